@@ -1,12 +1,28 @@
-export async function GET(request: Request) {
+import type { ChatMessagesResponse, Message } from '@/lib/types';
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+
+const DEFAULT_LIMIT = 50;
+const MAX_LIMIT = 100;
+
+// Parse a non-negative integer query parameter; undefined when absent, NaN when invalid
+function parseIntParam(value: string | null): number | undefined {
+  if (value === null || value === '') return undefined;
+  return /^\d+$/.test(value) ? Number(value) : NaN;
+}
+
+async function handleGet(request: Request) {
   try {
     console.log('[API CHAT LIST] Function called');
 
     const { searchParams } = new URL(request.url);
     const gameId = searchParams.get('game_id');
     const since = searchParams.get('since');
+    const afterId = parseIntParam(searchParams.get('after_id'));
+    const beforeId = parseIntParam(searchParams.get('before_id'));
+    const limit = parseIntParam(searchParams.get('limit')) ?? DEFAULT_LIMIT;
 
-    console.log('[API CHAT LIST] Params:', { gameId, since });
+    console.log('[API CHAT LIST] Params:', { gameId, since, afterId, beforeId, limit });
 
     // Validate game_id
     if (!gameId) {
@@ -14,19 +30,64 @@ export async function GET(request: Request) {
       return Response.json({ error: 'game_id is required' }, { status: 400 });
     }
 
-    // Return empty messages array (mock implementation)
-    const messages: any[] = [];
+    // Validate cursors
+    if (Number.isNaN(afterId) || Number.isNaN(beforeId)) {
+      return Response.json(
+        { error: 'after_id and before_id must be non-negative integers' },
+        { status: 400 }
+      );
+    }
 
-    console.log('[API CHAT LIST] Success, returning messages');
+    if (afterId !== undefined && beforeId !== undefined) {
+      return Response.json(
+        { error: 'after_id and before_id cannot be combined' },
+        { status: 400 }
+      );
+    }
 
-    return Response.json(
-      { messages },
-      {
-        headers: {
-          'Content-Type': 'application/json',
-        },
-      }
-    );
+    if (Number.isNaN(limit) || limit < 1 || limit > MAX_LIMIT) {
+      return Response.json(
+        { error: `limit must be between 1 and ${MAX_LIMIT}` },
+        { status: 400 }
+      );
+    }
+
+    // Fetch one extra row to learn whether another page exists; recent pages of active
+    // games are served from the in-memory chat buffer
+    const { store, chatBuffers } = getServerContext();
+    const pageQuery = { afterId, beforeId, limit: limit + 1 };
+    const rows =
+      (await chatBuffers.list(store, gameId, pageQuery)) ??
+      (await store.listMessages(gameId, pageQuery));
+    const hasMore = rows.length > limit;
+
+    let messages: Message[];
+    let nextCursor: number | null;
+
+    if (afterId !== undefined) {
+      // Forward page: oldest first, continue with after_id=next_cursor
+      messages = rows.slice(0, limit);
+      nextCursor = hasMore ? messages[messages.length - 1].id : null;
+    } else {
+      // Newest page (or older history): continue with before_id=next_cursor
+      messages = rows.slice(rows.length - Math.min(rows.length, limit));
+      nextCursor = hasMore ? messages[0].id : null;
+    }
+
+    // Deprecated timestamp filter, applied to the newest page only
+    if (since && afterId === undefined && beforeId === undefined) {
+      messages = messages.filter((m) => m.created_at > since);
+    }
+
+    console.log('[API CHAT LIST] Success, returning messages:', messages.length);
+
+    const response: ChatMessagesResponse = { messages, next_cursor: nextCursor };
+
+    return Response.json(response, {
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    });
   } catch (error) {
     console.error('[API CHAT LIST] Unexpected error:', error);
     console.error('[API CHAT LIST] Stack:', error instanceof Error ? error.stack : 'No stack');
@@ -41,5 +102,7 @@ export async function GET(request: Request) {
   }
 }
 
+export const GET = withMetrics('/api/chat/list', handleGet);
+
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
@@ -0,0 +1,36 @@
+import { forbiddenResponse, isCronRequest } from '@/server/auth';
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+
+// Runs one chat retention pass (scheduled hourly in vercel.json)
+async function handleGet(request: Request) {
+  try {
+    console.log('[API CHAT PRUNE] Function called');
+
+    if (!isCronRequest(request)) {
+      return forbiddenResponse();
+    }
+
+    const { store, chatBuffers, chatPruner } = getServerContext();
+    const result = await chatPruner.run(store, (gameId) => chatBuffers.invalidate(gameId));
+
+    console.log('[API CHAT PRUNE] Done:', result);
+
+    return Response.json(result);
+  } catch (error) {
+    console.error('[API CHAT PRUNE] Unexpected error:', error);
+
+    return Response.json(
+      {
+        error: 'Internal server error',
+        message: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+export const GET = withMetrics('/api/chat/prune', handleGet);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
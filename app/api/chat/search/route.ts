@@ -0,0 +1,85 @@
+import { forbiddenResponse, isAdminRequest } from '@/server/auth';
+import { searchChat } from '@/server/chat-search';
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+
+const DEFAULT_LIMIT = 20;
+const MAX_LIMIT = 100;
+
+// Parse an ISO date or epoch-ms query parameter; undefined when absent, NaN when invalid
+function parseTime(value: string | null): number | undefined {
+  if (!value) return undefined;
+  return /^\d+$/.test(value) ? Number(value) : Date.parse(value);
+}
+
+async function handleGet(request: Request) {
+  try {
+    console.log('[API CHAT SEARCH] Function called');
+
+    if (!isAdminRequest(request)) {
+      return forbiddenResponse();
+    }
+
+    const { searchParams } = new URL(request.url);
+    const q = searchParams.get('q');
+    const gameId = searchParams.get('game_id') || undefined;
+    const playerId = searchParams.get('player_id') || undefined;
+    const from = parseTime(searchParams.get('from'));
+    const to = parseTime(searchParams.get('to'));
+    const limit = Number(searchParams.get('limit') || DEFAULT_LIMIT);
+    const offset = Number(searchParams.get('cursor') || 0);
+
+    console.log('[API CHAT SEARCH] Params:', { q, gameId, playerId, from, to, limit, offset });
+
+    if (!q || !q.trim()) {
+      return Response.json({ error: 'q is required' }, { status: 400 });
+    }
+
+    if (Number.isNaN(from) || Number.isNaN(to)) {
+      return Response.json(
+        { error: 'from and to must be ISO dates or epoch milliseconds' },
+        { status: 400 }
+      );
+    }
+
+    if (!Number.isInteger(limit) || limit < 1 || limit > MAX_LIMIT) {
+      return Response.json(
+        { error: `limit must be between 1 and ${MAX_LIMIT}` },
+        { status: 400 }
+      );
+    }
+
+    if (!Number.isInteger(offset) || offset < 0) {
+      return Response.json({ error: 'cursor must be a non-negative integer' }, { status: 400 });
+    }
+
+    const page = await searchChat(getServerContext().store, {
+      q,
+      gameId,
+      playerId,
+      from,
+      to,
+      limit,
+      offset,
+    });
+
+    console.log('[API CHAT SEARCH] Success, returning results:', page.results.length);
+
+    return Response.json(page);
+  } catch (error) {
+    console.error('[API CHAT SEARCH] Unexpected error:', error);
+
+    return Response.json(
+      {
+        error: 'Internal server error',
+        message: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+export const GET = withMetrics('/api/chat/search', handleGet);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
@@ -1,6 +1,11 @@
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
 import { broadcastChatUpdate } from '@/server/pusher';
+import { clientIp, enforceRateLimit } from '@/server/rate-limit';
 
-export async function POST(request: Request) {
+const MAX_MESSAGE_LENGTH = 500;
+
+async function handlePost(request: Request) {
   try {
     console.log('[API CHAT SEND] Function called');
 
@@ -29,28 +34,63 @@ export async function POST(request: Request) {
       return Response.json({ error: 'text is required and must be a string' }, { status: 400 });
     }
 
-    // Generate message
-    const now = new Date().toISOString();
-    const messageId = Math.floor(Math.random() * 1000000);
+    if (text.length > MAX_MESSAGE_LENGTH) {
+      console.log('[API CHAT SEND] Text too long:', text.length);
+      return Response.json(
+        { error: `text must be at most ${MAX_MESSAGE_LENGTH} characters` },
+        { status: 400 }
+      );
+    }
+
+    // Rate limit before any store work
+    const { store, stateCache, chatBuffers, contentFilter, rateLimiters } = getServerContext();
+    const limited = await enforceRateLimit(rateLimiters['chat:send'], [
+      `ip:${clientIp(request)}`,
+      `player:${player_id}`,
+    ]);
+    if (limited) {
+      console.log('[API CHAT SEND] Rate limited:', { player_id });
+      return limited;
+    }
+
+    // Validate game and player
+    const cached = await stateCache.load(store, game_id);
+
+    if (!cached) {
+      return Response.json({ error: 'Game not found' }, { status: 404 });
+    }
+
+    if (!cached.game.players.some((p) => p.id === player_id)) {
+      return Response.json({ error: 'Player not found in game' }, { status: 400 });
+    }
+
+    // Filter banned terms
+    await contentFilter.ready();
+    const filtered = contentFilter.check(text);
 
-    console.log('[API CHAT SEND] Generated message ID:', messageId);
+    if (filtered.matches > 0 && contentFilter.action === 'reject') {
+      console.log('[API CHAT SEND] Rejected by content filter:', { player_id });
+      return Response.json({ error: 'Message contains blocked words' }, { status: 400 });
+    }
 
-    const message = {
-      id: messageId,
+    // Store message (id is assigned by the store)
+    const message = await store.appendMessage({
       game_id,
       player_id,
-      message_type: 'chat' as const,
-      content: text,
-      created_at: now,
-    };
+      message_type: 'chat',
+      content: filtered.text,
+      created_at: new Date().toISOString(),
+    });
 
-    // Broadcast chat update via WebSocket
-    try {
-      broadcastChatUpdate(game_id, [message]);
-    } catch (error) {
+    chatBuffers.append(message);
+
+    console.log('[API CHAT SEND] Stored message ID:', message.id);
+
+    // Broadcast chat update via WebSocket; not awaited, so the response does not wait for
+    // Pusher. Don't fail the request if the broadcast fails.
+    broadcastChatUpdate(game_id, [message]).catch((error) => {
       console.error('[API CHAT SEND] Failed to broadcast WebSocket update:', error);
-      // Don't fail the request if WebSocket broadcast fails
-    }
+    });
 
     console.log('[API CHAT SEND] Success, returning message');
 
@@ -73,5 +113,7 @@ export async function POST(request: Request) {
   }
 }
 
+export const POST = withMetrics('/api/chat/send', handlePost);
+
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
@@ -0,0 +1,80 @@
+import { forbiddenResponse, isAdminRequest } from '@/server/auth';
+import { getServerContext } from '@/server/context';
+import { diffSnapshots, type MemorySnapshot } from '@/server/memory';
+
+const DEFAULT_TOP = 20;
+
+function trim(snapshot: MemorySnapshot, top: number): MemorySnapshot {
+  const { allocations } = snapshot;
+  if (!allocations) return snapshot;
+
+  return {
+    ...snapshot,
+    allocations: {
+      ...allocations,
+      modules: allocations.modules.slice(0, top),
+      sites: allocations.sites.slice(0, top),
+    },
+  };
+}
+
+// Takes a memory snapshot of this worker. Query: since=<snapshot id> adds the diff against an
+// earlier snapshot, top limits allocation groups, gc=1 collects garbage first when node runs
+// with --expose-gc (so the diff shows retained memory only).
+export async function GET(request: Request) {
+  try {
+    if (!isAdminRequest(request)) {
+      return forbiddenResponse();
+    }
+
+    const { searchParams } = new URL(request.url);
+    const since = searchParams.get('since');
+    const top = Number(searchParams.get('top') || DEFAULT_TOP);
+
+    if (!Number.isInteger(top) || top < 1) {
+      return Response.json({ error: 'top must be a positive integer' }, { status: 400 });
+    }
+
+    const context = getServerContext();
+    const { memory } = context;
+    const before = since !== null ? memory.get(Number(since)) : null;
+
+    if (since !== null && !before) {
+      return Response.json(
+        { error: `Snapshot ${since} not found`, snapshots: memory.stats().snapshots },
+        { status: 404 }
+      );
+    }
+
+    const gc = (globalThis as { gc?: () => void }).gc;
+    if (searchParams.get('gc') === '1' && gc) {
+      gc();
+    }
+
+    const snapshot = await memory.snapshot(context);
+    const diff = before ? diffSnapshots(before, snapshot) : null;
+
+    return Response.json({
+      diagnostics: memory.stats(),
+      snapshot: trim(snapshot, top),
+      diff: diff && {
+        ...diff,
+        modules: diff.modules.slice(0, top),
+        sites: diff.sites.slice(0, top),
+      },
+    });
+  } catch (error) {
+    console.error('[API DEBUG MEMORY] Unexpected error:', error);
+
+    return Response.json(
+      {
+        error: 'Internal server error',
+        message: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
@@ -1,5 +1,20 @@
-export async function GET(request: Request) {
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+
+async function handleGet(request: Request) {
   console.log('[API DEBUG] GET request received');
+  const {
+    store,
+    stateCache,
+    chatBuffers,
+    chatPruner,
+    contentFilter,
+    inviteCodes,
+    rateLimiters,
+    metrics,
+    tracer,
+    memory,
+  } = getServerContext();
 
   return Response.json({
     status: 'ok',
@@ -12,10 +27,23 @@ export async function GET(request: Request) {
       VERCEL: process.env.VERCEL,
       VERCEL_ENV: process.env.VERCEL_ENV,
     },
+    store: store.kind,
+    state_cache: stateCache.stats(),
+    chat_buffers: chatBuffers.stats(),
+    chat_retention: chatPruner.stats(),
+    content_filter: contentFilter.stats(),
+    invite_codes: inviteCodes.stats(),
+    rate_limits: {
+      chat_send: rateLimiters['chat:send'].stats(),
+      game_move: rateLimiters['game:move'].stats(),
+    },
+    metrics: metrics.stats(),
+    tracing: tracer.stats(),
+    memory: memory.stats(),
   });
 }
 
-export async function POST(request: Request) {
+async function handlePost(request: Request) {
   console.log('[API DEBUG] POST request received');
 
   try {
@@ -38,5 +66,8 @@ export async function POST(request: Request) {
   }
 }
 
+export const GET = withMetrics('/api/debug', handleGet);
+export const POST = withMetrics('/api/debug', handlePost);
+
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
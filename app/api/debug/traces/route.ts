@@ -0,0 +1,82 @@
+import { forbiddenResponse, isAdminRequest } from '@/server/auth';
+import { getServerContext } from '@/server/context';
+import type { TraceRecord } from '@/server/tracing';
+
+const DEFAULT_LIMIT = 20;
+
+function round(ms: number): number {
+  return Math.round(ms * 1000) / 1000;
+}
+
+// Spans as offsets from the start of the trace, so a slow phase stands out
+function formatTrace(trace: TraceRecord) {
+  return {
+    trace_id: trace.traceId,
+    name: trace.name,
+    started_at: new Date(trace.startTime).toISOString(),
+    duration_ms: round(trace.durationMs),
+    spans: trace.spans.map((span) => ({
+      span_id: span.spanId,
+      parent_span_id: span.parentSpanId,
+      name: span.name,
+      offset_ms: round(span.startTime - trace.startTime),
+      duration_ms: round(span.durationMs),
+      attributes: span.attributes,
+      error: span.error,
+    })),
+  };
+}
+
+// Recent traces of this worker, newest first. Query: limit, route (part of the root span name,
+// e.g. /api/game/move), min_ms, order=slowest. Not wrapped with withMetrics so reading traces
+// does not record more of them.
+export async function GET(request: Request) {
+  try {
+    if (!isAdminRequest(request)) {
+      return forbiddenResponse();
+    }
+
+    const { searchParams } = new URL(request.url);
+    const limit = Number(searchParams.get('limit') || DEFAULT_LIMIT);
+    const minMs = searchParams.get('min_ms');
+    const order = searchParams.get('order') || 'newest';
+
+    if (!Number.isInteger(limit) || limit < 1) {
+      return Response.json({ error: 'limit must be a positive integer' }, { status: 400 });
+    }
+
+    if (minMs !== null && !Number.isFinite(Number(minMs))) {
+      return Response.json({ error: 'min_ms must be a number' }, { status: 400 });
+    }
+
+    if (order !== 'newest' && order !== 'slowest') {
+      return Response.json({ error: 'order must be newest or slowest' }, { status: 400 });
+    }
+
+    const { tracer } = getServerContext();
+    const traces = tracer.recent({
+      limit,
+      name: searchParams.get('route') || undefined,
+      minMs: minMs !== null ? Number(minMs) : undefined,
+      slowest: order === 'slowest',
+    });
+
+    return Response.json({
+      tracing: tracer.stats(),
+      traces: traces.map(formatTrace),
+    });
+  } catch (error) {
+    console.error('[API DEBUG TRACES] Unexpected error:', error);
+
+    return Response.json(
+      {
+        error: 'Internal server error',
+        message: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
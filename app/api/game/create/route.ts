@@ -1,45 +1,45 @@
-import { kv } from '@vercel/kv';
-import { NextResponse } from 'next/server';
-import Pusher from 'pusher';
-
-const pusher = new Pusher({
-  appId: process.env.PUSHER_APP_ID!,
-  key: process.env.PUSHER_KEY!,
-  secret: process.env.PUSHER_SECRET!,
-  cluster: process.env.PUSHER_CLUSTER!,
-  useTLS: true,
-});
-
-function generateInviteCode(): string {
-  const chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789';
-  return Array.from({ length: 6 }, () => chars[Math.floor(Math.random() * chars.length)]).join(
-    ''
-  );
-}
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+import { checkProfileToken } from '@/server/ratings';
+import type { StoredGame } from '@/server/store';
 
 function generateId(): string {
   return `${Date.now()}_${Math.random().toString(36).substring(2, 15)}`;
 }
 
-export async function POST(request: Request) {
+async function handlePost(request: Request) {
   try {
     const body = await request.json();
-    const { mode, player_name } = body;
+    const { mode, player_name, profile_id, profile_token } = body;
 
-    if (!mode || !['classic3', 'gomoku5'].includes(mode)) {
-      return NextResponse.json({ error: 'Invalid game mode' }, { status: 400 });
+    if (!mode || !['classic3', 'gomoku'].includes(mode)) {
+      return Response.json({ error: 'Invalid game mode' }, { status: 400 });
     }
 
     if (!player_name || typeof player_name !== 'string') {
-      return NextResponse.json({ error: 'Player name is required' }, { status: 400 });
+      return Response.json({ error: 'Player name is required' }, { status: 400 });
+    }
+
+    const { store, stateCache, inviteCodes } = getServerContext();
+
+    // Optional: games between two profiles are rated. Playing under a profile takes its token.
+    if (profile_id !== undefined) {
+      const check = await checkProfileToken(store, profile_id, profile_token);
+      if (check === 'not_found') {
+        return Response.json({ error: 'Player profile not found' }, { status: 404 });
+      }
+      if (check === 'invalid_token') {
+        return Response.json({ error: 'Invalid profile token' }, { status: 403 });
+      }
     }
 
     const gameId = `game_${generateId()}`;
     const playerId = generateId();
-    const inviteCode = generateInviteCode();
+    // Unique by construction, no lookup needed
+    const inviteCode = await inviteCodes.next(store);
     const now = new Date().toISOString();
 
-    const game = {
+    const game: StoredGame = {
       id: gameId,
       invite_code: inviteCode,
       mode,
@@ -55,6 +55,7 @@ export async function POST(request: Request) {
           player_name,
           is_ai: false,
           joined_at: now,
+          ...(profile_id && { profile_id }),
         },
       ],
       created_at: now,
@@ -62,13 +63,14 @@ export async function POST(request: Request) {
       finished_at: null,
     };
 
-    // Save to KV
-    await kv.set(`game:${gameId}`, game, { ex: 86400 }); // 24 hours
-    await kv.set(`invite:${inviteCode}`, gameId, { ex: 86400 });
+    // Save game and invite code
+    const version = await store.saveGame(game);
+    stateCache.set(game, version);
+    await store.saveInvite(inviteCode, gameId);
 
     console.log('[CREATE] Game created:', { gameId, inviteCode });
 
-    return NextResponse.json(
+    return Response.json(
       {
         game,
         player_id: playerId,
@@ -78,9 +80,11 @@ export async function POST(request: Request) {
     );
   } catch (error) {
     console.error('[CREATE] Error:', error);
-    return NextResponse.json({ error: 'Failed to create game' }, { status: 500 });
+    return Response.json({ error: 'Failed to create game' }, { status: 500 });
   }
 }
 
+export const POST = withMetrics('/api/game/create', handlePost);
+
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
@@ -0,0 +1,114 @@
+import type { GameStatus } from '@/lib/types';
+import { forbiddenResponse, isAdminRequest } from '@/server/auth';
+import { getServerContext } from '@/server/context';
+import { exportGames, serializeExportEvent } from '@/server/export';
+import { withMetrics } from '@/server/metrics';
+
+const STATUSES: GameStatus[] = ['waiting', 'active', 'completed', 'abandoned'];
+const MAX_CHUNK_SIZE = 1000;
+
+// Parse an ISO date or epoch-ms query parameter; undefined when absent, NaN when invalid
+function parseTime(value: string | null): number | undefined {
+  if (!value) return undefined;
+  return /^\d+$/.test(value) ? Number(value) : Date.parse(value);
+}
+
+// Streams every matching game as NDJSON: one {"type":"game"} line per game and a
+// {"type":"cursor"} line after each chunk. Pass the last cursor back to resume; a resumed
+// export may repeat games sent before it, so de-duplicate by game.id.
+async function handleGet(request: Request) {
+  try {
+    console.log('[API GAME EXPORT] Function called');
+
+    if (!isAdminRequest(request)) {
+      return forbiddenResponse();
+    }
+
+    const { searchParams } = new URL(request.url);
+    const status = (searchParams.get('status') || undefined) as GameStatus | undefined;
+    const mode = searchParams.get('mode') || undefined;
+    const from = parseTime(searchParams.get('from'));
+    const to = parseTime(searchParams.get('to'));
+    const cursor = searchParams.get('cursor') || undefined;
+    const chunkSize = Number(searchParams.get('chunk_size') || 100);
+
+    console.log('[API GAME EXPORT] Params:', { status, mode, from, to, cursor, chunkSize });
+
+    if (status && !STATUSES.includes(status)) {
+      return Response.json(
+        { error: `status must be one of: ${STATUSES.join(', ')}` },
+        { status: 400 }
+      );
+    }
+
+    if (Number.isNaN(from) || Number.isNaN(to)) {
+      return Response.json(
+        { error: 'from and to must be ISO dates or epoch milliseconds' },
+        { status: 400 }
+      );
+    }
+
+    if (cursor !== undefined && !/^\d+$/.test(cursor)) {
+      return Response.json(
+        { error: 'cursor must be a value from a previous export' },
+        { status: 400 }
+      );
+    }
+
+    if (!Number.isInteger(chunkSize) || chunkSize < 1 || chunkSize > MAX_CHUNK_SIZE) {
+      return Response.json(
+        { error: `chunk_size must be between 1 and ${MAX_CHUNK_SIZE}` },
+        { status: 400 }
+      );
+    }
+
+    const events = exportGames(getServerContext().store, {
+      status,
+      mode,
+      from,
+      to,
+      cursor,
+      chunkSize,
+    });
+    const encoder = new TextEncoder();
+
+    // Pull-based: the next chunk is only read once the client has taken the previous one
+    const stream = new ReadableStream<Uint8Array>({
+      async pull(controller) {
+        try {
+          const { value, done } = await events.next();
+          if (done) {
+            controller.close();
+          } else {
+            controller.enqueue(encoder.encode(serializeExportEvent(value)));
+          }
+        } catch (error) {
+          console.error('[API GAME EXPORT] Stream failed:', error);
+          controller.error(error);
+        }
+      },
+      async cancel() {
+        await events.return(undefined);
+      },
+    });
+
+    return new Response(stream, {
+      headers: { 'Content-Type': 'application/x-ndjson', 'Cache-Control': 'no-store' },
+    });
+  } catch (error) {
+    console.error('[API GAME EXPORT] Unexpected error:', error);
+
+    return Response.json(
+      {
+        error: 'Internal server error',
+        message: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+export const GET = withMetrics('/api/game/export', handleGet);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
@@ -1,87 +1,98 @@
-import { kv } from '@vercel/kv';
-import { NextResponse } from 'next/server';
-import Pusher from 'pusher';
-
-const pusher = new Pusher({
-  appId: process.env.PUSHER_APP_ID!,
-  key: process.env.PUSHER_KEY!,
-  secret: process.env.PUSHER_SECRET!,
-  cluster: process.env.PUSHER_CLUSTER!,
-  useTLS: true,
-});
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+import { checkProfileToken } from '@/server/ratings';
+import type { Player } from '@/lib/types';
 
 function generateId(): string {
   return `${Date.now()}_${Math.random().toString(36).substring(2, 15)}`;
 }
 
-export async function POST(request: Request) {
+async function handlePost(request: Request) {
   try {
     const body = await request.json();
-    const { invite_code, player_name } = body;
+    const { invite_code, player_name, profile_id, profile_token } = body;
 
     if (!invite_code || typeof invite_code !== 'string' || invite_code.length !== 6) {
-      return NextResponse.json({ error: 'Invalid invite code' }, { status: 400 });
+      return Response.json({ error: 'Invalid invite code' }, { status: 400 });
     }
 
     if (!player_name || typeof player_name !== 'string') {
-      return NextResponse.json({ error: 'Player name is required' }, { status: 400 });
+      return Response.json({ error: 'Player name is required' }, { status: 400 });
     }
 
     const inviteCodeUpper = invite_code.toUpperCase();
-
-    // 1. Find game_id by invite_code
-    const gameId = await kv.get<string>(`invite:${inviteCodeUpper}`);
-
-    if (!gameId) {
-      console.log('[JOIN] Game not found for code:', inviteCodeUpper);
-      return NextResponse.json({ error: 'Game not found' }, { status: 404 });
+    const { store, stateCache, getPusher } = getServerContext();
+
+    // Optional: games between two profiles are rated. Playing under a profile takes its token.
+    if (profile_id !== undefined) {
+      const check = await checkProfileToken(store, profile_id, profile_token);
+      if (check === 'not_found') {
+        return Response.json({ error: 'Player profile not found' }, { status: 404 });
+      }
+      if (check === 'invalid_token') {
+        return Response.json({ error: 'Invalid profile token' }, { status: 403 });
+      }
     }
 
-    // 2. Load game from KV
-    const game = await kv.get<any>(`game:${gameId}`);
+    // 1. Resolve invite code and load game (single round trip)
+    const game = await store.getGameByInvite(inviteCodeUpper);
 
     if (!game) {
-      return NextResponse.json({ error: 'Game not found' }, { status: 404 });
+      console.log('[JOIN] Game not found for code:', inviteCodeUpper);
+      return Response.json({ error: 'Game not found' }, { status: 404 });
     }
 
-    // 3. Check that game is in waiting status
+    const gameId = game.id;
+
+    // 2. Check that game is in waiting status
     if (game.status !== 'waiting') {
-      return NextResponse.json(
+      return Response.json(
         { error: 'Game already started or finished' },
         { status: 409 }
       );
     }
 
-    // 4. Check that game is not full
+    // 3. Check that game is not full
     if (game.players.length >= 2) {
-      return NextResponse.json({ error: 'Game is full' }, { status: 409 });
+      return Response.json({ error: 'Game is full' }, { status: 409 });
     }
 
-    // 5. Add second player
+    // 4. Add second player
     const playerId = generateId();
     const now = new Date().toISOString();
 
-    const newPlayer = {
+    const newPlayer: Player = {
       id: playerId,
       game_id: gameId,
       player_number: 2,
       player_name,
       is_ai: false,
       joined_at: now,
+      ...(profile_id && { profile_id }),
     };
 
+    const expectedVersion = game.version ?? 0;
     game.players.push(newPlayer);
     game.status = 'active';
     game.current_turn = 1; // First player goes first
     game.started_at = now;
 
-    // 6. Update in KV
-    await kv.set(`game:${gameId}`, game, { ex: 86400 });
+    // 5. Save only if nobody changed the game since it was read; the loser of two
+    // simultaneous joins gets a 409 instead of overwriting the winner
+    const version = await store.saveGameIfVersion(game, expectedVersion);
+
+    if (version === null) {
+      console.log('[JOIN] Lost join race:', { gameId, inviteCode: inviteCodeUpper });
+      return Response.json({ error: 'Another player joined this game first' }, { status: 409 });
+    }
+
+    stateCache.set(game, version);
 
     console.log('[JOIN] Player joined:', { gameId, playerId, inviteCode: inviteCodeUpper });
 
-    // 7. Send notification to first player through Pusher
+    // 6. Send notification to first player through Pusher
     try {
+      const pusher = await getPusher();
       await pusher.trigger(`game-${gameId}`, 'player-joined', {
         game,
         player: newPlayer,
@@ -94,7 +105,7 @@ export async function POST(request: Request) {
       // Continue even if Pusher fails
     }
 
-    return NextResponse.json(
+    return Response.json(
       {
         game,
         player: newPlayer,
@@ -104,9 +115,11 @@ export async function POST(request: Request) {
     );
   } catch (error) {
     console.error('[JOIN] Error:', error);
-    return NextResponse.json({ error: 'Failed to join game' }, { status: 500 });
+    return Response.json({ error: 'Failed to join game' }, { status: 500 });
   }
 }
 
+export const POST = withMetrics('/api/game/join', handlePost);
+
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
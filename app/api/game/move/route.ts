@@ -1,66 +1,59 @@
-import { getGameState, setGameState, createGameState } from '../gameState';
+import { encodeCompactMove } from '@/lib/compact';
+import {
+  buildBoard,
+  checkWinner,
+  getBoardSize,
+  isBoardFull,
+  isValidPosition,
+} from '@/lib/game-logic';
+import type { GameBoard, GameMode, GameStatus, MakeMoveResponse, Move, Player } from '@/lib/types';
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
 import { broadcastGameUpdate } from '@/server/pusher';
-
-// Check for winner in Classic 3x3
-function checkWinner(board: (string | null)[][]): 'X' | 'O' | null {
-  // Check rows
-  for (let row = 0; row < 3; row++) {
-    if (board[row][0] && board[row][0] === board[row][1] && board[row][1] === board[row][2]) {
-      return board[row][0] as 'X' | 'O';
-    }
+import { clientIp, enforceRateLimit } from '@/server/rate-limit';
+import { ratingChanges } from '@/server/ratings';
+import type { StoredGame } from '@/server/store';
+import { setSpanAttributes, traced } from '@/server/tracing';
+
+type MoveCheck = { error: string } | { player: Player; board: GameBoard };
+
+// Game rules for a move on the loaded state: the board is rebuilt to check the target cell
+function validateMove(
+  gameState: StoredGame,
+  playerId: string,
+  rowIndex: number,
+  columnIndex: number
+): MoveCheck {
+  // Check if game is already finished
+  if (gameState.status === 'completed') {
+    return { error: 'Game is already finished' };
   }
 
-  // Check columns
-  for (let col = 0; col < 3; col++) {
-    if (board[0][col] && board[0][col] === board[1][col] && board[1][col] === board[2][col]) {
-      return board[0][col] as 'X' | 'O';
-    }
+  // Validate it's the player's turn
+  const player = gameState.players.find((p) => p.id === playerId);
+  if (!player) {
+    return { error: 'Player not found in game' };
   }
 
-  // Check diagonals
-  if (board[0][0] && board[0][0] === board[1][1] && board[1][1] === board[2][2]) {
-    return board[0][0] as 'X' | 'O';
+  if (player.player_number !== gameState.current_turn) {
+    return { error: 'Not your turn' };
   }
 
-  if (board[0][2] && board[0][2] === board[1][1] && board[1][1] === board[2][0]) {
-    return board[0][2] as 'X' | 'O';
+  // Build current board and check if position is valid and free
+  const mode = gameState.mode as GameMode;
+  if (!isValidPosition(mode, rowIndex, columnIndex)) {
+    return { error: 'Position out of bounds' };
   }
 
-  return null;
-}
-
-// Build board from moves
-function buildBoardFromMoves(moves: any[], players: any[]): (string | null)[][] {
-  const board: (string | null)[][] = Array.from({ length: 3 }, () =>
-    Array.from({ length: 3 }, () => null)
-  );
-
-  const playerMap = new Map(players.map((p: any) => [p.id, p]));
-
-  for (const move of moves) {
-    const player = playerMap.get(move.player_id);
-    if (player) {
-      const symbol = player.player_number === 1 ? 'X' : 'O';
-      board[move.row_index][move.column_index] = symbol;
-    }
+  const board = buildBoard(mode, gameState.moves ?? [], gameState.players);
+  if (board.cells[rowIndex][columnIndex].symbol !== null) {
+    return { error: 'Position already occupied' };
   }
 
-  return board;
+  return { player, board };
 }
 
-// Check if board is full
-function isBoardFull(board: (string | null)[][]): boolean {
-  for (let row = 0; row < 3; row++) {
-    for (let col = 0; col < 3; col++) {
-      if (board[row][col] === null) {
-        return false;
-      }
-    }
-  }
-  return true;
-}
-
-export async function POST(request: Request) {
+async function handlePost(request: Request) {
   try {
     console.log('[API MOVE] Function called');
 
@@ -92,40 +85,44 @@ export async function POST(request: Request) {
       );
     }
 
-    // Get or create game state
-    let gameState = getGameState(game_id);
-
-    if (!gameState) {
-      // Initialize new game state if it doesn't exist
-      gameState = createGameState(game_id);
+    // Rate limit before any store work
+    const { store, stateCache, rateLimiters } = getServerContext();
+    const limited = await traced('move.rate_limit', () =>
+      enforceRateLimit(rateLimiters['game:move'], [
+        `ip:${clientIp(request)}`,
+        `player:${player_id}`,
+      ])
+    );
+    if (limited) {
+      console.log('[API MOVE] Rate limited:', { player_id });
+      return limited;
     }
 
-    // Check if game is already finished
-    if (gameState.game.status === 'completed') {
-      return Response.json({ error: 'Game is already finished' }, { status: 400 });
-    }
+    // Load game state (cached copy is cloned before it is modified)
+    const cached = await traced('move.load', () => stateCache.load(store, game_id));
 
-    // Validate it's the player's turn
-    const player = gameState.players.find((p: any) => p.id === player_id);
-    if (!player) {
-      return Response.json({ error: 'Player not found in game' }, { status: 400 });
+    if (!cached) {
+      return Response.json({ error: 'Game not found' }, { status: 404 });
     }
 
-    if (player.player_number !== gameState.game.current_turn) {
-      return Response.json({ error: 'Not your turn' }, { status: 400 });
-    }
+    const gameState = structuredClone(cached.game);
+    const mode = gameState.mode as GameMode;
+    const moves = gameState.moves ?? [];
+    setSpanAttributes({ 'game.id': game_id, 'game.mode': mode, 'game.moves': moves.length });
 
-    // Build current board and check if position is occupied
-    const board = buildBoardFromMoves(gameState.moves, gameState.players);
-    if (board[row_index][column_index] !== null) {
-      return Response.json({ error: 'Position already occupied' }, { status: 400 });
+    const check = traced('move.validate', () =>
+      validateMove(gameState, player_id, row_index, column_index)
+    );
+    if ('error' in check) {
+      return Response.json({ error: check.error }, { status: 400 });
     }
+    const { player, board } = check;
 
     // Create move
     const now = new Date().toISOString();
-    const moveId = gameState.moves.length + 1;
+    const moveId = moves.length + 1;
 
-    const move = {
+    const move: Move = {
       id: moveId,
       game_id,
       player_id,
@@ -136,49 +133,71 @@ export async function POST(request: Request) {
     };
 
     // Add move to game state
-    gameState.moves.push(move);
+    moves.push(move);
+    gameState.moves = moves;
 
-    // Rebuild board with new move
-    const newBoard = buildBoardFromMoves(gameState.moves, gameState.players);
-
-    // Check for winner
-    const winner = checkWinner(newBoard);
-    const isDraw = !winner && isBoardFull(newBoard);
+    // Apply the new move and check for winner
+    board.cells[row_index][column_index] = {
+      symbol: player.player_number === 1 ? 'X' : 'O',
+      player_number: player.player_number,
+    };
+    const winner = traced('move.win_check', () => checkWinner(mode, board));
+    const isDraw = !winner && isBoardFull(board);
 
     let isWinner = false;
-    let gameStatus = 'active';
+    let gameStatus: GameStatus = 'active';
 
     if (winner) {
       isWinner = true;
       gameStatus = 'completed';
-      gameState.game.status = 'completed';
-      gameState.game.winner_id = player_id;
-      gameState.game.finished_at = now;
-      gameState.game.current_turn = null;
+      gameState.status = 'completed';
+      gameState.winner_id = player_id;
+      gameState.finished_at = now;
+      gameState.current_turn = null;
       console.log('[API MOVE] Winner found:', winner);
     } else if (isDraw) {
       gameStatus = 'completed';
-      gameState.game.status = 'completed';
-      gameState.game.finished_at = now;
-      gameState.game.current_turn = null;
+      gameState.status = 'completed';
+      gameState.finished_at = now;
+      gameState.current_turn = null;
       console.log('[API MOVE] Game is a draw');
     } else {
       // Switch turn
-      gameState.game.current_turn = gameState.game.current_turn === 1 ? 2 : 1;
+      gameState.current_turn = gameState.current_turn === 1 ? 2 : 1;
     }
 
-    // Save updated state
-    setGameState(game_id, gameState);
+    // Rated games (two profiles) save the final state and both rating changes together
+    const changes =
+      gameStatus === 'completed'
+        ? await traced('move.rate', () => ratingChanges(store, gameState))
+        : null;
+
+    // Save only if nobody moved since the state was loaded (another request, or another
+    // worker behind this one's cache), then write it through to the cache
+    const version = await traced('move.commit', () =>
+      changes
+        ? store.saveRatedGame(gameState, changes, cached.version)
+        : store.saveGameIfVersion(gameState, cached.version)
+    );
 
-    // Broadcast game state update via WebSocket
-    try {
-      broadcastGameUpdate(game_id, gameState);
-    } catch (error) {
-      console.error('[API MOVE] Failed to broadcast WebSocket update:', error);
-      // Don't fail the request if WebSocket broadcast fails
+    if (version === null) {
+      console.log('[API MOVE] Lost move race:', { game_id, player_id });
+      stateCache.invalidate(game_id);
+      return Response.json(
+        { error: 'The game changed since it was loaded; reload and try again' },
+        { status: 409 }
+      );
     }
 
-    const responseData = {
+    stateCache.set(gameState, version);
+
+    // Broadcast game state update via WebSocket; not awaited, so the response does not wait
+    // for Pusher. Don't fail the request if the broadcast fails.
+    traced('move.publish', () => broadcastGameUpdate(game_id, gameState)).catch((error) => {
+      console.error('[API MOVE] Failed to broadcast WebSocket update:', error);
+    });
+
+    const responseData: MakeMoveResponse = {
       move,
       is_winner: isWinner,
       is_draw: isDraw,
@@ -187,7 +206,11 @@ export async function POST(request: Request) {
 
     console.log('[API MOVE] Success, returning:', responseData);
 
-    return Response.json(responseData, {
+    const format = new URL(request.url).searchParams.get('format');
+    const responseBody =
+      format === 'compact' ? encodeCompactMove(responseData, getBoardSize(mode)) : responseData;
+
+    return Response.json(responseBody, {
       headers: {
         'Content-Type': 'application/json',
       },
@@ -206,5 +229,7 @@ export async function POST(request: Request) {
   }
 }
 
+export const POST = withMetrics('/api/game/move', handlePost);
+
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
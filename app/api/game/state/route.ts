@@ -1,52 +1,45 @@
-import { kv } from '@vercel/kv';
-import { NextResponse } from 'next/server';
+import { encodeCompactGameState } from '@/lib/compact';
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+import { jsonResponse, toGameStateResponse } from '@/server/serialize';
 
-export async function GET(request: Request) {
+async function handleGet(request: Request) {
   try {
     const { searchParams } = new URL(request.url);
     const gameId = searchParams.get('game_id');
+    const format = searchParams.get('format');
 
     if (!gameId) {
-      return NextResponse.json({ error: 'game_id is required' }, { status: 400 });
+      return Response.json({ error: 'game_id is required' }, { status: 400 });
     }
 
-    const game = await kv.get<any>(`game:${gameId}`);
+    const { store, stateCache } = getServerContext();
+    const cached = await stateCache.load(store, gameId);
 
-    if (!game) {
-      return NextResponse.json({ error: 'Game not found' }, { status: 404 });
+    if (!cached) {
+      return Response.json({ error: 'Game not found' }, { status: 404 });
     }
 
+    const { game } = cached;
     console.log('[STATE] Game loaded:', {
       gameId,
       status: game.status,
       players: game.players.length,
     });
 
+    if (format === 'compact') {
+      return jsonResponse(JSON.stringify(encodeCompactGameState(toGameStateResponse(game))));
+    }
+
     // Return in the format expected by the frontend
-    return NextResponse.json(
-      {
-        game: {
-          id: game.id,
-          invite_code: game.invite_code,
-          mode: game.mode,
-          status: game.status,
-          created_at: game.created_at,
-          started_at: game.started_at,
-          finished_at: game.finished_at,
-          current_turn: game.current_turn,
-          winner_id: game.winner_id,
-        },
-        players: game.players,
-        moves: [], // TODO: Implement moves from KV if needed
-        messages: [], // TODO: Implement messages from KV if needed
-      },
-      { status: 200 }
-    );
+    return jsonResponse(cached.body);
   } catch (error) {
     console.error('[STATE] Error:', error);
-    return NextResponse.json({ error: 'Failed to get game state' }, { status: 500 });
+    return Response.json({ error: 'Failed to get game state' }, { status: 500 });
   }
 }
 
+export const GET = withMetrics('/api/game/state', handleGet);
+
 export const dynamic = 'force-dynamic';
 export const runtime = 'nodejs';
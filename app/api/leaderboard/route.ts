@@ -0,0 +1,57 @@
+import type { GameMode, LeaderboardResponse } from '@/lib/types';
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+import { RATED_MODES, getLeaderboardEntry, getLeaderboardPage } from '@/server/ratings';
+
+const DEFAULT_LIMIT = 20;
+const MAX_LIMIT = 100;
+
+// Top players of a mode by rating. Query: mode, limit, offset; profile_id adds that
+// player's own entry (null when they have no rated games in the mode).
+async function handleGet(request: Request) {
+  try {
+    const { searchParams } = new URL(request.url);
+    const mode = searchParams.get('mode') as GameMode;
+    const limit = Number(searchParams.get('limit') || DEFAULT_LIMIT);
+    const offset = Number(searchParams.get('offset') || 0);
+    const profileId = searchParams.get('profile_id');
+
+    if (!RATED_MODES.includes(mode)) {
+      return Response.json(
+        { error: `mode must be one of: ${RATED_MODES.join(', ')}` },
+        { status: 400 }
+      );
+    }
+
+    if (!Number.isInteger(limit) || limit < 1 || limit > MAX_LIMIT) {
+      return Response.json(
+        { error: `limit must be an integer from 1 to ${MAX_LIMIT}` },
+        { status: 400 }
+      );
+    }
+
+    if (!Number.isInteger(offset) || offset < 0) {
+      return Response.json({ error: 'offset must be a non-negative integer' }, { status: 400 });
+    }
+
+    const { store } = getServerContext();
+    const [entries, player] = await Promise.all([
+      getLeaderboardPage(store, mode, offset, limit),
+      profileId ? getLeaderboardEntry(store, mode, profileId) : undefined,
+    ]);
+
+    const response: LeaderboardResponse = { mode, entries };
+    if (profileId) {
+      response.player = player;
+    }
+    return Response.json(response);
+  } catch (error) {
+    console.error('[LEADERBOARD] Error:', error);
+    return Response.json({ error: 'Failed to load leaderboard' }, { status: 500 });
+  }
+}
+
+export const GET = withMetrics('/api/leaderboard', handleGet);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
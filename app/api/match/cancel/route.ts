@@ -0,0 +1,51 @@
+import { getServerContext } from '@/server/context';
+import { cancelMatch, toMatchStatus } from '@/server/matchmaking';
+import { withMetrics } from '@/server/metrics';
+
+// Leave the quick match queue; 409 when the ticket has already been paired
+async function handlePost(request: Request) {
+  try {
+    let body;
+    try {
+      body = await request.json();
+    } catch (e) {
+      console.error('[MATCH CANCEL] Failed to parse body:', e);
+      return Response.json({ error: 'Invalid JSON body' }, { status: 400 });
+    }
+
+    const { ticket_id } = body;
+
+    if (!ticket_id || typeof ticket_id !== 'string') {
+      return Response.json({ error: 'ticket_id is required' }, { status: 400 });
+    }
+
+    const context = getServerContext();
+    const ticket = await context.store.getMatchTicket(ticket_id);
+
+    if (!ticket) {
+      return Response.json({ error: 'Ticket not found' }, { status: 404 });
+    }
+
+    const cancelled = await cancelMatch(context, ticket);
+
+    if (!cancelled) {
+      const current = (await context.store.getMatchTicket(ticket_id)) ?? ticket;
+      return Response.json(
+        { error: 'Already matched', ...(await toMatchStatus(context, current)) },
+        { status: 409 }
+      );
+    }
+
+    console.log('[MATCH CANCEL] Ticket cancelled:', ticket_id);
+
+    return Response.json(await toMatchStatus(context, cancelled));
+  } catch (error) {
+    console.error('[MATCH CANCEL] Error:', error);
+    return Response.json({ error: 'Failed to cancel match' }, { status: 500 });
+  }
+}
+
+export const POST = withMetrics('/api/match/cancel', handlePost);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
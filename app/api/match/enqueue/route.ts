@@ -0,0 +1,59 @@
+import type { GameMode } from '@/lib/types';
+import { getServerContext } from '@/server/context';
+import { MATCH_MODES, enqueueMatch, toMatchStatus } from '@/server/matchmaking';
+import { withMetrics } from '@/server/metrics';
+import { checkProfileToken } from '@/server/ratings';
+
+// Queue for a quick match. The response is already `matched` when an opponent was waiting;
+// otherwise listen on the Pusher channel `match-<ticket_id>` for `match-found`.
+async function handlePost(request: Request) {
+  try {
+    let body;
+    try {
+      body = await request.json();
+    } catch (e) {
+      console.error('[MATCH] Failed to parse body:', e);
+      return Response.json({ error: 'Invalid JSON body' }, { status: 400 });
+    }
+
+    const { mode, player_name, profile_id, profile_token } = body;
+
+    if (!MATCH_MODES.includes(mode)) {
+      return Response.json(
+        { error: `mode must be one of: ${MATCH_MODES.join(', ')}` },
+        { status: 400 }
+      );
+    }
+
+    if (!player_name || typeof player_name !== 'string') {
+      return Response.json({ error: 'Player name is required' }, { status: 400 });
+    }
+
+    const context = getServerContext();
+
+    // Optional: games between two profiles are rated. Playing under a profile takes its token.
+    if (profile_id !== undefined) {
+      const check = await checkProfileToken(context.store, profile_id, profile_token);
+      if (check === 'not_found') {
+        return Response.json({ error: 'Player profile not found' }, { status: 404 });
+      }
+      if (check === 'invalid_token') {
+        return Response.json({ error: 'Invalid profile token' }, { status: 403 });
+      }
+    }
+
+    const ticket = await enqueueMatch(context, mode as GameMode, player_name, profile_id);
+
+    console.log('[MATCH] Ticket queued:', { ticketId: ticket.id, mode, status: ticket.status });
+
+    return Response.json(await toMatchStatus(context, ticket), { status: 201 });
+  } catch (error) {
+    console.error('[MATCH] Error:', error);
+    return Response.json({ error: 'Failed to join the match queue' }, { status: 500 });
+  }
+}
+
+export const POST = withMetrics('/api/match/enqueue', handlePost);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
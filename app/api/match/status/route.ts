@@ -0,0 +1,31 @@
+import { getServerContext } from '@/server/context';
+import { toMatchStatus } from '@/server/matchmaking';
+import { withMetrics } from '@/server/metrics';
+
+// Current state of a quick match ticket (fallback for clients without Pusher)
+async function handleGet(request: Request) {
+  try {
+    const ticketId = new URL(request.url).searchParams.get('ticket_id');
+
+    if (!ticketId) {
+      return Response.json({ error: 'ticket_id is required' }, { status: 400 });
+    }
+
+    const context = getServerContext();
+    const ticket = await context.store.getMatchTicket(ticketId);
+
+    if (!ticket) {
+      return Response.json({ error: 'Ticket not found' }, { status: 404 });
+    }
+
+    return Response.json(await toMatchStatus(context, ticket));
+  } catch (error) {
+    console.error('[MATCH STATUS] Error:', error);
+    return Response.json({ error: 'Failed to load match status' }, { status: 500 });
+  }
+}
+
+export const GET = withMetrics('/api/match/status', handleGet);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
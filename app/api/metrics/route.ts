@@ -0,0 +1,33 @@
+import { forbiddenResponse, isMetricsRequest } from '@/server/auth';
+import { getServerContext } from '@/server/context';
+
+// Prometheus scrape target: request metrics of this worker, or of all workers when shared
+export async function GET(request: Request) {
+  try {
+    if (!isMetricsRequest(request)) {
+      return forbiddenResponse();
+    }
+
+    const { metrics } = getServerContext();
+
+    return new Response(await metrics.render(), {
+      headers: {
+        'Content-Type': 'text/plain; version=0.0.4; charset=utf-8',
+        'Cache-Control': 'no-store',
+      },
+    });
+  } catch (error) {
+    console.error('[API METRICS] Unexpected error:', error);
+
+    return Response.json(
+      {
+        error: 'Internal server error',
+        message: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
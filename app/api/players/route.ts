@@ -0,0 +1,62 @@
+import type { CreateProfileResponse } from '@/lib/types';
+import { getServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+import { createProfile, getProfileResponse } from '@/server/ratings';
+
+// Creates a player profile. Pass its id as profile_id, with the profile_token returned here,
+// when creating, joining or queueing for games to have them rated. The token is only shown
+// once; the id is public.
+async function handlePost(request: Request) {
+  try {
+    let body;
+    try {
+      body = await request.json();
+    } catch (e) {
+      console.error('[PLAYERS] Failed to parse body:', e);
+      return Response.json({ error: 'Invalid JSON body' }, { status: 400 });
+    }
+
+    const { player_name } = body;
+
+    if (!player_name || typeof player_name !== 'string') {
+      return Response.json({ error: 'Player name is required' }, { status: 400 });
+    }
+
+    const { profile, token } = await createProfile(getServerContext().store, player_name);
+    console.log('[PLAYERS] Profile created:', { profileId: profile.id });
+
+    const response: CreateProfileResponse = { profile, profile_token: token };
+    return Response.json(response, { status: 201 });
+  } catch (error) {
+    console.error('[PLAYERS] Error:', error);
+    return Response.json({ error: 'Failed to create profile' }, { status: 500 });
+  }
+}
+
+// A profile with its rating, rank and record in every mode
+async function handleGet(request: Request) {
+  try {
+    const profileId = new URL(request.url).searchParams.get('profile_id');
+
+    if (!profileId) {
+      return Response.json({ error: 'profile_id is required' }, { status: 400 });
+    }
+
+    const response = await getProfileResponse(getServerContext().store, profileId);
+
+    if (!response) {
+      return Response.json({ error: 'Player profile not found' }, { status: 404 });
+    }
+
+    return Response.json(response);
+  } catch (error) {
+    console.error('[PLAYERS] Error:', error);
+    return Response.json({ error: 'Failed to load profile' }, { status: 500 });
+  }
+}
+
+export const POST = withMetrics('/api/players', handlePost);
+export const GET = withMetrics('/api/players', handleGet);
+
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
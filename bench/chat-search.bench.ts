@@ -0,0 +1,79 @@
+// Chat full-text search latency over a synthetic corpus
+// Run with: npx tsx bench/chat-search.bench.ts
+// BENCH_MESSAGES sets the corpus size (default 1,000,000; needs a few GB of heap at full size)
+
+import { searchChat, type ChatSearchQuery } from '@/server/chat-search';
+import { MemoryGameStore } from '@/server/stores/memory-store';
+import { bench, printResults, type BenchResult } from './harness';
+
+const MESSAGES = Number(process.env.BENCH_MESSAGES || 1_000_000);
+const GAMES = Math.max(1, Math.floor(MESSAGES / 100));
+const VOCABULARY = 5000;
+
+// Deterministic PRNG so runs are comparable
+function mulberry32(seed: number) {
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+async function buildCorpus(store: MemoryGameStore): Promise<number> {
+  const random = mulberry32(42);
+  const words = Array.from({ length: VOCABULARY }, (_, i) => `w${i.toString(36)}`);
+  const start = Date.parse('2024-01-01T00:00:00Z');
+
+  for (let i = 0; i < MESSAGES; i++) {
+    // Zipf-like word choice: low ids are common, high ids rare
+    const length = 3 + Math.floor(random() * 10);
+    const content = Array.from(
+      { length },
+      () => words[Math.floor(VOCABULARY * random() ** 3)]
+    ).join(' ');
+
+    await store.appendMessage({
+      game_id: `game_${i % GAMES}`,
+      player_id: `player_${i % (GAMES * 2)}`,
+      message_type: 'chat',
+      content: i % 10000 === 0 ? `${content} needle` : content,
+      created_at: new Date(start + i * 1000).toISOString(),
+    });
+  }
+
+  return start;
+}
+
+async function main() {
+  const store = new MemoryGameStore();
+  const buildStart = performance.now();
+  const start = await buildCorpus(store);
+  console.info(
+    `Indexed ${MESSAGES} messages in ${((performance.now() - buildStart) / 1000).toFixed(1)}s`
+  );
+
+  const base = { limit: 20, offset: 0 };
+  const queries: [string, ChatSearchQuery][] = [
+    ['rare term', { ...base, q: 'needle' }],
+    ['common term', { ...base, q: 'w0' }],
+    ['two terms', { ...base, q: 'w1 w2' }],
+    ['term + time range', { ...base, q: 'w3', from: start, to: start + 86400 * 1000 }],
+    ['term + player', { ...base, q: 'w0', playerId: 'player_7' }],
+    ['term + game', { ...base, q: 'w0', gameId: 'game_7' }],
+    ['second page', { ...base, q: 'w0', offset: 20 }],
+  ];
+
+  const results: BenchResult[] = [];
+  for (const [name, query] of queries) {
+    results.push(await bench(name, () => searchChat(store, query), { iterations: 200, warmup: 20 }));
+  }
+
+  printResults(`Chat search over ${MESSAGES} messages`, results);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
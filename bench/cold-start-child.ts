@@ -0,0 +1,23 @@
+// Child process for bench/cold-start.ts: times the import of a single route module
+// Prints one JSON line: { ms, heavy } where heavy lists eagerly loaded heavy packages
+
+const HEAVY_PACKAGES = ['pusher', '@vercel/kv', '@upstash/redis', 'next'];
+
+function loadedHeavyPackages(): string[] {
+  const loaded = new Set<string>();
+  for (const file of Object.keys(require.cache)) {
+    for (const name of HEAVY_PACKAGES) {
+      if (file.includes(`/node_modules/${name}/`)) {
+        loaded.add(name);
+      }
+    }
+  }
+  return [...loaded];
+}
+
+const target = process.argv[2];
+const start = performance.now();
+require(target);
+const ms = performance.now() - start;
+
+console.info(JSON.stringify({ ms, heavy: loadedHeavyPackages() }));
@@ -0,0 +1,104 @@
+// Cold-start import time for each API route module
+// Run with: npx tsx bench/cold-start.ts [--budget] (npm run bench:cold-start:check)
+//
+// Every route.ts under app/api is measured, so new routes are budgeted without being listed
+// here. Every sample runs in a fresh Node process, so module caches never carry over.
+// With --budget the script exits non-zero when a route's median import time exceeds
+// COLD_START_BUDGET_MS or when a route eagerly loads a heavy SDK at import time.
+
+import { spawnSync } from 'node:child_process';
+import { readdirSync } from 'node:fs';
+import path from 'node:path';
+
+const RUNS = Number(process.env.COLD_START_RUNS || 7);
+const BUDGET_MS = Number(process.env.COLD_START_BUDGET_MS || 250);
+
+const rootDir = path.resolve(__dirname, '..');
+const childScript = path.join(__dirname, 'cold-start-child.ts');
+
+// Route modules under dir, relative to the repository root, in a stable order
+function findRoutes(dir: string): string[] {
+  const routes: string[] = [];
+  for (const entry of readdirSync(path.join(rootDir, dir), { withFileTypes: true })) {
+    const relative = path.posix.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      routes.push(...findRoutes(relative));
+    } else if (entry.name === 'route.ts') {
+      routes.push(relative);
+    }
+  }
+  return routes.sort();
+}
+
+interface Sample {
+  ms: number;
+  heavy: string[];
+}
+
+function sampleImport(route: string): Sample {
+  const result = spawnSync(
+    process.execPath,
+    ['--import', 'tsx', childScript, path.join(rootDir, route)],
+    { cwd: rootDir, encoding: 'utf8', env: { ...process.env, NODE_ENV: 'production' } }
+  );
+
+  if (result.status !== 0) {
+    throw new Error(`Importing ${route} failed:\n${result.stderr}`);
+  }
+
+  const lines = result.stdout.trim().split('\n');
+  return JSON.parse(lines[lines.length - 1]) as Sample;
+}
+
+function median(values: number[]): number {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+function main() {
+  const enforceBudget = process.argv.includes('--budget');
+  const failures: string[] = [];
+  const rows = [];
+
+  for (const route of findRoutes('app/api')) {
+    // First run warms the tsx transpile cache and is discarded
+    sampleImport(route);
+
+    const samples = Array.from({ length: RUNS }, () => sampleImport(route));
+    const times = samples.map((s) => s.ms);
+    const heavy = samples[0].heavy;
+    const medianMs = median(times);
+
+    rows.push({
+      route,
+      'median (ms)': medianMs.toFixed(1),
+      'min (ms)': Math.min(...times).toFixed(1),
+      'max (ms)': Math.max(...times).toFixed(1),
+      'eager heavy imports': heavy.join(', ') || '-',
+    });
+
+    if (medianMs > BUDGET_MS) {
+      failures.push(`${route}: median ${medianMs.toFixed(1)}ms exceeds ${BUDGET_MS}ms budget`);
+    }
+    if (heavy.length > 0) {
+      failures.push(`${route}: loads ${heavy.join(', ')} at import time`);
+    }
+  }
+
+  console.info(`\nCold import time per route (${RUNS} fresh processes each)`);
+  console.table(rows);
+
+  if (enforceBudget && failures.length > 0) {
+    console.error('\n❌ Cold-start budget exceeded:');
+    for (const failure of failures) {
+      console.error(`  - ${failure}`);
+    }
+    process.exit(1);
+  }
+
+  if (enforceBudget) {
+    console.info('\n✅ All routes within cold-start budget');
+  }
+}
+
+main();
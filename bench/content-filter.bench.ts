@@ -0,0 +1,74 @@
+// Chat content filter cost per message: Aho-Corasick automaton vs one regex per term
+// Run with: npx tsx bench/content-filter.bench.ts
+// BENCH_TERMS sets the dictionary size (default 10,000); messages are 500 characters
+
+import { ContentFilter } from '@/server/content-filter';
+import { bench, printResults } from './harness';
+
+const TERMS = Number(process.env.BENCH_TERMS || 10_000);
+const MESSAGES = 1000;
+const MESSAGE_LENGTH = 500;
+
+// Deterministic PRNG so runs are comparable
+function mulberry32(seed: number) {
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function randomWord(random: () => number, minLength: number, maxLength: number): string {
+  const length = minLength + Math.floor(random() * (maxLength - minLength + 1));
+  let word = '';
+  for (let i = 0; i < length; i++) {
+    word += String.fromCharCode(97 + Math.floor(random() * 26));
+  }
+  return word;
+}
+
+async function main() {
+  const random = mulberry32(7);
+  const terms = Array.from({ length: TERMS }, () => randomWord(random, 4, 10));
+
+  // Mostly clean chat, with a banned term in one message out of ten
+  const messages = Array.from({ length: MESSAGES }, (_, i) => {
+    let text = i % 10 === 0 ? `${terms[i % TERMS]} ` : '';
+    while (text.length < MESSAGE_LENGTH) {
+      text += `${randomWord(random, 2, 8)} `;
+    }
+    return text.slice(0, MESSAGE_LENGTH);
+  });
+
+  const buildStart = performance.now();
+  const filter = new ContentFilter({ action: 'mask', termsFile: null, reloadIntervalMs: 0 }, terms);
+  const buildMs = performance.now() - buildStart;
+
+  const patterns = terms.map((term) => new RegExp(`\\b${term}\\b`, 'i'));
+
+  const automaton = await bench('aho-corasick', (i) => filter.check(messages[i % MESSAGES]), {
+    iterations: 20_000,
+    warmup: 1000,
+  });
+  const regexes = await bench(
+    'regex per term',
+    (i) => patterns.some((pattern) => pattern.test(messages[i % MESSAGES])),
+    { iterations: 200, warmup: 20 }
+  );
+
+  printResults(`Filter one ${MESSAGE_LENGTH}-char message against ${TERMS} terms`, [
+    automaton,
+    regexes,
+  ]);
+
+  const { states } = filter.stats();
+  console.info(`Automaton build: ${buildMs.toFixed(1)}ms, ${states} states`);
+  console.info(`Speedup: ${(automaton.opsPerSec / regexes.opsPerSec).toFixed(0)}x`);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
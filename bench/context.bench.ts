@@ -0,0 +1,93 @@
+// Request throughput: shared server context vs per-endpoint resource initialisation
+// Run with: npx tsx bench/context.bench.ts
+//
+// "shared" resolves the store and Pusher client once per process, as the routes now do.
+// "per-endpoint" rebuilds them before every request, which is what each isolated
+// endpoint bundle pays on a cold serverless instance.
+
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { GET as getState } from '@/app/api/game/state/route';
+import { resetServerContext } from '@/server/context';
+import { MemoryGameStore } from '@/server/stores/memory-store';
+import { bench, jsonRequest, printResults, silenceLogs } from './harness';
+
+const FLOWS = Number(process.env.BENCH_FLOWS || 500);
+
+async function playFlow(beforeRequest: () => void) {
+  beforeRequest();
+  const created = await (
+    await createGame(jsonRequest('/api/game/create', { mode: 'classic3', player_name: 'Alice' }))
+  ).json();
+
+  beforeRequest();
+  const joined = await (
+    await joinGame(
+      jsonRequest('/api/game/join', {
+        invite_code: created.game.invite_code,
+        player_name: 'Bob',
+      })
+    )
+  ).json();
+
+  const gameId = created.game.id;
+  const players = [created.player_id, joined.player_id];
+  const cells = [
+    [0, 0],
+    [1, 1],
+    [0, 1],
+  ];
+
+  for (let i = 0; i < cells.length; i++) {
+    beforeRequest();
+    await makeMove(
+      jsonRequest('/api/game/move', {
+        game_id: gameId,
+        player_id: players[i % 2],
+        row_index: cells[i][0],
+        column_index: cells[i][1],
+      })
+    );
+  }
+
+  beforeRequest();
+  await getState(jsonRequest(`/api/game/state?game_id=${gameId}`));
+}
+
+async function main() {
+  // Every simulated request comes from one client; lift the per-IP budgets
+  process.env.RATE_LIMIT_GAME_MOVE = '1000000000/1000000';
+  process.env.RATE_LIMIT_CHAT_SEND = '1000000000/1000000';
+
+  const restoreLogs = silenceLogs();
+  const store = new MemoryGameStore();
+  const requestsPerFlow = 6;
+
+  resetServerContext({ store });
+  const shared = await bench('shared context', () => playFlow(() => {}), {
+    iterations: FLOWS,
+    warmup: 50,
+  });
+
+  const perEndpoint = await bench(
+    'per-endpoint init',
+    () => playFlow(() => resetServerContext({ store })),
+    { iterations: FLOWS, warmup: 50 }
+  );
+
+  restoreLogs();
+  printResults(`Game flow (${requestsPerFlow} requests per flow, ${FLOWS} flows)`, [
+    shared,
+    perEndpoint,
+  ]);
+
+  for (const result of [shared, perEndpoint]) {
+    console.info(`${result.name}: ${Math.round(result.opsPerSec * requestsPerFlow)} requests/s`);
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,104 @@
+// Realistic game fixtures shared by the benchmarks
+// Boards are filled so that neither player ever has a winning line, which keeps "near-full"
+// positions valid and forces win checks to scan the whole board.
+
+import type { GameMode, Message, Move, Player } from '@/lib/types';
+import { getBoardSize } from '@/lib/game-logic';
+import type { StoredGame } from '@/server/store';
+
+const CREATED_AT = Date.parse('2024-01-01T00:00:00Z');
+
+// Drawn 3x3 position, in move order: X O X / X O O / O X X
+const CLASSIC3_DRAW: [number, number][] = [
+  [0, 0],
+  [0, 1],
+  [0, 2],
+  [1, 1],
+  [1, 0],
+  [1, 2],
+  [2, 1],
+  [2, 0],
+  [2, 2],
+];
+
+// Gomoku cells in move order for a full board without five in a row: cell (r, c) belongs to
+// player 1 when floor(c / 2) + r is even, giving runs of at most two in every direction
+function gomokuDrawOrder(size: number): [number, number][] {
+  const own: [number, number][][] = [[], []];
+  for (let row = 0; row < size; row++) {
+    for (let column = 0; column < size; column++) {
+      own[(Math.floor(column / 2) + row) % 2].push([row, column]);
+    }
+  }
+
+  const order: [number, number][] = [];
+  for (let i = 0; i < own[0].length; i++) {
+    order.push(own[0][i]);
+    if (i < own[1].length) order.push(own[1][i]);
+  }
+  return order;
+}
+
+export function fixturePlayers(gameId: string): Player[] {
+  return [1, 2].map((n) => ({
+    id: `${gameId}_player${n}`,
+    game_id: gameId,
+    player_number: n as 1 | 2,
+    player_name: `Player ${n}`,
+    joined_at: new Date(CREATED_AT).toISOString(),
+    is_ai: false,
+  }));
+}
+
+// Active game with moveCount moves played and nobody winning
+export function buildFixtureGame(mode: GameMode, moveCount: number, gameId: string): StoredGame {
+  const order = mode === 'classic3' ? CLASSIC3_DRAW : gomokuDrawOrder(getBoardSize(mode));
+  if (moveCount > order.length) {
+    throw new Error(`A ${mode} board holds at most ${order.length} moves`);
+  }
+
+  const players = fixturePlayers(gameId);
+  const moves: Move[] = order.slice(0, moveCount).map(([row, column], i) => ({
+    id: i + 1,
+    game_id: gameId,
+    player_id: players[i % 2].id,
+    move_number: i + 1,
+    column_index: column,
+    row_index: row,
+    created_at: new Date(CREATED_AT + (i + 1) * 1500).toISOString(),
+  }));
+
+  return {
+    id: gameId,
+    invite_code: gameId.slice(-6).toUpperCase(),
+    mode,
+    status: 'active',
+    created_at: new Date(CREATED_AT).toISOString(),
+    started_at: new Date(CREATED_AT).toISOString(),
+    finished_at: null,
+    current_turn: (moveCount % 2) + 1,
+    winner_id: null,
+    board: mode === 'classic3' ? Array(9).fill(null) : [],
+    players,
+    moves,
+    messages: [],
+  };
+}
+
+// The next free cell in fixture order, so a move on a fixture game never wins or collides
+export function nextFixtureMove(mode: GameMode, moveCount: number): [number, number] {
+  const order = mode === 'classic3' ? CLASSIC3_DRAW : gomokuDrawOrder(getBoardSize(mode));
+  return order[moveCount];
+}
+
+export function buildChatHistory(gameId: string, players: Player[], count: number): Message[] {
+  const lines = ['gg', 'nice move', 'hmm, let me think', 'your turn!', 'good luck, have fun'];
+  return Array.from({ length: count }, (_, i) => ({
+    id: i + 1,
+    game_id: gameId,
+    player_id: players[i % 2].id,
+    message_type: 'chat' as const,
+    content: lines[i % lines.length],
+    created_at: new Date(CREATED_AT + i * 4000).toISOString(),
+  }));
+}
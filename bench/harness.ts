@@ -0,0 +1,102 @@
+// Minimal benchmark harness shared by the scripts in bench/
+// Run any benchmark with: npx tsx bench/<name>.bench.ts
+
+export interface BenchResult {
+  name: string;
+  iterations: number;
+  totalMs: number;
+  opsPerSec: number;
+  meanUs: number;
+  p50Us: number;
+  p95Us: number;
+  p99Us: number;
+}
+
+export interface BenchOptions {
+  iterations?: number;
+  warmup?: number;
+  // Calls per timed sample, for operations shorter than the timer resolution
+  batch?: number;
+}
+
+export function percentile(sorted: number[], p: number): number {
+  if (sorted.length === 0) return 0;
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+  return sorted[Math.max(0, index)];
+}
+
+export function summarize(name: string, samplesMs: number[]): BenchResult {
+  const sorted = [...samplesMs].sort((a, b) => a - b);
+  const totalMs = samplesMs.reduce((sum, value) => sum + value, 0);
+
+  return {
+    name,
+    iterations: samplesMs.length,
+    totalMs,
+    opsPerSec: totalMs > 0 ? (samplesMs.length * 1000) / totalMs : 0,
+    meanUs: samplesMs.length > 0 ? (totalMs * 1000) / samplesMs.length : 0,
+    p50Us: percentile(sorted, 50) * 1000,
+    p95Us: percentile(sorted, 95) * 1000,
+    p99Us: percentile(sorted, 99) * 1000,
+  };
+}
+
+export async function bench(
+  name: string,
+  fn: (iteration: number) => unknown | Promise<unknown>,
+  { iterations = 1000, warmup = 100, batch = 1 }: BenchOptions = {}
+): Promise<BenchResult> {
+  for (let i = 0; i < warmup; i++) {
+    await fn(i);
+  }
+
+  const samples: number[] = new Array(iterations);
+  for (let i = 0; i < iterations; i++) {
+    const start = performance.now();
+    for (let j = 0; j < batch; j++) {
+      await fn(i);
+    }
+    samples[i] = (performance.now() - start) / batch;
+  }
+
+  return summarize(name, samples);
+}
+
+export function printResults(title: string, results: BenchResult[]): void {
+  console.info(`\n${title}`);
+  console.table(
+    results.map((r) => ({
+      name: r.name,
+      iterations: r.iterations,
+      'ops/s': Math.round(r.opsPerSec),
+      'mean (µs)': r.meanUs.toFixed(1),
+      'p50 (µs)': r.p50Us.toFixed(1),
+      'p95 (µs)': r.p95Us.toFixed(1),
+      'p99 (µs)': r.p99Us.toFixed(1),
+    }))
+  );
+}
+
+// Route handlers log every request; keep benchmark output readable
+export function silenceLogs(): () => void {
+  const { log, warn } = console;
+  console.log = () => {};
+  console.warn = () => {};
+  return () => {
+    console.log = log;
+    console.warn = warn;
+  };
+}
+
+export function jsonRequest(path: string, body?: unknown): Request {
+  const url = `http://localhost:3000${path}`;
+  if (body === undefined) {
+    return new Request(url);
+  }
+
+  return new Request(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+}
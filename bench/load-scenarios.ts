@@ -0,0 +1,111 @@
+// Load test scenarios for bench/load.ts
+// A scenario describes the games to play and how their players behave. Pick a preset with
+// --scenario=<name>, or pass a JSON file with --scenario=path/to/scenario.json; fields missing
+// from the file fall back to the "mixed" preset.
+
+import type { GameMode } from '@/lib/types';
+
+export type OpponentKind = 'human' | 'ai';
+
+export interface GameMix {
+  mode: GameMode;
+  opponent: OpponentKind;
+  weight: number; // relative share of games
+}
+
+export interface LoadScenario {
+  name: string;
+  description: string;
+  games: number; // games played in total
+  concurrency: number; // games in flight at once
+  mix: GameMix[];
+  // Delay before the second player joins; the host polls state while waiting
+  joinDelayMs: number;
+  waitingPollMs: number;
+  // Exponentially distributed per human move, capped at maxThinkTimeMs
+  thinkTimeMs: number;
+  maxThinkTimeMs: number;
+  // AI opponents reply after this delay and never chat or poll
+  aiMoveDelayMs: number;
+  // Each human client polls game/state and chat/list at this interval during play
+  pollIntervalMs: number;
+  // Messages per minute per human player (Poisson)
+  chatPerMinute: number;
+  // Players leave games that are still running after this many moves
+  maxMoves: number;
+}
+
+const mixed: LoadScenario = {
+  name: 'mixed',
+  description: 'Human and AI games of both modes at UI polling rates',
+  games: 200,
+  concurrency: 50,
+  mix: [
+    { mode: 'classic3', opponent: 'human', weight: 4 },
+    { mode: 'gomoku', opponent: 'human', weight: 3 },
+    { mode: 'classic3', opponent: 'ai', weight: 2 },
+    { mode: 'gomoku', opponent: 'ai', weight: 1 },
+  ],
+  joinDelayMs: 3000,
+  waitingPollMs: 5000,
+  thinkTimeMs: 2500,
+  maxThinkTimeMs: 15_000,
+  aiMoveDelayMs: 300,
+  pollIntervalMs: 2000,
+  chatPerMinute: 2,
+  maxMoves: 80,
+};
+
+export const SCENARIOS: Record<string, LoadScenario> = {
+  mixed,
+  smoke: {
+    ...mixed,
+    name: 'smoke',
+    description: 'A few fast games to check the harness and routes end to end',
+    games: 20,
+    concurrency: 10,
+    joinDelayMs: 50,
+    waitingPollMs: 100,
+    // Fast, but each player stays within the default game:move budget of 2 moves/s
+    thinkTimeMs: 300,
+    maxThinkTimeMs: 1000,
+    aiMoveDelayMs: 250,
+    pollIntervalMs: 200,
+    chatPerMinute: 30,
+    maxMoves: 30,
+  },
+  chatty: {
+    ...mixed,
+    name: 'chatty',
+    description: 'Human classic3 games with heavy chat',
+    mix: [{ mode: 'classic3', opponent: 'human', weight: 1 }],
+    chatPerMinute: 12,
+  },
+  ai: {
+    ...mixed,
+    name: 'ai',
+    description: 'Single players against AI opponents',
+    mix: [
+      { mode: 'classic3', opponent: 'ai', weight: 1 },
+      { mode: 'gomoku', opponent: 'ai', weight: 1 },
+    ],
+  },
+  thousand: {
+    ...mixed,
+    name: 'thousand',
+    description: 'A thousand concurrent games',
+    games: 3000,
+    concurrency: 1000,
+  },
+};
+
+export function resolveScenario(source: LoadScenario | Partial<LoadScenario>): LoadScenario {
+  const scenario = { ...mixed, ...source };
+  if (scenario.mix.length === 0 || scenario.mix.every((entry) => entry.weight <= 0)) {
+    throw new Error(`Scenario ${scenario.name} has no games in its mix`);
+  }
+  if (scenario.games < 1 || scenario.concurrency < 1) {
+    throw new Error(`Scenario ${scenario.name} needs at least one game and one slot`);
+  }
+  return scenario;
+}
@@ -0,0 +1,541 @@
+// End-to-end load test: simulated players create, join and play games over the API
+// Run with: npx tsx bench/load.ts [--scenario=mixed] [--games=N] [--concurrency=N] [--speed=1]
+//   [--seed=1] [--base-url=http://localhost:3000] [--no-rate-limit] [--json=report.json]
+//
+// Every game runs as its own set of clients: the host creates it and polls while waiting, the
+// guest joins, then both take turns with think times while polling state and chat and sending
+// messages. AI opponents are played by the client with a short reply delay, standing in for a
+// server-side AI. Scenarios are defined in bench/load-scenarios.ts or a JSON file.
+//
+// Without --base-url the route handlers run in this process against a MemoryGameStore, which
+// also lets the report count store operations; client and server then share one event loop.
+// With --base-url requests go over HTTP to a running server (npm run dev / npm start).
+// --speed divides every delay, e.g. --speed=10 plays ten times faster than real users.
+// Each simulated player sends its own X-Forwarded-For address so per-IP rate limits apply
+// per player, as they would in production.
+
+import { readFileSync, writeFileSync } from 'node:fs';
+import { GET as listChat } from '@/app/api/chat/list/route';
+import { POST as sendChat } from '@/app/api/chat/send/route';
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { GET as getState } from '@/app/api/game/state/route';
+import { getBoardSize } from '@/lib/game-logic';
+import { getServerContext, resetServerContext } from '@/server/context';
+import type { GameStore } from '@/server/store';
+import { MemoryGameStore } from '@/server/stores/memory-store';
+import { silenceLogs, summarize } from './harness';
+import { resolveScenario, SCENARIOS, type GameMix, type LoadScenario } from './load-scenarios';
+
+type Method = 'GET' | 'POST';
+
+interface ApiResponse {
+  status: number; // 0 when the request itself failed
+  body: any;
+}
+
+type Transport = (method: Method, path: string, body: unknown, ip: string) => Promise<ApiResponse>;
+
+type RouteHandler = (request: Request) => Promise<Response>;
+
+const ROUTES: Record<string, RouteHandler> = {
+  'POST /api/game/create': createGame,
+  'POST /api/game/join': joinGame,
+  'POST /api/game/move': makeMove,
+  'GET /api/game/state': getState,
+  'POST /api/chat/send': sendChat,
+  'GET /api/chat/list': listChat,
+};
+
+const MAX_MOVE_ATTEMPTS = 3;
+
+const CHAT_LINES = ['gl hf', 'nice move', 'hmm', 'your turn', 'gg', 'wow', 'almost had it', 'ok'];
+
+function parseArgs(argv: string[]): Record<string, string> {
+  const args: Record<string, string> = {};
+  for (const arg of argv) {
+    const match = /^--([\w-]+)(?:=(.*))?$/.exec(arg);
+    if (!match) {
+      throw new Error(`Unexpected argument: ${arg}`);
+    }
+    args[match[1]] = match[2] ?? 'true';
+  }
+  return args;
+}
+
+// Deterministic PRNG so runs are comparable
+function mulberry32(seed: number) {
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+function requestInit(method: Method, body: unknown, ip: string): RequestInit {
+  const headers: Record<string, string> = { 'X-Forwarded-For': ip };
+  if (method === 'GET') {
+    return { method, headers };
+  }
+  headers['Content-Type'] = 'application/json';
+  return { method, headers, body: JSON.stringify(body) };
+}
+
+async function readBody(response: Response): Promise<any> {
+  const text = await response.text();
+  try {
+    return JSON.parse(text);
+  } catch {
+    return text;
+  }
+}
+
+function inProcessTransport(): Transport {
+  return async (method, path, body, ip) => {
+    const handler = ROUTES[`${method} ${path.split('?')[0]}`];
+    const response = await handler(
+      new Request(`http://localhost:3000${path}`, requestInit(method, body, ip))
+    );
+    return { status: response.status, body: await readBody(response) };
+  };
+}
+
+function httpTransport(baseUrl: string): Transport {
+  return async (method, path, body, ip) => {
+    const response = await fetch(`${baseUrl}${path}`, requestInit(method, body, ip));
+    return { status: response.status, body: await readBody(response) };
+  };
+}
+
+// Counts calls per store method; the in-process stand-in for database-side contention
+function countingStore(store: GameStore, counts: Map<string, number>): GameStore {
+  return new Proxy(store, {
+    get(target, property, receiver) {
+      const value = Reflect.get(target, property, receiver);
+      if (typeof value !== 'function' || typeof property !== 'string') {
+        return value;
+      }
+      return (...args: unknown[]) => {
+        counts.set(property, (counts.get(property) ?? 0) + 1);
+        return value.apply(target, args);
+      };
+    },
+  });
+}
+
+interface EndpointReport {
+  endpoint: string;
+  requests: number;
+  perSecond: number;
+  p50Ms: number;
+  p95Ms: number;
+  p99Ms: number;
+  maxMs: number;
+  errors: number; // any status outside 2xx
+  conflicts: number; // 409
+  rateLimited: number; // 429
+  serverErrors: number; // 5xx or failed requests
+}
+
+class LoadRecorder {
+  private samples = new Map<string, number[]>();
+  private statuses = new Map<string, number[]>();
+
+  record(endpoint: string, ms: number, status: number): void {
+    if (!this.samples.has(endpoint)) {
+      this.samples.set(endpoint, []);
+      this.statuses.set(endpoint, []);
+    }
+    this.samples.get(endpoint)!.push(ms);
+    this.statuses.get(endpoint)!.push(status);
+  }
+
+  get requests(): number {
+    let total = 0;
+    for (const samples of this.samples.values()) total += samples.length;
+    return total;
+  }
+
+  report(elapsedMs: number): EndpointReport[] {
+    return [...this.samples.keys()].sort().map((endpoint) => {
+      const samples = this.samples.get(endpoint)!;
+      const statuses = this.statuses.get(endpoint)!;
+      const summary = summarize(endpoint, samples);
+      const count = (test: (status: number) => boolean) => statuses.filter(test).length;
+
+      return {
+        endpoint,
+        requests: samples.length,
+        perSecond: (samples.length * 1000) / elapsedMs,
+        p50Ms: summary.p50Us / 1000,
+        p95Ms: summary.p95Us / 1000,
+        p99Ms: summary.p99Us / 1000,
+        maxMs: samples.reduce((max, ms) => Math.max(max, ms), 0),
+        errors: count((s) => s < 200 || s >= 300),
+        conflicts: count((s) => s === 409),
+        rateLimited: count((s) => s === 429),
+        serverErrors: count((s) => s === 0 || s >= 500),
+      };
+    });
+  }
+}
+
+type GameOutcome = 'won' | 'draw' | 'abandoned' | 'failed';
+
+interface SimulatedPlayer {
+  id: string;
+  ip: string;
+  ai: boolean;
+}
+
+class LoadSimulation {
+  readonly outcomes: Record<GameOutcome, number> = { won: 0, draw: 0, abandoned: 0, failed: 0 };
+  readonly recorder = new LoadRecorder();
+  private readonly random: () => number;
+
+  constructor(
+    readonly scenario: LoadScenario,
+    private readonly transport: Transport,
+    private readonly speed: number,
+    seed: number
+  ) {
+    this.random = mulberry32(seed);
+  }
+
+  async run(onProgress: (done: number, inFlight: number) => void): Promise<void> {
+    let started = 0;
+    let done = 0;
+
+    const worker = async () => {
+      while (started < this.scenario.games) {
+        const index = started++;
+        const outcome = await this.playGame(index, this.pickGame()).catch((error) => {
+          console.error(`[LOAD] Game ${index} crashed:`, error);
+          return 'failed' as const;
+        });
+        this.outcomes[outcome]++;
+        done++;
+      }
+    };
+
+    const progress = setInterval(() => onProgress(done, started - done), 5000);
+    try {
+      await Promise.all(Array.from({ length: this.scenario.concurrency }, worker));
+    } finally {
+      clearInterval(progress);
+    }
+  }
+
+  private async call(method: Method, path: string, body: unknown, ip: string) {
+    const endpoint = `${method} ${path.split('?')[0]}`;
+    const start = performance.now();
+    let response: ApiResponse;
+    try {
+      response = await this.transport(method, path, body, ip);
+    } catch (error) {
+      response = { status: 0, body: String(error) };
+    }
+    this.recorder.record(endpoint, performance.now() - start, response.status);
+    return response;
+  }
+
+  private pickGame(): GameMix {
+    const { mix } = this.scenario;
+    const total = mix.reduce((sum, entry) => sum + Math.max(0, entry.weight), 0);
+    let roll = this.random() * total;
+    for (const entry of mix) {
+      roll -= Math.max(0, entry.weight);
+      if (roll < 0) return entry;
+    }
+    return mix[mix.length - 1];
+  }
+
+  private delay(ms: number): Promise<void> {
+    return sleep(ms / this.speed);
+  }
+
+  private thinkTime(): number {
+    const { thinkTimeMs, maxThinkTimeMs } = this.scenario;
+    return Math.min(maxThinkTimeMs, -Math.log(1 - this.random()) * thinkTimeMs);
+  }
+
+  private async playGame(index: number, spec: GameMix): Promise<GameOutcome> {
+    const { scenario } = this;
+    // One address per player, 10.<game>.<player>
+    const ip = (player: number) => `10.${(index >> 8) & 255}.${index & 255}.${player}`;
+
+    const created = await this.call(
+      'POST',
+      '/api/game/create',
+      { mode: spec.mode, player_name: `Host ${index}` },
+      ip(1)
+    );
+    if (created.status !== 201) return 'failed';
+
+    const gameId: string = created.body.game.id;
+    const host: SimulatedPlayer = { id: created.body.player_id, ip: ip(1), ai: false };
+
+    // The host polls while waiting; an AI opponent takes its seat right away
+    let joined = false;
+    const waiting = (async () => {
+      for (;;) {
+        await this.delay(scenario.waitingPollMs);
+        if (joined) return;
+        await this.call('GET', `/api/game/state?game_id=${gameId}`, undefined, host.ip);
+      }
+    })();
+
+    if (spec.opponent === 'human') {
+      await this.delay(scenario.joinDelayMs);
+    }
+    const guestIp = ip(2);
+    const joinedResponse = await this.call(
+      'POST',
+      '/api/game/join',
+      {
+        invite_code: created.body.game.invite_code,
+        player_name: spec.opponent === 'ai' ? 'AI' : `Guest ${index}`,
+      },
+      guestIp
+    );
+    joined = true;
+    if (joinedResponse.status !== 200) {
+      await waiting;
+      return 'failed';
+    }
+
+    const guest: SimulatedPlayer = {
+      id: joinedResponse.body.player_id,
+      ip: guestIp,
+      ai: spec.opponent === 'ai',
+    };
+    const players = [host, guest];
+    const humans = players.filter((player) => !player.ai);
+
+    let finished = false;
+    const background = [
+      waiting,
+      ...humans.map((player) => this.pollLoop(gameId, player, () => finished)),
+      ...humans.map((player) => this.chatLoop(gameId, player, () => finished)),
+    ];
+
+    // Random legal moves; players alternate starting with the host
+    const size = getBoardSize(spec.mode);
+    const free = Array.from({ length: size * size }, (_, cell) => cell);
+    let outcome: GameOutcome = 'abandoned';
+
+    for (let move = 0; move < scenario.maxMoves && free.length > 0; move++) {
+      const player = players[move % 2];
+      await this.delay(player.ai ? scenario.aiMoveDelayMs : this.thinkTime());
+
+      const pick = Math.floor(this.random() * free.length);
+      const cell = free[pick];
+      free[pick] = free[free.length - 1];
+      free.pop();
+
+      const moved = await this.submitMove(gameId, player, Math.floor(cell / size), cell % size);
+      if (moved.status !== 200) {
+        outcome = 'failed';
+        break;
+      }
+      if (moved.body.game_status !== 'active') {
+        outcome = moved.body.is_winner ? 'won' : 'draw';
+        break;
+      }
+    }
+
+    finished = true;
+    await Promise.all(background);
+    return outcome;
+  }
+
+  // Rate-limited moves are retried after Retry-After, as a well-behaved client would
+  private async submitMove(
+    gameId: string,
+    player: SimulatedPlayer,
+    row: number,
+    column: number
+  ): Promise<ApiResponse> {
+    const body = { game_id: gameId, player_id: player.id, row_index: row, column_index: column };
+
+    for (let attempt = 1; ; attempt++) {
+      const response = await this.call('POST', '/api/game/move', body, player.ip);
+      if (response.status !== 429 || attempt === MAX_MOVE_ATTEMPTS) {
+        return response;
+      }
+      await sleep((response.body.retry_after ?? 1) * 1000);
+    }
+  }
+
+  // State and new chat messages at the client polling interval, with jitter
+  private async pollLoop(gameId: string, player: SimulatedPlayer, finished: () => boolean) {
+    let afterId = 0;
+
+    for (;;) {
+      await this.delay(this.scenario.pollIntervalMs * (0.5 + this.random()));
+      if (finished()) return;
+
+      await this.call('GET', `/api/game/state?game_id=${gameId}`, undefined, player.ip);
+      const chat = await this.call(
+        'GET',
+        `/api/chat/list?game_id=${gameId}&after_id=${afterId}`,
+        undefined,
+        player.ip
+      );
+      const messages = chat.status === 200 ? chat.body.messages : [];
+      if (messages.length > 0) {
+        afterId = messages[messages.length - 1].id;
+      }
+    }
+  }
+
+  private async chatLoop(gameId: string, player: SimulatedPlayer, finished: () => boolean) {
+    if (this.scenario.chatPerMinute <= 0) return;
+    const meanGapMs = 60_000 / this.scenario.chatPerMinute;
+
+    for (;;) {
+      await this.delay(-Math.log(1 - this.random()) * meanGapMs);
+      if (finished()) return;
+
+      const text = CHAT_LINES[Math.floor(this.random() * CHAT_LINES.length)];
+      await this.call(
+        'POST',
+        '/api/chat/send',
+        { game_id: gameId, player_id: player.id, text },
+        player.ip
+      );
+    }
+  }
+}
+
+function loadScenario(name: string): LoadScenario {
+  if (name.endsWith('.json')) {
+    return resolveScenario(JSON.parse(readFileSync(name, 'utf8')));
+  }
+  const scenario = SCENARIOS[name];
+  if (!scenario) {
+    throw new Error(`Unknown scenario ${name}; choose from ${Object.keys(SCENARIOS).join(', ')}`);
+  }
+  return scenario;
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const scenario = resolveScenario({
+    ...loadScenario(args.scenario ?? 'mixed'),
+    ...(args.games ? { games: Number(args.games) } : {}),
+    ...(args.concurrency ? { concurrency: Number(args.concurrency) } : {}),
+  });
+  const speed = Number(args.speed ?? 1);
+  const baseUrl = args['base-url']?.replace(/\/$/, '');
+
+  const storeOps = new Map<string, number>();
+  let restoreLogs = () => {};
+
+  if (!baseUrl) {
+    if (args['no-rate-limit']) {
+      process.env.RATE_LIMIT_GAME_MOVE = '1000000000/1000000';
+      process.env.RATE_LIMIT_CHAT_SEND = '1000000000/1000000';
+    }
+    restoreLogs = silenceLogs();
+    resetServerContext({
+      store: countingStore(new MemoryGameStore(), storeOps),
+      getPusher: async () => ({ trigger: async () => {} }) as never,
+    });
+  }
+
+  const target = baseUrl ?? 'in-process';
+  console.info(
+    `[LOAD] ${scenario.name}: ${scenario.games} games, ${scenario.concurrency} concurrent, ` +
+      `speed x${speed}, target ${target}`
+  );
+
+  const simulation = new LoadSimulation(
+    scenario,
+    baseUrl ? httpTransport(baseUrl) : inProcessTransport(),
+    speed,
+    Number(args.seed ?? 1)
+  );
+  const startedAt = performance.now();
+  await simulation.run((done, inFlight) => {
+    console.info(
+      `[LOAD] ${done}/${scenario.games} games done, ${inFlight} in flight, ` +
+        `${simulation.recorder.requests} requests`
+    );
+  });
+  const elapsedMs = performance.now() - startedAt;
+  restoreLogs();
+
+  const endpoints = simulation.recorder.report(elapsedMs);
+  const totalRequests = endpoints.reduce((sum, e) => sum + e.requests, 0);
+
+  console.info(
+    `\n${scenario.name}: ${totalRequests} requests in ${(elapsedMs / 1000).toFixed(1)}s ` +
+      `(${Math.round((totalRequests * 1000) / elapsedMs)} requests/s)`
+  );
+  console.table(
+    endpoints.map((e) => ({
+      endpoint: e.endpoint,
+      requests: e.requests,
+      'req/s': e.perSecond.toFixed(1),
+      'p50 (ms)': e.p50Ms.toFixed(2),
+      'p95 (ms)': e.p95Ms.toFixed(2),
+      'p99 (ms)': e.p99Ms.toFixed(2),
+      'max (ms)': e.maxMs.toFixed(2),
+      errors: e.errors,
+      conflicts: e.conflicts,
+      'rate limited': e.rateLimited,
+      'server errors': e.serverErrors,
+    }))
+  );
+  console.info('Games:', simulation.outcomes);
+
+  let serverStats: Record<string, unknown> | null = null;
+  if (!baseUrl) {
+    const { stateCache, chatBuffers } = getServerContext();
+    serverStats = { state_cache: stateCache.stats(), chat_buffers: chatBuffers.stats() };
+
+    const ops = [...storeOps.entries()].sort((a, b) => b[1] - a[1]);
+    console.info('\nStore operations');
+    console.table(
+      ops.map(([operation, calls]) => ({
+        operation,
+        calls,
+        'per request': (calls / totalRequests).toFixed(2),
+      }))
+    );
+  }
+
+  if (args.json) {
+    const report = {
+      scenario,
+      speed,
+      target,
+      elapsedMs: Math.round(elapsedMs),
+      requests: totalRequests,
+      games: simulation.outcomes,
+      endpoints,
+      storeOps: Object.fromEntries(storeOps),
+      server: serverStats,
+    };
+    writeFileSync(args.json, `${JSON.stringify(report, null, 2)}\n`);
+    console.info(`Report written to ${args.json}`);
+  }
+
+  if (simulation.outcomes.failed > 0) {
+    console.error(`[LOAD] ${simulation.outcomes.failed} games failed`);
+    process.exit(1);
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
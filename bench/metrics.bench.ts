@@ -0,0 +1,62 @@
+// Per-request cost of the metrics wrapper, store timing and tracing
+// Run with: npx tsx bench/metrics.bench.ts
+//
+// "bare" calls a handler that makes two store reads; "instrumented" wraps the same handler
+// with withMetrics() and reads through the instrumented store, as the API routes do. The
+// traced case samples every request: one root span, a phase span and two store spans.
+
+import { getServerContext, resetServerContext } from '@/server/context';
+import { withMetrics } from '@/server/metrics';
+import { MemoryGameStore } from '@/server/stores/memory-store';
+import { Tracer, traced } from '@/server/tracing';
+import { bench, printResults } from './harness';
+
+const ITERATIONS = 200_000;
+
+async function main() {
+  const store = new MemoryGameStore();
+  const response = new Response(null, { status: 204 });
+  const context = resetServerContext({ store });
+
+  const bare = async () => {
+    await store.getGameVersion('missing');
+    await store.getGame('missing');
+    return response;
+  };
+  const instrumented = withMetrics('/api/bench', async () => {
+    const { store } = getServerContext();
+    await traced('bench.load', async () => {
+      await store.getGameVersion('missing');
+      await store.getGame('missing');
+    });
+    return response;
+  });
+  const request = new Request('http://localhost:3000/api/bench');
+
+  const results = [
+    await bench('bare handler', bare, { iterations: ITERATIONS, warmup: 10_000 }),
+    await bench('withMetrics + store timing', () => instrumented(request), {
+      iterations: ITERATIONS,
+      warmup: 10_000,
+    }),
+  ];
+
+  context.tracer = new Tracer({ sampleRate: 1, bufferSize: 200, otlpFile: null, serviceName: '' });
+  results.push(
+    await bench('withMetrics + every request traced', () => instrumented(request), {
+      iterations: ITERATIONS,
+      warmup: 10_000,
+    })
+  );
+  printResults('Metrics overhead per request', results);
+
+  const overheadUs = results[1].meanUs - results[0].meanUs;
+  const tracingUs = results[2].meanUs - results[1].meanUs;
+  console.info(`Overhead: ${overheadUs.toFixed(2)}µs per request (mean)`);
+  console.info(`Tracing a sampled request: +${tracingUs.toFixed(2)}µs (mean)`);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,94 @@
+// Game state serialization: generic JSON.stringify vs the fast path in server/serialize.ts
+// Run with: npx tsx bench/serialize.bench.ts
+
+import type { Move, Player } from '@/lib/types';
+import { serializeGameState } from '@/server/serialize';
+import type { StoredGame } from '@/server/store';
+import { bench, printResults, type BenchResult } from './harness';
+
+const MOVE_COUNTS = [0, 50, 225];
+
+export function buildGomokuGame(moveCount: number): StoredGame {
+  const gameId = 'game_1730000000000_k3j5h6g7f8d9';
+  const createdAt = Date.parse('2024-01-01T00:00:00Z');
+  const players: Player[] = [1, 2].map((n) => ({
+    id: `1730000000000_player${n}abcdef`,
+    game_id: gameId,
+    player_number: n as 1 | 2,
+    player_name: `Player ${n}`,
+    joined_at: new Date(createdAt).toISOString(),
+    is_ai: false,
+  }));
+
+  const moves: Move[] = Array.from({ length: moveCount }, (_, i) => ({
+    id: i + 1,
+    game_id: gameId,
+    player_id: players[i % 2].id,
+    move_number: i + 1,
+    column_index: i % 15,
+    row_index: Math.floor(i / 15),
+    created_at: new Date(createdAt + (i + 1) * 1500).toISOString(),
+  }));
+
+  return {
+    id: gameId,
+    invite_code: 'K3J5H6',
+    mode: 'gomoku',
+    status: 'active',
+    created_at: new Date(createdAt).toISOString(),
+    started_at: new Date(createdAt).toISOString(),
+    finished_at: null,
+    current_turn: (moveCount % 2) + 1,
+    winner_id: null,
+    players,
+    moves,
+    messages: [],
+  };
+}
+
+// The previous response path: copy into the response shape, then JSON.stringify
+function serializeGeneric(game: StoredGame): string {
+  return JSON.stringify({
+    game: {
+      id: game.id,
+      invite_code: game.invite_code,
+      mode: game.mode,
+      status: game.status,
+      created_at: game.created_at,
+      started_at: game.started_at,
+      finished_at: game.finished_at,
+      current_turn: game.current_turn,
+      winner_id: game.winner_id,
+    },
+    players: game.players,
+    moves: game.moves ?? [],
+    messages: game.messages ?? [],
+  });
+}
+
+async function main() {
+  const results: BenchResult[] = [];
+
+  for (const moveCount of MOVE_COUNTS) {
+    const game = buildGomokuGame(moveCount);
+    const body = serializeGameState(game);
+
+    if (body !== serializeGeneric(game)) {
+      throw new Error(`Fast path output differs from JSON.stringify at ${moveCount} moves`);
+    }
+
+    const options = { iterations: 20000, warmup: 2000 };
+    results.push(await bench(`generic ${moveCount} moves`, () => serializeGeneric(game), options));
+    results.push(await bench(`fast ${moveCount} moves`, () => serializeGameState(game), options));
+    console.info(`${moveCount} moves: ${body.length} bytes`);
+  }
+
+  printResults('Game state serialization', results);
+}
+
+if (require.main === module) {
+  main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });
+}
@@ -0,0 +1,295 @@
+// Microbenchmark suite for the game engine and API hot paths, with stored baselines
+// Run with: npx tsx bench/suite.bench.ts [--save] [--check] [--threshold=0.25] [--rounds=3]
+//                                         [--filter=text]
+//
+// Each case runs --rounds times and keeps its fastest median, which is compared with
+// bench/baselines.json. --check exits non-zero when any case is slower than its baseline by
+// more than the threshold (default 25%).
+// --save records the current run as the new baseline; re-record after intentional changes
+// and on the machine the comparison runs on, since absolute timings are hardware-specific.
+
+import { existsSync, readFileSync, writeFileSync } from 'node:fs';
+import path from 'node:path';
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { GET as getState } from '@/app/api/game/state/route';
+import { GET as listChat } from '@/app/api/chat/list/route';
+import { POST as sendChat } from '@/app/api/chat/send/route';
+import { buildBoard, checkWinner } from '@/lib/game-logic';
+import type { GameMode } from '@/lib/types';
+import { resetServerContext } from '@/server/context';
+import { MemoryGameStore } from '@/server/stores/memory-store';
+import { buildChatHistory, buildFixtureGame, nextFixtureMove } from './fixtures';
+import { bench, jsonRequest, printResults, silenceLogs, type BenchResult } from './harness';
+
+// Relative to the repository root, where the npm scripts run
+const BASELINE_FILE = path.join(process.cwd(), 'bench', 'baselines.json');
+
+interface Baselines {
+  environment: { node: string; platform: string; arch: string; recordedAt: string };
+  results: Record<string, { p50Us: number; meanUs: number }>;
+}
+
+interface BenchCase {
+  name: string;
+  iterations: number;
+  batch?: number;
+  run: (iteration: number) => unknown | Promise<unknown>;
+}
+
+function parseArgs(argv: string[]) {
+  const value = (name: string) =>
+    argv.find((arg) => arg.startsWith(`--${name}=`))?.slice(name.length + 3);
+
+  return {
+    save: argv.includes('--save'),
+    check: argv.includes('--check'),
+    threshold: Number(value('threshold') ?? 0.25),
+    rounds: Number(value('rounds') ?? 3),
+    filter: value('filter'),
+  };
+}
+
+function warmupFor(iterations: number): number {
+  return Math.min(200, iterations / 10);
+}
+
+function engineCases(): BenchCase[] {
+  const positions: [GameMode, string, number][] = [
+    ['classic3', 'empty', 0],
+    ['classic3', 'mid-game', 4],
+    ['classic3', 'near-full', 8],
+    ['gomoku', 'empty', 0],
+    ['gomoku', 'mid-game', 100],
+    ['gomoku', 'near-full', 224],
+  ];
+
+  return positions.flatMap(([mode, label, moveCount]) => {
+    const game = buildFixtureGame(mode, moveCount, `game_${mode}_${moveCount}`);
+    const board = buildBoard(mode, game.moves!, game.players);
+    if (checkWinner(mode, board)) {
+      throw new Error(`Fixture ${mode} ${label} unexpectedly has a winner`);
+    }
+
+    return [
+      {
+        name: `checkWinner ${mode} ${label}`,
+        iterations: 2000,
+        batch: 20,
+        run: () => checkWinner(mode, board),
+      },
+      {
+        name: `buildBoard ${mode} ${label}`,
+        iterations: 2000,
+        batch: 20,
+        run: () => buildBoard(mode, game.moves!, game.players),
+      },
+    ];
+  });
+}
+
+// A failing request would benchmark the error path; stop instead
+async function expectOk(name: string, response: Promise<Response>): Promise<void> {
+  const { status } = await response;
+  if (status >= 400) {
+    throw new Error(`${name} returned ${status}`);
+  }
+}
+
+async function routeCases(store: MemoryGameStore, rounds: number): Promise<BenchCase[]> {
+  const ROUTE_ITERATIONS = 2000;
+  // Warmup calls reuse iteration numbers, so single-use fixtures are taken from a counter
+  const pool = rounds * (ROUTE_ITERATIONS + warmupFor(ROUTE_ITERATIONS));
+  let nextMoveGame = 0;
+  let nextInvite = 0;
+
+  // One mid-game gomoku game per move request, so every request plays a fresh position
+  const moveGames = [];
+  for (let i = 0; i < pool; i++) {
+    const game = buildFixtureGame('gomoku', 100, `game_move_${i}`);
+    await store.saveGame(game);
+    moveGames.push(game);
+  }
+  const [moveRow, moveColumn] = nextFixtureMove('gomoku', 100);
+
+  // Waiting games to join
+  const inviteCodes = [];
+  for (let i = 0; i < pool; i++) {
+    const game = buildFixtureGame('gomoku', 0, `game_join_${i}`);
+    const waiting = { ...game, status: 'waiting' as const, players: game.players.slice(0, 1) };
+    const code = `J${i.toString(36).toUpperCase().padStart(5, '0')}`;
+    await store.saveGame({ ...waiting, invite_code: code });
+    await store.saveInvite(code, game.id);
+    inviteCodes.push(code);
+  }
+
+  // Mid-game state and a long chat history
+  const stateGame = buildFixtureGame('gomoku', 100, 'game_state');
+  await store.saveGame(stateGame);
+  for (const message of buildChatHistory(stateGame.id, stateGame.players, 5000)) {
+    const { id: _id, ...rest } = message;
+    await store.appendMessage(rest);
+  }
+  const speaker = stateGame.players[0].id;
+
+  const cases: { name: string; request: () => Promise<Response> }[] = [
+    {
+      name: 'POST /api/game/create',
+      request: () =>
+        createGame(jsonRequest('/api/game/create', { mode: 'classic3', player_name: 'Alice' })),
+    },
+    {
+      name: 'POST /api/game/join',
+      request: () =>
+        joinGame(
+          jsonRequest('/api/game/join', {
+            invite_code: inviteCodes[nextInvite++],
+            player_name: 'Bob',
+          })
+        ),
+    },
+    {
+      name: 'POST /api/game/move gomoku mid-game',
+      request: () => {
+        const game = moveGames[nextMoveGame++];
+        return makeMove(
+          jsonRequest('/api/game/move', {
+            game_id: game.id,
+            player_id: game.players[0].id,
+            row_index: moveRow,
+            column_index: moveColumn,
+          })
+        );
+      },
+    },
+    {
+      name: 'GET /api/game/state gomoku mid-game',
+      request: () => getState(jsonRequest(`/api/game/state?game_id=${stateGame.id}`)),
+    },
+    {
+      name: 'GET /api/chat/list newest page (5000 messages)',
+      request: () => listChat(jsonRequest(`/api/chat/list?game_id=${stateGame.id}`)),
+    },
+    {
+      name: 'GET /api/chat/list deep page (5000 messages)',
+      request: () => listChat(jsonRequest(`/api/chat/list?game_id=${stateGame.id}&before_id=1000`)),
+    },
+    {
+      name: 'POST /api/chat/send',
+      request: () =>
+        sendChat(
+          jsonRequest('/api/chat/send', { game_id: stateGame.id, player_id: speaker, text: 'gg' })
+        ),
+    },
+  ];
+
+  return cases.map(({ name, request }) => ({
+    name,
+    iterations: ROUTE_ITERATIONS,
+    run: () => expectOk(name, request()),
+  }));
+}
+
+function loadBaselines(): Baselines | null {
+  return existsSync(BASELINE_FILE)
+    ? (JSON.parse(readFileSync(BASELINE_FILE, 'utf8')) as Baselines)
+    : null;
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+
+  // The suite sends far more requests per player than the production budgets allow
+  process.env.RATE_LIMIT_GAME_MOVE = '1000000000/1000000';
+  process.env.RATE_LIMIT_CHAT_SEND = '1000000000/1000000';
+
+  const restoreLogs = silenceLogs();
+  const store = new MemoryGameStore();
+  resetServerContext({ store, getPusher: async () => ({ trigger: async () => {} }) as never });
+
+  const cases = [...engineCases(), ...(await routeCases(store, args.rounds))].filter(
+    (c) => !args.filter || c.name.includes(args.filter)
+  );
+
+  // Rounds go through every case in turn; the fastest median of each case is kept, which
+  // filters out rounds slowed down by other work on the machine
+  const results: BenchResult[] = [];
+  for (let round = 0; round < args.rounds; round++) {
+    for (let index = 0; index < cases.length; index++) {
+      const benchCase = cases[index];
+      const result = await bench(benchCase.name, benchCase.run, {
+        iterations: benchCase.iterations,
+        warmup: warmupFor(benchCase.iterations),
+        batch: benchCase.batch,
+      });
+      if (!results[index] || result.p50Us < results[index].p50Us) {
+        results[index] = result;
+      }
+    }
+  }
+  restoreLogs();
+
+  printResults('Hot path microbenchmarks', results);
+
+  const baselines = loadBaselines();
+  const regressions: string[] = [];
+
+  if (baselines) {
+    const { environment } = baselines;
+    console.info(
+      `\nCompared with baseline from ${environment.recordedAt} ` +
+        `(node ${environment.node}, ${environment.platform}/${environment.arch})`
+    );
+    console.table(
+      results.map((r) => {
+        const baseline = baselines.results[r.name];
+        const change = baseline ? r.p50Us / baseline.p50Us - 1 : null;
+        const regressed = change !== null && change > args.threshold;
+        if (regressed) regressions.push(r.name);
+
+        return {
+          name: r.name,
+          'baseline p50 (µs)': baseline ? baseline.p50Us.toFixed(1) : '-',
+          'p50 (µs)': r.p50Us.toFixed(1),
+          change: change === null ? 'new' : `${change > 0 ? '+' : ''}${(change * 100).toFixed(1)}%`,
+          status: regressed ? 'REGRESSION' : 'ok',
+        };
+      })
+    );
+  }
+
+  if (args.save) {
+    const next: Baselines = {
+      environment: {
+        node: process.version,
+        platform: process.platform,
+        arch: process.arch,
+        recordedAt: new Date().toISOString(),
+      },
+      // Keep baselines of cases skipped by --filter
+      results: { ...baselines?.results },
+    };
+    for (const r of results) {
+      next.results[r.name] = {
+        p50Us: Math.round(r.p50Us * 1000) / 1000,
+        meanUs: Math.round(r.meanUs * 1000) / 1000,
+      };
+    }
+    writeFileSync(BASELINE_FILE, `${JSON.stringify(next, null, 2)}\n`);
+    console.info(`\nSaved ${results.length} baselines to bench/baselines.json`);
+  }
+
+  if (regressions.length > 0) {
+    console.error(
+      `\n${regressions.length} case(s) regressed by more than ${args.threshold * 100}%:`
+    );
+    for (const name of regressions) console.error(`  - ${name}`);
+    if (args.check) process.exit(1);
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
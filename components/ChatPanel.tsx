@@ -14,18 +14,20 @@ interface ChatPanelProps {
 }
 
 export default function ChatPanel({ gameId, playerId, className }: ChatPanelProps) {
-  const { messages, isLoading, error, isConnected } = useChatWebSocket(gameId);
+  const { messages, isLoading, error, isConnected, hasOlder, loadOlder } =
+    useChatWebSocket(gameId);
   const [messageText, setMessageText] = useState('');
   const [isSending, setIsSending] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const messagesContainerRef = useRef<HTMLDivElement>(null);
 
-  // Auto-scroll to bottom when new messages arrive
+  // Auto-scroll to bottom when new messages arrive (not when older history is prepended)
+  const latestMessageId = messages.length > 0 ? messages[messages.length - 1].id : null;
   useEffect(() => {
     if (messagesEndRef.current) {
       messagesEndRef.current.scrollIntoView({ behavior: 'smooth' });
     }
-  }, [messages]);
+  }, [latestMessageId]);
 
   const handleSubmit = async (e: FormEvent) => {
     e.preventDefault();
@@ -120,6 +122,19 @@ export default function ChatPanel({ gameId, playerId, className }: ChatPanelProp
           </div>
         )}
 
+        {hasOlder && (
+          <div className="flex justify-center mb-2">
+            <button
+              type="button"
+              onClick={loadOlder}
+              disabled={isLoading}
+              className="text-xs text-slate-400 hover:text-slate-200 disabled:opacity-50"
+            >
+              Load earlier messages
+            </button>
+          </div>
+        )}
+
         {messages.map(renderMessage)}
 
         <div ref={messagesEndRef} />
@@ -133,6 +148,7 @@ export default function ChatPanel({ gameId, playerId, className }: ChatPanelProp
             value={messageText}
             onChange={(e) => setMessageText(e.target.value)}
             placeholder="Type a message..."
+            maxLength={500}
             disabled={isSending || !playerId}
             className={cn(
               'flex-1 bg-slate-900/50 backdrop-blur-sm border rounded-lg px-4 py-2.5 text-slate-100 placeholder-slate-500 transition-all duration-200',
@@ -0,0 +1,115 @@
+// Tests for the compact game state encoding
+// Run with: npx tsx lib/__tests__/compact.test.ts
+
+import { decodeCompactGameState, encodeCompactGameState, encodeCompactMove } from '../compact';
+import type { GameStateResponse, Move, Player } from '../types';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function buildState(moveCount: number): GameStateResponse {
+  const players: Player[] = [
+    {
+      id: '8f14e45f-ceea-467f-a8f5-3c2a1b0e9d77',
+      game_id: 'K3J5H6',
+      player_number: 1,
+      player_name: 'Alice',
+      joined_at: '2024-01-01T00:00:00.000Z',
+      is_ai: false,
+    },
+    {
+      id: 'c9f0f895-fb98-4ab9-9f4e-7d1c2b3a4e55',
+      game_id: 'K3J5H6',
+      player_number: 2,
+      player_name: 'Bob',
+      joined_at: '2024-01-01T00:00:05.000Z',
+      is_ai: false,
+    },
+  ];
+
+  const start = Date.parse('2024-01-01T00:00:10.000Z');
+  const moves: Move[] = Array.from({ length: moveCount }, (_, i) => ({
+    id: i + 1,
+    game_id: 'K3J5H6',
+    player_id: players[i % 2].id,
+    move_number: i + 1,
+    column_index: (i * 7) % 15,
+    row_index: Math.floor(i / 15),
+    created_at: new Date(start + i * 1234).toISOString(),
+  }));
+
+  return {
+    game: {
+      id: 'K3J5H6',
+      invite_code: 'K3J5H6',
+      mode: 'gomoku',
+      status: 'active',
+      created_at: '2024-01-01T00:00:00.000Z',
+      started_at: '2024-01-01T00:00:05.000Z',
+      finished_at: null,
+      current_turn: 1,
+      winner_id: null,
+    },
+    players,
+    moves,
+    messages: [],
+  };
+}
+
+function runTests() {
+  console.log('Running compact encoding tests...\n');
+
+  console.log('Testing round trip...');
+  for (const moveCount of [0, 1, 50, 225]) {
+    const state = buildState(moveCount);
+    const decoded = decodeCompactGameState(encodeCompactGameState(state));
+    assertEqual(
+      JSON.stringify(decoded),
+      JSON.stringify(state),
+      `Decoded state should match original at ${moveCount} moves`
+    );
+  }
+  console.log('✓ Round trip tests passed\n');
+
+  console.log('Testing payload size...');
+  const full = buildState(225);
+  const fullSize = JSON.stringify(full).length;
+  const compactSize = JSON.stringify(encodeCompactGameState(full)).length;
+  assert(compactSize * 5 < fullSize, `Compact payload (${compactSize}) should be 5x smaller`);
+  console.log(`  full: ${fullSize} bytes, compact: ${compactSize} bytes`);
+  console.log('✓ Payload size tests passed\n');
+
+  console.log('Testing encodeCompactMove...');
+  const move = full.moves[20];
+  const compactMove = encodeCompactMove(
+    { move, is_winner: false, is_draw: false, game_status: 'active' },
+    15
+  );
+  assertEqual(compactMove.cell, move.row_index * 15 + move.column_index, 'Cell index');
+  assertEqual(compactMove.move_number, 21, 'Move number');
+  assertEqual(new Date(compactMove.t).toISOString(), move.created_at, 'Move timestamp');
+  console.log('✓ encodeCompactMove tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  try {
+    runTests();
+  } catch (error) {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  }
+}
+
+export { runTests };
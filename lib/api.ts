@@ -1,16 +1,26 @@
 // API client for game and chat endpoints
 
+import { decodeCompactGameState } from './compact';
 import type {
   CreateGameRequest,
   CreateGameResponse,
   JoinGameRequest,
   JoinGameResponse,
   GameStateResponse,
+  CompactGameStateResponse,
   MakeMoveRequest,
   MakeMoveResponse,
   SendMessageRequest,
   Message,
   ChatMessagesResponse,
+  ChatPageOptions,
+  MatchRequest,
+  MatchStatusResponse,
+  CreateProfileRequest,
+  CreateProfileResponse,
+  PlayerProfileResponse,
+  GameMode,
+  LeaderboardResponse,
 } from './types';
 
 class ApiError extends Error {
@@ -100,6 +110,14 @@ export async function getGameState(gameId: string): Promise<GameStateResponse> {
   return fetchJson<GameStateResponse>(`/api/game/state?game_id=${encodeURIComponent(gameId)}`);
 }
 
+// Fetch state in the compact encoding and expand it to the regular response shape
+export async function getGameStateCompact(gameId: string): Promise<GameStateResponse> {
+  const compact = await fetchJson<CompactGameStateResponse>(
+    `/api/game/state?game_id=${encodeURIComponent(gameId)}&format=compact`
+  );
+  return decodeCompactGameState(compact);
+}
+
 export async function makeMove(request: MakeMoveRequest): Promise<MakeMoveResponse> {
   return fetchJson<MakeMoveResponse>('/api/game/move', {
     method: 'POST',
@@ -116,12 +134,79 @@ export async function sendMessage(request: SendMessageRequest): Promise<Message>
   });
 }
 
-export async function getMessages(gameId: string, since?: string): Promise<ChatMessagesResponse> {
+export async function getMessages(
+  gameId: string,
+  options: ChatPageOptions = {}
+): Promise<ChatMessagesResponse> {
   const params = new URLSearchParams({ game_id: gameId });
-  if (since) {
-    params.append('since', since);
+  if (options.afterId !== undefined) {
+    params.append('after_id', String(options.afterId));
+  }
+  if (options.beforeId !== undefined) {
+    params.append('before_id', String(options.beforeId));
+  }
+  if (options.limit !== undefined) {
+    params.append('limit', String(options.limit));
   }
   return fetchJson<ChatMessagesResponse>(`/api/chat/list?${params.toString()}`);
 }
 
+// Quick match API functions
+
+export async function enqueueMatch(request: MatchRequest): Promise<MatchStatusResponse> {
+  return fetchJson<MatchStatusResponse>('/api/match/enqueue', {
+    method: 'POST',
+    body: JSON.stringify(request),
+  });
+}
+
+export async function getMatchStatus(ticketId: string): Promise<MatchStatusResponse> {
+  return fetchJson<MatchStatusResponse>(
+    `/api/match/status?ticket_id=${encodeURIComponent(ticketId)}`
+  );
+}
+
+export async function cancelMatch(ticketId: string): Promise<MatchStatusResponse> {
+  return fetchJson<MatchStatusResponse>('/api/match/cancel', {
+    method: 'POST',
+    body: JSON.stringify({ ticket_id: ticketId }),
+  });
+}
+
+// Player profile and leaderboard API functions
+
+// Keep profile_token private: it is what lets games be played under the profile
+export async function createProfile(
+  request: CreateProfileRequest
+): Promise<CreateProfileResponse> {
+  return fetchJson<CreateProfileResponse>('/api/players', {
+    method: 'POST',
+    body: JSON.stringify(request),
+  });
+}
+
+export async function getProfile(profileId: string): Promise<PlayerProfileResponse> {
+  return fetchJson<PlayerProfileResponse>(
+    `/api/players?profile_id=${encodeURIComponent(profileId)}`
+  );
+}
+
+export async function getLeaderboard(
+  mode: GameMode,
+  options: { limit?: number; offset?: number; profileId?: string } = {}
+): Promise<LeaderboardResponse> {
+  const params = new URLSearchParams({ mode });
+  if (options.limit !== undefined) {
+    params.append('limit', String(options.limit));
+  }
+  if (options.offset !== undefined) {
+    params.append('offset', String(options.offset));
+  }
+  if (options.profileId) {
+    params.append('profile_id', options.profileId);
+  }
+
+  return fetchJson<LeaderboardResponse>(`/api/leaderboard?${params.toString()}`);
+}
+
 export { ApiError };
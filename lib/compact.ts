@@ -0,0 +1,96 @@
+// Compact game state encoding shared by the API and clients
+// Cuts Gomoku state payloads by dropping per-move ids, player UUIDs and ISO timestamps
+
+import { getBoardSize } from './game-logic';
+import type {
+  CompactGameStateResponse,
+  CompactMakeMoveResponse,
+  GameStateResponse,
+  MakeMoveResponse,
+  Move,
+} from './types';
+
+function bytesToBase64(bytes: Uint8Array): string {
+  let binary = '';
+  for (let i = 0; i < bytes.length; i++) {
+    binary += String.fromCharCode(bytes[i]);
+  }
+  return btoa(binary);
+}
+
+function base64ToBytes(encoded: string): Uint8Array {
+  const binary = atob(encoded);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+}
+
+export function encodeCompactGameState(state: GameStateResponse): CompactGameStateResponse {
+  const size = getBoardSize(state.game.mode);
+  const moves = [...state.moves].sort((a, b) => a.move_number - b.move_number);
+  const cells = new Uint8Array(moves.length);
+  const dt: number[] = new Array(moves.length);
+
+  let previous = moves.length > 0 ? Date.parse(moves[0].created_at) : 0;
+  for (let i = 0; i < moves.length; i++) {
+    const time = Date.parse(moves[i].created_at);
+    cells[i] = moves[i].row_index * size + moves[i].column_index;
+    dt[i] = time - previous;
+    previous = time;
+  }
+
+  return {
+    format: 'compact',
+    game: state.game,
+    players: [...state.players].sort((a, b) => a.player_number - b.player_number),
+    board_size: size,
+    cells: bytesToBase64(cells),
+    t0: moves.length > 0 ? Date.parse(moves[0].created_at) : null,
+    dt,
+    messages: state.messages,
+  };
+}
+
+export function decodeCompactGameState(compact: CompactGameStateResponse): GameStateResponse {
+  const cells = base64ToBytes(compact.cells);
+  const playerByNumber = new Map(compact.players.map((p) => [p.player_number, p]));
+  const moves: Move[] = new Array(cells.length);
+
+  let time = compact.t0 ?? 0;
+  for (let i = 0; i < cells.length; i++) {
+    time += compact.dt[i];
+    moves[i] = {
+      id: i + 1,
+      game_id: compact.game.id,
+      player_id: playerByNumber.get(i % 2 === 0 ? 1 : 2)?.id ?? '',
+      move_number: i + 1,
+      column_index: cells[i] % compact.board_size,
+      row_index: Math.floor(cells[i] / compact.board_size),
+      created_at: new Date(time).toISOString(),
+    };
+  }
+
+  return {
+    game: compact.game,
+    players: compact.players,
+    moves,
+    messages: compact.messages,
+  };
+}
+
+export function encodeCompactMove(
+  response: MakeMoveResponse,
+  boardSize: number
+): CompactMakeMoveResponse {
+  return {
+    format: 'compact',
+    move_number: response.move.move_number,
+    cell: response.move.row_index * boardSize + response.move.column_index,
+    t: Date.parse(response.move.created_at),
+    is_winner: response.is_winner,
+    is_draw: response.is_draw,
+    game_status: response.game_status,
+  };
+}
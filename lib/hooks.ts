@@ -133,15 +133,24 @@ export function useChat(gameId: string | null, pollingInterval = 2000) {
   const [error, setError] = useState<Error | null>(null);
   const intervalRef = useRef<NodeJS.Timeout | null>(null);
   const mountedRef = useRef(true);
-  const lastFetchTimeRef = useRef<string | null>(null);
+  const lastMessageIdRef = useRef<number | null>(null);
+  // before_id cursor for the next page of older history; null once it is all loaded
+  const olderCursorRef = useRef<number | null>(null);
+  const loadingOlderRef = useRef(false);
+  const [hasOlder, setHasOlder] = useState(false);
+  // Game currently shown, so a page requested for the previous game is dropped
+  const gameIdRef = useRef(gameId);
 
   useEffect(() => {
     mountedRef.current = true;
+    gameIdRef.current = gameId;
+    olderCursorRef.current = null;
+    setHasOlder(false);
 
     if (!gameId) {
       setMessages([]);
       setError(null);
-      lastFetchTimeRef.current = null;
+      lastMessageIdRef.current = null;
       return;
     }
 
@@ -149,7 +158,8 @@ export function useChat(gameId: string | null, pollingInterval = 2000) {
     const fetchMessages = async () => {
       try {
         setIsLoading(true);
-        const response = await getMessages(gameId, lastFetchTimeRef.current || undefined);
+        const afterId = lastMessageIdRef.current;
+        const response = await getMessages(gameId, afterId !== null ? { afterId } : {});
 
         if (mountedRef.current) {
           if (response.messages.length > 0) {
@@ -159,9 +169,9 @@ export function useChat(gameId: string | null, pollingInterval = 2000) {
               const newMessages = response.messages.filter((m) => !existingIds.has(m.id));
 
               if (newMessages.length > 0) {
-                // Update last fetch time to most recent message
+                // Continue polling after the most recent message
                 const latestMessage = newMessages[newMessages.length - 1];
-                lastFetchTimeRef.current = latestMessage.created_at;
+                lastMessageIdRef.current = latestMessage.id;
 
                 return [...prev, ...newMessages];
               }
@@ -191,8 +201,10 @@ export function useChat(gameId: string | null, pollingInterval = 2000) {
           setMessages(response.messages);
           if (response.messages.length > 0) {
             const latestMessage = response.messages[response.messages.length - 1];
-            lastFetchTimeRef.current = latestMessage.created_at;
+            lastMessageIdRef.current = latestMessage.id;
           }
+          olderCursorRef.current = response.next_cursor ?? null;
+          setHasOlder(olderCursorRef.current !== null);
           setError(null);
         }
       } catch (err) {
@@ -221,5 +233,36 @@ export function useChat(gameId: string | null, pollingInterval = 2000) {
     };
   }, [gameId, pollingInterval]);
 
-  return { messages, isLoading, error };
+  // Prepend the page of history before the oldest loaded message
+  const loadOlder = useCallback(async () => {
+    const beforeId = olderCursorRef.current;
+    if (!gameId || beforeId === null || loadingOlderRef.current) return;
+
+    try {
+      loadingOlderRef.current = true;
+      setIsLoading(true);
+      const response = await getMessages(gameId, { beforeId });
+
+      if (mountedRef.current && gameIdRef.current === gameId) {
+        setMessages((prev) => {
+          const existingIds = new Set(prev.map((m) => m.id));
+          return [...response.messages.filter((m) => !existingIds.has(m.id)), ...prev];
+        });
+        olderCursorRef.current = response.next_cursor ?? null;
+        setHasOlder(olderCursorRef.current !== null);
+        setError(null);
+      }
+    } catch (err) {
+      if (mountedRef.current && gameIdRef.current === gameId) {
+        setError(err instanceof Error ? err : new Error('Failed to fetch messages'));
+      }
+    } finally {
+      loadingOlderRef.current = false;
+      if (mountedRef.current) {
+        setIsLoading(false);
+      }
+    }
+  }, [gameId]);
+
+  return { messages, isLoading, error, hasOlder, loadOlder };
 }
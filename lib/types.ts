@@ -24,6 +24,8 @@ export interface Player {
   player_name: string;
   joined_at: string;
   is_ai: boolean;
+  // Persistent profile the player is rated under (set when they joined with one)
+  profile_id?: string;
 }
 
 export interface Move {
@@ -50,6 +52,8 @@ export interface CreateGameRequest {
   player_name: string;
   mode?: GameMode;
   is_ai_opponent?: boolean;
+  profile_id?: string;
+  profile_token?: string; // required with profile_id
 }
 
 export interface CreateGameResponse {
@@ -61,6 +65,8 @@ export interface CreateGameResponse {
 export interface JoinGameRequest {
   invite_code: string;
   player_name: string;
+  profile_id?: string;
+  profile_token?: string; // required with profile_id
 }
 
 export interface JoinGameResponse {
@@ -96,8 +102,105 @@ export interface GameStateResponse {
   messages: Message[];
 }
 
+// Compact encoding (?format=compact): players listed once, moves as packed cell indices.
+// Moves strictly alternate starting with player 1, so the mover is implied by turn order.
+export interface CompactGameStateResponse {
+  format: 'compact';
+  game: Game;
+  players: Player[];
+  board_size: number;
+  cells: string; // base64, one byte per move: row_index * board_size + column_index
+  t0: number | null; // epoch ms of the first move
+  dt: number[]; // ms since the previous move (first entry is 0)
+  messages: Message[];
+}
+
+export interface CompactMakeMoveResponse {
+  format: 'compact';
+  move_number: number;
+  cell: number;
+  t: number; // epoch ms of the move
+  is_winner: boolean;
+  is_draw: boolean;
+  game_status: GameStatus;
+}
+
 export interface ChatMessagesResponse {
   messages: Message[];
+  // Cursor for the next page (after_id when paging forward, before_id otherwise)
+  next_cursor?: number | null;
+}
+
+export interface ChatPageOptions {
+  afterId?: number;
+  beforeId?: number;
+  limit?: number;
+}
+
+// Quick match
+export type MatchTicketStatus = 'queued' | 'matched' | 'cancelled';
+
+export interface MatchRequest {
+  mode: GameMode;
+  player_name: string;
+  profile_id?: string;
+  profile_token?: string; // required with profile_id
+}
+
+export interface MatchStatusResponse {
+  ticket_id: string;
+  status: MatchTicketStatus;
+  mode: GameMode;
+  player_id: string;
+  // Set once matched
+  game: Game | null;
+  player: Player | null;
+}
+
+// Player profiles and ratings: games between two profiles are rated (Elo, per mode).
+// The profile id is a public handle; playing under a profile takes its secret token.
+export interface PlayerProfile {
+  id: string;
+  player_name: string;
+  created_at: string;
+}
+
+export interface CreateProfileRequest {
+  player_name: string;
+}
+
+export interface CreateProfileResponse {
+  profile: PlayerProfile;
+  // Only returned here; send it with profile_id to create, join or queue for rated games
+  profile_token: string;
+}
+
+export interface ModeStanding {
+  rating: number;
+  rank: number | null; // 1-based leaderboard position, null before the first rated game
+  games: number;
+  wins: number;
+  losses: number;
+  draws: number;
+}
+
+export interface PlayerProfileResponse {
+  profile: PlayerProfile;
+  standings: Record<GameMode, ModeStanding>;
+}
+
+export interface LeaderboardEntry {
+  rank: number;
+  profile_id: string;
+  player_name: string;
+  rating: number;
+}
+
+export interface LeaderboardResponse {
+  mode: GameMode;
+  entries: LeaderboardEntry[];
+  // The requested profile's own entry (profile_id query parameter)
+  player?: LeaderboardEntry | null;
 }
 
 // Client-side types for UI
@@ -4,7 +4,7 @@
 
 import { useEffect, useState, useRef, useCallback } from 'react';
 import Pusher from 'pusher-js';
-import type { GameStateResponse, Message } from './types';
+import type { ChatMessagesResponse, Game, GameStateResponse, Message, Player } from './types';
 
 // Get Pusher client instance
 function getPusherClient(): Pusher | null {
@@ -156,6 +156,12 @@ export function useChatWebSocket(gameId: string | null) {
   const pusherRef = useRef<Pusher | null>(null);
   const channelRef = useRef<any>(null);
   const mountedRef = useRef(true);
+  // before_id cursor for the next page of older history; null once it is all loaded
+  const olderCursorRef = useRef<number | null>(null);
+  const loadingOlderRef = useRef(false);
+  const [hasOlder, setHasOlder] = useState(false);
+  // Game currently shown, so a page requested for the previous game is dropped
+  const gameIdRef = useRef(gameId);
 
   // Fetch initial messages via HTTP
   const fetchInitialMessages = useCallback(async () => {
@@ -169,10 +175,12 @@ export function useChatWebSocket(gameId: string | null) {
         throw new Error(`Failed to fetch messages: ${response.statusText}`);
       }
 
-      const data = await response.json();
+      const data: ChatMessagesResponse = await response.json();
 
       if (mountedRef.current) {
         setMessages(data.messages || []);
+        olderCursorRef.current = data.next_cursor ?? null;
+        setHasOlder(olderCursorRef.current !== null);
         setError(null);
       }
     } catch (err) {
@@ -186,8 +194,50 @@ export function useChatWebSocket(gameId: string | null) {
     }
   }, [gameId]);
 
+  // Prepend the page of history before the oldest loaded message
+  const loadOlder = useCallback(async () => {
+    const beforeId = olderCursorRef.current;
+    if (!gameId || beforeId === null || loadingOlderRef.current) return;
+
+    try {
+      loadingOlderRef.current = true;
+      setIsLoading(true);
+      const response = await fetch(
+        `/api/chat/list?game_id=${encodeURIComponent(gameId)}&before_id=${beforeId}`
+      );
+
+      if (!response.ok) {
+        throw new Error(`Failed to fetch messages: ${response.statusText}`);
+      }
+
+      const data: ChatMessagesResponse = await response.json();
+
+      if (mountedRef.current && gameIdRef.current === gameId) {
+        setMessages((prev) => {
+          const existingIds = new Set(prev.map((m) => m.id));
+          return [...(data.messages || []).filter((m) => !existingIds.has(m.id)), ...prev];
+        });
+        olderCursorRef.current = data.next_cursor ?? null;
+        setHasOlder(olderCursorRef.current !== null);
+        setError(null);
+      }
+    } catch (err) {
+      if (mountedRef.current && gameIdRef.current === gameId) {
+        setError(err instanceof Error ? err : new Error('Failed to fetch messages'));
+      }
+    } finally {
+      loadingOlderRef.current = false;
+      if (mountedRef.current) {
+        setIsLoading(false);
+      }
+    }
+  }, [gameId]);
+
   useEffect(() => {
     mountedRef.current = true;
+    gameIdRef.current = gameId;
+    olderCursorRef.current = null;
+    setHasOlder(false);
 
     if (!gameId) {
       setMessages([]);
@@ -263,5 +313,61 @@ export function useChatWebSocket(gameId: string | null) {
     };
   }, [gameId, fetchInitialMessages]);
 
-  return { messages, isLoading, error, isConnected };
+  return { messages, isLoading, error, isConnected, hasOlder, loadOlder };
+}
+
+export interface MatchFoundEvent {
+  ticket_id: string;
+  game: Game;
+  player: Player;
+  player_id: string;
+}
+
+// Hook that waits for a quick match ticket to be paired
+export function useMatchWebSocket(ticketId: string | null) {
+  const [match, setMatch] = useState<MatchFoundEvent | null>(null);
+
+  useEffect(() => {
+    setMatch(null);
+    if (!ticketId) return;
+
+    const pusher = getPusherClient();
+    if (!pusher) {
+      console.log('[Pusher] Client not configured, use /api/match/status instead');
+      return;
+    }
+
+    const channelName = `match-${ticketId}`;
+    const channel = pusher.subscribe(channelName);
+    channel.bind('match-found', (data: MatchFoundEvent) => {
+      console.log('[Pusher] Match found:', data.game.id);
+      setMatch(data);
+    });
+
+    // A match made before the subscription was active is only visible through the API
+    channel.bind('pusher:subscription_succeeded', async () => {
+      try {
+        const response = await fetch(
+          `/api/match/status?ticket_id=${encodeURIComponent(ticketId)}`
+        );
+        const status = await response.json();
+        if (status.status === 'matched' && status.game && status.player) {
+          setMatch({
+            ticket_id: ticketId,
+            game: status.game,
+            player: status.player,
+            player_id: status.player_id,
+          });
+        }
+      } catch (err) {
+        console.error('[Pusher] Failed to check match status:', err);
+      }
+    });
+
+    return () => {
+      pusher.unsubscribe(channelName);
+    };
+  }, [ticketId]);
+
+  return { match };
 }
@@ -0,0 +1,82 @@
+// Update the game analytics summary and print its tables
+// Run with: npx tsx scripts/analytics.ts [--state=analytics.json] [--archive=games.grec]
+//   [--chunk-size=1000] [--top=10]
+//
+// The summary in --state is read, updated with the games finished since its watermark and
+// written back, so runs can be scheduled. Games expire from the store after a day: run at
+// least daily, or feed archives from scripts/archive-games.ts with --archive. There is a
+// single watermark, so archives must be fed in order and before the store runs that follow
+// them: games at or before the watermark are skipped (and reported).
+
+import { existsSync } from 'node:fs';
+import { readFile, rename, writeFile } from 'node:fs/promises';
+import type { GameMode } from '@/lib/types';
+import {
+  emptyAnalytics,
+  modeReport,
+  openingHeatmap,
+  openingReport,
+  storeRecords,
+  updateAnalytics,
+  type AnalyticsState,
+} from '@/server/analytics';
+import { readGameRecords } from '@/server/game-record';
+import { createStore } from '@/server/store';
+
+function parseArgs(argv: string[]): Record<string, string> {
+  const args: Record<string, string> = {};
+  for (const arg of argv) {
+    const match = /^--([\w-]+)(?:=(.*))?$/.exec(arg);
+    if (!match) {
+      throw new Error(`Unexpected argument: ${arg}`);
+    }
+    args[match[1]] = match[2] ?? 'true';
+  }
+  return args;
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const stateFile = args.state ?? 'analytics.json';
+  const chunkSize = args['chunk-size'] ? Number(args['chunk-size']) : undefined;
+  const startedAt = Date.now();
+
+  const previous: AnalyticsState = existsSync(stateFile)
+    ? JSON.parse(await readFile(stateFile, 'utf8'))
+    : emptyAnalytics();
+  const source = args.archive
+    ? readGameRecords(args.archive)
+    : storeRecords(createStore(), chunkSize);
+  const { state, counted, skipped } = await updateAnalytics(previous, source, { chunkSize });
+
+  // The store yields already counted games on every run; an archive should not
+  if (args.archive && skipped > 0) {
+    console.warn(
+      `[Analytics] ${skipped} archived games finished at or before the watermark ` +
+        `${new Date(previous.watermark).toISOString()} were not counted`
+    );
+  }
+
+  // Replace the summary in one step so an interrupted run leaves the old one intact
+  await writeFile(`${stateFile}.tmp`, JSON.stringify(state));
+  await rename(`${stateFile}.tmp`, stateFile);
+
+  const top = Number(args.top || 10);
+  console.table(modeReport(state));
+  for (const mode of ['classic3', 'gomoku'] as GameMode[]) {
+    if (state.modes[mode].games === 0) continue;
+    console.log(`\nOpenings (${mode}):`);
+    console.table(openingReport(state, mode, top));
+    console.table(openingHeatmap(state, mode));
+  }
+
+  console.error(
+    `[Analytics] Done: ${counted} new games in ${Date.now() - startedAt}ms, ` +
+      `watermark ${new Date(state.watermark).toISOString()}`
+  );
+}
+
+main().catch((error) => {
+  console.error('[Analytics] Failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,101 @@
+// Archive games in the compact binary record format (server/game-record.ts)
+// Run with: npx tsx scripts/archive-games.ts --out=games.grec [--status=completed]
+//   [--mode=gomoku] [--from=2024-01-01] [--to=2024-02-01]
+//   or: npx tsx scripts/archive-games.ts --read=games.grec [--out=games.ndjson]
+//
+// Archives hold games, players and moves but not chat. --read converts an archive back to
+// the NDJSON of export-games.ts. Progress goes to stderr.
+
+import { createWriteStream } from 'node:fs';
+import { once } from 'node:events';
+import type { GameStatus } from '@/lib/types';
+import { exportGames } from '@/server/export';
+import {
+  GameRecordWriter,
+  gameToRecord,
+  readGameRecords,
+  recordToExportLine,
+} from '@/server/game-record';
+import { createStore } from '@/server/store';
+
+function parseArgs(argv: string[]): Record<string, string> {
+  const args: Record<string, string> = {};
+  for (const arg of argv) {
+    const match = /^--([\w-]+)(?:=(.*))?$/.exec(arg);
+    if (!match) {
+      throw new Error(`Unexpected argument: ${arg}`);
+    }
+    args[match[1]] = match[2] ?? 'true';
+  }
+  return args;
+}
+
+function parseTime(value: string | undefined): number | undefined {
+  if (!value) return undefined;
+  const time = /^\d+$/.test(value) ? Number(value) : Date.parse(value);
+  if (Number.isNaN(time)) {
+    throw new Error(`Invalid date: ${value}`);
+  }
+  return time;
+}
+
+async function archive(args: Record<string, string>) {
+  if (!args.out) {
+    throw new Error('--out=<file> is required');
+  }
+
+  const writer = new GameRecordWriter(createWriteStream(args.out));
+  let skipped = 0;
+
+  for await (const event of exportGames(createStore(), {
+    status: args.status as GameStatus | undefined,
+    mode: args.mode,
+    from: parseTime(args.from),
+    to: parseTime(args.to),
+  })) {
+    if (event.type === 'cursor') {
+      console.error(`[Archive] ${writer.written} games archived, ${skipped} skipped`);
+      continue;
+    }
+
+    try {
+      await writer.write(gameToRecord(event.game));
+    } catch (error) {
+      skipped++;
+      console.error(`[Archive] Skipping ${event.game.id}:`, (error as Error).message);
+    }
+  }
+
+  await writer.end();
+  return writer.written;
+}
+
+async function unarchive(args: Record<string, string>) {
+  const out = args.out ? createWriteStream(args.out) : process.stdout;
+  let read = 0;
+
+  for await (const record of readGameRecords(args.read)) {
+    read++;
+    if (!out.write(recordToExportLine(record))) {
+      await once(out, 'drain');
+    }
+  }
+
+  if (out !== process.stdout) {
+    out.end();
+    await once(out, 'finish');
+  }
+  return read;
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const startedAt = Date.now();
+  const games = args.read ? await unarchive(args) : await archive(args);
+  console.error(`[Archive] Done: ${games} games in ${Date.now() - startedAt}ms`);
+}
+
+main().catch((error) => {
+  console.error('[Archive] Failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,45 @@
+// Rebuild the chat full-text index from stored messages
+// Run with: npx tsx scripts/backfill-chat-index.ts
+//
+// Needed once for chat history written before the index existed. Re-running is safe:
+// messages that are already indexed are skipped, so neither postings nor the document count
+// used for ranking are counted twice.
+
+import { createStore } from '@/server/store';
+
+const PAGE_SIZE = 500;
+
+async function main() {
+  const store = createStore();
+  let games = 0;
+  let messages = 0;
+  const startedAt = Date.now();
+
+  for await (const gameId of store.listChatGameIds()) {
+    let afterId = 0;
+
+    for (;;) {
+      const page = await store.listMessages(gameId, { afterId, limit: PAGE_SIZE });
+      for (const message of page) {
+        await store.indexMessage(message);
+      }
+      messages += page.length;
+      if (page.length < PAGE_SIZE) break;
+      afterId = page[page.length - 1].id;
+    }
+
+    games++;
+    if (games % 100 === 0) {
+      console.info(`[Backfill] ${games} games, ${messages} messages indexed`);
+    }
+  }
+
+  console.info(
+    `[Backfill] Done: ${games} games, ${messages} messages in ${Date.now() - startedAt}ms`
+  );
+}
+
+main().catch((error) => {
+  console.error('[Backfill] Failed:', error);
+  process.exit(1);
+});
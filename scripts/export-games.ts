@@ -0,0 +1,76 @@
+// Export games with their players, moves and chat as NDJSON
+// Run with: npx tsx scripts/export-games.ts [--status=completed] [--mode=classic3]
+//   [--from=2024-01-01] [--to=2024-02-01] [--cursor=<cursor>] [--out=games.ndjson]
+//
+// Game records go to --out (or stdout); progress and resume cursors go to stderr.
+// If an export is interrupted, re-run with the last printed cursor and --append. A resumed
+// export may repeat games already written, so de-duplicate the file by game.id.
+
+import { createWriteStream } from 'node:fs';
+import { once } from 'node:events';
+import type { GameStatus } from '@/lib/types';
+import { exportGames, serializeExportEvent } from '@/server/export';
+import { createStore } from '@/server/store';
+
+function parseArgs(argv: string[]): Record<string, string> {
+  const args: Record<string, string> = {};
+  for (const arg of argv) {
+    const match = /^--([\w-]+)(?:=(.*))?$/.exec(arg);
+    if (!match) {
+      throw new Error(`Unexpected argument: ${arg}`);
+    }
+    args[match[1]] = match[2] ?? 'true';
+  }
+  return args;
+}
+
+function parseTime(value: string | undefined): number | undefined {
+  if (!value) return undefined;
+  const time = /^\d+$/.test(value) ? Number(value) : Date.parse(value);
+  if (Number.isNaN(time)) {
+    throw new Error(`Invalid date: ${value}`);
+  }
+  return time;
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const store = createStore();
+  const out = args.out
+    ? createWriteStream(args.out, { flags: args.append ? 'a' : 'w' })
+    : process.stdout;
+  const startedAt = Date.now();
+  let exported = 0;
+
+  for await (const event of exportGames(store, {
+    status: args.status as GameStatus | undefined,
+    mode: args.mode,
+    from: parseTime(args.from),
+    to: parseTime(args.to),
+    cursor: args.cursor,
+    chunkSize: args['chunk-size'] ? Number(args['chunk-size']) : undefined,
+  })) {
+    if (event.type === 'cursor') {
+      exported = event.exported;
+      console.error(`[Export] ${exported} games, cursor: ${event.cursor ?? 'done'}`);
+      continue;
+    }
+
+    // Respect backpressure so memory stays flat on slow destinations
+    if (!out.write(serializeExportEvent(event))) {
+      await once(out, 'drain');
+    }
+  }
+
+  if (out !== process.stdout) {
+    out.end();
+    await once(out, 'finish');
+  }
+
+  console.error(`[Export] Done: ${exported} games in ${Date.now() - startedAt}ms`);
+}
+
+main().catch((error) => {
+  console.error('[Export] Failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,7 @@
+// Worker process of scripts/selfplay.ts: plays each task it is sent and sends the games back
+
+import { runTask, type SelfPlayTask } from '@/server/selfplay';
+
+process.on('message', (task: SelfPlayTask) => {
+  process.send!(runTask(task));
+});
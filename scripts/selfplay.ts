@@ -0,0 +1,192 @@
+// Self-play tournament between move engines, for tuning AI players offline
+// Run with: npx tsx scripts/selfplay.ts [--modes=classic3,gomoku]
+//   [--engines=heuristic,random,heuristic:noise=0.2] [--games=1000] [--workers=N]
+//   [--task-size=50] [--seed=1] [--out=selfplay.grec] [--json=report.json]
+//
+// Every pair of engines plays --games games per mode, taking turns moving first, spread over
+// --workers processes (scripts/selfplay-child.ts; one less than the CPU count by default,
+// 0 plays in this process).
+// Prints win and draw rates with 95% confidence intervals, throughput and per-move think
+// times. --out writes the games as game records (npm run archive:games -- --read=<file>
+// turns them into NDJSON).
+
+import { fork, type ChildProcess } from 'node:child_process';
+import { createWriteStream, writeFileSync } from 'node:fs';
+import { availableParallelism } from 'node:os';
+import path from 'node:path';
+import type { GameMode } from '@/lib/types';
+import { parseEngineSpec } from '@/server/engines';
+import { GameRecordWriter } from '@/server/game-record';
+import {
+  PairingStats,
+  planTasks,
+  runTask,
+  selfPlayRecord,
+  type SelfPlayGame,
+  type SelfPlayTask,
+} from '@/server/selfplay';
+
+const MODES: GameMode[] = ['classic3', 'gomoku'];
+
+function parseArgs(argv: string[]): Record<string, string> {
+  const args: Record<string, string> = {};
+  for (const arg of argv) {
+    const match = /^--([\w-]+)(?:=(.*))?$/.exec(arg);
+    if (!match) {
+      throw new Error(`Unexpected argument: ${arg}`);
+    }
+    args[match[1]] = match[2] ?? 'true';
+  }
+  return args;
+}
+
+// Engine specs are comma separated and so are their settings: a part with "=" but no ":"
+// continues the previous spec ("heuristic:noise=0.2,defense=0.5")
+function parseEngines(value: string): string[] {
+  const specs: string[] = [];
+  for (const part of value.split(',')) {
+    if (part.includes('=') && !part.includes(':') && specs.length > 0) {
+      specs[specs.length - 1] += `,${part}`;
+    } else {
+      specs.push(part);
+    }
+  }
+  specs.forEach(parseEngineSpec); // fail before starting workers
+  return specs;
+}
+
+// Runs tasks on a pool of worker processes, handing out the next task as each one finishes
+async function runPool(
+  tasks: SelfPlayTask[],
+  workers: number,
+  onGames: (games: SelfPlayGame[]) => Promise<void>
+): Promise<void> {
+  if (workers === 0) {
+    for (const task of tasks) await onGames(runTask(task));
+    return;
+  }
+
+  const childScript = path.join(__dirname, 'selfplay-child.ts');
+  let next = 0;
+
+  const work = (child: ChildProcess) =>
+    new Promise<void>((resolve, reject) => {
+      const dispatch = () => {
+        if (next >= tasks.length) {
+          child.disconnect();
+          resolve();
+          return;
+        }
+        child.send(tasks[next++]);
+      };
+
+      child.on('message', (games: SelfPlayGame[]) => {
+        onGames(games).then(dispatch, reject);
+      });
+      child.on('exit', (code) => {
+        if (code !== 0) reject(new Error(`Self-play worker exited with code ${code}`));
+      });
+      dispatch();
+    });
+
+  const pool = Array.from({ length: Math.min(workers, tasks.length) }, () =>
+    fork(childScript, { serialization: 'advanced' })
+  );
+  try {
+    await Promise.all(pool.map(work));
+  } finally {
+    pool.forEach((child) => child.connected && child.kill());
+  }
+}
+
+const percent = (rate: number) => `${(rate * 100).toFixed(1)}%`;
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const modes = (args.modes || MODES.join(',')).split(',') as GameMode[];
+  const engines = parseEngines(args.engines || 'heuristic,random');
+  const games = Number(args.games || 1000);
+  const workers = Number(args.workers ?? Math.max(1, availableParallelism() - 1));
+  const taskSize = Number(args['task-size'] || 50);
+  const seed = Number(args.seed || 1);
+
+  for (const mode of modes) {
+    if (!MODES.includes(mode)) {
+      throw new Error(`Unknown mode "${mode}" (expected ${MODES.join(', ')})`);
+    }
+  }
+
+  const tasks = planTasks(modes, engines, games, taskSize, seed);
+  const stats = new Map<string, PairingStats>();
+  const writer = args.out ? new GameRecordWriter(createWriteStream(args.out)) : null;
+  const startedAt = Date.now();
+  let played = 0;
+  let moves = 0;
+
+  console.error(`[SelfPlay] ${tasks.length} tasks, ${workers} workers`);
+  await runPool(tasks, workers, async (batch) => {
+    for (const game of batch) {
+      const pairing = game.index % 2 === 0 ? game.seats : [game.seats[1], game.seats[0]];
+      const key = `${game.mode} ${pairing.join(' vs ')}`;
+      let pairingStats = stats.get(key);
+      if (!pairingStats) {
+        pairingStats = new PairingStats(game.mode, pairing as [string, string]);
+        stats.set(key, pairingStats);
+      }
+      pairingStats.add(game);
+      await writer?.write(selfPlayRecord(game, startedAt));
+    }
+
+    played += batch.length;
+    moves += batch.reduce((sum, game) => sum + game.cells.length, 0);
+    if (played % 1000 < batch.length) {
+      console.error(`[SelfPlay] ${played} games`);
+    }
+  });
+  await writer?.end();
+
+  const seconds = (Date.now() - startedAt) / 1000;
+  const reports = [...stats.values()].map((s) => s.report());
+  const thinkTimes = [...stats.values()].flatMap((s) =>
+    [...s.think.entries()].map(([engine, histogram]) => ({
+      mode: s.mode,
+      pairing: s.engines.join(' vs '),
+      engine,
+      moves: histogram.count,
+      'p50 (µs)': Math.round(histogram.percentile(50)),
+      'p95 (µs)': Math.round(histogram.percentile(95)),
+      'p99 (µs)': Math.round(histogram.percentile(99)),
+      'max (µs)': Math.round(histogram.max),
+    }))
+  );
+
+  console.table(
+    reports.map((r) => ({
+      mode: r.mode,
+      pairing: r.engines.join(' vs '),
+      games: r.games,
+      'first engine wins': `${percent(r.winRate[0])} (${r.winInterval[0].map(percent).join('-')})`,
+      'second engine wins': `${percent(r.winRate[1])} (${r.winInterval[1].map(percent).join('-')})`,
+      draws: percent(r.drawRate),
+      'first mover wins': percent(r.firstMoverWinRate),
+      'avg moves': r.averageMoves.toFixed(1),
+    }))
+  );
+  console.table(thinkTimes);
+  console.log(
+    `${played} games, ${moves} moves in ${seconds.toFixed(1)}s: ` +
+      `${Math.round(moves / seconds)} moves/s, ${Math.round(played / seconds)} games/s`
+  );
+
+  if (args.json) {
+    writeFileSync(
+      args.json,
+      JSON.stringify({ games: played, moves, seconds, workers, reports, thinkTimes }, null, 2)
+    );
+  }
+}
+
+main().catch((error) => {
+  console.error('[SelfPlay] Failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,180 @@
+// Tests for offline game analytics
+// Run with: npx tsx server/__tests__/analytics.test.ts
+
+import type { GameMode, Player } from '@/lib/types';
+import {
+  emptyAnalytics,
+  modeReport,
+  openingHeatmap,
+  openingReport,
+  storeRecords,
+  updateAnalytics,
+} from '../analytics';
+import type { GameRecord } from '../game-record';
+import type { StoredGame } from '../store';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+const T0 = Date.UTC(2024, 5, 1);
+
+function record(
+  index: number,
+  mode: GameMode,
+  cells: number[],
+  winner: GameRecord['winner'],
+  finishedAt = T0 + index * 1000
+): GameRecord {
+  return {
+    id: `game_${index}`,
+    inviteCode: 'ABC123',
+    mode,
+    status: 'completed',
+    winner,
+    createdAt: T0,
+    startedAt: T0,
+    finishedAt,
+    players: [],
+    cells: Uint8Array.from(cells),
+    moveTimes: cells.map((_, i) => T0 + i),
+  };
+}
+
+// 10 classic games: 6 open in the centre (4 won by X, 1 by O, 1 drawn), 4 in a corner
+// (1 won by X, 3 by O); and one Gomoku game
+function sampleGames(): GameRecord[] {
+  const games: GameRecord[] = [];
+  const centre: GameRecord['winner'][] = [1, 1, 1, 1, 2, 0];
+  centre.forEach((winner, i) => games.push(record(i + 1, 'classic3', [4, 0, 8, 2, 6], winner)));
+  const corner: GameRecord['winner'][] = [1, 2, 2, 2];
+  corner.forEach((winner, i) => games.push(record(i + 7, 'classic3', [0, 4, 8, 1], winner)));
+  games.push(record(11, 'gomoku', [112, 113, 97], 0));
+  return games;
+}
+
+function storedGame(id: string, status: StoredGame['status'], finishedAt: number): StoredGame {
+  const players: Player[] = [1, 2].map((n) => ({
+    id: `${id}_p${n}`,
+    game_id: id,
+    player_number: n as Player['player_number'],
+    player_name: `Player ${n}`,
+    joined_at: new Date(T0).toISOString(),
+    is_ai: false,
+  }));
+  return {
+    id,
+    invite_code: id.toUpperCase(),
+    mode: 'classic3',
+    status,
+    current_turn: null,
+    winner_id: players[0].id,
+    created_at: new Date(T0).toISOString(),
+    started_at: new Date(T0).toISOString(),
+    finished_at: status === 'completed' ? new Date(finishedAt).toISOString() : null,
+    players,
+    moves: [4, 0, 8].map((cell, i) => ({
+      id: i + 1,
+      game_id: id,
+      player_id: players[i % 2].id,
+      move_number: i + 1,
+      column_index: cell % 3,
+      row_index: Math.floor(cell / 3),
+      created_at: new Date(T0 + i).toISOString(),
+    })),
+  };
+}
+
+async function runTests() {
+  console.log('Running analytics tests...\n');
+
+  console.log('Testing aggregates...');
+  const games = sampleGames();
+  const { state, counted } = await updateAnalytics(emptyAnalytics(), games, {
+    chunkSize: 4, // chunks split the modes and openings
+    until: T0 + 60_000,
+  });
+  assertEqual(counted, 11, 'Every finished game is counted');
+  assertEqual(state.watermark, T0 + 11_000, 'Watermark is the latest finish time');
+
+  const [classic, gomoku] = modeReport(state);
+  assertEqual(classic.games, 10, 'Classic games');
+  assertEqual(classic.averageMoves, 4.6, 'Average length');
+  assertEqual(classic.firstPlayerWinRate, 0.5, 'First player wins');
+  assertEqual(classic.secondPlayerWinRate, 0.4, 'Second player wins');
+  assertEqual(classic.drawRate, 0.1, 'Draws');
+  assertEqual(classic.firstPlayerAdvantage, 0.056, 'First player wins 5 of 9 decisive games');
+  assertEqual(gomoku.games, 1, 'Modes are kept apart');
+  assertEqual(gomoku.drawRate, 1, 'Gomoku draw');
+
+  const [centre, corner] = openingReport(state, 'classic3');
+  assertEqual(`${centre.row},${centre.column}`, '1,1', 'Most played opening first');
+  assertEqual(centre.winRate, 0.667, 'Win rate after the centre opening');
+  assertEqual(corner.lossRate, 0.75, 'Loss rate after the corner opening');
+  assertEqual(openingHeatmap(state, 'classic3')[1][1], 6, 'Heatmap cell');
+  assertEqual(openingHeatmap(state, 'gomoku')[7][7], 1, 'Gomoku heatmap cell');
+  console.log('✓ Aggregate tests passed\n');
+
+  console.log('Testing incremental runs...');
+  const firstRun = await updateAnalytics(emptyAnalytics(), games.slice(0, 5), {
+    until: T0 + 60_000,
+  });
+  // The next run sees every game again, plus games finished later or not yet settled
+  const later = [record(12, 'classic3', [4], 1), record(13, 'classic3', [4], 2, T0 + 120_000)];
+  const secondRun = await updateAnalytics(firstRun.state, [...games, ...later], {
+    until: T0 + 60_000,
+  });
+  assertEqual(firstRun.counted + secondRun.counted, 12, 'Each game is counted once');
+  assertEqual(secondRun.state.modes.classic3.games, 11, 'Unsettled games wait for a later run');
+  assertEqual(firstRun.state.modes.classic3.games, 5, 'The previous state is not modified');
+
+  const thirdRun = await updateAnalytics(secondRun.state, [...games, ...later], {
+    until: T0 + 180_000,
+  });
+  assertEqual(thirdRun.counted, 1, 'Settled games are picked up');
+  assertEqual(thirdRun.state.modes.classic3.secondPlayerWins, 5, 'And added to the totals');
+  assertEqual(thirdRun.skipped, 12, 'Games behind the watermark are reported as skipped');
+  console.log('✓ Incremental run tests passed\n');
+
+  console.log('Testing store reads...');
+  const store = new MemoryGameStore();
+  await store.saveGame(storedGame('g1', 'completed', T0 + 1000));
+  await store.saveGame(storedGame('g2', 'active', 0));
+  const outOfTurn = storedGame('g3', 'completed', T0 + 2000);
+  outOfTurn.moves![1].player_id = outOfTurn.players[0].id;
+  await store.saveGame(outOfTurn);
+
+  const warn = console.warn;
+  const warnings: string[] = [];
+  console.warn = (...args: unknown[]) => warnings.push(args.join(' '));
+  try {
+    const fromStore = await updateAnalytics(emptyAnalytics(), storeRecords(store, 1));
+    assertEqual(fromStore.counted, 1, 'Only completed games are read');
+    assertEqual(fromStore.state.modes.classic3.openings[4], 1, 'Moves become cells');
+  } finally {
+    console.warn = warn;
+  }
+  assert(warnings.some((line) => line.includes('g3')), 'Unreadable games are reported');
+  console.log('✓ Store read tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
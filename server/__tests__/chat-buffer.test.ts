@@ -0,0 +1,88 @@
+// Tests for the per-game chat ring buffers
+// Run with: npx tsx server/__tests__/chat-buffer.test.ts
+
+import { ChatBufferPool } from '../chat-buffer';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+async function runTests() {
+  console.log('Running chat buffer tests...\n');
+
+  const store = new MemoryGameStore();
+  const send = (gameId: string, content: string) =>
+    store.appendMessage({
+      game_id: gameId,
+      player_id: 'p1',
+      message_type: 'chat',
+      content,
+      created_at: new Date().toISOString(),
+    });
+
+  for (let i = 1; i <= 8; i++) {
+    await send('g1', `message ${i}`);
+  }
+
+  const pool = new ChatBufferPool({ maxGames: 2, depth: 5, revalidateMs: 0 });
+
+  console.log('Testing warm and window...');
+  const newest = await pool.list(store, 'g1', { limit: 3 });
+  assertEqual(newest?.map((m) => m.id).join(','), '6,7,8', 'Newest page served from buffer');
+  assertEqual(pool.stats().warms, 1, 'Buffer warmed once');
+  assertEqual(pool.stats().messages, 5, 'Buffer holds depth messages');
+
+  const polled = await pool.list(store, 'g1', { afterId: 6, limit: 10 });
+  assertEqual(polled?.map((m) => m.id).join(','), '7,8', 'Polling page served from buffer');
+
+  const tooOld = await pool.list(store, 'g1', { afterId: 1, limit: 10 });
+  assertEqual(tooOld, null, 'Pages outside the window fall back to the store');
+  const older = await pool.list(store, 'g1', { beforeId: 5, limit: 3 });
+  assertEqual(older, null, 'Older history falls back to the store');
+  console.log('✓ Window tests passed\n');
+
+  console.log('Testing append and catch-up...');
+  pool.append(await send('g1', 'message 9'));
+  const afterAppend = await pool.list(store, 'g1', { afterId: 8, limit: 10 });
+  assertEqual(afterAppend?.map((m) => m.id).join(','), '9', 'Appended message is served');
+
+  // Written by another worker: this pool never sees append()
+  await send('g1', 'message 10');
+  const caughtUp = await pool.list(store, 'g1', { afterId: 9, limit: 10 });
+  assertEqual(caughtUp?.map((m) => m.id).join(','), '10', 'Other workers are caught up');
+  console.log('✓ Append tests passed\n');
+
+  console.log('Testing deletions by other workers...');
+  // Chat retention ran elsewhere: the latest id is unchanged, but messages are gone
+  await store.deleteMessages('g1', [7, 8]);
+  const afterPrune = await pool.list(store, 'g1', { limit: 5 });
+  assertEqual(afterPrune, null, 'A pruned game falls back to the store');
+  const rewarmed = await pool.list(store, 'g1', { limit: 5 });
+  assertEqual(rewarmed?.map((m) => m.id).join(','), '4,5,6,9,10', 'Pruned messages are gone');
+  console.log('✓ Deletion tests passed\n');
+
+  console.log('Testing complete history and eviction...');
+  await send('g2', 'hello');
+  const small = await pool.list(store, 'g2', { limit: 50 });
+  assertEqual(small?.length, 1, 'Short histories are complete and always servable');
+
+  await pool.list(store, 'g3', { limit: 10 });
+  assertEqual(pool.stats().games, 2, 'Game count is capped');
+  assertEqual(pool.stats().evictions, 1, 'Least recently used game evicted');
+  console.log('✓ Eviction tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
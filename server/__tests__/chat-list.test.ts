@@ -0,0 +1,109 @@
+// Tests for keyset paging of chat history (GET /api/chat/list)
+// Run with: npx tsx server/__tests__/chat-list.test.ts
+
+import { GET as listChat } from '@/app/api/chat/list/route';
+import type { ChatMessagesResponse } from '@/lib/types';
+import { resetServerContext } from '../context';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+const T0 = Date.UTC(2024, 0, 1);
+
+function list(query: string): Promise<Response> {
+  return listChat(new Request(`http://localhost:3000/api/chat/list?game_id=g1${query}`));
+}
+
+async function page(query: string): Promise<ChatMessagesResponse> {
+  const response = await list(query);
+  assertEqual(response.status, 200, `${query || 'newest page'} succeeds`);
+  return response.json();
+}
+
+// "first-last" of a page's message ids
+function span(result: ChatMessagesResponse): string {
+  const ids = result.messages.map((m) => m.id);
+  return ids.length > 0 ? `${ids[0]}-${ids[ids.length - 1]}` : 'empty';
+}
+
+async function runTests() {
+  console.log('Running chat list tests...\n');
+
+  const store = new MemoryGameStore();
+  resetServerContext({ store });
+  for (let i = 1; i <= 120; i++) {
+    await store.appendMessage({
+      game_id: 'g1',
+      player_id: 'p1',
+      message_type: 'chat',
+      content: `message ${i}`,
+      created_at: new Date(T0 + i * 1000).toISOString(),
+    });
+  }
+
+  console.log('Testing backward paging...');
+  const newest = await page('');
+  assertEqual(span(newest), '71-120', 'Newest 50 messages, oldest first');
+  assertEqual(newest.next_cursor, 71, 'Cursor is the oldest id on the page');
+  const older = await page(`&before_id=${newest.next_cursor}`);
+  assertEqual(span(older), '21-70', 'Next older page');
+  assertEqual(older.next_cursor, 21, 'Cursor moves back');
+  const oldest = await page(`&before_id=${older.next_cursor}`);
+  assertEqual(span(oldest), '1-20', 'Oldest page');
+  assertEqual(oldest.next_cursor, null, 'No cursor once history is exhausted');
+  console.log('✓ Backward paging tests passed\n');
+
+  console.log('Testing forward paging...');
+  const first = await page('&after_id=0&limit=30');
+  assertEqual(span(first), '1-30', 'First page after the start');
+  assertEqual(first.next_cursor, 30, 'Cursor is the newest id on the page');
+  const next = await page(`&after_id=${first.next_cursor}&limit=30`);
+  assertEqual(span(next), '31-60', 'Next newer page');
+  const tail = await page('&after_id=100&limit=30');
+  assertEqual(span(tail), '101-120', 'Last page');
+  assertEqual(tail.next_cursor, null, 'No cursor at the newest message');
+  assertEqual(span(await page('&after_id=120')), 'empty', 'Nothing after the newest message');
+  console.log('✓ Forward paging tests passed\n');
+
+  console.log('Testing limits and bad cursors...');
+  const full = await page('&limit=100');
+  assertEqual(full.messages.length, 100, 'limit=100 is allowed');
+  assertEqual(full.next_cursor, 21, 'Cursor of a full-size page');
+  for (const query of [
+    '&limit=101',
+    '&limit=0',
+    '&limit=ten',
+    '&after_id=abc',
+    '&before_id=-1',
+    '&after_id=1.5',
+    '&after_id=10&before_id=20',
+  ]) {
+    assertEqual((await list(query)).status, 400, `${query} is rejected`);
+  }
+  const noGame = await listChat(new Request('http://localhost:3000/api/chat/list'));
+  assertEqual(noGame.status, 400, 'game_id is required');
+  console.log('✓ Limit and cursor tests passed\n');
+
+  console.log('Testing the deprecated since filter...');
+  const since = new Date(T0 + 110 * 1000).toISOString();
+  assertEqual(span(await page(`&since=${since}`)), '111-120', 'Filters the newest page');
+  assertEqual(span(await page(`&before_id=71&since=${since}`)), '21-70', 'Ignored going back');
+  assertEqual(span(await page(`&after_id=0&since=${since}`)), '1-50', 'Ignored going forward');
+  console.log('✓ Since filter tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
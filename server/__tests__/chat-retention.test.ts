@@ -0,0 +1,115 @@
+// Tests for chat retention and the batched pruner
+// Run with: npx tsx server/__tests__/chat-retention.test.ts
+
+import type { MessageType } from '@/lib/types';
+import { ChatPruner, expiredMessageIds, type RetentionPolicy } from '../chat-retention';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+const HOUR_MS = 60 * 60 * 1000;
+
+async function runTests() {
+  console.log('Running chat retention tests...\n');
+
+  const store = new MemoryGameStore();
+  const now = Date.now();
+  const send = (gameId: string, type: MessageType, content: string, ageMs = 0) =>
+    store.appendMessage({
+      game_id: gameId,
+      player_id: type === 'chat' ? 'p1' : null,
+      message_type: type,
+      content,
+      created_at: new Date(now - ageMs).toISOString(),
+    });
+
+  const policy: RetentionPolicy = {
+    chat: { maxMessages: 3, maxAgeMs: 0 },
+    system: { maxMessages: 0, maxAgeMs: HOUR_MS },
+  };
+
+  // g1: ids 1-2 system (one old), ids 3-7 chat
+  await send('g1', 'system', 'expired notice', 2 * HOUR_MS);
+  await send('g1', 'system', 'recent notice');
+  for (let i = 1; i <= 5; i++) {
+    await send('g1', 'chat', `hello ${i}`);
+  }
+  await send('g2', 'chat', 'only message');
+
+  console.log('Testing policy evaluation...');
+  const ids = await expiredMessageIds(store, 'g1', policy, now);
+  assertEqual(ids.join(','), '1,3,4', 'Old system message and chat overflow are expired');
+  assertEqual((await expiredMessageIds(store, 'g2', policy, now)).length, 0, 'g2 is within policy');
+  console.log('✓ Policy tests passed\n');
+
+  console.log('Testing pruning...');
+  const pruned: string[] = [];
+  const pruner = new ChatPruner(policy, { batchSize: 2, timeBudgetMs: 60_000 });
+  const result = await pruner.run(store, (gameId) => pruned.push(gameId));
+
+  assertEqual(result.deleted.chat, 2, 'Two chat messages deleted');
+  assertEqual(result.deleted.system, 1, 'One system message deleted');
+  assertEqual(result.batches, 2, 'Deletes are split into batches');
+  assertEqual(result.gamesScanned, 2, 'Every game is scanned');
+  assertEqual(pruned.join(','), 'g1', 'Only changed games are reported');
+
+  const remaining = await store.listMessages('g1', { limit: 100 });
+  assertEqual(remaining.map((m) => m.id).join(','), '2,5,6,7', 'Retained messages');
+  assertEqual((await store.getChatHead('g1')).latestId, 7, 'Message ids are not reused');
+  assertEqual((await store.getChatHead('g1')).pruneCount, 2, 'Each deleting batch is counted');
+  assertEqual((await store.countPostings(['expired']))[0], 0, 'Postings of deleted messages go');
+  assertEqual(await store.countIndexedMessages(), 5, 'Index document count shrinks');
+
+  const again = await pruner.run(store);
+  assertEqual(again.deleted.chat + again.deleted.system, 0, 'Second pass is a no-op');
+  assertEqual(pruner.stats().runs, 2, 'Runs are counted');
+  assertEqual(pruner.stats().deleted.chat, 2, 'Totals accumulate');
+  console.log('✓ Pruning tests passed\n');
+
+  console.log('Testing resumed runs...');
+  const busy = new MemoryGameStore();
+  for (let g = 0; g < 5; g++) {
+    for (let i = 0; i < 5; i++) {
+      await busy.appendMessage({
+        game_id: `busy${g}`,
+        player_id: 'p1',
+        message_type: 'chat',
+        content: `message ${i}`,
+        created_at: new Date(now).toISOString(),
+      });
+    }
+  }
+  // A budget that is spent after the first game of every run
+  const slow = new ChatPruner(policy, { batchSize: 10, timeBudgetMs: -1 });
+  const runs = [];
+  for (let i = 0; i < 5; i++) {
+    runs.push(await slow.run(busy));
+  }
+  assertEqual(runs.map((r) => r.gamesScanned).join(','), '1,1,1,1,1', 'One game per run');
+  assertEqual(runs.map((r) => r.complete).join(','), 'false,false,false,false,true', 'Walk ends');
+  assertEqual(runs.filter((r) => r.resumed).length, 4, 'Later runs resume');
+  for (let g = 0; g < 5; g++) {
+    const left = await busy.listMessages(`busy${g}`, { limit: 100 });
+    assertEqual(left.length, 3, `busy${g} is reached`);
+  }
+  assertEqual(await busy.getJobCursor('chat-prune'), null, 'A finished walk clears its cursor');
+  const restart = await slow.run(busy);
+  assertEqual(restart.resumed, false, 'The next walk starts over');
+  console.log('✓ Resumed run tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,127 @@
+// Tests for chat full-text search
+// Run with: npx tsx server/__tests__/chat-search.test.ts
+
+import { makeSnippet, searchChat, tokenize } from '../chat-search';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+async function runTests() {
+  console.log('Running chat search tests...\n');
+
+  console.log('Testing tokenize...');
+  const terms = tokenize('Hello, WORLD! ｆｕｌｌwidth a hello');
+  assertEqual(terms.join(' '), 'hello world fullwidth', 'Terms are normalized and distinct');
+  console.log('✓ tokenize tests passed\n');
+
+  console.log('Testing makeSnippet...');
+  const { snippet, highlights } = makeSnippet(`${'x'.repeat(100)} Good game friend`, ['game']);
+  assert(snippet.startsWith('…'), 'Snippet should be truncated at the start');
+  assertEqual(snippet.slice(highlights[0][0], highlights[0][1]), 'game', 'Highlight offsets');
+  console.log('✓ makeSnippet tests passed\n');
+
+  console.log('Testing searchChat...');
+  const store = new MemoryGameStore();
+  const base = { message_type: 'chat' as const };
+  const send = (gameId: string, playerId: string, content: string, minute: number) =>
+    store.appendMessage({
+      ...base,
+      game_id: gameId,
+      player_id: playerId,
+      content,
+      created_at: new Date(Date.UTC(2024, 0, 1, 0, minute)).toISOString(),
+    });
+
+  await send('g1', 'p1', 'good game', 1);
+  await send('g1', 'p2', 'good good game', 2);
+  await send('g2', 'p3', 'bad game', 3);
+  await send('g2', 'p4', 'nice move', 4);
+
+  const page = await searchChat(store, { q: 'good game', limit: 10, offset: 0 });
+  assertEqual(page.results.length, 2, 'Both messages containing all terms match');
+  assertEqual(page.results[0].message.player_id, 'p2', 'Higher term frequency ranks first');
+
+  const byGame = await searchChat(store, { q: 'game', gameId: 'g2', limit: 10, offset: 0 });
+  assertEqual(byGame.results.length, 1, 'Game filter applies');
+  assertEqual(byGame.results[0].message.content, 'bad game', 'Game filter result');
+
+  const byPlayer = await searchChat(store, { q: 'game', playerId: 'p1', limit: 10, offset: 0 });
+  assertEqual(byPlayer.results.length, 1, 'Player filter applies');
+
+  const byTime = await searchChat(store, {
+    q: 'game',
+    from: Date.UTC(2024, 0, 1, 0, 2),
+    to: Date.UTC(2024, 0, 1, 0, 3),
+    limit: 10,
+    offset: 0,
+  });
+  assertEqual(byTime.results.length, 2, 'Time range applies');
+
+  const first = await searchChat(store, { q: 'game', limit: 2, offset: 0 });
+  assertEqual(first.next_cursor, 2, 'First page points at the next offset');
+  const second = await searchChat(store, { q: 'game', limit: 2, offset: 2 });
+  assertEqual(second.results.length, 1, 'Second page holds the remainder');
+  assertEqual(second.next_cursor, null, 'Last page has no cursor');
+
+  const none = await searchChat(store, { q: 'checkmate', limit: 10, offset: 0 });
+  assertEqual(none.results.length, 0, 'Unknown terms match nothing');
+  assertEqual(page.truncated, false, 'Small result sets are complete');
+
+  // A backfill re-run indexes the same messages again
+  const indexed = await store.countIndexedMessages();
+  const [latest] = await store.listMessages('g2', { afterId: 1, limit: 1 });
+  await store.indexMessage(latest);
+  assertEqual(await store.countIndexedMessages(), indexed, 'Re-indexing does not add documents');
+  await send('g2', 'p4', '!!', 5);
+  assertEqual(await store.countIndexedMessages(), indexed, 'Messages without terms do not count');
+  console.log('✓ searchChat tests passed\n');
+
+  console.log('Testing deep postings...');
+  const deep = new MemoryGameStore();
+  const say = (playerId: string, content: string, i: number) =>
+    deep.appendMessage({
+      ...base,
+      game_id: `d${i % 50}`,
+      player_id: playerId,
+      content,
+      created_at: new Date(Date.UTC(2024, 0, 1) + i * 1000).toISOString(),
+    });
+  // The oldest matches for p2 sit behind more than a page of newer postings
+  for (let i = 0; i < 3; i++) await say('p2', 'rematch please', i);
+  for (let i = 3; i < 2503; i++) await say('p1', 'rematch now', i);
+
+  const old = await searchChat(deep, { q: 'rematch', playerId: 'p2', limit: 10, offset: 0 });
+  assertEqual(old.results.length, 3, 'Filters see postings past the first page');
+  assertEqual(old.truncated, false, 'Every posting was read');
+  const paged = await searchChat(deep, { q: 'rematch', limit: 100, offset: 2450 });
+  assertEqual(paged.results.length, 53, 'Offsets reach past the first page');
+  assertEqual(paged.next_cursor, null, 'The last page ends the results');
+
+  for (let i = 2503; i < 20_100; i++) await say('p1', 'rematch now', i);
+  const capped = await searchChat(deep, { q: 'rematch', playerId: 'p2', limit: 10, offset: 0 });
+  assertEqual(capped.results.length, 0, 'Matches beyond the read cap are not reached');
+  assertEqual(capped.truncated, true, 'The cap is reported, not hidden');
+  console.log('✓ Deep postings tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
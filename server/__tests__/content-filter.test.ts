@@ -0,0 +1,69 @@
+// Tests for the chat content filter
+// Run with: npx tsx server/__tests__/content-filter.test.ts
+
+import { mkdtemp, rm, utimes, writeFile } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { ContentFilter, foldText, parseTermList } from '../content-filter';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+async function runTests() {
+  console.log('Running content filter tests...\n');
+
+  console.log('Testing folding...');
+  assertEqual(foldText('Ünïcödé').text, 'unicode', 'Accents are stripped and case folded');
+  assertEqual(foldText('ｂ4ｄ w0rd').text, 'bad word', 'Fullwidth and leetspeak are folded');
+  console.log('✓ Folding tests passed\n');
+
+  console.log('Testing matching...');
+  const options = { action: 'mask' as const, termsFile: null, reloadIntervalMs: 0 };
+  const filter = new ContentFilter(options, ['ass', 'bad word', 'he', 'she', 'hers']);
+
+  assertEqual(filter.check('a classy move').matches, 0, 'Terms inside words are ignored');
+  assertEqual(filter.check('you a$$!').text, 'you ***!', 'Leetspeak matches are masked');
+  assertEqual(filter.check('B4D W0RD, gg').text, '********, gg', 'Multi-word terms');
+  assertEqual(filter.check('ushers').matches, 0, 'Overlapping suffixes inside a word');
+  assertEqual(filter.check('she said hers').text, '*** said ****', 'Several matches');
+  assertEqual(filter.stats().flagged, 3, 'Flagged messages are counted');
+  console.log('✓ Matching tests passed\n');
+
+  console.log('Testing term file reload...');
+  assertEqual(parseTermList('# comment\n\n foo \nbar\n').join(','), 'foo,bar', 'Term list');
+
+  const dir = await mkdtemp(join(tmpdir(), 'content-filter-'));
+  try {
+    const file = join(dir, 'terms.txt');
+    await writeFile(file, 'alpha\n');
+    const watched = new ContentFilter({ action: 'reject', termsFile: file, reloadIntervalMs: 0 });
+
+    await watched.ready();
+    assertEqual(watched.check('alpha beta').matches, 1, 'Terms are loaded from the file');
+
+    await writeFile(file, 'beta\n');
+    await utimes(file, new Date(), new Date(Date.now() + 5000));
+    await watched.refresh();
+    assertEqual(watched.check('alpha').matches, 0, 'Old terms are gone after reload');
+    assertEqual(watched.check('beta').matches, 1, 'New terms apply after reload');
+    assertEqual(watched.stats().terms, 1, 'Stats reflect the new list');
+  } finally {
+    await rm(dir, { recursive: true, force: true });
+  }
+  console.log('✓ Reload tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
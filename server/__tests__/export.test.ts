@@ -0,0 +1,115 @@
+// Tests for the NDJSON game export
+// Run with: npx tsx server/__tests__/export.test.ts
+
+import type { GameStatus } from '@/lib/types';
+import { exportGames, serializeExportEvent, type ExportEvent } from '../export';
+import type { StoredGame } from '../store';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function makeGame(id: string, status: GameStatus, createdAt: string): StoredGame {
+  return {
+    id,
+    invite_code: id.toUpperCase(),
+    mode: 'classic3',
+    status,
+    created_at: createdAt,
+    started_at: null,
+    finished_at: null,
+    current_turn: 1,
+    winner_id: null,
+    players: [],
+    moves: [],
+  };
+}
+
+async function collect(events: AsyncIterable<ExportEvent>): Promise<ExportEvent[]> {
+  const all: ExportEvent[] = [];
+  for await (const event of events) {
+    all.push(event);
+  }
+  return all;
+}
+
+function gameIds(events: ExportEvent[]): string {
+  return events
+    .map((event) => (event.type === 'game' ? event.game.id : null))
+    .filter(Boolean)
+    .join(',');
+}
+
+async function runTests() {
+  console.log('Running export tests...\n');
+
+  const store = new MemoryGameStore();
+  for (let i = 1; i <= 5; i++) {
+    const status = i % 2 === 0 ? 'active' : 'completed';
+    await store.saveGame(makeGame(`g${i}`, status, `2024-01-0${i}T00:00:00.000Z`));
+  }
+  await store.appendMessage({
+    game_id: 'g1',
+    player_id: null,
+    message_type: 'system',
+    content: 'Game started',
+    created_at: '2024-01-01T00:00:01.000Z',
+  });
+
+  console.log('Testing full export...');
+  const all = await collect(exportGames(store, { chunkSize: 2 }));
+  assertEqual(gameIds(all), 'g1,g2,g3,g4,g5', 'Every game is exported');
+  const cursors = all.filter((event) => event.type === 'cursor');
+  assertEqual(cursors.length, 3, 'One cursor event per chunk');
+  const last = cursors[cursors.length - 1];
+  assertEqual(last.type === 'cursor' && last.cursor, null, 'Final cursor is null');
+
+  const line = serializeExportEvent(all[0]);
+  const record = JSON.parse(line);
+  assertEqual(line.endsWith('\n'), true, 'Lines are newline-terminated');
+  assertEqual(record.game.id, 'g1', 'Record carries the game header');
+  assertEqual(record.messages[0].content, 'Game started', 'Record carries chat history');
+  console.log('✓ Full export tests passed\n');
+
+  console.log('Testing filters and resume...');
+  const completed = await collect(exportGames(store, { status: 'completed' }));
+  assertEqual(gameIds(completed), 'g1,g3,g5', 'Status filter');
+
+  const ranged = await collect(
+    exportGames(store, { from: Date.parse('2024-01-02'), to: Date.parse('2024-01-03') })
+  );
+  assertEqual(gameIds(ranged), 'g2,g3', 'Date range filter');
+
+  const first = cursors[0];
+  const resumed = await collect(
+    exportGames(store, { chunkSize: 2, cursor: first.type === 'cursor' ? first.cursor! : '' })
+  );
+  assertEqual(gameIds(resumed), 'g3,g4,g5', 'Export resumes after the first chunk');
+  console.log('✓ Filter and resume tests passed\n');
+
+  console.log('Testing repeated scan results...');
+  // SCAN may return an id again on a later page
+  const repeating = Object.create(store) as MemoryGameStore;
+  repeating.scanGameIds = async (cursor, count) => {
+    const page = await store.scanGameIds(cursor, count);
+    return { ...page, ids: cursor === '0' ? page.ids : ['g1', ...page.ids] };
+  };
+  const walked = await collect(exportGames(repeating, { chunkSize: 2 }));
+  assertEqual(gameIds(walked), 'g1,g2,g3,g4,g5', 'Each game is exported once per walk');
+  console.log('✓ Repeated scan tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,197 @@
+// Tests for the binary game record format
+// Run with: npx tsx server/__tests__/game-record.test.ts
+
+import { createWriteStream } from 'node:fs';
+import { readFile, rm, writeFile } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import path from 'node:path';
+import type { Move, Player } from '@/lib/types';
+import { serializeExportEvent } from '../export';
+import {
+  GameRecordWriter,
+  crc32,
+  decodeGameRecords,
+  encodeGameRecord,
+  gameToRecord,
+  readGameRecords,
+  recordToExportLine,
+  recordToGame,
+  type GameRecord,
+} from '../game-record';
+import type { StoredGame } from '../store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+async function assertRejects(fn: () => Promise<unknown>, pattern: RegExp, message: string) {
+  try {
+    await fn();
+  } catch (error) {
+    assert(pattern.test(String(error)), `${message}: ${error}`);
+    return;
+  }
+  throw new Error(`Assertion failed: ${message}. Expected an error`);
+}
+
+// An in-memory record file holding the given records
+function recordFile(...records: GameRecord[]): Uint8Array {
+  const frames = records.map((record) => [...encodeGameRecord(record)]);
+  return Uint8Array.from([0x47, 0x52, 0x45, 0x43, 1, ...frames.flat()]);
+}
+
+async function readAll(file: string): Promise<number> {
+  let count = 0;
+  for await (const _ of readGameRecords(file)) count++;
+  return count;
+}
+
+const T0 = Date.UTC(2024, 5, 1, 12, 0, 0);
+const iso = (ms: number) => new Date(ms).toISOString();
+
+// A finished Gomoku game with moveCount alternating moves
+function buildGame(index: number, moveCount: number): StoredGame {
+  const id = `game_${1_700_000_000_000 + index}_${index.toString(36).padStart(9, 'x')}`;
+  const players: Player[] = [1, 2].map((n) => ({
+    id: `p${n}_${index}_${'u'.repeat(24)}`,
+    game_id: id,
+    player_number: n as Player['player_number'],
+    player_name: n === 1 ? 'Host' : 'Gäst 🎲',
+    joined_at: iso(T0 + n * 1500),
+    is_ai: n === 2 && index % 2 === 0,
+  }));
+  const moves: Move[] = Array.from({ length: moveCount }, (_, i) => ({
+    id: i + 1,
+    game_id: id,
+    player_id: players[i % 2].id,
+    move_number: i + 1,
+    column_index: (i * 7) % 15,
+    row_index: Math.floor(i / 15) % 15,
+    created_at: iso(T0 + 3000 + i * 2345 + (i % 3)),
+  }));
+
+  return {
+    id,
+    invite_code: 'ABC123',
+    mode: 'gomoku',
+    status: 'completed',
+    current_turn: null,
+    winner_id: players[1].id,
+    created_at: iso(T0),
+    started_at: iso(T0 + 3000),
+    finished_at: iso(T0 + 3000 + moveCount * 2345),
+    players,
+    moves,
+  };
+}
+
+async function runTests() {
+  console.log('Running game record tests...\n');
+
+  console.log('Testing encoding...');
+  assertEqual(crc32(new TextEncoder().encode('123456789')), 0xcbf43926, 'CRC-32 check value');
+
+  const game = buildGame(1, 120);
+  const record = gameToRecord(game);
+  const encoded = encodeGameRecord(record);
+  const [decoded] = decodeGameRecords(recordFile(record));
+
+  const restored = recordToGame(decoded);
+  assertEqual(JSON.stringify(restored), JSON.stringify(game), 'Round trip is lossless');
+  assertEqual(
+    recordToExportLine(decoded),
+    serializeExportEvent({ type: 'game', game, messages: [] }),
+    'Records convert to export lines'
+  );
+
+  const ndjsonBytes = Buffer.byteLength(recordToExportLine(decoded));
+  assert(encoded.length * 10 < ndjsonBytes, `${encoded.length} bytes vs ${ndjsonBytes} as NDJSON`);
+  assert(encoded.length < 120 * 3 + 150, 'About one byte per cell plus a short time delta');
+
+  const odd: GameRecord = {
+    ...record,
+    status: 'waiting',
+    winner: 0,
+    startedAt: null,
+    finishedAt: null,
+    players: record.players.slice(0, 1),
+    cells: new Uint8Array(0),
+    moveTimes: [],
+  };
+  const [oddBack] = decodeGameRecords(recordFile(odd));
+  assertEqual(oddBack.startedAt, null, 'Missing timestamps stay null');
+  assertEqual(oddBack.players.length, 1, 'Waiting games have one player');
+  assertEqual(recordToGame(oddBack).winner_id, null, 'No winner');
+
+  // Clock skew between workers can put a move before the previous one
+  const skewed = { ...record, moveTimes: [...record.moveTimes] };
+  skewed.moveTimes[5] = skewed.moveTimes[4] - 800;
+  const [skewBack] = decodeGameRecords(recordFile(skewed));
+  assertEqual(skewBack.moveTimes[5], skewed.moveTimes[5], 'Negative time deltas survive');
+
+  const outOfTurn = buildGame(2, 4);
+  outOfTurn.moves![2].player_id = outOfTurn.players[1].id;
+  let threw = false;
+  try {
+    gameToRecord(outOfTurn);
+  } catch {
+    threw = true;
+  }
+  assert(threw, 'Out-of-turn moves are rejected');
+  console.log('✓ Encoding tests passed\n');
+
+  console.log('Testing files...');
+  const file = path.join(tmpdir(), `games-${process.pid}.grec`);
+  const writer = new GameRecordWriter(createWriteStream(file));
+  const count = 500;
+  for (let i = 0; i < count; i++) {
+    await writer.write(gameToRecord(buildGame(i, i % 226)));
+  }
+  await writer.end();
+
+  // Small chunks split records and varints across reads
+  let read = 0;
+  for await (const fromFile of readGameRecords(file, { chunkSize: 37 })) {
+    const expected = buildGame(read, read % 226);
+    assertEqual(fromFile.id, expected.id, `Record ${read} in order`);
+    assertEqual(fromFile.cells.length, expected.moves!.length, `Record ${read} moves`);
+    read++;
+  }
+  assertEqual(read, count, 'Every record is read back');
+
+  const bytes = await readFile(file);
+  assertEqual([...decodeGameRecords(bytes)].length, count, 'In-memory decoding agrees');
+
+  const corrupt = Buffer.from(bytes);
+  corrupt[200] ^= 0xff;
+  await writeFile(file, corrupt);
+  await assertRejects(() => readAll(file), /checksum/, 'Corruption is detected');
+
+  await writeFile(file, bytes.subarray(0, bytes.length - 3));
+  await assertRejects(() => readAll(file), /truncated/, 'Truncation is detected');
+
+  await writeFile(file, '{"type":"game"}\n');
+  await assertRejects(() => readAll(file), /Not a game record file/, 'Other files are rejected');
+  await rm(file, { force: true });
+  console.log('✓ File tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,96 @@
+// Tests for collision-free invite code allocation
+// Run with: npx tsx server/__tests__/invite-codes.test.ts
+
+import {
+  INVITE_SPACE,
+  IndexPermutation,
+  InviteCodeAllocator,
+  encodeInviteCode,
+  inviteCodeOptionsFromEnv,
+} from '../invite-codes';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+async function runTests() {
+  console.log('Running invite code tests...\n');
+
+  console.log('Testing permutation...');
+  // Full check on a small domain (odd size, so cycle walking is exercised)
+  const small = new IndexPermutation('test', 1000);
+  const seen = new Set<number>();
+  for (let i = 0; i < 1000; i++) {
+    const value = small.apply(i);
+    assert(value >= 0 && value < 1000, `Value ${value} stays in the domain`);
+    assertEqual(small.invert(value), i, 'invert undoes apply');
+    seen.add(value);
+  }
+  assertEqual(seen.size, 1000, 'Small-domain permutation is a bijection');
+
+  const full = new IndexPermutation('test');
+  for (const index of [0, 1, 2, 123_456, INVITE_SPACE - 1]) {
+    const value = full.apply(index);
+    assert(value < INVITE_SPACE, 'Value is a valid code index');
+    assertEqual(full.invert(value), index, `Round trip of ${index}`);
+  }
+  assert(full.apply(0) !== new IndexPermutation('other').apply(0), 'Secret changes the order');
+  console.log('✓ Permutation tests passed\n');
+
+  console.log('Testing encoding...');
+  assertEqual(encodeInviteCode(0), '000000', 'Codes are zero-padded');
+  assertEqual(encodeInviteCode(INVITE_SPACE - 1), 'ZZZZZZ', 'Largest code');
+  console.log('✓ Encoding tests passed\n');
+
+  console.log('Testing allocation across workers...');
+  const store = new MemoryGameStore();
+  const options = { secret: 'test', blockSize: 10 };
+  const workers = [new InviteCodeAllocator(options), new InviteCodeAllocator(options)];
+
+  const codes = new Set<string>();
+  const issued = await Promise.all(
+    Array.from({ length: 100 }, (_, i) => workers[i % 2].next(store))
+  );
+  for (const code of issued) {
+    assert(/^[0-9A-Z]{6}$/.test(code), `Code ${code} has the invite format`);
+    codes.add(code);
+  }
+  assertEqual(codes.size, 100, 'No duplicate codes');
+  assertEqual(workers[0].stats().blocks, 5, 'Each worker reserves blocks of 10');
+  assertEqual(await store.reserveSequence('invite', 0), 100, 'Counter advanced by whole blocks');
+  console.log('✓ Allocation tests passed\n');
+
+  console.log('Testing block size settings...');
+  const blockSize = (value: string) => {
+    process.env.INVITE_CODE_BLOCK_SIZE = value;
+    return inviteCodeOptionsFromEnv().blockSize;
+  };
+  assertEqual(blockSize('250'), 250, 'Positive integers are used');
+  for (const invalid of ['0', '-5', '2.5', 'many']) {
+    assertEqual(blockSize(invalid), 100, `${invalid} falls back to the default`);
+  }
+  delete process.env.INVITE_CODE_BLOCK_SIZE;
+  assertEqual(inviteCodeOptionsFromEnv().blockSize, 100, 'Default when unset');
+  console.log('✓ Block size tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
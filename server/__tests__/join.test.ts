@@ -0,0 +1,67 @@
+// Tests for the atomic join (conditional save on the game version)
+// Run with: npx tsx server/__tests__/join.test.ts
+
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { resetServerContext } from '../context';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function post(path: string, body: unknown): Request {
+  return new Request(`http://localhost:3000${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+}
+
+async function runTests() {
+  console.log('Running join tests...\n');
+
+  const store = new MemoryGameStore();
+  resetServerContext({ store, getPusher: async () => ({ trigger: async () => {} }) as never });
+
+  console.log('Testing conditional save...');
+  const created = await (
+    await createGame(post('/api/game/create', { mode: 'classic3', player_name: 'Alice' }))
+  ).json();
+  const game = (await store.getGame(created.game.id))!;
+  const stale = { ...game, status: 'completed' as const };
+
+  assertEqual(await store.saveGameIfVersion(game, 1), 2, 'Save with current version wins');
+  assertEqual(await store.saveGameIfVersion(stale, 1), null, 'Save with stale version loses');
+  assertEqual((await store.getGame(game.id))?.status, 'waiting', 'Losing write is discarded');
+  console.log('✓ Conditional save tests passed\n');
+
+  console.log('Testing simultaneous joins...');
+  const join = (name: string) =>
+    joinGame(post('/api/game/join', { invite_code: created.game.invite_code, player_name: name }));
+  const responses = await Promise.all([join('Bob'), join('Carol')]);
+  const statuses = responses.map((r) => r.status).sort();
+
+  assertEqual(statuses.join(','), '200,409', 'Exactly one join succeeds');
+  const joined = (await store.getGame(game.id))!;
+  assertEqual(joined.players.length, 2, 'Game has two players');
+  assertEqual(joined.status, 'active', 'Game is active');
+
+  const late = await join('Dave');
+  assertEqual(late.status, 409, 'Joining a started game is a conflict');
+  console.log('✓ Join race tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
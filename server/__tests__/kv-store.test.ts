@@ -0,0 +1,132 @@
+// Tests for the KV store's key layout
+// Run with: npx tsx server/__tests__/kv-store.test.ts
+
+import { exportGames } from '../export';
+import type { StoredGame } from '../store';
+import { KvGameStore } from '../stores/kv-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+// Minimal stand-in for the KV client: plain key/value writes, and scripts store every key
+// they are given (the first as the JSON record in ARGV[1]), which is what scans can see
+function fakeKv() {
+  const data = new Map<string, unknown>();
+  const glob = (pattern: string) =>
+    new RegExp(`^${pattern.replace(/[.+?^${}()|[\]\\]/g, '\\$&').replace(/\*/g, '.*')}$`);
+
+  const client = {
+    multi() {
+      const ops: [string, unknown][] = [];
+      return {
+        set(key: string, value: unknown) {
+          ops.push([key, value]);
+        },
+        async exec() {
+          for (const [key, value] of ops) data.set(key, value);
+        },
+      };
+    },
+    async eval(_script: string, keys: string[], args: string[]) {
+      keys.forEach((key, i) => data.set(key, i === 0 ? JSON.parse(args[0]) : 1));
+      return 1;
+    },
+    async get(key: string) {
+      return data.get(key) ?? null;
+    },
+    async mget(...keys: string[]) {
+      return keys.map((key) => data.get(key) ?? null);
+    },
+    async scan(_cursor: string, { match }: { match: string }) {
+      return ['0', [...data.keys()].filter((key) => glob(match).test(key))];
+    },
+    async zrange() {
+      return [];
+    },
+  };
+  return { data, factory: async () => client as never };
+}
+
+function finishedGame(id: string): StoredGame {
+  const now = new Date().toISOString();
+  return {
+    id,
+    invite_code: 'ABCDEF',
+    mode: 'classic3',
+    status: 'completed',
+    current_turn: null,
+    winner_id: `${id}_p1`,
+    players: [1, 2].map((n) => ({
+      id: `${id}_p${n}`,
+      game_id: id,
+      player_number: n as 1 | 2,
+      player_name: `P${n}`,
+      joined_at: now,
+      is_ai: false,
+      profile_id: `profile_${n}`,
+    })),
+    moves: [],
+    created_at: now,
+    started_at: now,
+    finished_at: now,
+  };
+}
+
+async function runTests() {
+  console.log('Running KV store tests...\n');
+
+  console.log('Testing game scans after rated games...');
+  const kv = fakeKv();
+  const store = new KvGameStore(kv.factory);
+  await store.saveGame(finishedGame('game_plain'));
+  await store.saveRatedGame(
+    finishedGame('game_rated'),
+    [
+      { profileId: 'profile_1', delta: 20, result: 'wins' },
+      { profileId: 'profile_2', delta: -20, result: 'losses' },
+    ],
+    0
+  );
+  assert(kv.data.size > 4, 'Rated saves write marker, leaderboard and record keys');
+
+  const { cursor, ids } = await store.scanGameIds('0', 100);
+  assertEqual(cursor, '0', 'One page');
+  assertEqual(ids.sort().join(), 'game_plain,game_rated', 'Only game records are scanned');
+  const games = await store.getGames(ids);
+  assert(
+    games.every((game) => game !== null && game.id.startsWith('game_')),
+    'Every scanned id loads a game'
+  );
+
+  const exported: StoredGame[] = [];
+  for await (const event of exportGames(store)) {
+    if (event.type === 'game') exported.push(event.game);
+  }
+  assertEqual(exported.length, 2, 'Exports see each game once');
+  assert(
+    exported.every((game) => typeof game.id === 'string'),
+    'No export line without a game'
+  );
+  console.log('✓ Scan tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,119 @@
+// Tests for quick match queues and pairing
+// Run with: npx tsx server/__tests__/matchmaking.test.ts
+
+import { resetServerContext } from '../context';
+import {
+  MATCH_PAIRING_TIMEOUT_MS,
+  cancelMatch,
+  enqueueMatch,
+  pairWaitingPlayers,
+} from '../matchmaking';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+async function runTests() {
+  console.log('Running matchmaking tests...\n');
+
+  const notifications: string[] = [];
+  const pusher = {
+    trigger: async (channel: string) => {
+      notifications.push(channel);
+    },
+  };
+  const store = new MemoryGameStore();
+  const context = resetServerContext({ store, getPusher: async () => pusher as never });
+
+  console.log('Testing FIFO pairing...');
+  const alice = await enqueueMatch(context, 'classic3', 'Alice');
+  assertEqual(alice.status, 'queued', 'First player waits');
+
+  const gomoku = await enqueueMatch(context, 'gomoku', 'Gina');
+  assertEqual(gomoku.status, 'queued', 'Modes have separate queues');
+
+  const bob = await enqueueMatch(context, 'classic3', 'Bob');
+  assertEqual(bob.status, 'matched', 'Second player is paired immediately');
+
+  const game = await store.getGame(bob.game_id!);
+  assertEqual(game?.status, 'active', 'Game starts active');
+  assertEqual(game?.players[0].id, alice.player_id, 'Longest-waiting player is player 1');
+  assertEqual(game?.players[1].id, bob.player_id, 'New player is player 2');
+  assertEqual((await store.getMatchTicket(alice.id))?.game_id, bob.game_id, 'Both tickets match');
+  assertEqual(
+    notifications.sort().join(','),
+    [`match-${alice.id}`, `match-${bob.id}`].sort().join(','),
+    'Both players are notified'
+  );
+  console.log('✓ Pairing tests passed\n');
+
+  console.log('Testing cancellation...');
+  const carol = await enqueueMatch(context, 'classic3', 'Carol');
+  const cancelled = await cancelMatch(context, carol);
+  assertEqual(cancelled?.status, 'cancelled', 'Queued ticket is cancelled');
+  assertEqual(await cancelMatch(context, bob), null, 'Matched ticket cannot be cancelled');
+
+  const dave = await enqueueMatch(context, 'classic3', 'Dave');
+  assertEqual(dave.status, 'queued', 'Cancelled players are not paired');
+  console.log('✓ Cancellation tests passed\n');
+
+  console.log('Testing concurrent enqueues...');
+  const burst = await Promise.all(
+    Array.from({ length: 9 }, (_, i) => enqueueMatch(context, 'gomoku', `Player ${i}`))
+  );
+  const queued = await Promise.all(
+    [gomoku, ...burst].map(async (t) => (await store.getMatchTicket(t.id))!.status)
+  );
+  assertEqual(queued.filter((s) => s === 'matched').length, 10, 'Ten players make five games');
+  console.log('✓ Concurrency tests passed\n');
+
+  console.log('Testing interrupted pairing...');
+  const waiting = await enqueueMatch(context, 'classic3', 'Erin'); // pairs with Dave
+  assertEqual(waiting.status, 'matched', 'Queue is empty again');
+  const allocator = context.inviteCodes;
+  context.inviteCodes = {
+    next: async () => {
+      throw new Error('invite codes unavailable');
+    },
+  } as never;
+  const frank = await enqueueMatch(context, 'classic3', 'Frank');
+  let failed = false;
+  try {
+    await enqueueMatch(context, 'classic3', 'Grace');
+  } catch {
+    failed = true;
+  }
+  assertEqual(failed, true, 'The pairing error surfaces');
+  context.inviteCodes = allocator;
+  const retried = await pairWaitingPlayers(context, 'classic3');
+  assertEqual(retried.length, 2, 'Both tickets were queued again');
+  assertEqual(retried[0].id, frank.id, 'In their original order');
+
+  // A worker that pops a pair and dies never settles it
+  await enqueueMatch(context, 'gomoku', 'Heidi');
+  await enqueueMatch(context, 'gomoku', 'Ivan');
+  const orphaned = await store.popMatchPair('gomoku');
+  const later = Date.now() + MATCH_PAIRING_TIMEOUT_MS + 1;
+  assertEqual(await store.popMatchPair('gomoku'), null, 'Popped tickets are not queued');
+  assertEqual(
+    (await store.popMatchPair('gomoku', later))?.join(),
+    orphaned?.join(),
+    'Unsettled tickets return to the front of the queue'
+  );
+  console.log('✓ Interrupted pairing tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
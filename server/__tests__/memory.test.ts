@@ -0,0 +1,163 @@
+// Tests for memory diagnostics
+// Run with: npx tsx server/__tests__/memory.test.ts
+
+import { GET as getMemory } from '@/app/api/debug/memory/route';
+import { resetServerContext } from '../context';
+import { MemoryDiagnostics, diffSnapshots, moduleOf, summarizeProfile } from '../memory';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function frame(functionName: string, url: string, lineNumber: number) {
+  return { functionName, url, lineNumber };
+}
+
+// Kept alive until the end of the test so the profiler still sees it
+const retained: string[][] = [];
+
+function allocateChatHistory(): void {
+  retained.push(Array.from({ length: 20_000 }, (_, i) => `message number ${i} `.repeat(4)));
+}
+
+async function runTests() {
+  console.log('Running memory diagnostics tests...\n');
+
+  console.log('Testing module grouping...');
+  const cwd = process.cwd();
+  assertEqual(moduleOf(`${cwd}/node_modules/pusher/lib/pusher.js`), 'pusher', 'Package');
+  assertEqual(
+    moduleOf(`file://${cwd}/node_modules/@vercel/kv/dist/index.js`),
+    '@vercel/kv',
+    'Scoped package from a file URL'
+  );
+  assertEqual(moduleOf(`${cwd}/server/chat-buffer.ts`), 'server/chat-buffer.ts', 'App code');
+  assertEqual(moduleOf('node:internal/streams/readable'), 'node (internal)', 'Node internals');
+  assertEqual(moduleOf(''), '(native)', 'Native frames');
+
+  const summary = summarizeProfile(
+    {
+      callFrame: frame('(root)', '', -1),
+      selfSize: 0,
+      children: [
+        {
+          callFrame: frame('load', `${cwd}/server/state-cache.ts`, 9),
+          selfSize: 300,
+          children: [
+            {
+              callFrame: frame('parse', `${cwd}/node_modules/a/x.js`, 0),
+              selfSize: 50,
+              children: [],
+            },
+          ],
+        },
+        {
+          callFrame: frame('load', `${cwd}/server/state-cache.ts`, 9),
+          selfSize: 100,
+          children: [],
+        },
+      ],
+    },
+    1024
+  );
+  assertEqual(summary.totalBytes, 450, 'Every sampled node is counted');
+  assertEqual(summary.modules[0].name, 'server/state-cache.ts', 'Largest module first');
+  assertEqual(summary.modules[0].bytes, 400, 'Nodes of one module add up');
+  assertEqual(summary.sites[0].name, 'load server/state-cache.ts:10', 'Sites are 1-based lines');
+  assertEqual(summary.sites[0].samples, 2, 'Sites count their nodes');
+  console.log('✓ Module grouping tests passed\n');
+
+  console.log('Testing snapshots with the sampling profiler...');
+  const memory = new MemoryDiagnostics({ enabled: true, sampleBytes: 4096, keepSnapshots: 2 });
+  const context = resetServerContext({ store: new MemoryGameStore(), memory });
+  memory.start(); // idempotent: the context already started it
+
+  const first = await memory.snapshot();
+  assert(first.allocations !== null, 'Allocations are sampled when enabled');
+  assert(first.process.heapUsed > 0, 'Process memory is reported');
+  assert('new_space' in first.heapSpaces, 'V8 heap spaces are reported');
+  assertEqual(first.caches.state_cache.entries, 0, 'Cache sizes are reported');
+
+  allocateChatHistory();
+  context.stateCache.set(
+    {
+      id: 'game_1',
+      invite_code: 'ABC123',
+      mode: 'classic3',
+      status: 'waiting',
+      current_turn: null,
+      winner_id: null,
+      players: [],
+      created_at: new Date().toISOString(),
+      started_at: null,
+      finished_at: null,
+    },
+    1
+  );
+
+  const second = await memory.snapshot();
+  const diff = diffSnapshots(first, second);
+  assertEqual(diff.caches.state_cache.entries, 1, 'Cache growth shows in the diff');
+  const testModule = diff.modules.find((m) => m.name === 'server/__tests__/memory.test.ts');
+  assert(testModule !== undefined && testModule.bytes > 500_000, 'Growth is attributed to us');
+  assert(
+    diff.sites.some((site) => site.name.includes('memory.test.ts') && site.bytes > 0),
+    'Growth is attributed to an allocation site'
+  );
+
+  await memory.snapshot();
+  assertEqual(memory.get(first.id), null, 'Only the newest snapshots are kept');
+  console.log('✓ Snapshot tests passed\n');
+
+  console.log('Testing the debug route...');
+  const response = await getMemory(
+    new Request(`http://localhost:3000/api/debug/memory?since=${second.id}&top=3`)
+  );
+  assertEqual(response.status, 200, 'Snapshot is served outside production');
+  const body = await response.json();
+  assertEqual(body.diff.from, second.id, 'Diff against the requested snapshot');
+  assert(body.snapshot.allocations.sites.length <= 3, 'top limits the allocation groups');
+
+  const missing = await getMemory(new Request('http://localhost:3000/api/debug/memory?since=999'));
+  assertEqual(missing.status, 404, 'Unknown snapshots are reported');
+  console.log('✓ Debug route tests passed\n');
+
+  console.log('Testing the signal handler...');
+  const logged: string[] = [];
+  const log = console.log;
+  console.log = (...args: unknown[]) => logged.push(args.join(' '));
+  try {
+    process.kill(process.pid, 'SIGUSR2');
+    await new Promise((resolve) => setTimeout(resolve, 200));
+  } finally {
+    console.log = log;
+  }
+  assert(logged.some((line) => line.startsWith('[Memory] Snapshot')), 'SIGUSR2 logs a snapshot');
+  assert(
+    logged.some((line) => line.startsWith('[Memory] Since snapshot')),
+    'SIGUSR2 logs the diff against the previous snapshot'
+  );
+  console.log('✓ Signal handler tests passed\n');
+
+  assert(retained.length === 1, 'Allocation kept alive');
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,196 @@
+// Tests for request metrics and the Prometheus exposition
+// Run with: npx tsx server/__tests__/metrics.test.ts
+
+import { resetServerContext } from '../context';
+import { RequestMetrics, renderPrometheus, withMetrics } from '../metrics';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+// Value of one exposition line, e.g. sampleValue(text, 'http_requests_total{...}')
+function sampleValue(text: string, series: string): number | null {
+  const line = text.split('\n').find((l) => l.startsWith(`${series} `));
+  return line ? Number(line.slice(series.length + 1)) : null;
+}
+
+// Minimal stand-in for the KV hash used in shared mode
+function fakeKv() {
+  const hash = new Map<string, number>();
+  const client = {
+    pipeline() {
+      const ops: [string, number][] = [];
+      return {
+        hincrbyfloat(_key: string, field: string, value: number) {
+          ops.push([field, value]);
+        },
+        async exec() {
+          for (const [field, value] of ops) hash.set(field, (hash.get(field) ?? 0) + value);
+        },
+      };
+    },
+    async hgetall() {
+      return Object.fromEntries(hash);
+    },
+  };
+  return { hash, factory: async () => client as never };
+}
+
+async function runTests() {
+  console.log('Running metrics tests...\n');
+
+  console.log('Testing route instrumentation...');
+  const store = new MemoryGameStore();
+  const context = resetServerContext({
+    store,
+    metrics: new RequestMetrics({ shared: false, flushIntervalMs: 10_000 }),
+  });
+
+  const handler = withMetrics('/api/test', async (request) => {
+    await context.store.getGame('missing');
+    await context.store.getGameVersion('missing');
+    const body = JSON.stringify({ ok: true, echo: await request.text() });
+    return new Response(body, { headers: { 'Content-Length': String(body.length) } });
+  });
+
+  for (let i = 0; i < 3; i++) {
+    const response = await handler(
+      new Request('http://localhost/api/test', {
+        method: 'POST',
+        headers: { 'Content-Length': '5' },
+        body: 'hello',
+      })
+    );
+    assertEqual(response.status, 200, 'Wrapped handler response is passed through');
+  }
+
+  const failing = withMetrics('/api/fail', async () => {
+    throw new Error('boom');
+  });
+  let threw = false;
+  try {
+    await failing(new Request('http://localhost/api/fail'));
+  } catch {
+    threw = true;
+  }
+  assert(threw, 'Handler errors propagate');
+
+  const text = await context.metrics.render();
+  const labels = 'route="/api/test",method="POST"';
+  assertEqual(sampleValue(text, `http_requests_total{${labels},status="200"}`), 3, '3 requests');
+  assertEqual(
+    sampleValue(text, 'http_requests_total{route="/api/fail",method="GET",status="500"}'),
+    1,
+    'Thrown errors count as 500'
+  );
+  assertEqual(sampleValue(text, `http_request_duration_seconds_count{${labels}}`), 3, 'Durations');
+  assertEqual(
+    sampleValue(text, `http_request_duration_seconds_bucket{${labels},le="+Inf"}`),
+    3,
+    '+Inf bucket holds every observation'
+  );
+  assert(
+    (sampleValue(text, `http_request_store_seconds_sum{${labels}}`) ?? 0) > 0,
+    'Store time is attributed to the request'
+  );
+  assertEqual(sampleValue(text, `http_request_size_bytes_sum{${labels}}`), 15, 'Request sizes');
+  assertEqual(sampleValue(text, `http_response_size_bytes_count{${labels}}`), 3, 'Response sizes');
+
+  // Response.json sets no Content-Length; the wrapper measures the body itself
+  const json = withMetrics('/api/json', async () => Response.json({ ok: true, items: [1, 2] }));
+  const jsonResponse = await json(new Request('http://localhost/api/json'));
+  assertEqual(jsonResponse.headers.get('content-length'), null, 'No declared length');
+  const jsonBody = await jsonResponse.text();
+  assertEqual(jsonBody, '{"ok":true,"items":[1,2]}', 'Measured body is still returned');
+  const jsonText = await context.metrics.render();
+  assertEqual(
+    sampleValue(jsonText, 'http_response_size_bytes_sum{route="/api/json",method="GET"}'),
+    jsonBody.length,
+    'JSON response sizes are recorded'
+  );
+  assertEqual(
+    sampleValue(text, 'http_requests_in_flight{route="/api/test"}'),
+    0,
+    'In-flight gauge returns to zero'
+  );
+  assert(text.includes('# TYPE http_request_duration_seconds histogram'), 'Type lines');
+  assert(text.includes('process_resident_memory_bytes '), 'Process metrics in local mode');
+  console.log('✓ Route instrumentation tests passed\n');
+
+  console.log('Testing exposition order...');
+  const rendered = renderPrometheus(
+    [{ name: 'x_seconds', type: 'histogram', help: 'Test' }],
+    [
+      { family: 'x_seconds', suffix: '_count', labels: 'a="1"', value: 2 },
+      { family: 'x_seconds', suffix: '_bucket', labels: 'a="1"', le: '+Inf', value: 2 },
+      { family: 'x_seconds', suffix: '_bucket', labels: 'a="1"', le: '10', value: 2 },
+      { family: 'x_seconds', suffix: '_bucket', labels: 'a="1"', le: '2.5', value: 1 },
+      { family: 'x_seconds', suffix: '_sum', labels: 'a="1"', value: 4 },
+    ]
+  );
+  assertEqual(
+    rendered,
+    [
+      '# HELP x_seconds Test',
+      '# TYPE x_seconds histogram',
+      'x_seconds_bucket{a="1",le="2.5"} 1',
+      'x_seconds_bucket{a="1",le="10"} 2',
+      'x_seconds_bucket{a="1",le="+Inf"} 2',
+      'x_seconds_sum{a="1"} 4',
+      'x_seconds_count{a="1"} 2',
+      '',
+    ].join('\n'),
+    'Buckets ascend by le, then _sum and _count'
+  );
+  console.log('✓ Exposition order tests passed\n');
+
+  console.log('Testing shared mode...');
+  const kv = fakeKv();
+  const workers = [1, 2].map(
+    () => new RequestMetrics({ shared: true, flushIntervalMs: 60_000 }, kv.factory)
+  );
+  const observation = {
+    status: 200,
+    durationMs: 3,
+    storeMs: 1,
+    requestBytes: null,
+    responseBytes: null,
+  };
+  const [first, second] = workers.map((worker) => worker.routeSeries('/api/x', 'GET'));
+  workers[0].observe(first, observation);
+  workers[0].observe(first, observation);
+  await workers[0].flush();
+  await workers[0].flush(); // nothing new: must not double count
+  workers[1].observe(second, observation);
+
+  const shared = await workers[1].render();
+  assertEqual(
+    sampleValue(shared, 'http_requests_total{route="/api/x",method="GET",status="200"}'),
+    3,
+    'Scrape adds up every worker'
+  );
+  const bucket = 'http_request_duration_seconds_bucket{route="/api/x",method="GET",le="0.005"}';
+  assertEqual(sampleValue(shared, bucket), 3, 'Histogram buckets add up');
+  console.log('✓ Shared mode tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,99 @@
+// Tests for the broadcast helpers and the routes that publish through them
+// Run with: npx tsx server/__tests__/pusher.test.ts
+
+import { POST as sendChat } from '@/app/api/chat/send/route';
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { resetServerContext } from '../context';
+import { broadcastChatUpdate, broadcastGameUpdate } from '../pusher';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function post(path: string, body: unknown): Request {
+  return new Request(`http://localhost:3000${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function runTests() {
+  console.log('Running pusher tests...\n');
+
+  console.log("Testing the context's client...");
+  const events: string[] = [];
+  resetServerContext({
+    store: new MemoryGameStore(),
+    getPusher: async () =>
+      ({
+        trigger: async (channel: string, event: string) => {
+          events.push(`${channel} ${event}`);
+        },
+      }) as never,
+  });
+  await broadcastGameUpdate('g1', {});
+  await broadcastChatUpdate('g1', []);
+  assertEqual(events.join(), 'game-g1 game-update,game-g1 chat-update', 'Helpers use it');
+  console.log('✓ Context client tests passed\n');
+
+  console.log('Testing failed broadcasts...');
+  const unhandled: unknown[] = [];
+  const onUnhandled = (reason: unknown) => unhandled.push(reason);
+  process.on('unhandledRejection', onUnhandled);
+
+  const context = resetServerContext({
+    store: new MemoryGameStore(),
+    getPusher: async () => ({ trigger: async () => {} }) as never,
+  });
+  const created = await (
+    await createGame(post('/api/game/create', { mode: 'classic3', player_name: 'Host' }))
+  ).json();
+  await joinGame(
+    post('/api/game/join', { invite_code: created.game.invite_code, player_name: 'Guest' })
+  );
+
+  context.getPusher = async () =>
+    ({
+      trigger: async () => {
+        throw new Error('pusher unavailable');
+      },
+    }) as never;
+  const moved = await makeMove(
+    post('/api/game/move', {
+      game_id: created.game.id,
+      player_id: created.player_id,
+      row_index: 0,
+      column_index: 0,
+    })
+  );
+  assertEqual(moved.status, 200, 'Moves succeed without Pusher');
+  const sent = await sendChat(
+    post('/api/chat/send', { game_id: created.game.id, player_id: created.player_id, text: 'hi' })
+  );
+  assertEqual(sent.status, 200, 'Chat succeeds without Pusher');
+
+  await sleep(10); // broadcasts are not awaited by the routes
+  process.off('unhandledRejection', onUnhandled);
+  assertEqual(unhandled.length, 0, 'Broadcast failures are handled');
+  console.log('✓ Failed broadcast tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
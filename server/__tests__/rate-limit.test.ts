@@ -0,0 +1,72 @@
+// Tests for the in-process token-bucket rate limiter
+// Run with: npx tsx server/__tests__/rate-limit.test.ts
+
+import { MemoryRateLimiter, enforceRateLimit } from '../rate-limit';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+async function runTests() {
+  console.log('Running rate limiter tests...\n');
+
+  console.log('Testing burst and refill...');
+  const limiter = new MemoryRateLimiter({ capacity: 3, refillPerSecond: 1 });
+  const t0 = 1_000_000;
+  for (let i = 0; i < 3; i++) {
+    assert((await limiter.consume(['p1'], t0)).allowed, `Request ${i + 1} within burst`);
+  }
+  const rejected = await limiter.consume(['p1'], t0);
+  assert(!rejected.allowed, 'Request beyond burst is rejected');
+  assertEqual(rejected.retryAfterMs, 1000, 'Retry after one refill interval');
+  assert((await limiter.consume(['p2'], t0)).allowed, 'Other keys have their own bucket');
+  assert((await limiter.consume(['p1'], t0 + 1000)).allowed, 'Token refills after 1s');
+  assert(!(await limiter.consume(['p1'], t0 + 1000)).allowed, 'Only one token refilled');
+  console.log('✓ Burst and refill tests passed\n');
+
+  console.log('Testing idle expiry...');
+  assertEqual(limiter.stats().keys, 2, 'Two active keys');
+  await limiter.consume(['p3'], t0 + 10_000);
+  assertEqual(limiter.stats().keys, 1, 'Idle (full) buckets are dropped');
+  console.log('✓ Idle expiry tests passed\n');
+
+  console.log('Testing enforceRateLimit...');
+  const strict = new MemoryRateLimiter({ capacity: 1, refillPerSecond: 0.5 });
+  assertEqual(await enforceRateLimit(strict, ['ip:1', 'player:a']), null, 'First request passes');
+  const response = await enforceRateLimit(strict, ['ip:1', 'player:b']);
+  assertEqual(response?.status, 429, 'Shared IP bucket rejects');
+  assertEqual(response?.headers.get('Retry-After'), '2', 'Retry-After in whole seconds');
+
+  // A player who is out of tokens must not drain the bucket of the IP they retry from
+  const shared = new MemoryRateLimiter({ capacity: 2, refillPerSecond: 0.001 });
+  for (let i = 0; i < 2; i++) {
+    assertEqual(await enforceRateLimit(shared, ['ip:home', 'player:c']), null, 'c within burst');
+  }
+  for (let i = 0; i < 2; i++) {
+    const blocked = await enforceRateLimit(shared, ['ip:nat', 'player:c']);
+    assertEqual(blocked?.status, 429, 'c is out of tokens on any IP');
+  }
+  const neighbour = await enforceRateLimit(shared, ['ip:nat', 'player:d']);
+  assertEqual(neighbour, null, "Rejected requests leave the IP's tokens alone");
+  console.log('✓ enforceRateLimit tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,257 @@
+// Tests for player profiles, ratings and the leaderboard
+// Run with: npx tsx server/__tests__/ratings.test.ts
+
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { GET as getLeaderboard } from '@/app/api/leaderboard/route';
+import { POST as enqueueMatch } from '@/app/api/match/enqueue/route';
+import { GET as getPlayer, POST as createPlayer } from '@/app/api/players/route';
+import { resetServerContext } from '../context';
+import { INITIAL_RATING, eloDeltas, expectedScore } from '../ratings';
+import { checkStoreBudget, measureStoreOps } from '../request-scope';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function post(path: string, body: unknown): Request {
+  return new Request(`http://localhost:3000${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+}
+
+function get(path: string): Request {
+  return new Request(`http://localhost:3000${path}`);
+}
+
+const newPlayer = { rating: null, games: 0, wins: 0, losses: 0, draws: 0 };
+
+interface Credentials {
+  profile_id: string;
+  profile_token: string;
+}
+
+// Plays a classic game in which the host (X) takes the top row
+async function playHostWin(hostProfile?: Credentials, guestProfile?: Credentials) {
+  const created = await (
+    await createGame(
+      post('/api/game/create', { mode: 'classic3', player_name: 'Host', ...hostProfile })
+    )
+  ).json();
+  const joined = await (
+    await joinGame(
+      post('/api/game/join', {
+        invite_code: created.game.invite_code,
+        player_name: 'Guest',
+        ...guestProfile,
+      })
+    )
+  ).json();
+
+  const moves: [string, number, number][] = [
+    [created.player_id, 0, 0],
+    [joined.player_id, 1, 0],
+    [created.player_id, 0, 1],
+    [joined.player_id, 1, 1],
+  ];
+  for (const [player_id, row_index, column_index] of moves) {
+    const move = post('/api/game/move', {
+      game_id: created.game.id,
+      player_id,
+      row_index,
+      column_index,
+    });
+    assertEqual((await makeMove(move)).status, 200, 'Move accepted');
+  }
+
+  const finalMove = () =>
+    makeMove(
+      post('/api/game/move', {
+        game_id: created.game.id,
+        player_id: created.player_id,
+        row_index: 0,
+        column_index: 2,
+      })
+    );
+  return { gameId: created.game.id as string, finalMove };
+}
+
+async function runTests() {
+  console.log('Running ratings tests...\n');
+
+  console.log('Testing Elo...');
+  assertEqual(expectedScore(1500, 1500), 0.5, 'Equal ratings');
+  assert(Math.abs(expectedScore(1900, 1500) - 0.909) < 0.001, '400 points is 10 to 1');
+  const [winner, loser] = eloDeltas(newPlayer, newPlayer, 1);
+  assertEqual(winner, 20, 'New players move by half the provisional K');
+  assertEqual(loser, -20, 'Zero sum between equal K');
+  const settled = { rating: 1600, games: 100, wins: 60, losses: 40, draws: 0 };
+  const [upset] = eloDeltas(newPlayer, settled, 1);
+  const [, settledLoss] = eloDeltas(newPlayer, settled, 1);
+  assert(upset > 20, 'Beating a stronger player gains more');
+  assert(settledLoss > -20 && settledLoss < -10, 'Settled players move more slowly');
+  const [draw] = eloDeltas(newPlayer, newPlayer, 0.5);
+  assertEqual(draw, 0, 'A draw between equals changes nothing');
+  console.log('✓ Elo tests passed\n');
+
+  console.log('Testing rated games...');
+  const store = new MemoryGameStore();
+  process.env.RATE_LIMIT_GAME_MOVE = '1000000000/1000000'; // every move comes from one IP
+  resetServerContext({ store, getPusher: async () => ({ trigger: async () => {} }) as never });
+
+  const profile = async (player_name: string): Promise<Credentials> => {
+    const response = await createPlayer(post('/api/players', { player_name }));
+    assertEqual(response.status, 201, 'Profile created');
+    const created = await response.json();
+    assert(typeof created.profile_token === 'string', 'The token is handed out once');
+    assertEqual(created.profile.token_hash, undefined, 'The token hash stays on the server');
+    return { profile_id: created.profile.id, profile_token: created.profile_token };
+  };
+  const aliceCredentials = await profile('Alice');
+  const bobCredentials = await profile('Bob');
+  const alice = aliceCredentials.profile_id;
+  const bob = bobCredentials.profile_id;
+
+  const unknown = await createGame(
+    post('/api/game/create', {
+      mode: 'classic3',
+      player_name: 'X',
+      profile_id: 'nobody',
+      profile_token: 'x',
+    })
+  );
+  assertEqual(unknown.status, 404, 'Unknown profiles are rejected');
+  const create = (body: object) =>
+    createGame(post('/api/game/create', { mode: 'classic3', player_name: 'X', ...body }));
+  const noToken = await create({ profile_id: alice });
+  assertEqual(noToken.status, 403, 'A profile id alone is not enough');
+  const stolen = await create({ profile_id: alice, profile_token: bobCredentials.profile_token });
+  assertEqual(stolen.status, 403, "Another profile's token is rejected");
+  const enqueueStolen = await enqueueMatch(
+    post('/api/match/enqueue', { mode: 'gomoku', player_name: 'P', profile_id: alice })
+  );
+  assertEqual(enqueueStolen.status, 403, 'Quick match checks the token');
+
+  const rated = await playHostWin(aliceCredentials, bobCredentials);
+  const { result, ops } = await measureStoreOps(rated.finalMove);
+  assertEqual((await result.json()).is_winner, true, 'Host wins');
+  // An ordinary move costs 2 calls (cache revalidation and save)
+  const violations = checkStoreBudget(ops, {
+    calls: 3,
+    byOperation: { getGame: 0, saveGameIfVersion: 0, saveRatedGame: 1 },
+  });
+  assert(violations.length === 0, `Rating costs one read: ${violations.join('; ')}`);
+
+  const game = await store.getGame(rated.gameId);
+  assertEqual(game!.players[0].profile_id, alice, 'Players keep their profile');
+  const [aliceStanding, bobStanding] = await store.getStandings('classic3', [alice, bob]);
+  assertEqual(aliceStanding.rating, INITIAL_RATING + 20, 'Winner gains');
+  assertEqual(bobStanding.rating, INITIAL_RATING - 20, 'Loser loses');
+  assertEqual(bobStanding.losses, 1, 'Records are kept');
+
+  // Saving the finished game again must not rate it twice
+  const saved = await store.saveRatedGame(
+    game!,
+    [{ profileId: alice, delta: 20, result: 'wins' }],
+    game!.version!
+  );
+  assertEqual(saved, game!.version! + 1, 'The game is saved again');
+  const [again] = await store.getStandings('classic3', [alice]);
+  assertEqual(again.games, 1, 'Each game is rated once');
+
+  await (await playHostWin(aliceCredentials)).finalMove();
+  const [unrated] = await store.getStandings('classic3', [alice]);
+  assertEqual(unrated.games, 1, 'Games against players without a profile are not rated');
+
+  await (await playHostWin(bobCredentials, bobCredentials)).finalMove();
+  const [self] = await store.getStandings('classic3', [bob]);
+  assertEqual(self.games, 1, 'Games against yourself are not rated');
+  console.log('✓ Rated game tests passed\n');
+
+  console.log('Testing profile and leaderboard routes...');
+  const player = await (await getPlayer(get(`/api/players?profile_id=${alice}`))).json();
+  assertEqual(player.profile.player_name, 'Alice', 'Profile is served');
+  assertEqual(player.profile.token_hash, undefined, 'Profiles are served without the hash');
+  assertEqual(player.standings.classic3.rank, 1, 'Rank in a rated mode');
+  assertEqual(player.standings.classic3.rating, 1520, 'Rating');
+  assertEqual(player.standings.gomoku.rank, null, 'No rank before the first rated game');
+  assertEqual(player.standings.gomoku.rating, INITIAL_RATING, 'Initial rating');
+  const missing = await getPlayer(get('/api/players?profile_id=nobody'));
+  assertEqual(missing.status, 404, 'Unknown profile');
+
+  const board = await (
+    await getLeaderboard(get(`/api/leaderboard?mode=classic3&profile_id=${bob}`))
+  ).json();
+  assertEqual(board.entries.length, 2, 'Rated players are listed');
+  assertEqual(board.entries[0].player_name, 'Alice', 'Highest rating first');
+  assertEqual(
+    Object.keys(board.entries[0]).sort().join(),
+    'player_name,profile_id,rank,rating',
+    'Entries carry only the public handle and name'
+  );
+  assertEqual(board.player.rank, 2, "The requested player's entry");
+  const invalid = await getLeaderboard(get('/api/leaderboard?mode=chess'));
+  assertEqual(invalid.status, 400, 'Unknown mode');
+  console.log('✓ Route tests passed\n');
+
+  console.log('Testing quick match profiles...');
+  for (const credentials of [aliceCredentials, bobCredentials]) {
+    const ticket = { mode: 'gomoku', player_name: 'P', ...credentials };
+    await enqueueMatch(post('/api/match/enqueue', ticket));
+  }
+  const { ids } = await store.scanGameIds('0', 100);
+  const matched = (await store.getGames(ids)).find((g) => g!.mode === 'gomoku');
+  assertEqual(matched!.players[1].profile_id, bob, 'Matched players keep their profile');
+  console.log('✓ Quick match tests passed\n');
+
+  console.log('Testing leaderboard order...');
+  const large = new MemoryGameStore();
+  const deltas = new Map<string, number>();
+  for (let i = 0; i < 500; i++) {
+    const a = `p${i % 97}`;
+    const b = `p${(i * 7 + 1) % 97}`;
+    const delta = ((i * 37) % 41) - 20;
+    deltas.set(a, (deltas.get(a) ?? 0) + delta);
+    deltas.set(b, (deltas.get(b) ?? 0) - delta);
+    await large.saveRatedGame(
+      { ...game!, id: `g${i}`, mode: 'gomoku' },
+      [
+        { profileId: a, delta, result: delta > 0 ? 'wins' : 'losses' },
+        { profileId: b, delta: -delta, result: delta > 0 ? 'losses' : 'wins' },
+      ],
+      0
+    );
+  }
+  const rows = await large.getLeaderboard('gomoku', 0, 1000);
+  assertEqual(rows.length, deltas.size, 'Every rated profile is listed once');
+  for (let i = 0; i < rows.length; i++) {
+    assertEqual(rows[i].rating, INITIAL_RATING + deltas.get(rows[i].profileId)!, 'Rating');
+    assertEqual(await large.getLeaderboardRank('gomoku', rows[i].profileId), i, 'Rank');
+    if (i > 0) assert(rows[i - 1].rating >= rows[i].rating, 'Sorted by rating');
+  }
+  console.log('✓ Leaderboard order tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
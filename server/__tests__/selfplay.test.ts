@@ -0,0 +1,162 @@
+// Tests for move engines and the self-play runner
+// Run with: npx tsx server/__tests__/selfplay.test.ts
+
+import { buildBoard, checkWinner } from '@/lib/game-logic';
+import type { GameBoard } from '@/lib/types';
+import { createEngine, parseEngineSpec } from '../engines';
+import { decodeGameRecords, encodeGameRecord, recordToGame } from '../game-record';
+import {
+  LatencyHistogram,
+  PairingStats,
+  planTasks,
+  runTask,
+  selfPlayRecord,
+  seededRandom,
+  wilsonInterval,
+  type SelfPlayGame,
+} from '../selfplay';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function assertThrows(fn: () => unknown, message: string) {
+  try {
+    fn();
+  } catch {
+    return;
+  }
+  throw new Error(`Assertion failed: ${message}. Expected an error`);
+}
+
+// Board from rows like 'XO.'
+function board(rows: string[]): GameBoard {
+  return {
+    size: rows.length,
+    cells: rows.map((row) =>
+      [...row].map((c) => ({
+        symbol: c === '.' ? null : (c as 'X' | 'O'),
+        player_number: c === 'X' ? 1 : c === 'O' ? 2 : null,
+      }))
+    ),
+  };
+}
+
+function playAll(tasks: ReturnType<typeof planTasks>): SelfPlayGame[] {
+  return tasks.flatMap(runTask).sort((a, b) => a.index - b.index);
+}
+
+async function runTests() {
+  console.log('Running self-play tests...\n');
+
+  console.log('Testing engines...');
+  const heuristic = createEngine('heuristic', 'classic3');
+  const random = seededRandom(1);
+  const win = heuristic.move(board(['XX.', 'OO.', '...']), 1, random);
+  assertEqual(win.join(), '0,2', 'Completes its own line');
+  const block = heuristic.move(board(['XX.', 'O..', '...']), 2, random);
+  assertEqual(block.join(), '0,2', "Blocks the opponent's line");
+  const preferWin = heuristic.move(board(['XX.', 'OO.', 'X..']), 2, random);
+  assertEqual(preferWin.join(), '1,2', 'Winning beats blocking');
+
+  const gomoku = createEngine('heuristic', 'gomoku');
+  const empty = board(Array.from({ length: 15 }, () => '.'.repeat(15)));
+  assertEqual(gomoku.move(empty, 1, random).join(), '7,7', 'Opens in the center');
+  assertThrows(() => heuristic.move(empty, 1, random), 'Rejects a board of another mode');
+
+  assertEqual(parseEngineSpec('random').noise, 1, 'random always plays at random');
+  const tuned = parseEngineSpec('heuristic:defense=0.5,noise=0.1');
+  assertEqual(tuned.defense, 0.5, 'defense setting');
+  assertEqual(tuned.noise, 0.1, 'noise setting');
+  assertThrows(() => parseEngineSpec('minimax'), 'Unknown engine');
+  assertThrows(() => parseEngineSpec('heuristic:depth=3'), 'Unknown setting');
+  assertThrows(() => parseEngineSpec('heuristic:noise=lots'), 'Non-numeric setting');
+  console.log('✓ Engine tests passed\n');
+
+  console.log('Testing games...');
+  const engines = ['heuristic', 'random'];
+  const games = playAll(planTasks(['classic3', 'gomoku'], engines, 40, 7, 3));
+  for (const game of games) {
+    const replay = recordToGame(selfPlayRecord(game, 0));
+    const symbol = checkWinner(game.mode, buildBoard(game.mode, replay.moves!, replay.players));
+    assertEqual(symbol ? (symbol === 'X' ? 1 : 2) : 0, game.winner, 'Winner matches the rules');
+    assertEqual(game.thinkUs.length, game.cells.length, 'Think time per move');
+    assertEqual(new Set(game.cells).size, game.cells.length, 'No cell is played twice');
+  }
+
+  const strip = (g: SelfPlayGame) => `${g.mode} ${g.index} ${g.seats} ${g.cells}`;
+  const again = playAll(planTasks(['classic3', 'gomoku'], engines, 40, 40, 3));
+  assertEqual(again.map(strip).join('|'), games.map(strip).join('|'), 'Task size does not matter');
+  const reseeded = playAll(planTasks(['gomoku'], engines, 40, 40, 4));
+  assert(
+    reseeded.map(strip).join('|') !== games.filter((g) => g.mode === 'gomoku').map(strip).join('|'),
+    'Seeds change the games'
+  );
+  const mirror = planTasks(['classic3'], ['heuristic'], 10, 4, 1);
+  assertEqual(mirror.length, 3, 'A single engine plays itself');
+  assertEqual(mirror[0].engines.join(), 'heuristic,heuristic', 'Self pairing');
+  console.log('✓ Game tests passed\n');
+
+  console.log('Testing statistics...');
+  for (const mode of ['classic3', 'gomoku'] as const) {
+    const stats = new PairingStats(mode, ['heuristic', 'random']);
+    runTask({ mode, engines: ['heuristic', 'random'], from: 0, count: 100, seed: 1 }).forEach(
+      (game) => stats.add(game)
+    );
+    const report = stats.report();
+    assertEqual(report.games, 100, `${mode} games`);
+    assertEqual(report.wins[0] + report.wins[1] + report.draws, 100, `${mode} results add up`);
+    assert(report.winInterval[0][0] > 0.8, `heuristic beats random in ${mode}`);
+    assertEqual(stats.think.get('random')!.count > 0, true, 'Think time per engine');
+  }
+
+  assertEqual(wilsonInterval(0, 0).join(), '0,1', 'No trials, no information');
+  const [low, high] = wilsonInterval(50, 100);
+  assert(Math.abs(low - 0.404) < 0.001 && Math.abs(high - 0.596) < 0.001, 'Interval at 50%');
+  const [, zeroHigh] = wilsonInterval(0, 100);
+  assert(zeroHigh > 0.03 && zeroHigh < 0.04, 'Interval at 0% is not empty');
+
+  const histogram = new LatencyHistogram();
+  for (let us = 1; us <= 1000; us++) histogram.observe(us);
+  assertEqual(histogram.count, 1000, 'Count');
+  assertEqual(histogram.max, 1000, 'Max');
+  const p50 = histogram.percentile(50);
+  assert(p50 >= 500 && p50 < 500 * 1.1, `p50 within a bucket (${p50})`);
+  assertEqual(histogram.percentile(100), 1000, 'p100 is the max');
+  console.log('✓ Statistics tests passed\n');
+
+  console.log('Testing game records...');
+  const sample = games.filter((g) => g.mode === 'gomoku').slice(0, 5);
+  const frames = sample.map((game) => [...encodeGameRecord(selfPlayRecord(game, 0))]);
+  const file = Uint8Array.from([0x47, 0x52, 0x45, 0x43, 1, ...frames.flat()]);
+  const decoded = [...decodeGameRecords(file)];
+  assertEqual(decoded.length, sample.length, 'Every game decodes');
+  decoded.forEach((record, i) => {
+    assertEqual([...record.cells].join(), sample[i].cells.join(), 'Moves round-trip');
+    assertEqual(record.winner, sample[i].winner, 'Winner round-trips');
+    assertEqual(record.players[0].name, sample[i].seats[0], 'First mover is player 1');
+  });
+  const self = selfPlayRecord({ ...sample[0], seats: ['random', 'random'] }, 0);
+  assert(self.players[0].id !== self.players[1].id, 'Seats have their own ids');
+  console.log('✓ Game record tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
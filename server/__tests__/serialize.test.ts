@@ -0,0 +1,113 @@
+// Tests for the fast game state serializer
+// Run with: npx tsx server/__tests__/serialize.test.ts
+
+import type { Move } from '../../lib/types';
+import { serializeGameState, serializeMoves } from '../serialize';
+import type { StoredGame } from '../store';
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function makeMove(n: number, playerId: string): Move {
+  return {
+    id: n,
+    game_id: 'game_1',
+    player_id: playerId,
+    move_number: n,
+    column_index: n % 15,
+    row_index: Math.floor(n / 15),
+    created_at: `2024-01-01T00:00:${String(n % 60).padStart(2, '0')}.000Z`,
+  };
+}
+
+function runTests() {
+  console.log('Running serializer tests...\n');
+
+  console.log('Testing serializeMoves...');
+  assertEqual(serializeMoves([]), '[]', 'Empty move list should encode as []');
+  const moves = [makeMove(1, 'p1'), makeMove(2, 'p2'), makeMove(3, 'p1')];
+  assertEqual(serializeMoves(moves), JSON.stringify(moves), 'Moves should match JSON.stringify');
+
+  const unsafe = [makeMove(1, 'p"1\\'), makeMove(2, 'p\n2')];
+  assertEqual(
+    serializeMoves(unsafe),
+    JSON.stringify(unsafe),
+    'Ids needing escapes should match JSON.stringify'
+  );
+  console.log('✓ serializeMoves tests passed\n');
+
+  console.log('Testing serializeGameState...');
+  const game: StoredGame = {
+    id: 'game_1',
+    invite_code: 'ABC123',
+    mode: 'gomoku',
+    status: 'active',
+    created_at: '2024-01-01T00:00:00.000Z',
+    started_at: '2024-01-01T00:00:01.000Z',
+    finished_at: null,
+    current_turn: 2,
+    winner_id: null,
+    board: [],
+    players: [
+      {
+        id: 'p1',
+        game_id: 'game_1',
+        player_number: 1,
+        player_name: 'Alice "the <b>great</b>"',
+        joined_at: '2024-01-01T00:00:00.000Z',
+        is_ai: false,
+      },
+    ],
+    moves,
+    messages: [
+      {
+        id: 1,
+        game_id: 'game_1',
+        player_id: 'p1',
+        message_type: 'chat',
+        content: 'gg   "wp"',
+        created_at: '2024-01-01T00:00:02.000Z',
+      },
+    ],
+  };
+
+  const expected = JSON.stringify({
+    game: {
+      id: game.id,
+      invite_code: game.invite_code,
+      mode: game.mode,
+      status: game.status,
+      created_at: game.created_at,
+      started_at: game.started_at,
+      finished_at: game.finished_at,
+      current_turn: game.current_turn,
+      winner_id: game.winner_id,
+    },
+    players: game.players,
+    moves: game.moves,
+    messages: game.messages,
+  });
+  assertEqual(serializeGameState(game), expected, 'State body should match generic encoding');
+
+  const parsed = JSON.parse(serializeGameState({ ...game, moves: undefined, messages: undefined }));
+  assertEqual(parsed.moves.length, 0, 'Missing moves should encode as an empty list');
+  assertEqual(parsed.messages.length, 0, 'Missing messages should encode as an empty list');
+  console.log('✓ serializeGameState tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  try {
+    runTests();
+  } catch (error) {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  }
+}
+
+export { runTests };
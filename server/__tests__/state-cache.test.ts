@@ -0,0 +1,154 @@
+// Tests for the in-process game state cache
+// Run with: npx tsx server/__tests__/state-cache.test.ts
+
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { resetServerContext } from '../context';
+import { GameStateCache } from '../state-cache';
+import type { StoredGame } from '../store';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function makeGame(id: string): StoredGame {
+  return {
+    id,
+    invite_code: id.toUpperCase(),
+    mode: 'classic3',
+    status: 'waiting',
+    created_at: '2024-01-01T00:00:00.000Z',
+    started_at: null,
+    finished_at: null,
+    current_turn: null,
+    winner_id: null,
+    players: [],
+  };
+}
+
+function activeGame(id: string): StoredGame {
+  const players = [1, 2].map((n) => ({
+    id: `${id}_p${n}`,
+    game_id: id,
+    player_number: n as 1 | 2,
+    player_name: `P${n}`,
+    joined_at: '2024-01-01T00:00:00.000Z',
+    is_ai: false,
+  }));
+  return { ...makeGame(id), status: 'active', current_turn: 1, players };
+}
+
+function move(gameId: string, playerId: string, row: number, column: number) {
+  return makeMove(
+    new Request('http://localhost:3000/api/game/move', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        game_id: gameId,
+        player_id: playerId,
+        row_index: row,
+        column_index: column,
+      }),
+    })
+  );
+}
+
+async function runTests() {
+  console.log('Running state cache tests...\n');
+
+  console.log('Testing hits and misses...');
+  const store = new MemoryGameStore();
+  const cache = new GameStateCache({ maxEntries: 2, maxBytes: 1024 * 1024, revalidateMs: 0 });
+  await store.saveGame(makeGame('g1'));
+
+  assertEqual((await cache.load(store, 'g1'))?.version, 1, 'First load should read version 1');
+  assertEqual((await cache.load(store, 'g1'))?.version, 1, 'Second load should hit');
+  assertEqual(cache.stats().hits, 1, 'One hit recorded');
+  assertEqual(cache.stats().misses, 1, 'One miss recorded');
+  assertEqual(await cache.load(store, 'missing'), null, 'Unknown game should return null');
+  console.log('✓ Hit/miss tests passed\n');
+
+  console.log('Testing cross-worker invalidation...');
+  // Another worker saves a new version behind this cache's back
+  const updated = { ...(await store.getGame('g1'))!, status: 'active' as const };
+  await store.saveGame(updated);
+  const reloaded = await cache.load(store, 'g1');
+  assertEqual(reloaded?.version, 2, 'Stale entry should be reloaded');
+  assertEqual(reloaded?.game.status, 'active', 'Reloaded entry should have new status');
+  assertEqual(cache.stats().stale, 1, 'Stale lookup recorded');
+  console.log('✓ Invalidation tests passed\n');
+
+  console.log('Testing write-through...');
+  const written = { ...updated, current_turn: 2 };
+  const version = await store.saveGame(written);
+  cache.set(written, version);
+  const afterWrite = await cache.load(store, 'g1');
+  assertEqual(afterWrite?.game.current_turn, 2, 'Write-through entry should be served');
+  assert(afterWrite!.body.includes('"current_turn":2'), 'Cached body should be re-serialized');
+  console.log('✓ Write-through tests passed\n');
+
+  console.log('Testing LRU eviction...');
+  await store.saveGame(makeGame('g2'));
+  await store.saveGame(makeGame('g3'));
+  await cache.load(store, 'g2');
+  await cache.load(store, 'g1'); // g1 becomes most recently used
+  await cache.load(store, 'g3'); // evicts g2
+  assertEqual(cache.stats().entries, 2, 'Cache should hold at most 2 entries');
+  assertEqual(cache.stats().evictions, 1, 'One eviction recorded');
+  const hitsBefore = cache.stats().hits;
+  await cache.load(store, 'g1');
+  assertEqual(cache.stats().hits, hitsBefore + 1, 'g1 should still be cached');
+  console.log('✓ LRU eviction tests passed\n');
+
+  console.log('Testing byte limit...');
+  const tiny = new GameStateCache({ maxEntries: 100, maxBytes: 10, revalidateMs: 0 });
+  await tiny.load(store, 'g1');
+  assertEqual(tiny.stats().entries, 0, 'Oversized entries should not be cached');
+  console.log('✓ Byte limit tests passed\n');
+
+  console.log('Testing moves from a stale cache...');
+  // Two workers hold the same cached copy and skip revalidation
+  const shared = new MemoryGameStore();
+  const context = resetServerContext({
+    store: shared,
+    getPusher: async () => ({ trigger: async () => {} }) as never,
+  });
+  const options = { maxEntries: 10, maxBytes: 1024 * 1024, revalidateMs: 60_000 };
+  const workerA = new GameStateCache(options);
+  const workerB = new GameStateCache(options);
+  await shared.saveGame(activeGame('race'));
+  await workerA.load(shared, 'race');
+  await workerB.load(shared, 'race');
+
+  context.stateCache = workerA;
+  assertEqual((await move('race', 'race_p1', 0, 0)).status, 200, 'First move is saved');
+  context.stateCache = workerB;
+  const lost = await move('race', 'race_p1', 1, 1);
+  assertEqual(lost.status, 409, 'A move based on an old version is rejected');
+  assertEqual((await shared.getGame('race'))!.moves!.length, 1, 'The first move is kept');
+  assertEqual(workerB.stats().invalidations, 1, 'The stale copy is dropped');
+  const next = await move('race', 'race_p2', 1, 1);
+  assertEqual(next.status, 200, 'The next move sees the saved state');
+  assertEqual((await workerB.load(shared, 'race'))!.version, 3, 'Versions stay distinct');
+  console.log('✓ Stale cache move tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,212 @@
+// Store call budgets per endpoint: catches N+1 patterns and extra round trips
+// Run with: npx tsx server/__tests__/store-budget.test.ts
+//
+// Each budget is what the route needs today. When a change legitimately adds a store call,
+// raise the budget in the same commit so reviewers see it.
+
+import { GET as listChat } from '@/app/api/chat/list/route';
+import { GET as searchChat } from '@/app/api/chat/search/route';
+import { POST as sendChat } from '@/app/api/chat/send/route';
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { GET as getState } from '@/app/api/game/state/route';
+import { POST as cancelMatch } from '@/app/api/match/cancel/route';
+import { POST as enqueueMatch } from '@/app/api/match/enqueue/route';
+import { GET as matchStatus } from '@/app/api/match/status/route';
+import { resetServerContext } from '../context';
+import { checkStoreBudget, measureStoreOps, type StoreBudget } from '../request-scope';
+import { GameStateCache } from '../state-cache';
+import { MemoryGameStore } from '../stores/memory-store';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function post(path: string, body: unknown): Request {
+  return new Request(`http://localhost:3000${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+}
+
+function get(path: string): Request {
+  return new Request(`http://localhost:3000${path}`);
+}
+
+// Calls the route and fails when it exceeds the budget or returns an error status
+async function withinBudget(
+  name: string,
+  call: () => Promise<Response>,
+  budget: StoreBudget
+): Promise<Response> {
+  const { result, ops } = await measureStoreOps(call);
+  assert(result.status < 400, `${name} responded ${result.status}`);
+  const violations = checkStoreBudget(ops, budget);
+  assert(violations.length === 0, `${name} is over its store budget: ${violations.join('; ')}`);
+  return result;
+}
+
+async function runTests() {
+  console.log('Running store budget tests...\n');
+
+  const store = new MemoryGameStore();
+  const context = resetServerContext({
+    store,
+    getPusher: async () => ({ trigger: async () => {} }) as never,
+  });
+
+  console.log('Testing game routes...');
+  const created = await (
+    await withinBudget(
+      'game/create',
+      () => createGame(post('/api/game/create', { mode: 'gomoku', player_name: 'Host' })),
+      { calls: 3, byOperation: { saveGame: 1 } }
+    )
+  ).json();
+  const gameId: string = created.game.id;
+
+  await withinBudget(
+    'game/join',
+    () =>
+      joinGame(
+        post('/api/game/join', { invite_code: created.game.invite_code, player_name: 'Guest' })
+      ),
+    { calls: 2, byOperation: { saveGameIfVersion: 1 } }
+  );
+
+  await withinBudget(
+    'game/move',
+    () =>
+      makeMove(
+        post('/api/game/move', {
+          game_id: gameId,
+          player_id: created.player_id,
+          row_index: 7,
+          column_index: 7,
+        })
+      ),
+    { calls: 2, byOperation: { getGame: 0, saveGameIfVersion: 1 } }
+  );
+
+  const state = () => getState(get(`/api/game/state?game_id=${gameId}`));
+  await withinBudget('game/state (cached)', state, { calls: 1, byOperation: { getGame: 0 } });
+  context.stateCache = new GameStateCache();
+  await withinBudget('game/state (cold)', state, { calls: 1 });
+  console.log('✓ Game route budgets hold\n');
+
+  console.log('Testing chat routes...');
+  await withinBudget(
+    'chat/send',
+    () =>
+      sendChat(
+        post('/api/chat/send', { game_id: gameId, player_id: created.player_id, text: 'good luck' })
+      ),
+    { calls: 2, byOperation: { appendMessage: 1 } }
+  );
+
+  // Seeded outside any scope, so none of this is charged
+  for (let i = 0; i < 200; i++) {
+    await store.appendMessage({
+      game_id: i % 2 === 0 ? gameId : `game_other_${i}`,
+      player_id: created.player_id,
+      message_type: 'chat',
+      content: `well played ${i}`,
+      created_at: new Date(Date.UTC(2024, 0, 1, 0, 0, i)).toISOString(),
+    });
+  }
+
+  await withinBudget('chat/list', () => listChat(get(`/api/chat/list?game_id=${gameId}`)), {
+    calls: 1,
+  });
+  await withinBudget(
+    'chat/list (before_id)',
+    () => listChat(get(`/api/chat/list?game_id=${gameId}&before_id=50`)),
+    { calls: 1 }
+  );
+  // Matches span 100 games: the page must be fetched in one batch, not once per message or game
+  await withinBudget('chat/search', () => searchChat(get('/api/chat/search?q=well+played')), {
+    calls: 4,
+    byOperation: { getMessagesByRef: 1, getGame: 0 },
+  });
+  await withinBudget(
+    'chat/search (game)',
+    () => searchChat(get(`/api/chat/search?q=played&game_id=${gameId}`)),
+    { calls: 3, byOperation: { listMessages: 1 } }
+  );
+  console.log('✓ Chat route budgets hold\n');
+
+  console.log('Testing match routes...');
+  const first = await (
+    await withinBudget(
+      'match/enqueue (queued)',
+      () => enqueueMatch(post('/api/match/enqueue', { mode: 'classic3', player_name: 'A' })),
+      { calls: 3 }
+    )
+  ).json();
+  await withinBudget(
+    'match/status',
+    () => matchStatus(get(`/api/match/status?ticket_id=${first.ticket_id}`)),
+    { calls: 1 }
+  );
+  // Pairing writes the game and both tickets in one call and reuses the ticket it wrote
+  const second = await (
+    await withinBudget(
+      'match/enqueue (paired)',
+      () => enqueueMatch(post('/api/match/enqueue', { mode: 'classic3', player_name: 'B' })),
+      { calls: 7, byOperation: { saveMatchedGame: 1, saveGame: 0, getMatchTicket: 2 } }
+    )
+  ).json();
+  assertEqual(second.status, 'matched', 'Second player is paired');
+
+  const third = await (
+    await enqueueMatch(post('/api/match/enqueue', { mode: 'gomoku', player_name: 'C' }))
+  ).json();
+  await withinBudget(
+    'match/cancel',
+    () => cancelMatch(post('/api/match/cancel', { ticket_id: third.ticket_id })),
+    { calls: 2 }
+  );
+  console.log('✓ Match route budgets hold\n');
+
+  console.log('Testing budget reports...');
+  const { ops } = await measureStoreOps(async () => {
+    await Promise.all([1, 2, 3].map((i) => context.store.getGame(`missing_${i}`)));
+    return context.store.listMessages(gameId, { limit: 10 });
+  });
+  assertEqual(ops.calls, 4, 'Concurrent calls are all counted');
+  assertEqual(ops.byOperation.getGame.calls, 3, 'Calls are counted per operation');
+  assertEqual(ops.byOperation.getGame.items, 0, 'Missing records count no items');
+  assertEqual(ops.items, 10, 'Array results count their length');
+
+  const violations = checkStoreBudget(ops, { calls: 2, byOperation: { getGame: 1 } });
+  assertEqual(violations.length, 3, 'Both violations plus the operations made');
+  assert(violations[0].includes('4 store calls'), 'Total calls are reported');
+  assert(violations[2].includes('getGame×3'), 'The operations made are listed');
+  assertEqual(checkStoreBudget(ops, { calls: 4 }).length, 0, 'A budget may be met exactly');
+
+  const outside = await context.store.getGame(gameId);
+  assert(outside !== null, 'Calls outside a scope pass straight through');
+  console.log('✓ Budget report tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,195 @@
+// Tests for request tracing
+// Run with: npx tsx server/__tests__/tracing.test.ts
+
+import { readFile, rm } from 'node:fs/promises';
+import { tmpdir } from 'node:os';
+import path from 'node:path';
+import { GET as getTraces } from '@/app/api/debug/traces/route';
+import { POST as createGame } from '@/app/api/game/create/route';
+import { POST as joinGame } from '@/app/api/game/join/route';
+import { POST as makeMove } from '@/app/api/game/move/route';
+import { resetServerContext } from '../context';
+import { MemoryGameStore } from '../stores/memory-store';
+import { Tracer, traced, type SpanRecord, type TraceRecord } from '../tracing';
+
+function assert(condition: boolean, message: string) {
+  if (!condition) {
+    throw new Error(`Assertion failed: ${message}`);
+  }
+}
+
+function assertEqual<T>(actual: T, expected: T, message: string) {
+  if (actual !== expected) {
+    throw new Error(`Assertion failed: ${message}. Expected ${expected}, got ${actual}`);
+  }
+}
+
+function post(path: string, body: unknown): Request {
+  return new Request(`http://localhost:3000${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+}
+
+function spanNamed(trace: TraceRecord, name: string): SpanRecord {
+  const span = trace.spans.find((s) => s.name === name);
+  if (!span) throw new Error(`No ${name} span in ${trace.spans.map((s) => s.name).join(', ')}`);
+  return span;
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function runTests() {
+  console.log('Running tracing tests...\n');
+
+  const otlpFile = path.join(tmpdir(), `traces-${process.pid}.jsonl`);
+  await rm(otlpFile, { force: true });
+
+  console.log('Testing move request trace...');
+  const tracer = new Tracer({ sampleRate: 1, bufferSize: 10, otlpFile, serviceName: 'test' });
+  resetServerContext({
+    store: new MemoryGameStore(),
+    getPusher: async () => ({ trigger: async () => {} }) as never,
+    tracer,
+  });
+
+  const created = await (
+    await createGame(post('/api/game/create', { mode: 'classic3', player_name: 'Host' }))
+  ).json();
+  await joinGame(
+    post('/api/game/join', { invite_code: created.game.invite_code, player_name: 'Guest' })
+  );
+  const moved = await makeMove(
+    post('/api/game/move', {
+      game_id: created.game.id,
+      player_id: created.player_id,
+      row_index: 1,
+      column_index: 1,
+    })
+  );
+  assertEqual(moved.status, 200, 'Move succeeds while traced');
+  await sleep(10); // publishing is not awaited by the route
+
+  const [trace] = tracer.recent({ limit: 1, name: '/api/game/move' });
+  assert(trace !== undefined, 'Move trace is buffered');
+  assertEqual(trace.name, 'POST /api/game/move', 'Root span is named after the route');
+
+  const root = trace.spans[0];
+  assertEqual(root.parentSpanId, null, 'Root span comes first');
+  assertEqual(root.attributes['http.response.status_code'], 200, 'Status is recorded');
+  assertEqual(root.attributes['game.mode'], 'classic3', 'Handler attributes land on the root');
+  for (const phase of ['rate_limit', 'load', 'validate', 'win_check', 'commit', 'publish']) {
+    assertEqual(spanNamed(trace, `move.${phase}`).parentSpanId, root.spanId, `${phase} phase`);
+  }
+
+  const load = spanNamed(trace, 'move.load');
+  const commit = spanNamed(trace, 'move.commit');
+  assertEqual(spanNamed(trace, 'store.getGameVersion').parentSpanId, load.spanId, 'Store nests');
+  const save = spanNamed(trace, 'store.saveGameIfVersion');
+  assertEqual(save.parentSpanId, commit.spanId, 'Commit store call');
+  assertEqual(save.kind, 'client', 'Store calls are client spans');
+  assert(
+    trace.spans.every((span) => span.startTime >= trace.startTime),
+    'Spans start within the trace'
+  );
+  console.log('✓ Move request trace tests passed\n');
+
+  console.log('Testing async propagation...');
+  const parent = tracer.startTrace('job')!;
+  await parent.run(async () => {
+    await Promise.all(
+      ['a', 'b'].map((name) =>
+        traced(name, async () => {
+          await sleep(5);
+          await traced(`${name}.inner`, async () => sleep(1));
+        })
+      )
+    );
+    // Not awaited: the trace stays open until this ends
+    traced('late', () => sleep(20));
+  });
+  parent.end();
+  assertEqual(tracer.recent({ limit: 1, name: 'job' }).length, 0, 'Open spans hold the trace');
+  await sleep(30);
+
+  const [job] = tracer.recent({ limit: 1, name: 'job' });
+  assert(job !== undefined, 'Trace finishes when its last span ends');
+  for (const name of ['a', 'b']) {
+    const outer = spanNamed(job, name);
+    assertEqual(outer.parentSpanId, job.spans[0].spanId, `${name} is a child of the root`);
+    assertEqual(spanNamed(job, `${name}.inner`).parentSpanId, outer.spanId, `${name}.inner`);
+  }
+  assert(spanNamed(job, 'a').durationMs >= 5, 'Durations cover awaited work');
+
+  const failed = tracer.startTrace('failed job')!;
+  let threw = false;
+  try {
+    await failed.run(() =>
+      traced('failing', async () => {
+        throw new Error('boom');
+      })
+    );
+  } catch {
+    threw = true;
+  }
+  failed.end();
+  assert(threw, 'Errors propagate out of traced()');
+  const [failedJob] = tracer.recent({ limit: 1, name: 'failed job' });
+  assertEqual(spanNamed(failedJob, 'failing').error, 'boom', 'Errors are recorded on the span');
+
+  const finished = tracer.stats().finished;
+  await parent.run(() => traced('after', async () => {}));
+  assertEqual(tracer.stats().finished, finished, 'A finished trace is not finished twice');
+  console.log('✓ Async propagation tests passed\n');
+
+  console.log('Testing sampling and the ring buffer...');
+  const off = new Tracer({ sampleRate: 0, bufferSize: 10, otlpFile: null, serviceName: 'test' });
+  assertEqual(off.startTrace('x'), null, 'Sample rate 0 traces nothing');
+  assertEqual(traced('untraced', () => 42), 42, 'traced() just runs fn without a trace');
+  assertEqual(off.stats().skipped, 1, 'Skipped requests are counted');
+
+  const small = new Tracer({ sampleRate: 1, bufferSize: 3, otlpFile: null, serviceName: 'test' });
+  for (let i = 0; i < 5; i++) small.startTrace(`t${i}`)!.end();
+  const names = small.recent({ limit: 10 }).map((t) => t.name);
+  assertEqual(names.join(','), 't4,t3,t2', 'Ring buffer keeps the newest traces');
+  console.log('✓ Sampling and ring buffer tests passed\n');
+
+  console.log('Testing exporters...');
+  await tracer.flush();
+  const lines = (await readFile(otlpFile, 'utf8')).trim().split('\n');
+  assertEqual(lines.length, tracer.stats().exported, 'One OTLP line per finished trace');
+  const exported = JSON.parse(lines[lines.length - 1]);
+  const resource = exported.resourceSpans[0];
+  assertEqual(resource.resource.attributes[0].value.stringValue, 'test', 'Service name');
+  const spans = resource.scopeSpans[0].spans;
+  assertEqual(spans[0].traceId.length, 32, 'Trace ids are 16 bytes of hex');
+  assertEqual(spans[0].spanId.length, 16, 'Span ids are 8 bytes of hex');
+  assertEqual(spans[0].kind, 2, 'Root is a server span');
+  assert(
+    BigInt(spans[0].endTimeUnixNano) > BigInt(spans[0].startTimeUnixNano),
+    'Timestamps are unix nanoseconds'
+  );
+  await rm(otlpFile, { force: true });
+
+  const dump = await getTraces(
+    new Request('http://localhost:3000/api/debug/traces?route=/api/game/move&order=slowest')
+  );
+  assertEqual(dump.status, 200, 'Trace dump is served outside production');
+  const body = await dump.json();
+  assertEqual(body.traces.length, 1, 'Route filter applies');
+  assertEqual(body.traces[0].spans[0].offset_ms, 0, 'Spans are offsets from the trace start');
+  console.log('✓ Exporter tests passed\n');
+
+  console.log('✅ All tests passed!');
+}
+
+// Run tests if this file is executed directly
+if (require.main === module) {
+  runTests().catch((error) => {
+    console.error('❌ Test failed:', error);
+    process.exit(1);
+  });
+}
+
+export { runTests };
@@ -0,0 +1,270 @@
+// Offline game analytics: opening heatmaps, win rates by first move, game length by mode and
+// first-player advantage
+// Finished games are read in chunks and laid out as typed-array columns (mode, winner, move
+// count, first cell, finish time); the aggregates are then a few passes over those arrays
+// instead of rebuilding every game's board. Summaries are counters that add up, so each run
+// folds in only the games finished after the previous run's watermark
+// (see scripts/analytics.ts).
+
+import { getBoardSize } from '@/lib/game-logic';
+import type { GameMode } from '@/lib/types';
+import { gameToRecord, type GameRecord } from './game-record';
+import type { GameStore } from './store';
+
+const MODES: GameMode[] = ['classic3', 'gomoku'];
+const DEFAULT_CHUNK_SIZE = 1000;
+// Games finishing this close to a run may not be saved yet; the next run picks them up
+const DEFAULT_SETTLE_MS = 60_000;
+
+export interface ModeSummary {
+  games: number;
+  moves: number; // total, for the average game length
+  firstPlayerWins: number;
+  secondPlayerWins: number;
+  draws: number;
+  openings: number[]; // games per first-move cell (row * size + column)
+  openingWins: number[]; // games per first-move cell won by the first player
+  openingLosses: number[];
+}
+
+export interface AnalyticsState {
+  // Games finished at or before this time (epoch ms) are counted
+  watermark: number;
+  updatedAt: string | null;
+  modes: Record<GameMode, ModeSummary>;
+}
+
+export interface AnalyticsOptions {
+  chunkSize?: number;
+  // Only games finished at or before this time are counted (default: now minus 60 seconds)
+  until?: number;
+}
+
+// One chunk of finished games, column by column
+export interface GameColumns {
+  length: number;
+  mode: Uint8Array; // index into MODES
+  winner: Uint8Array; // player number, 0 for a draw
+  moveCount: Uint16Array;
+  firstCell: Int16Array; // -1 when the game has no moves
+  finishedAt: Float64Array;
+}
+
+function emptyModeSummary(mode: GameMode): ModeSummary {
+  const cells = getBoardSize(mode) ** 2;
+  return {
+    games: 0,
+    moves: 0,
+    firstPlayerWins: 0,
+    secondPlayerWins: 0,
+    draws: 0,
+    openings: new Array(cells).fill(0),
+    openingWins: new Array(cells).fill(0),
+    openingLosses: new Array(cells).fill(0),
+  };
+}
+
+export function emptyAnalytics(): AnalyticsState {
+  return {
+    watermark: 0,
+    updatedAt: null,
+    modes: {
+      classic3: emptyModeSummary('classic3'),
+      gomoku: emptyModeSummary('gomoku'),
+    },
+  };
+}
+
+export function toColumns(records: GameRecord[]): GameColumns {
+  const length = records.length;
+  const columns: GameColumns = {
+    length,
+    mode: new Uint8Array(length),
+    winner: new Uint8Array(length),
+    moveCount: new Uint16Array(length),
+    firstCell: new Int16Array(length),
+    finishedAt: new Float64Array(length),
+  };
+
+  for (let i = 0; i < length; i++) {
+    const record = records[i];
+    columns.mode[i] = MODES.indexOf(record.mode);
+    columns.winner[i] = record.winner;
+    columns.moveCount[i] = record.cells.length;
+    columns.firstCell[i] = record.cells.length > 0 ? record.cells[0] : -1;
+    columns.finishedAt[i] = record.finishedAt ?? 0;
+  }
+  return columns;
+}
+
+// Adds the games of a chunk finished in (after, until] to the summaries; returns how many
+// were counted and the latest finish time among them
+export function aggregateColumns(
+  columns: GameColumns,
+  modes: Record<GameMode, ModeSummary>,
+  after: number,
+  until: number
+): { counted: number; latest: number } {
+  const { length, mode, winner, moveCount, firstCell, finishedAt } = columns;
+  let counted = 0;
+  let latest = after;
+
+  for (let m = 0; m < MODES.length; m++) {
+    const summary = modes[MODES[m]];
+    const cells = summary.openings.length;
+    // Per-cell counters for this chunk, added to the summary once at the end
+    const openings = new Uint32Array(cells);
+    const openingWins = new Uint32Array(cells);
+    const openingLosses = new Uint32Array(cells);
+    const results = new Uint32Array(3); // draws, first player wins, second player wins
+    let games = 0;
+    let moves = 0;
+
+    for (let i = 0; i < length; i++) {
+      if (mode[i] !== m || finishedAt[i] <= after || finishedAt[i] > until) continue;
+
+      const cell = firstCell[i];
+      const result = winner[i];
+      games++;
+      moves += moveCount[i];
+      results[result]++;
+      if (cell >= 0 && cell < cells) {
+        openings[cell]++;
+        openingWins[cell] += result === 1 ? 1 : 0;
+        openingLosses[cell] += result === 2 ? 1 : 0;
+      }
+      if (finishedAt[i] > latest) latest = finishedAt[i];
+    }
+
+    if (games === 0) continue;
+    counted += games;
+    summary.games += games;
+    summary.moves += moves;
+    summary.draws += results[0];
+    summary.firstPlayerWins += results[1];
+    summary.secondPlayerWins += results[2];
+    for (let cell = 0; cell < cells; cell++) {
+      summary.openings[cell] += openings[cell];
+      summary.openingWins[cell] += openingWins[cell];
+      summary.openingLosses[cell] += openingLosses[cell];
+    }
+  }
+
+  return { counted, latest };
+}
+
+// Completed games in the store as records, one store round trip per chunk of ids
+export async function* storeRecords(
+  store: GameStore,
+  chunkSize = DEFAULT_CHUNK_SIZE
+): AsyncGenerator<GameRecord> {
+  const seen = new Set<string>(); // SCAN may return an id more than once
+  let cursor = '0';
+
+  do {
+    const page = await store.scanGameIds(cursor, chunkSize);
+    cursor = page.cursor;
+
+    const ids = page.ids.filter((id) => !seen.has(id));
+    ids.forEach((id) => seen.add(id));
+    for (const game of await store.getGames(ids)) {
+      if (!game || game.status !== 'completed' || !game.finished_at) continue;
+
+      try {
+        yield gameToRecord(game);
+      } catch (error) {
+        console.warn(`[Analytics] Skipping ${game.id}:`, (error as Error).message);
+      }
+    }
+  } while (cursor !== '0');
+}
+
+// Folds the completed games of source that finished after state.watermark into a copy of
+// state. There is one watermark whatever the source: games finished at or before it are
+// skipped, whether they were counted already (the store yields them again on every run) or
+// come from an archive of older games fed in after a newer run. They are reported as
+// skipped, never counted.
+export async function updateAnalytics(
+  state: AnalyticsState,
+  source: AsyncIterable<GameRecord> | Iterable<GameRecord>,
+  options: AnalyticsOptions = {}
+): Promise<{ state: AnalyticsState; counted: number; skipped: number }> {
+  const chunkSize = options.chunkSize ?? DEFAULT_CHUNK_SIZE;
+  const until = options.until ?? Date.now() - DEFAULT_SETTLE_MS;
+  const next: AnalyticsState = structuredClone(state);
+  let chunk: GameRecord[] = [];
+  let counted = 0;
+  let skipped = 0;
+  let latest = state.watermark;
+
+  const flush = () => {
+    const result = aggregateColumns(toColumns(chunk), next.modes, state.watermark, until);
+    counted += result.counted;
+    latest = Math.max(latest, result.latest);
+    chunk = [];
+  };
+
+  for await (const record of source) {
+    if (record.status !== 'completed') continue;
+    if (record.finishedAt !== null && record.finishedAt <= state.watermark) {
+      skipped++;
+      continue;
+    }
+    chunk.push(record);
+    if (chunk.length >= chunkSize) flush();
+  }
+  flush();
+
+  // Every game finished by until has been seen, so the latest counted one is a safe mark
+  next.watermark = latest;
+  next.updatedAt = new Date().toISOString();
+  return { state: next, counted, skipped };
+}
+
+const rate = (count: number, total: number) =>
+  total > 0 ? Math.round((count / total) * 1000) / 1000 : null;
+
+// One row per mode: game count, average length and result rates
+export function modeReport(state: AnalyticsState) {
+  return MODES.map((mode) => {
+    const summary = state.modes[mode];
+    const decisive = summary.firstPlayerWins + summary.secondPlayerWins;
+    const averageMoves = summary.games > 0 ? summary.moves / summary.games : null;
+    return {
+      mode,
+      games: summary.games,
+      averageMoves: averageMoves === null ? null : Math.round(averageMoves * 10) / 10,
+      firstPlayerWinRate: rate(summary.firstPlayerWins, summary.games),
+      secondPlayerWinRate: rate(summary.secondPlayerWins, summary.games),
+      drawRate: rate(summary.draws, summary.games),
+      // Share of decisive games won by the first player, minus one half
+      firstPlayerAdvantage: rate(summary.firstPlayerWins - decisive / 2, decisive),
+    };
+  });
+}
+
+// The most played openings of a mode with the first player's results after each
+export function openingReport(state: AnalyticsState, mode: GameMode, limit = 10) {
+  const summary = state.modes[mode];
+  const size = getBoardSize(mode);
+
+  return summary.openings
+    .map((games, cell) => ({
+      row: Math.floor(cell / size),
+      column: cell % size,
+      games,
+      share: rate(games, summary.games),
+      winRate: rate(summary.openingWins[cell], games),
+      lossRate: rate(summary.openingLosses[cell], games),
+    }))
+    .filter((opening) => opening.games > 0)
+    .sort((a, b) => b.games - a.games)
+    .slice(0, limit);
+}
+
+// Opening counts as a board, for heatmaps
+export function openingHeatmap(state: AnalyticsState, mode: GameMode): number[][] {
+  const { openings } = state.modes[mode];
+  const size = getBoardSize(mode);
+  return Array.from({ length: size }, (_, row) => openings.slice(row * size, (row + 1) * size));
+}
@@ -0,0 +1,36 @@
+// Access control for staff-only and debug endpoints
+// Requests must send `Authorization: Bearer <ADMIN_API_TOKEN>`; when no token is configured
+// these endpoints are only reachable outside production
+
+import { timingSafeEqual } from 'node:crypto';
+
+function hasBearerToken(request: Request, token: string): boolean {
+  const expected = Buffer.from(`Bearer ${token}`);
+  const actual = Buffer.from(request.headers.get('authorization') ?? '');
+  return actual.length === expected.length && timingSafeEqual(actual, expected);
+}
+
+export function isAdminRequest(request: Request): boolean {
+  const token = process.env.ADMIN_API_TOKEN;
+  if (!token) {
+    return process.env.NODE_ENV !== 'production';
+  }
+
+  return hasBearerToken(request, token);
+}
+
+// Vercel Cron sends `Authorization: Bearer <CRON_SECRET>`; admins may trigger jobs by hand
+export function isCronRequest(request: Request): boolean {
+  const secret = process.env.CRON_SECRET;
+  return Boolean(secret && hasBearerToken(request, secret)) || isAdminRequest(request);
+}
+
+// Prometheus scrapers send `Authorization: Bearer <METRICS_TOKEN>`; admins may read metrics too
+export function isMetricsRequest(request: Request): boolean {
+  const token = process.env.METRICS_TOKEN;
+  return Boolean(token && hasBearerToken(request, token)) || isAdminRequest(request);
+}
+
+export function forbiddenResponse(): Response {
+  return Response.json({ error: 'Forbidden' }, { status: 403 });
+}
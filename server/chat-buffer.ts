@@ -0,0 +1,207 @@
+// Per-game ring buffers of recent chat messages
+// chat/list pages that fall inside a game's buffered window are answered from memory.
+// Buffers are filled by chat/send after the store write and warmed from the store on first
+// access. Other workers' messages are picked up by comparing against the store's latest id,
+// and deletions (chat retention) by its prune count.
+
+import type { Message } from '@/lib/types';
+import type { GameStore, MessagePageQuery } from './store';
+
+export interface ChatBufferOptions {
+  maxGames: number;
+  depth: number;
+  // Buffers validated more recently than this skip the latest-id check
+  revalidateMs: number;
+}
+
+export interface ChatBufferStats {
+  games: number;
+  messages: number;
+  maxGames: number;
+  depth: number;
+  hits: number;
+  misses: number;
+  warms: number;
+  evictions: number;
+  hitRate: number;
+}
+
+interface GameChatBuffer {
+  messages: Message[]; // ascending ids, contiguous, at most `depth` long
+  complete: boolean; // holds the game's entire history
+  pruneCount: number; // store's prune count when the buffer was filled
+  validatedAt: number;
+}
+
+export function chatBufferOptionsFromEnv(): ChatBufferOptions {
+  return {
+    maxGames: Number(process.env.CHAT_BUFFER_MAX_GAMES || 1000),
+    depth: Number(process.env.CHAT_BUFFER_DEPTH || 100),
+    revalidateMs: Number(process.env.CHAT_BUFFER_REVALIDATE_MS || 0),
+  };
+}
+
+export class ChatBufferPool {
+  // Insertion order doubles as LRU order
+  private buffers = new Map<string, GameChatBuffer>();
+  private totalMessages = 0;
+  private counters = { hits: 0, misses: 0, warms: 0, evictions: 0 };
+
+  constructor(readonly options: ChatBufferOptions = chatBufferOptionsFromEnv()) {}
+
+  // A page of messages served from memory, or null when the caller must query the store
+  async list(store: GameStore, gameId: string, query: MessagePageQuery): Promise<Message[] | null> {
+    const cached = this.buffers.get(gameId);
+    if (cached && this.beforeWindow(cached, query)) {
+      // Older history than the window holds; revalidating would only add newer messages
+      this.counters.misses++;
+      return null;
+    }
+
+    const buffer = await this.acquire(store, gameId);
+    const page = buffer ? this.slice(buffer, query) : null;
+
+    if (page) {
+      this.counters.hits++;
+    } else {
+      this.counters.misses++;
+    }
+    return page;
+  }
+
+  // Record a message right after it was stored
+  append(message: Message): void {
+    const buffer = this.buffers.get(message.game_id);
+    if (!buffer) return;
+
+    const last = buffer.messages[buffer.messages.length - 1];
+    if (last && message.id !== last.id + 1) {
+      // A message we have not seen sits in between; rebuild on next access
+      this.invalidate(message.game_id);
+      return;
+    }
+
+    this.push(buffer, message);
+  }
+
+  invalidate(gameId: string): void {
+    const buffer = this.buffers.get(gameId);
+    if (!buffer) return;
+
+    this.totalMessages -= buffer.messages.length;
+    this.buffers.delete(gameId);
+  }
+
+  stats(): ChatBufferStats {
+    const lookups = this.counters.hits + this.counters.misses;
+
+    return {
+      games: this.buffers.size,
+      messages: this.totalMessages,
+      maxGames: this.options.maxGames,
+      depth: this.options.depth,
+      ...this.counters,
+      hitRate: lookups > 0 ? this.counters.hits / lookups : 0,
+    };
+  }
+
+  private push(buffer: GameChatBuffer, message: Message): void {
+    buffer.messages.push(message);
+    this.totalMessages++;
+
+    if (buffer.messages.length > this.options.depth) {
+      buffer.messages.shift();
+      buffer.complete = false;
+      this.totalMessages--;
+    }
+  }
+
+  // Buffer for a game, warmed or brought up to date with the store as needed
+  private async acquire(store: GameStore, gameId: string): Promise<GameChatBuffer | null> {
+    let buffer = this.buffers.get(gameId);
+
+    if (!buffer) {
+      const { messages, head } = await store.listLatestMessages(gameId, this.options.depth);
+      buffer = {
+        messages,
+        complete: messages.length < this.options.depth,
+        pruneCount: head.pruneCount,
+        validatedAt: Date.now(),
+      };
+      this.buffers.set(gameId, buffer);
+      this.totalMessages += messages.length;
+      this.counters.warms++;
+      this.evict();
+      return buffer;
+    }
+
+    // Mark as most recently used
+    this.buffers.delete(gameId);
+    this.buffers.set(gameId, buffer);
+
+    const now = Date.now();
+    if (now - buffer.validatedAt < this.options.revalidateMs) {
+      return buffer;
+    }
+
+    const { latestId, pruneCount } = await store.getChatHead(gameId);
+    const lastId = buffer.messages.length > 0 ? buffer.messages[buffer.messages.length - 1].id : 0;
+
+    if (latestId < lastId || pruneCount !== buffer.pruneCount) {
+      // History was reset or pruned under us
+      this.invalidate(gameId);
+      return null;
+    }
+
+    if (latestId > lastId) {
+      // Catch up with messages written by other workers, accepting only contiguous ids
+      const missing = await store.listMessages(gameId, {
+        afterId: lastId,
+        limit: this.options.depth,
+      });
+      for (const message of missing) {
+        const last = buffer.messages[buffer.messages.length - 1];
+        if (last && message.id !== last.id + 1) break;
+        this.push(buffer, message);
+      }
+
+      const caughtUp = buffer.messages[buffer.messages.length - 1]?.id ?? 0;
+      if (caughtUp < latestId) {
+        return null;
+      }
+    }
+
+    buffer.validatedAt = now;
+    return buffer;
+  }
+
+  private slice(buffer: GameChatBuffer, query: MessagePageQuery): Message[] | null {
+    const { messages } = buffer;
+    const firstId = messages.length > 0 ? messages[0].id : Infinity;
+
+    if (query.afterId !== undefined) {
+      // Everything after the cursor must be inside the window
+      if (!buffer.complete && query.afterId < firstId - 1) return null;
+      return messages.filter((m) => m.id > query.afterId!).slice(0, query.limit);
+    }
+
+    const older =
+      query.beforeId !== undefined ? messages.filter((m) => m.id < query.beforeId!) : messages;
+    if (older.length < query.limit && !buffer.complete) return null;
+    return older.slice(Math.max(0, older.length - query.limit));
+  }
+
+  private beforeWindow(buffer: GameChatBuffer, query: MessagePageQuery): boolean {
+    if (query.beforeId === undefined || buffer.complete) return false;
+    const older = buffer.messages.filter((m) => m.id < query.beforeId!);
+    return older.length < query.limit;
+  }
+
+  private evict(): void {
+    while (this.buffers.size > this.options.maxGames) {
+      const oldest = this.buffers.keys().next().value as string;
+      this.invalidate(oldest);
+      this.counters.evictions++;
+    }
+  }
+}
@@ -0,0 +1,231 @@
+// Chat retention: per-game message caps and maximum age, with separate rules for chat and
+// system messages. A pruner walks games with chat history and deletes expired messages in
+// small batches, so no single store call touches more than `batchSize` messages. A run that
+// uses up its time budget saves where it stopped, and the next run resumes from there, so
+// every game is reached however many games have chat.
+
+import type { MessageType } from '@/lib/types';
+import type { GameStore } from './store';
+
+export interface RetentionRule {
+  maxMessages: number; // newest messages kept per game; 0 = no cap
+  maxAgeMs: number; // 0 = no age limit
+}
+
+export type RetentionPolicy = Record<MessageType, RetentionRule>;
+
+export interface PruneOptions {
+  batchSize: number;
+  // Stop starting new games after this many milliseconds (keeps cron runs inside maxDuration)
+  timeBudgetMs: number;
+}
+
+export interface PruneRunResult {
+  resumed: boolean; // continued a walk an earlier run left unfinished
+  gamesScanned: number;
+  gamesPruned: number;
+  deleted: Record<MessageType, number>;
+  batches: number;
+  durationMs: number;
+  complete: boolean; // the walk reached the last game; the next run starts over
+}
+
+export interface ChatPrunerStats {
+  policy: RetentionPolicy;
+  runs: number;
+  gamesScanned: number;
+  deleted: Record<MessageType, number>;
+  batches: number;
+  lastRun: (PruneRunResult & { finishedAt: string }) | null;
+  lastError: string | null;
+}
+
+const HOUR_MS = 60 * 60 * 1000;
+const SCAN_PAGE_SIZE = 500;
+const GAME_PAGE_SIZE = 100;
+const CURSOR_JOB = 'chat-prune';
+
+function numberFromEnv(name: string, fallback: number): number {
+  const value = Number(process.env[name]);
+  return process.env[name] !== undefined && value >= 0 ? value : fallback;
+}
+
+export function retentionPolicyFromEnv(): RetentionPolicy {
+  return {
+    chat: {
+      maxMessages: numberFromEnv('CHAT_RETENTION_MAX_MESSAGES', 1000),
+      maxAgeMs: numberFromEnv('CHAT_RETENTION_MAX_AGE_HOURS', 24 * 7) * HOUR_MS,
+    },
+    system: {
+      maxMessages: numberFromEnv('CHAT_RETENTION_SYSTEM_MAX_MESSAGES', 100),
+      maxAgeMs: numberFromEnv('CHAT_RETENTION_SYSTEM_MAX_AGE_HOURS', 24) * HOUR_MS,
+    },
+  };
+}
+
+export function pruneOptionsFromEnv(): PruneOptions {
+  return {
+    batchSize: numberFromEnv('CHAT_PRUNE_BATCH_SIZE', 100) || 100,
+    timeBudgetMs: numberFromEnv('CHAT_PRUNE_TIME_BUDGET_MS', 8000),
+  };
+}
+
+// Ids of a game's messages that fall outside the policy, oldest first
+export async function expiredMessageIds(
+  store: GameStore,
+  gameId: string,
+  policy: RetentionPolicy,
+  now = Date.now()
+): Promise<number[]> {
+  const idsByType: Record<MessageType, number[]> = { chat: [], system: [] };
+  const expired = new Set<number>();
+  let afterId = 0;
+
+  for (;;) {
+    const page = await store.listMessages(gameId, { afterId, limit: SCAN_PAGE_SIZE });
+    for (const message of page) {
+      const rule = policy[message.message_type];
+      if (!rule) continue;
+
+      idsByType[message.message_type].push(message.id);
+      if (rule.maxAgeMs > 0 && now - Date.parse(message.created_at) > rule.maxAgeMs) {
+        expired.add(message.id);
+      }
+    }
+    if (page.length < SCAN_PAGE_SIZE) break;
+    afterId = page[page.length - 1].id;
+  }
+
+  for (const type of Object.keys(idsByType) as MessageType[]) {
+    const ids = idsByType[type];
+    const { maxMessages } = policy[type];
+    if (maxMessages > 0 && ids.length > maxMessages) {
+      for (const id of ids.slice(0, ids.length - maxMessages)) {
+        expired.add(id);
+      }
+    }
+  }
+
+  return [...expired].sort((a, b) => a - b);
+}
+
+export class ChatPruner {
+  private totals = {
+    runs: 0,
+    gamesScanned: 0,
+    deleted: { chat: 0, system: 0 } as Record<MessageType, number>,
+    batches: 0,
+  };
+  private lastRun: ChatPrunerStats['lastRun'] = null;
+  private lastError: string | null = null;
+  private running: Promise<PruneRunResult> | null = null;
+
+  constructor(
+    readonly policy: RetentionPolicy = retentionPolicyFromEnv(),
+    readonly options: PruneOptions = pruneOptionsFromEnv()
+  ) {}
+
+  // One pass over the games, resuming where the last run stopped; concurrent callers share
+  // the run in progress. onPruned is called with each game whose history changed (e.g. to
+  // drop chat buffers).
+  run(store: GameStore, onPruned?: (gameId: string) => void): Promise<PruneRunResult> {
+    if (!this.running) {
+      this.running = this.prune(store, onPruned).finally(() => {
+        this.running = null;
+      });
+    }
+    return this.running;
+  }
+
+  stats(): ChatPrunerStats {
+    return {
+      policy: this.policy,
+      ...this.totals,
+      deleted: { ...this.totals.deleted },
+      lastRun: this.lastRun,
+      lastError: this.lastError,
+    };
+  }
+
+  private async prune(
+    store: GameStore,
+    onPruned?: (gameId: string) => void
+  ): Promise<PruneRunResult> {
+    const startedAt = Date.now();
+    const result: PruneRunResult = {
+      resumed: false,
+      gamesScanned: 0,
+      gamesPruned: 0,
+      deleted: { chat: 0, system: 0 },
+      batches: 0,
+      durationMs: 0,
+      complete: true,
+    };
+
+    try {
+      // Saved as "<scan cursor>/<games of that page already done>"
+      const saved = await store.getJobCursor(CURSOR_JOB);
+      const [savedCursor, savedDone] = (saved ?? '0/0').split('/');
+      let cursor = savedCursor;
+      let done = Number(savedDone) || 0;
+      result.resumed = saved !== null;
+
+      do {
+        const page = await store.scanChatGameIds(cursor, GAME_PAGE_SIZE);
+
+        for (; done < page.ids.length; done++) {
+          // Every run handles at least one game, so a walk always moves forward
+          if (result.gamesScanned > 0 && Date.now() - startedAt > this.options.timeBudgetMs) {
+            result.complete = false;
+            break;
+          }
+
+          const gameId = page.ids[done];
+          result.gamesScanned++;
+          const ids = await expiredMessageIds(store, gameId, this.policy, startedAt);
+          if (ids.length === 0) continue;
+
+          for (let i = 0; i < ids.length; i += this.options.batchSize) {
+            const batch = ids.slice(i, i + this.options.batchSize);
+            const deleted = await store.deleteMessages(gameId, batch);
+            for (const message of deleted) {
+              result.deleted[message.message_type]++;
+            }
+            result.batches++;
+          }
+
+          result.gamesPruned++;
+          onPruned?.(gameId);
+        }
+
+        if (!result.complete) break;
+        cursor = page.cursor;
+        done = 0;
+      } while (cursor !== '0');
+
+      if (!result.complete) {
+        await store.saveJobCursor(CURSOR_JOB, `${cursor}/${done}`);
+      } else if (result.resumed) {
+        await store.saveJobCursor(CURSOR_JOB, null);
+      }
+      this.lastError = null;
+    } catch (error) {
+      this.lastError = error instanceof Error ? error.message : String(error);
+      throw error;
+    } finally {
+      result.durationMs = Date.now() - startedAt;
+      this.record(result);
+    }
+
+    return result;
+  }
+
+  private record(result: PruneRunResult): void {
+    this.totals.runs++;
+    this.totals.gamesScanned += result.gamesScanned;
+    this.totals.batches += result.batches;
+    this.totals.deleted.chat += result.deleted.chat;
+    this.totals.deleted.system += result.deleted.system;
+    this.lastRun = { ...result, finishedAt: new Date().toISOString() };
+  }
+}
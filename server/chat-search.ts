@@ -0,0 +1,259 @@
+// Full-text search over chat messages
+// Stores keep an inverted index (term -> message refs, newest first) in sync on every append;
+// this module tokenizes, plans the lookup, ranks candidates with BM25 and builds snippets.
+//
+// Index lookups read the rarest term's postings a page at a time, newest first. Matches are
+// ranked among the postings read: at least one page, and more while the requested page is
+// not yet filled. Past MAX_POSTINGS_READ the search stops and reports `truncated`.
+
+import type { Message } from '@/lib/types';
+import type { GameStore } from './store';
+
+const TOKEN_PATTERN = /[\p{L}\p{N}]+/gu;
+const MIN_TERM_LENGTH = 2;
+const MAX_TERMS_PER_MESSAGE = 64;
+const MAX_QUERY_TERMS = 8;
+
+// Postings of the rarest query term read per store call, and at most per search
+const POSTINGS_PAGE_SIZE = 2000;
+const MAX_POSTINGS_READ = 20_000;
+
+// BM25 parameters
+const K1 = 1.2;
+const B = 0.75;
+
+// Reference to a message in the index: `${game_id}:${id}`
+export type MessageRef = string;
+
+export function messageRef(message: Pick<Message, 'game_id' | 'id'>): MessageRef {
+  return `${message.game_id}:${message.id}`;
+}
+
+export function parseMessageRef(ref: MessageRef): { gameId: string; id: number } {
+  const separator = ref.lastIndexOf(':');
+  return { gameId: ref.slice(0, separator), id: Number(ref.slice(separator + 1)) };
+}
+
+function normalize(text: string): string {
+  return text.normalize('NFKC').toLowerCase();
+}
+
+// Distinct index terms of a text, in order of first appearance
+export function tokenize(text: string): string[] {
+  const terms = new Set<string>();
+  for (const match of normalize(text).matchAll(TOKEN_PATTERN)) {
+    if (match[0].length >= MIN_TERM_LENGTH) {
+      terms.add(match[0]);
+      if (terms.size >= MAX_TERMS_PER_MESSAGE) break;
+    }
+  }
+  return [...terms];
+}
+
+function termFrequencies(text: string): { counts: Map<string, number>; length: number } {
+  const counts = new Map<string, number>();
+  let length = 0;
+  for (const match of normalize(text).matchAll(TOKEN_PATTERN)) {
+    length++;
+    counts.set(match[0], (counts.get(match[0]) ?? 0) + 1);
+  }
+  return { counts, length };
+}
+
+export interface Snippet {
+  snippet: string;
+  highlights: [number, number][]; // [start, end) offsets of matched terms within snippet
+}
+
+export function makeSnippet(content: string, terms: string[], radius = 40): Snippet {
+  const text = content.normalize('NFKC');
+  const lower = text.toLowerCase();
+  // Case mapping can change length for a few scripts; fall back to the lowercased text
+  const display = lower.length === text.length ? text : lower;
+
+  const ranges: [number, number][] = [];
+  for (const term of terms) {
+    for (let i = lower.indexOf(term); i !== -1; i = lower.indexOf(term, i + term.length)) {
+      ranges.push([i, i + term.length]);
+    }
+  }
+  ranges.sort((a, b) => a[0] - b[0]);
+
+  const first = ranges.length > 0 ? ranges[0][0] : 0;
+  const start = Math.max(0, first - radius);
+  const end = Math.min(display.length, first + radius * 2);
+  const prefix = start > 0 ? '…' : '';
+  const suffix = end < display.length ? '…' : '';
+
+  const highlights: [number, number][] = [];
+  let lastEnd = -1;
+  for (const [from, to] of ranges) {
+    if (from < start || to > end || from < lastEnd) continue;
+    highlights.push([from - start + prefix.length, to - start + prefix.length]);
+    lastEnd = to;
+  }
+
+  return { snippet: prefix + display.slice(start, end) + suffix, highlights };
+}
+
+export interface ChatSearchQuery {
+  q: string;
+  gameId?: string;
+  playerId?: string;
+  from?: number; // epoch ms, inclusive
+  to?: number; // epoch ms, inclusive
+  limit: number;
+  offset: number;
+}
+
+export interface ChatSearchHit extends Snippet {
+  message: Message;
+  score: number;
+}
+
+export interface ChatSearchPage {
+  results: ChatSearchHit[];
+  next_cursor: number | null;
+  // Older postings were left unread (MAX_POSTINGS_READ): there may be more matches than listed
+  truncated: boolean;
+}
+
+interface Match {
+  message: Message;
+  score: number;
+  length: number;
+  tf: number[];
+}
+
+// Term frequencies of a message that passes every filter, or null
+function matchMessage(message: Message, terms: string[], query: ChatSearchQuery): Match | null {
+  if (query.playerId && message.player_id !== query.playerId) return null;
+  const time = Date.parse(message.created_at);
+  if (query.from !== undefined && time < query.from) return null;
+  if (query.to !== undefined && time > query.to) return null;
+
+  // Every query term must occur (AND semantics); this also drops stale postings
+  const { counts, length } = termFrequencies(message.content);
+  const tf = terms.map((term) => counts.get(term) ?? 0);
+  if (tf.some((count) => count === 0)) return null;
+
+  return { message, score: 0, length, tf };
+}
+
+// Messages of a single game that may match; scanning one game's history is cheap
+async function gameCandidates(store: GameStore, gameId: string): Promise<Message[]> {
+  const messages: Message[] = [];
+  let afterId = 0;
+
+  for (;;) {
+    const page = await store.listMessages(gameId, { afterId, limit: 500 });
+    messages.push(...page);
+    if (page.length < 500) return messages;
+    afterId = page[page.length - 1].id;
+  }
+}
+
+// Matches from the rarest query term's postings, read until the requested page and one more
+// match are covered (so next_cursor is exact), the postings run out, or the read cap is hit
+async function indexMatches(
+  store: GameStore,
+  terms: string[],
+  query: ChatSearchQuery,
+  frequencies: number[]
+): Promise<{ matches: Match[]; truncated: boolean }> {
+  let rarest = 0;
+  for (let i = 1; i < terms.length; i++) {
+    if (frequencies[i] < frequencies[rarest]) rarest = i;
+  }
+
+  const wanted = query.offset + query.limit + 1;
+  const seen = new Set<MessageRef>();
+  const matches: Match[] = [];
+  let read = 0;
+
+  for (;;) {
+    const refs = await store.searchPostings(terms[rarest], {
+      from: query.from,
+      to: query.to,
+      offset: read,
+      limit: POSTINGS_PAGE_SIZE,
+    });
+    read += refs.length;
+
+    // Postings written since the last page shift offsets, so a ref can come up twice
+    const fresh = refs.filter((ref) => !seen.has(ref));
+    fresh.forEach((ref) => seen.add(ref));
+    for (const message of await store.getMessagesByRef(fresh)) {
+      const match = message && matchMessage(message, terms, query);
+      if (match) matches.push(match);
+    }
+
+    if (refs.length < POSTINGS_PAGE_SIZE || matches.length >= wanted) {
+      return { matches, truncated: false };
+    }
+    if (read >= MAX_POSTINGS_READ) {
+      return { matches, truncated: true };
+    }
+  }
+}
+
+export async function searchChat(
+  store: GameStore,
+  query: ChatSearchQuery
+): Promise<ChatSearchPage> {
+  const terms = tokenize(query.q).slice(0, MAX_QUERY_TERMS);
+  if (terms.length === 0) {
+    return { results: [], next_cursor: null, truncated: false };
+  }
+
+  const [frequencies, totalDocuments] = await Promise.all([
+    store.countPostings(terms),
+    store.countIndexedMessages(),
+  ]);
+
+  if (frequencies.some((df) => df === 0) && !query.gameId) {
+    return { results: [], next_cursor: null, truncated: false };
+  }
+
+  let scored: Match[];
+  let truncated = false;
+  if (query.gameId) {
+    const candidates = await gameCandidates(store, query.gameId);
+    scored = candidates.flatMap((message) => matchMessage(message, terms, query) ?? []);
+  } else {
+    ({ matches: scored, truncated } = await indexMatches(store, terms, query, frequencies));
+  }
+
+  // Inverse document frequency per term (BM25 variant, always positive)
+  const idf = frequencies.map((df) =>
+    Math.log(1 + (totalDocuments - df + 0.5) / (df + 0.5))
+  );
+
+  const totalLength = scored.reduce((sum, entry) => sum + entry.length, 0);
+  const averageLength = scored.length > 0 ? totalLength / scored.length : 1;
+  for (const entry of scored) {
+    const norm = K1 * (1 - B + (B * entry.length) / averageLength);
+    entry.score = entry.tf.reduce(
+      (sum, tf, i) => sum + (idf[i] * (tf * (K1 + 1))) / (tf + norm),
+      0
+    );
+  }
+
+  // Best score first, newest first among equals
+  scored.sort(
+    (a, b) => b.score - a.score || b.message.created_at.localeCompare(a.message.created_at)
+  );
+
+  const page = scored.slice(query.offset, query.offset + query.limit);
+  const nextOffset = query.offset + page.length;
+
+  return {
+    results: page.map(({ message, score }) => ({
+      message,
+      score: Math.round(score * 1000) / 1000,
+      ...makeSnippet(message.content, terms),
+    })),
+    next_cursor: nextOffset < scored.length ? nextOffset : null,
+    truncated,
+  };
+}
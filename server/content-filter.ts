@@ -0,0 +1,304 @@
+// Banned-term filter for chat messages
+// Terms are compiled into an Aho-Corasick automaton, so checking a message is a single pass
+// over its characters whatever the size of the term list. Text is folded before matching
+// (NFKD, accents stripped, lowercase, leetspeak digits and @/$ mapped to letters) and
+// matches are only accepted on word boundaries, so "class" does not trip on "ass".
+// The term list is reloaded from CHAT_FILTER_TERMS_FILE when the file changes; a reload
+// builds a new automaton and swaps it in with a single assignment.
+
+import { readFile, stat } from 'node:fs/promises';
+
+const LEET: Record<string, string> = {
+  '0': 'o',
+  '1': 'i',
+  '3': 'e',
+  '4': 'a',
+  '5': 's',
+  '7': 't',
+  '8': 'b',
+  '9': 'g',
+  '@': 'a',
+  $: 's',
+};
+
+const COMBINING_MARKS = /\p{M}/gu;
+const WORD_CHAR = /[\p{L}\p{N}]/u;
+
+// Folded form of single characters; the alphabet seen in chat is small
+const foldCache = new Map<string, string>();
+const FOLD_CACHE_LIMIT = 4096;
+
+function foldChar(char: string): string {
+  let folded = foldCache.get(char);
+  if (folded === undefined) {
+    folded = char.normalize('NFKD').replace(COMBINING_MARKS, '').toLowerCase();
+    folded = folded.length === 1 ? LEET[folded] ?? folded : folded;
+    if (foldCache.size < FOLD_CACHE_LIMIT) foldCache.set(char, folded);
+  }
+  return folded;
+}
+
+interface FoldedText {
+  text: string;
+  // For each folded code unit, the offsets of the original character it came from
+  start: Int32Array;
+  end: Int32Array;
+}
+
+export function foldText(input: string): FoldedText {
+  const parts: string[] = [];
+  const start: number[] = [];
+  const end: number[] = [];
+  let offset = 0;
+
+  for (const char of input) {
+    const folded = foldChar(char);
+    for (let i = 0; i < folded.length; i++) {
+      start.push(offset);
+      end.push(offset + char.length);
+    }
+    parts.push(folded);
+    offset += char.length;
+  }
+
+  return { text: parts.join(''), start: Int32Array.from(start), end: Int32Array.from(end) };
+}
+
+function isWordChar(text: string, index: number): boolean {
+  return index >= 0 && index < text.length && WORD_CHAR.test(text[index]);
+}
+
+// Aho-Corasick automaton over UTF-16 code units of folded terms
+class Automaton {
+  // Transitions keyed by state * 0x10000 + code unit
+  private readonly next = new Map<number, number>();
+  private readonly fail: Int32Array;
+  // Length of the term ending at a state (0 when none); every state spells a single string
+  private readonly termLength: Int32Array;
+  // Nearest proper suffix state that ends a term
+  private readonly outputLink: Int32Array;
+  readonly terms: number;
+  readonly states: number;
+
+  constructor(terms: string[]) {
+    const children: [number, number][][] = [[]];
+    const length: number[] = [0];
+    let termCount = 0;
+
+    for (const term of terms) {
+      const folded = foldText(term.trim()).text;
+      if (!folded) continue;
+
+      let state = 0;
+      for (let i = 0; i < folded.length; i++) {
+        const key = state * 0x10000 + folded.charCodeAt(i);
+        let child = this.next.get(key);
+        if (child === undefined) {
+          child = children.length;
+          children.push([]);
+          length.push(0);
+          this.next.set(key, child);
+          children[state].push([folded.charCodeAt(i), child]);
+        }
+        state = child;
+      }
+      if (length[state] === 0) termCount++;
+      length[state] = folded.length;
+    }
+
+    this.terms = termCount;
+    this.states = children.length;
+    this.termLength = Int32Array.from(length);
+    this.fail = new Int32Array(this.states);
+    this.outputLink = new Int32Array(this.states);
+
+    // Breadth-first, so every state's fail target is finished before its children
+    const queue: number[] = children[0].map(([, child]) => child);
+    for (let head = 0; head < queue.length; head++) {
+      const state = queue[head];
+      for (const [unit, child] of children[state]) {
+        let fallback = this.fail[state];
+        while (fallback > 0 && !this.next.has(fallback * 0x10000 + unit)) {
+          fallback = this.fail[fallback];
+        }
+        const target = this.next.get(fallback * 0x10000 + unit);
+        const failState = target !== undefined && target !== child ? target : 0;
+
+        this.fail[child] = failState;
+        this.outputLink[child] =
+          this.termLength[failState] > 0 ? failState : this.outputLink[failState];
+        queue.push(child);
+      }
+    }
+  }
+
+  // [start, end) ranges in the folded text of every term occurrence on word boundaries
+  search(text: string): [number, number][] {
+    const matches: [number, number][] = [];
+    let state = 0;
+
+    for (let i = 0; i < text.length; i++) {
+      const unit = text.charCodeAt(i);
+      let target = this.next.get(state * 0x10000 + unit);
+      while (target === undefined && state > 0) {
+        state = this.fail[state];
+        target = this.next.get(state * 0x10000 + unit);
+      }
+      state = target ?? 0;
+
+      let output = this.termLength[state] > 0 ? state : this.outputLink[state];
+      while (output > 0) {
+        const from = i + 1 - this.termLength[output];
+        if (!isWordChar(text, from - 1) && !isWordChar(text, i + 1)) {
+          matches.push([from, i + 1]);
+        }
+        output = this.outputLink[output];
+      }
+    }
+
+    return matches;
+  }
+}
+
+export type ContentFilterAction = 'mask' | 'reject';
+
+export interface ContentFilterResult {
+  text: string; // input with matched terms masked
+  matches: number;
+}
+
+export interface ContentFilterStats {
+  terms: number;
+  states: number;
+  action: ContentFilterAction;
+  source: string | null;
+  loadedAt: string | null;
+  reloads: number;
+  checked: number;
+  flagged: number;
+  lastError: string | null;
+}
+
+export interface ContentFilterOptions {
+  action: ContentFilterAction;
+  termsFile: string | null;
+  // How often the terms file is checked for changes
+  reloadIntervalMs: number;
+}
+
+export function contentFilterOptionsFromEnv(): ContentFilterOptions {
+  return {
+    action: process.env.CHAT_FILTER_ACTION === 'reject' ? 'reject' : 'mask',
+    termsFile: process.env.CHAT_FILTER_TERMS_FILE || null,
+    reloadIntervalMs: Number(process.env.CHAT_FILTER_RELOAD_MS || 30_000),
+  };
+}
+
+// One term per line; blank lines and lines starting with # are ignored
+export function parseTermList(source: string): string[] {
+  return source
+    .split('\n')
+    .map((line) => line.trim())
+    .filter((line) => line && !line.startsWith('#'));
+}
+
+export class ContentFilter {
+  private automaton: Automaton;
+  private loadedAt: number | null = null;
+  private fileMtimeMs = 0;
+  private lastCheckAt = 0;
+  private reloading: Promise<void> | null = null;
+  private counters = { reloads: 0, checked: 0, flagged: 0 };
+  private lastError: string | null = null;
+
+  constructor(
+    readonly options: ContentFilterOptions = contentFilterOptionsFromEnv(),
+    terms: string[] = []
+  ) {
+    this.automaton = new Automaton(terms);
+    if (terms.length > 0) this.loadedAt = Date.now();
+  }
+
+  get action(): ContentFilterAction {
+    return this.options.action;
+  }
+
+  // Build the new automaton first, then swap; checks in flight keep the old one
+  reload(terms: string[]): void {
+    const automaton = new Automaton(terms);
+    this.automaton = automaton;
+    this.loadedAt = Date.now();
+    this.counters.reloads++;
+  }
+
+  // Resolves once the terms file has been loaded for the first time (no-op without a file)
+  async ready(): Promise<void> {
+    this.refreshInBackground();
+    if (this.fileMtimeMs === 0 && this.reloading) {
+      await this.reloading;
+    }
+  }
+
+  check(text: string): ContentFilterResult {
+    this.refreshInBackground();
+    this.counters.checked++;
+
+    const folded = foldText(text);
+    const matches = this.automaton.search(folded.text);
+    if (matches.length === 0) {
+      return { text, matches: 0 };
+    }
+
+    this.counters.flagged++;
+    const masked = text.split('');
+    for (const [from, to] of matches) {
+      for (let i = folded.start[from]; i < folded.end[to - 1]; i++) {
+        masked[i] = '*';
+      }
+    }
+    return { text: masked.join(''), matches: matches.length };
+  }
+
+  // Load the terms file now (first use) or when it has changed since the last load
+  async refresh(): Promise<void> {
+    const { termsFile } = this.options;
+    if (!termsFile) return;
+
+    try {
+      const { mtimeMs } = await stat(termsFile);
+      if (mtimeMs === this.fileMtimeMs) return;
+
+      this.reload(parseTermList(await readFile(termsFile, 'utf8')));
+      this.fileMtimeMs = mtimeMs;
+      this.lastError = null;
+      console.log(`[ContentFilter] Loaded ${this.automaton.terms} terms from ${termsFile}`);
+    } catch (error) {
+      // Keep filtering with the previous list
+      this.lastError = error instanceof Error ? error.message : String(error);
+      console.error('[ContentFilter] Failed to load terms:', error);
+    }
+  }
+
+  stats(): ContentFilterStats {
+    return {
+      terms: this.automaton.terms,
+      states: this.automaton.states,
+      action: this.options.action,
+      source: this.options.termsFile,
+      loadedAt: this.loadedAt ? new Date(this.loadedAt).toISOString() : null,
+      ...this.counters,
+      lastError: this.lastError,
+    };
+  }
+
+  private refreshInBackground(): void {
+    const now = Date.now();
+    if (!this.options.termsFile || this.reloading) return;
+    if (this.lastCheckAt > 0 && now - this.lastCheckAt < this.options.reloadIntervalMs) return;
+
+    this.lastCheckAt = now;
+    this.reloading = this.refresh().finally(() => {
+      this.reloading = null;
+    });
+  }
+}
@@ -0,0 +1,76 @@
+// Shared server context: resources created once per process and reused by every API route
+// Stored on globalThis so route bundles and dev hot reloads see the same instance
+// Heavy clients (Pusher, KV) are created lazily on first use to keep cold starts short
+
+import type Pusher from 'pusher';
+import { ChatBufferPool } from './chat-buffer';
+import { ChatPruner } from './chat-retention';
+import { ContentFilter } from './content-filter';
+import { InviteCodeAllocator } from './invite-codes';
+import { MemoryDiagnostics } from './memory';
+import { RequestMetrics } from './metrics';
+import { getPusherServer } from './pusher';
+import { createRateLimiters, type RateLimitedEndpoint, type RateLimiter } from './rate-limit';
+import { instrumentStore } from './request-scope';
+import { GameStateCache } from './state-cache';
+import { createStore, type GameStore } from './store';
+import { Tracer } from './tracing';
+
+export interface ServerContext {
+  startedAt: number;
+  store: GameStore;
+  getPusher: () => Promise<Pusher>;
+  stateCache: GameStateCache;
+  chatBuffers: ChatBufferPool;
+  chatPruner: ChatPruner;
+  contentFilter: ContentFilter;
+  inviteCodes: InviteCodeAllocator;
+  rateLimiters: Record<RateLimitedEndpoint, RateLimiter>;
+  metrics: RequestMetrics;
+  tracer: Tracer;
+  memory: MemoryDiagnostics;
+}
+
+const globalForContext = globalThis as unknown as { __serverContext?: ServerContext };
+
+function initServerContext(overrides: Partial<ServerContext> = {}): ServerContext {
+  const startedAt = Date.now();
+
+  const context: ServerContext = {
+    startedAt,
+    // Store calls are timed per request for the metrics
+    store: instrumentStore(overrides.store ?? createStore()),
+    getPusher: overrides.getPusher ?? getPusherServer,
+    stateCache: overrides.stateCache ?? new GameStateCache(),
+    chatBuffers: overrides.chatBuffers ?? new ChatBufferPool(),
+    chatPruner: overrides.chatPruner ?? new ChatPruner(),
+    contentFilter: overrides.contentFilter ?? new ContentFilter(),
+    inviteCodes: overrides.inviteCodes ?? new InviteCodeAllocator(),
+    rateLimiters: overrides.rateLimiters ?? createRateLimiters(),
+    metrics: overrides.metrics ?? new RequestMetrics(),
+    tracer: overrides.tracer ?? new Tracer(),
+    memory: overrides.memory ?? new MemoryDiagnostics(),
+  };
+  // Opt-in: the sampling heap profiler and SIGUSR2 handler (MEMORY_DIAGNOSTICS=1)
+  context.memory.start();
+
+  console.log(
+    `[Context] Initialized in ${Date.now() - startedAt}ms (store: ${context.store.kind})`
+  );
+
+  return context;
+}
+
+export function getServerContext(): ServerContext {
+  if (!globalForContext.__serverContext) {
+    globalForContext.__serverContext = initServerContext();
+  }
+
+  return globalForContext.__serverContext;
+}
+
+// Replace the shared context (used by tests and benchmarks)
+export function resetServerContext(overrides: Partial<ServerContext> = {}): ServerContext {
+  globalForContext.__serverContext = initServerContext(overrides);
+  return globalForContext.__serverContext;
+}
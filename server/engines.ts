@@ -0,0 +1,176 @@
+// Move engines for AI players and self-play (see server/selfplay.ts)
+// An engine picks a cell for the player to move on a GameBoard, the board the shared rules in
+// lib/game-logic work on. Engines are built from a spec: "random", "heuristic", or settings
+// after a colon, e.g. "heuristic:defense=0.5,noise=0.1".
+//
+// heuristic scores each candidate cell by the lines it would extend for the player plus,
+// weighted by `defense`, the lines it would cut for the opponent: longer lines and lines
+// open at both ends score higher, and a completed line beats everything. Gomoku candidates
+// are the empty cells within two of a stone. `noise` is the chance of a random candidate
+// instead of the best one.
+
+import { getBoardSize } from '@/lib/game-logic';
+import type { GameBoard, GameMode } from '@/lib/types';
+
+export type EngineKind = 'random' | 'heuristic';
+
+export interface EngineSettings {
+  kind: EngineKind;
+  defense: number;
+  noise: number;
+}
+
+export interface Engine {
+  spec: string;
+  settings: EngineSettings;
+  // Returns [row, column] of an empty cell; random is the game's seeded generator
+  move(board: GameBoard, player: 1 | 2, random: () => number): [number, number];
+}
+
+const DEFAULTS: Record<EngineKind, EngineSettings> = {
+  random: { kind: 'random', defense: 0, noise: 1 },
+  heuristic: { kind: 'heuristic', defense: 0.9, noise: 0 },
+};
+
+const DIRECTIONS = [
+  [0, 1],
+  [1, 0],
+  [1, 1],
+  [1, -1],
+];
+
+const WIN_SCORE = 1e8;
+
+export function parseEngineSpec(spec: string): EngineSettings {
+  const [kind, options = ''] = spec.split(':');
+  if (!(kind in DEFAULTS)) {
+    throw new Error(`Unknown engine "${kind}" (expected ${Object.keys(DEFAULTS).join(', ')})`);
+  }
+
+  const settings = { ...DEFAULTS[kind as EngineKind] };
+  for (const option of options.split(',').filter(Boolean)) {
+    const [key, value] = option.split('=');
+    if ((key !== 'defense' && key !== 'noise') || !Number.isFinite(Number(value))) {
+      throw new Error(`Invalid engine setting "${option}" in ${spec}`);
+    }
+    settings[key] = Number(value);
+  }
+  return settings;
+}
+
+function winLength(mode: GameMode): number {
+  return mode === 'classic3' ? 3 : 5;
+}
+
+function owner(board: GameBoard, row: number, column: number): number | null {
+  if (row < 0 || row >= board.size || column < 0 || column >= board.size) return -1;
+  return board.cells[row][column].player_number;
+}
+
+// Value of the line through an empty cell in one direction if player took the cell
+function lineScore(
+  board: GameBoard,
+  row: number,
+  column: number,
+  [dr, dc]: number[],
+  player: number,
+  length: number
+): number {
+  let count = 1;
+  let open = 0;
+
+  for (const sign of [1, -1]) {
+    let r = row + dr * sign;
+    let c = column + dc * sign;
+    while (owner(board, r, c) === player) {
+      count++;
+      r += dr * sign;
+      c += dc * sign;
+    }
+    if (owner(board, r, c) === null) open++;
+  }
+
+  if (count >= length) return WIN_SCORE;
+  if (open === 0) return 0;
+  // One short of a win: unstoppable when open at both ends
+  if (count === length - 1) return open === 2 ? 1e6 : 1e4;
+  return 10 ** count * open;
+}
+
+function candidates(board: GameBoard, mode: GameMode): [number, number][] {
+  const { size, cells } = board;
+  const empty: [number, number][] = [];
+  const near: [number, number][] = [];
+  let stones = 0;
+
+  for (let row = 0; row < size; row++) {
+    for (let column = 0; column < size; column++) {
+      if (cells[row][column].player_number !== null) {
+        stones++;
+        continue;
+      }
+      empty.push([row, column]);
+      if (mode !== 'gomoku') continue;
+
+      let isNear = false;
+      for (let r = row - 2; r <= row + 2 && !isNear; r++) {
+        for (let c = column - 2; c <= column + 2 && !isNear; c++) {
+          const stone = owner(board, r, c);
+          isNear = stone === 1 || stone === 2;
+        }
+      }
+      if (isNear) near.push([row, column]);
+    }
+  }
+
+  if (mode === 'gomoku') {
+    const center = Math.floor(size / 2);
+    return stones === 0 ? [[center, center]] : near;
+  }
+  return empty;
+}
+
+export function createEngine(spec: string, mode: GameMode): Engine {
+  const settings = parseEngineSpec(spec);
+  const length = winLength(mode);
+  const size = getBoardSize(mode);
+
+  const move = (board: GameBoard, player: 1 | 2, random: () => number): [number, number] => {
+    if (board.size !== size) {
+      throw new Error(`Engine ${spec} plays ${mode}, got a ${board.size}×${board.size} board`);
+    }
+
+    const options = candidates(board, mode);
+    if (options.length === 0) {
+      throw new Error('No empty cell to play');
+    }
+    if (random() < settings.noise) {
+      return options[Math.floor(random() * options.length)];
+    }
+
+    const opponent = player === 1 ? 2 : 1;
+    let best = -1;
+    let choice = options[0];
+    let ties = 0;
+
+    for (const [row, column] of options) {
+      let score = 0;
+      for (const direction of DIRECTIONS) {
+        score += lineScore(board, row, column, direction, player, length);
+        score += settings.defense * lineScore(board, row, column, direction, opponent, length);
+      }
+
+      // Equal scores are broken at random (reservoir sampling), so games vary
+      if (score > best) {
+        best = score;
+        choice = [row, column];
+        ties = 1;
+      } else if (score === best && random() * ++ties < 1) {
+        choice = [row, column];
+      }
+    }
+    return choice;
+  };
+
+  return { spec, settings, move };
+}
@@ -0,0 +1,94 @@
+// Streaming bulk export of games with their players, moves and chat
+// Games are read in chunks from a keyspace scan, so memory use is bounded by one chunk of
+// game records plus one game's chat history, however many games are exported.
+// After every chunk a cursor event is emitted; passing it back resumes the export there.
+// A walk never emits a game twice, but SCAN may return an id again after a resume, so
+// consumers that stitch exports together across requests must de-duplicate by game id.
+
+import type { GameStatus, Message } from '@/lib/types';
+import { gameHeader, serializeMoves } from './serialize';
+import type { GameStore, StoredGame } from './store';
+
+const DEFAULT_CHUNK_SIZE = 100;
+const MESSAGE_PAGE_SIZE = 500;
+
+export interface ExportFilter {
+  status?: GameStatus;
+  mode?: string;
+  from?: number; // created_at lower bound, epoch ms inclusive
+  to?: number; // created_at upper bound, epoch ms inclusive
+}
+
+export interface ExportOptions extends ExportFilter {
+  cursor?: string; // from a previous export's cursor event; omit to start from the beginning
+  chunkSize?: number;
+}
+
+export type ExportEvent =
+  | { type: 'game'; game: StoredGame; messages: Message[] }
+  // cursor is null once the export is complete
+  | { type: 'cursor'; cursor: string | null; exported: number };
+
+function matches(game: StoredGame, filter: ExportFilter): boolean {
+  if (filter.status && game.status !== filter.status) return false;
+  if (filter.mode && game.mode !== filter.mode) return false;
+
+  const created = Date.parse(game.created_at);
+  if (filter.from !== undefined && created < filter.from) return false;
+  if (filter.to !== undefined && created > filter.to) return false;
+  return true;
+}
+
+async function listAllMessages(store: GameStore, gameId: string): Promise<Message[]> {
+  const messages: Message[] = [];
+  let afterId = 0;
+
+  for (;;) {
+    const page = await store.listMessages(gameId, { afterId, limit: MESSAGE_PAGE_SIZE });
+    messages.push(...page);
+    if (page.length < MESSAGE_PAGE_SIZE) return messages;
+    afterId = page[page.length - 1].id;
+  }
+}
+
+export async function* exportGames(
+  store: GameStore,
+  options: ExportOptions = {}
+): AsyncGenerator<ExportEvent> {
+  const chunkSize = options.chunkSize ?? DEFAULT_CHUNK_SIZE;
+  let cursor = options.cursor ?? '0';
+  let exported = 0;
+  const seen = new Set<string>(); // SCAN may return an id more than once
+
+  do {
+    const page = await store.scanGameIds(cursor, chunkSize);
+    cursor = page.cursor;
+
+    const ids = page.ids.filter((id) => !seen.has(id));
+    ids.forEach((id) => seen.add(id));
+    const games = await store.getGames(ids);
+    for (const game of games) {
+      if (!game || !matches(game, options)) continue;
+
+      yield { type: 'game', game, messages: await listAllMessages(store, game.id) };
+      exported++;
+    }
+
+    yield { type: 'cursor', cursor: cursor === '0' ? null : cursor, exported };
+  } while (cursor !== '0');
+}
+
+// One NDJSON line (including the trailing newline) for an export event
+export function serializeExportEvent(event: ExportEvent): string {
+  if (event.type === 'cursor') {
+    return `${JSON.stringify(event)}\n`;
+  }
+
+  const { game, messages } = event;
+  return (
+    `{"type":"game","game":${JSON.stringify(gameHeader(game))},` +
+    `"players":${JSON.stringify(game.players)},` +
+    `"moves":${serializeMoves(game.moves ?? [])},` +
+    `"messages":${JSON.stringify(messages)}}\n`
+  );
+}
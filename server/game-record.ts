@@ -0,0 +1,493 @@
+// Compact binary game records for archives and replay datasets
+// As NDJSON every move repeats the game id, the player id and an ISO timestamp. Here a move
+// is one byte (the cell index, row * size + column) and a varint time delta; the player
+// follows from the move number, since players alternate starting with player 1.
+//
+// File: "GREC" and a format version byte, then records back to back. Each record is a
+// varint body length, the body and the CRC32 of the body (uint32 LE). Body:
+//   u8       mode (bits 0-1), status (2-3), winner's player number (4-5),
+//            has started_at (6), has finished_at (7)
+//   varint   created_at, epoch ms
+//   svarint  started_at and finished_at minus created_at, when present
+//   string   game id, invite code
+//   u8       player count; per player: string id, string name, u8 is_ai,
+//            svarint joined_at minus created_at
+//   varint   move count, then one byte per move, then one svarint per move: ms since the
+//            previous move (the first one since started_at, or created_at)
+// Strings are a varint byte length and UTF-8; svarints are zigzag encoded.
+//
+// Records decode one at a time, so reading a file keeps one chunk in memory however many
+// games it holds.
+
+import { createReadStream } from 'node:fs';
+import { once } from 'node:events';
+import type { Writable } from 'node:stream';
+import { getBoardSize } from '@/lib/game-logic';
+import type { GameMode, GameStatus, Move, Player } from '@/lib/types';
+import { serializeExportEvent } from './export';
+import type { StoredGame } from './store';
+
+const MAGIC = [0x47, 0x52, 0x45, 0x43]; // "GREC"
+const FORMAT_VERSION = 1;
+const FILE_HEADER = Uint8Array.from([...MAGIC, FORMAT_VERSION]);
+// A full Gomoku board with long names is a few KB; anything larger is a corrupt length
+const MAX_RECORD_BYTES = 1 << 20;
+
+const MODES: GameMode[] = ['classic3', 'gomoku'];
+const STATUSES: GameStatus[] = ['waiting', 'active', 'completed', 'abandoned'];
+
+export interface GameRecordPlayer {
+  id: string;
+  name: string;
+  isAi: boolean;
+  joinedAt: number;
+}
+
+export interface GameRecord {
+  id: string;
+  inviteCode: string;
+  mode: GameMode;
+  status: GameStatus;
+  winner: 0 | 1 | 2; // player number, 0 for none
+  createdAt: number; // epoch ms
+  startedAt: number | null;
+  finishedAt: number | null;
+  players: GameRecordPlayer[]; // in player_number order
+  cells: Uint8Array; // row * size + column, per move
+  moveTimes: number[]; // epoch ms, per move
+}
+
+// CRC-32 (IEEE), as used by zip and PNG
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256);
+  for (let n = 0; n < 256; n++) {
+    let c = n;
+    for (let k = 0; k < 8; k++) {
+      c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+    }
+    table[n] = c >>> 0;
+  }
+  return table;
+})();
+
+export function crc32(bytes: Uint8Array, start = 0, end = bytes.length): number {
+  let crc = 0xffffffff;
+  for (let i = start; i < end; i++) {
+    crc = CRC_TABLE[(crc ^ bytes[i]) & 0xff] ^ (crc >>> 8);
+  }
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+const encoder = new TextEncoder();
+const decoder = new TextDecoder();
+
+// Growable output buffer; varints use arithmetic so values above 2^32 (timestamps) survive
+class ByteWriter {
+  bytes = new Uint8Array(1024);
+  length = 0;
+
+  reset(): void {
+    this.length = 0;
+  }
+
+  private reserve(count: number): void {
+    if (this.length + count <= this.bytes.length) return;
+    const grown = new Uint8Array(Math.max(this.bytes.length * 2, this.length + count));
+    grown.set(this.bytes.subarray(0, this.length));
+    this.bytes = grown;
+  }
+
+  u8(value: number): void {
+    this.reserve(1);
+    this.bytes[this.length++] = value;
+  }
+
+  u32(value: number): void {
+    this.reserve(4);
+    new DataView(this.bytes.buffer).setUint32(this.length, value, true);
+    this.length += 4;
+  }
+
+  varint(value: number): void {
+    this.reserve(8);
+    while (value >= 0x80) {
+      this.bytes[this.length++] = (value % 0x80) | 0x80;
+      value = Math.floor(value / 0x80);
+    }
+    this.bytes[this.length++] = value;
+  }
+
+  svarint(value: number): void {
+    this.varint(value >= 0 ? value * 2 : -value * 2 - 1);
+  }
+
+  raw(bytes: Uint8Array): void {
+    this.reserve(bytes.length);
+    this.bytes.set(bytes, this.length);
+    this.length += bytes.length;
+  }
+
+  string(value: string): void {
+    const bytes = encoder.encode(value);
+    this.varint(bytes.length);
+    this.raw(bytes);
+  }
+}
+
+class ByteReader {
+  constructor(
+    private readonly bytes: Uint8Array,
+    public offset: number,
+    private readonly end: number
+  ) {}
+
+  private need(count: number): void {
+    if (this.offset + count > this.end) {
+      throw new Error('Game record is truncated');
+    }
+  }
+
+  u8(): number {
+    this.need(1);
+    return this.bytes[this.offset++];
+  }
+
+  varint(): number {
+    let value = 0;
+    let scale = 1;
+    for (;;) {
+      const byte = this.u8();
+      value += (byte & 0x7f) * scale;
+      if (byte < 0x80) return value;
+      scale *= 0x80;
+    }
+  }
+
+  svarint(): number {
+    const value = this.varint();
+    return value % 2 === 0 ? value / 2 : -(value + 1) / 2;
+  }
+
+  raw(count: number): Uint8Array {
+    this.need(count);
+    const bytes = this.bytes.slice(this.offset, this.offset + count);
+    this.offset += count;
+    return bytes;
+  }
+
+  string(): string {
+    const length = this.varint();
+    this.need(length);
+    const value = decoder.decode(this.bytes.subarray(this.offset, this.offset + length));
+    this.offset += length;
+    return value;
+  }
+}
+
+function writeBody(out: ByteWriter, record: GameRecord): void {
+  const flags =
+    MODES.indexOf(record.mode) |
+    (STATUSES.indexOf(record.status) << 2) |
+    (record.winner << 4) |
+    (record.startedAt !== null ? 0x40 : 0) |
+    (record.finishedAt !== null ? 0x80 : 0);
+  out.u8(flags);
+  out.varint(record.createdAt);
+  if (record.startedAt !== null) out.svarint(record.startedAt - record.createdAt);
+  if (record.finishedAt !== null) out.svarint(record.finishedAt - record.createdAt);
+  out.string(record.id);
+  out.string(record.inviteCode);
+
+  out.u8(record.players.length);
+  for (const player of record.players) {
+    out.string(player.id);
+    out.string(player.name);
+    out.u8(player.isAi ? 1 : 0);
+    out.svarint(player.joinedAt - record.createdAt);
+  }
+
+  out.varint(record.cells.length);
+  out.raw(record.cells);
+  let previous = record.startedAt ?? record.createdAt;
+  for (const time of record.moveTimes) {
+    out.svarint(time - previous);
+    previous = time;
+  }
+}
+
+function readBody(reader: ByteReader): GameRecord {
+  const flags = reader.u8();
+  const createdAt = reader.varint();
+  const startedAt = flags & 0x40 ? createdAt + reader.svarint() : null;
+  const finishedAt = flags & 0x80 ? createdAt + reader.svarint() : null;
+  const id = reader.string();
+  const inviteCode = reader.string();
+
+  const players: GameRecordPlayer[] = new Array(reader.u8());
+  for (let i = 0; i < players.length; i++) {
+    players[i] = {
+      id: reader.string(),
+      name: reader.string(),
+      isAi: reader.u8() === 1,
+      joinedAt: createdAt + reader.svarint(),
+    };
+  }
+
+  const cells = reader.raw(reader.varint());
+  const moveTimes: number[] = new Array(cells.length);
+  let previous = startedAt ?? createdAt;
+  for (let i = 0; i < cells.length; i++) {
+    previous += reader.svarint();
+    moveTimes[i] = previous;
+  }
+
+  return {
+    id,
+    inviteCode,
+    mode: MODES[flags & 0x03],
+    status: STATUSES[(flags >> 2) & 0x03],
+    winner: ((flags >> 4) & 0x03) as GameRecord['winner'],
+    createdAt,
+    startedAt,
+    finishedAt,
+    players,
+    cells,
+    moveTimes,
+  };
+}
+
+// Frames one record (length, body, CRC) into out
+function writeFrame(out: ByteWriter, body: ByteWriter, record: GameRecord): void {
+  body.reset();
+  writeBody(body, record);
+  out.varint(body.length);
+  out.raw(body.bytes.subarray(0, body.length));
+  out.u32(crc32(body.bytes, 0, body.length));
+}
+
+// One framed record, without the file header
+export function encodeGameRecord(record: GameRecord): Uint8Array {
+  const out = new ByteWriter();
+  writeFrame(out, new ByteWriter(), record);
+  return out.bytes.slice(0, out.length);
+}
+
+// Decodes the record at offset; null when bytes ends before the record does
+function decodeFrame(
+  bytes: Uint8Array,
+  offset: number
+): { record: GameRecord; next: number } | null {
+  const header = new ByteReader(bytes, offset, bytes.length);
+  let length: number;
+  try {
+    length = header.varint();
+  } catch {
+    return null;
+  }
+
+  if (length > MAX_RECORD_BYTES) {
+    throw new Error(`Game record at byte ${offset} has an invalid length`);
+  }
+
+  const start = header.offset;
+  const end = start + length;
+  if (end + 4 > bytes.length) return null;
+
+  const expected = new DataView(bytes.buffer, bytes.byteOffset).getUint32(end, true);
+  if (crc32(bytes, start, end) !== expected) {
+    throw new Error(`Game record at byte ${offset} fails its checksum`);
+  }
+
+  const reader = new ByteReader(bytes, start, end);
+  return { record: readBody(reader), next: end + 4 };
+}
+
+function checkFileHeader(bytes: Uint8Array): void {
+  const magic = MAGIC.every((byte, i) => bytes[i] === byte);
+  if (!magic) {
+    throw new Error('Not a game record file');
+  }
+  if (bytes[MAGIC.length] !== FORMAT_VERSION) {
+    throw new Error(`Unsupported game record version ${bytes[MAGIC.length]}`);
+  }
+}
+
+// Every record in an in-memory file (header included)
+export function* decodeGameRecords(bytes: Uint8Array): Generator<GameRecord> {
+  checkFileHeader(bytes);
+  let offset = FILE_HEADER.length;
+
+  while (offset < bytes.length) {
+    const frame = decodeFrame(bytes, offset);
+    if (!frame) {
+      throw new Error(`Game record file is truncated at byte ${offset}`);
+    }
+    yield frame.record;
+    offset = frame.next;
+  }
+}
+
+// Streams the records of a file; memory is bounded by the chunk size plus one record
+export async function* readGameRecords(
+  file: string,
+  options: { chunkSize?: number } = {}
+): AsyncGenerator<GameRecord> {
+  const stream = createReadStream(file, { highWaterMark: options.chunkSize ?? 1 << 20 });
+  let pending: Uint8Array = new Uint8Array(0);
+  let headerChecked = false;
+  let consumed = 0; // bytes of the file before pending, for error messages
+
+  for await (const chunk of stream as AsyncIterable<Buffer>) {
+    pending = pending.length > 0 ? Buffer.concat([pending, chunk]) : chunk;
+
+    let offset = 0;
+    if (!headerChecked) {
+      if (pending.length < FILE_HEADER.length) continue;
+      checkFileHeader(pending);
+      headerChecked = true;
+      offset = FILE_HEADER.length;
+    }
+
+    for (;;) {
+      const frame = decodeFrame(pending, offset);
+      if (!frame) break;
+      yield frame.record;
+      offset = frame.next;
+    }
+
+    // Keep the partial record for the next chunk
+    consumed += offset;
+    pending = pending.subarray(offset);
+  }
+
+  if (!headerChecked) {
+    throw new Error('Not a game record file');
+  }
+  if (pending.length > 0) {
+    throw new Error(`Game record file is truncated at byte ${consumed}`);
+  }
+}
+
+// Writes a record file with backpressure; call end() to flush and close it
+export class GameRecordWriter {
+  private readonly frame = new ByteWriter();
+  private readonly body = new ByteWriter();
+  private headerWritten = false;
+  written = 0;
+
+  constructor(private readonly out: Writable) {}
+
+  async write(record: GameRecord): Promise<void> {
+    this.frame.reset();
+    if (!this.headerWritten) {
+      this.frame.raw(FILE_HEADER);
+      this.headerWritten = true;
+    }
+    writeFrame(this.frame, this.body, record);
+
+    this.written++;
+    if (!this.out.write(this.frame.bytes.slice(0, this.frame.length))) {
+      await once(this.out, 'drain');
+    }
+  }
+
+  async end(): Promise<void> {
+    if (!this.headerWritten) {
+      this.out.write(FILE_HEADER);
+      this.headerWritten = true;
+    }
+    this.out.end();
+    await once(this.out, 'finish');
+  }
+}
+
+// From a stored game and its moves. Throws when moves do not alternate from player 1, which
+// the format cannot represent.
+export function gameToRecord(game: StoredGame): GameRecord {
+  const mode = game.mode as GameMode;
+  if (!MODES.includes(mode)) {
+    throw new Error(`Game ${game.id} has unknown mode ${game.mode}`);
+  }
+
+  const players = [...game.players].sort((a, b) => a.player_number - b.player_number);
+  const moves = [...(game.moves ?? [])].sort((a, b) => a.move_number - b.move_number);
+  const size = getBoardSize(mode);
+  const cells = new Uint8Array(moves.length);
+  const moveTimes: number[] = new Array(moves.length);
+
+  for (let i = 0; i < moves.length; i++) {
+    const move = moves[i];
+    if (move.player_id !== players[i % 2]?.id) {
+      throw new Error(`Game ${game.id}: move ${move.move_number} is out of turn`);
+    }
+    cells[i] = move.row_index * size + move.column_index;
+    moveTimes[i] = Date.parse(move.created_at);
+  }
+
+  const winner = players.findIndex((p) => p.id === game.winner_id) + 1;
+
+  return {
+    id: game.id,
+    inviteCode: game.invite_code,
+    mode,
+    status: game.status,
+    winner: winner as GameRecord['winner'],
+    createdAt: Date.parse(game.created_at),
+    startedAt: game.started_at ? Date.parse(game.started_at) : null,
+    finishedAt: game.finished_at ? Date.parse(game.finished_at) : null,
+    players: players.map((p) => ({
+      id: p.id,
+      name: p.player_name,
+      isAi: p.is_ai,
+      joinedAt: Date.parse(p.joined_at),
+    })),
+    cells,
+    moveTimes,
+  };
+}
+
+// Back to a stored game. Move ids are move numbers, as the API assigns them; chat is not
+// part of a record.
+export function recordToGame(record: GameRecord): StoredGame {
+  const size = getBoardSize(record.mode);
+  const iso = (time: number | null) => (time === null ? null : new Date(time).toISOString());
+
+  const players: Player[] = record.players.map((p, i) => ({
+    id: p.id,
+    game_id: record.id,
+    player_number: (i + 1) as Player['player_number'],
+    player_name: p.name,
+    joined_at: iso(p.joinedAt)!,
+    is_ai: p.isAi,
+  }));
+
+  const moves: Move[] = Array.from(record.cells, (cell, i) => ({
+    id: i + 1,
+    game_id: record.id,
+    player_id: players[i % 2].id,
+    move_number: i + 1,
+    column_index: cell % size,
+    row_index: Math.floor(cell / size),
+    created_at: iso(record.moveTimes[i])!,
+  }));
+
+  return {
+    id: record.id,
+    invite_code: record.inviteCode,
+    mode: record.mode,
+    status: record.status,
+    // Only active games have a player to move
+    current_turn: record.status === 'active' ? (moves.length % 2) + 1 : null,
+    winner_id: record.winner > 0 ? players[record.winner - 1].id : null,
+    created_at: iso(record.createdAt)!,
+    started_at: iso(record.startedAt),
+    finished_at: iso(record.finishedAt),
+    players,
+    moves,
+  };
+}
+
+// The record as a line of the NDJSON export (scripts/export-games.ts), with no chat
+export function recordToExportLine(record: GameRecord): string {
+  return serializeExportEvent({ type: 'game', game: recordToGame(record), messages: [] });
+}
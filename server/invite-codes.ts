@@ -0,0 +1,170 @@
+// Invite code allocation without collision checks
+// Codes are a keyed permutation of a counter onto the 36^6 six-character codes: a Feistel
+// network over 32-bit values, cycle-walked until the result falls inside the code space.
+// Distinct counter values always give distinct codes, and consecutive values look unrelated.
+// Workers reserve counter blocks from the store (one INCRBY per block) and hand out codes
+// from the block locally, so creating a game needs no uniqueness probe.
+
+import { createHash } from 'node:crypto';
+import type { GameStore } from './store';
+
+export const INVITE_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ';
+export const INVITE_CODE_LENGTH = 6;
+export const INVITE_SPACE = INVITE_ALPHABET.length ** INVITE_CODE_LENGTH;
+
+const FEISTEL_ROUNDS = 6;
+const DEV_SECRET = 'development-invite-secret';
+const DEFAULT_BLOCK_SIZE = 100;
+
+// murmur3 finalizer: cheap 32-bit mixing for the round function
+function mix32(value: number): number {
+  value ^= value >>> 16;
+  value = Math.imul(value, 0x85ebca6b);
+  value ^= value >>> 13;
+  value = Math.imul(value, 0xc2b2ae35);
+  value ^= value >>> 16;
+  return value >>> 0;
+}
+
+// Bijection on [0, domain) derived from a secret
+export class IndexPermutation {
+  private readonly halfBits: number;
+  private readonly halfMask: number;
+  private readonly keys: number[];
+
+  constructor(secret: string, readonly domain: number = INVITE_SPACE) {
+    // Smallest even bit width covering the domain, so both halves are the same size
+    let bits = Math.max(2, Math.ceil(Math.log2(domain)));
+    if (bits % 2 === 1) bits++;
+    if (bits > 32) {
+      throw new Error(`Domain too large for a 32-bit permutation: ${domain}`);
+    }
+
+    this.halfBits = bits / 2;
+    this.halfMask = 2 ** this.halfBits - 1;
+
+    const digest = createHash('sha256').update(secret).digest();
+    this.keys = Array.from({ length: FEISTEL_ROUNDS }, (_, i) => digest.readUInt32BE(i * 4));
+  }
+
+  apply(index: number): number {
+    let value = index;
+    // Cycle walking: the Feistel domain is at most 4x larger, so few steps are needed
+    do {
+      value = this.encrypt(value);
+    } while (value >= this.domain);
+    return value;
+  }
+
+  invert(value: number): number {
+    let index = value;
+    do {
+      index = this.decrypt(index);
+    } while (index >= this.domain);
+    return index;
+  }
+
+  private round(half: number, key: number): number {
+    return mix32(half ^ key) & this.halfMask;
+  }
+
+  private encrypt(value: number): number {
+    let left = Math.floor(value / 2 ** this.halfBits);
+    let right = value & this.halfMask;
+    for (const key of this.keys) {
+      [left, right] = [right, left ^ this.round(right, key)];
+    }
+    return left * 2 ** this.halfBits + right;
+  }
+
+  private decrypt(value: number): number {
+    let left = Math.floor(value / 2 ** this.halfBits);
+    let right = value & this.halfMask;
+    for (let i = this.keys.length - 1; i >= 0; i--) {
+      [left, right] = [right ^ this.round(left, this.keys[i]), left];
+    }
+    return left * 2 ** this.halfBits + right;
+  }
+}
+
+export function encodeInviteCode(value: number): string {
+  return value.toString(36).toUpperCase().padStart(INVITE_CODE_LENGTH, '0');
+}
+
+export interface InviteCodeOptions {
+  secret: string;
+  blockSize: number;
+}
+
+// A block must hold at least one code: 0 would make next() reserve empty blocks forever, and
+// NaN or negative sizes give indices outside the reserved range
+function blockSizeFromEnv(): number {
+  const value = process.env.INVITE_CODE_BLOCK_SIZE;
+  if (!value) return DEFAULT_BLOCK_SIZE;
+
+  const size = Number(value);
+  if (Number.isInteger(size) && size > 0) return size;
+
+  console.warn(
+    `[InviteCodes] INVITE_CODE_BLOCK_SIZE=${value} is not a positive integer; ` +
+      `using ${DEFAULT_BLOCK_SIZE}.`
+  );
+  return DEFAULT_BLOCK_SIZE;
+}
+
+export function inviteCodeOptionsFromEnv(): InviteCodeOptions {
+  const secret = process.env.INVITE_CODE_SECRET;
+  if (!secret && process.env.NODE_ENV === 'production') {
+    console.warn('[InviteCodes] INVITE_CODE_SECRET not set; invite codes are predictable.');
+  }
+
+  return {
+    secret: secret || DEV_SECRET,
+    blockSize: blockSizeFromEnv(),
+  };
+}
+
+export class InviteCodeAllocator {
+  private readonly permutation: IndexPermutation;
+  // Counter values [nextIndex, blockEnd) are reserved for this worker
+  private nextIndex = 0;
+  private blockEnd = 0;
+  private reserving: Promise<void> | null = null;
+  private counters = { issued: 0, blocks: 0 };
+
+  constructor(readonly options: InviteCodeOptions = inviteCodeOptionsFromEnv()) {
+    this.permutation = new IndexPermutation(options.secret);
+  }
+
+  async next(store: GameStore): Promise<string> {
+    while (this.nextIndex >= this.blockEnd) {
+      // Concurrent callers share one reservation
+      if (!this.reserving) {
+        this.reserving = this.reserve(store).finally(() => {
+          this.reserving = null;
+        });
+      }
+      await this.reserving;
+    }
+
+    const index = this.nextIndex++;
+    this.counters.issued++;
+    // The counter wraps after 36^6 codes; invites expire long before that
+    return encodeInviteCode(this.permutation.apply(index % INVITE_SPACE));
+  }
+
+  stats() {
+    return {
+      ...this.counters,
+      blockSize: this.options.blockSize,
+      remainingInBlock: this.blockEnd - this.nextIndex,
+    };
+  }
+
+  private async reserve(store: GameStore): Promise<void> {
+    const end = await store.reserveSequence('invite', this.options.blockSize);
+    this.nextIndex = end - this.options.blockSize;
+    this.blockEnd = end;
+    this.counters.blocks++;
+  }
+}
@@ -0,0 +1,207 @@
+// Quick match: players queue per game mode and are paired first come, first served
+// Queues live in the store (a KV list per mode), so they are shared by all workers and
+// survive restarts. Whoever enqueues runs the pairing step; the store pops two tickets
+// atomically, so a ticket is never paired twice. Both players are told through Pusher.
+// Popped tickets stay on a per-mode pairing list until their game is saved; if the worker
+// dies in between, a later pop returns them to the front of the queue.
+
+import type { Game, GameMode, MatchStatusResponse, MatchTicketStatus, Player } from '@/lib/types';
+import type { ServerContext } from './context';
+import { gameHeader } from './serialize';
+import type { StoredGame } from './store';
+
+export const MATCH_MODES: GameMode[] = ['classic3', 'gomoku'];
+
+// Tickets of players who left without cancelling expire after this long
+export const MATCH_TICKET_TTL_SECONDS = 600;
+
+// Popped tickets whose game was not saved after this long are queued again
+export const MATCH_PAIRING_TIMEOUT_MS = 30_000;
+
+export interface MatchTicket {
+  id: string;
+  mode: GameMode;
+  player_id: string;
+  player_name: string;
+  profile_id?: string;
+  created_at: string;
+  status: MatchTicketStatus;
+  game_id: string | null;
+}
+
+function generateId(): string {
+  return `${Date.now()}_${Math.random().toString(36).substring(2, 15)}`;
+}
+
+export function matchChannel(ticketId: string): string {
+  return `match-${ticketId}`;
+}
+
+function toPlayer(ticket: MatchTicket, gameId: string, playerNumber: 1 | 2, now: string): Player {
+  return {
+    id: ticket.player_id,
+    game_id: gameId,
+    player_number: playerNumber,
+    player_name: ticket.player_name,
+    is_ai: false,
+    joined_at: now,
+    ...(ticket.profile_id ? { profile_id: ticket.profile_id } : {}),
+  };
+}
+
+export async function enqueueMatch(
+  context: ServerContext,
+  mode: GameMode,
+  playerName: string,
+  profileId?: string
+): Promise<MatchTicket> {
+  const ticket: MatchTicket = {
+    id: `match_${generateId()}`,
+    mode,
+    player_id: generateId(),
+    player_name: playerName,
+    ...(profileId ? { profile_id: profileId } : {}),
+    created_at: new Date().toISOString(),
+    status: 'queued',
+    game_id: null,
+  };
+
+  await context.store.enqueueMatchTicket(ticket);
+  const matched = await pairWaitingPlayers(context, mode);
+
+  // Paired here: the matched copy is what was just written. Otherwise another request may
+  // have paired it in the meantime.
+  const own = matched.find((t) => t.id === ticket.id);
+  if (own) return own;
+  return (await context.store.getMatchTicket(ticket.id)) ?? ticket;
+}
+
+// Pairs queued players of a mode until fewer than two remain; returns the tickets matched
+export async function pairWaitingPlayers(
+  context: ServerContext,
+  mode: GameMode
+): Promise<MatchTicket[]> {
+  const { store } = context;
+  const matched: MatchTicket[] = [];
+
+  for (;;) {
+    const pair = await store.popMatchPair(mode);
+    if (!pair) return matched;
+
+    const tickets = await Promise.all(pair.map((id) => store.getMatchTicket(id)));
+    const live = tickets.filter((t): t is MatchTicket => t !== null && t.status === 'queued');
+
+    if (live.length < 2) {
+      // A cancelled or expired ticket was popped; the other keeps its place at the front
+      for (const ticket of live) {
+        await store.requeueMatchTicket(ticket);
+      }
+      continue;
+    }
+
+    try {
+      matched.push(...(await startMatchedGame(context, live[0], live[1])));
+    } catch (error) {
+      // Neither player is seated; put both back at the front, first in line first
+      await store.requeueMatchTicket(live[1]);
+      await store.requeueMatchTicket(live[0]);
+      throw error;
+    }
+  }
+}
+
+async function startMatchedGame(
+  context: ServerContext,
+  first: MatchTicket,
+  second: MatchTicket
+): Promise<MatchTicket[]> {
+  const { store, stateCache, inviteCodes, getPusher } = context;
+  const gameId = `game_${generateId()}`;
+  const now = new Date().toISOString();
+
+  // Created already active: both players are seated and the first in line moves first
+  const game: StoredGame = {
+    id: gameId,
+    invite_code: await inviteCodes.next(store),
+    mode: first.mode,
+    status: 'active',
+    current_turn: 1,
+    winner_id: null,
+    board: first.mode === 'classic3' ? Array(9).fill(null) : [],
+    players: [toPlayer(first, gameId, 1, now), toPlayer(second, gameId, 2, now)],
+    created_at: now,
+    started_at: now,
+    finished_at: null,
+  };
+
+  const matched = [first, second].map((ticket) => ({
+    ...ticket,
+    status: 'matched' as const,
+    game_id: gameId,
+  }));
+
+  // Game, both players and both tickets are written together
+  const version = await store.saveMatchedGame(game, matched);
+  stateCache.set(game, version);
+
+  console.log('[Match] Paired players:', {
+    gameId,
+    mode: first.mode,
+    tickets: [first.id, second.id],
+  });
+
+  try {
+    const pusher = await getPusher();
+    await Promise.all(
+      matched.map((ticket, i) =>
+        pusher.trigger(matchChannel(ticket.id), 'match-found', {
+          ticket_id: ticket.id,
+          game: gameHeader(game),
+          player: game.players[i],
+          player_id: ticket.player_id,
+        })
+      )
+    );
+  } catch (pusherError) {
+    console.error('[Match] Pusher error:', pusherError);
+    // Clients can still pick the match up from /api/match/status
+  }
+
+  return matched;
+}
+
+// Takes a ticket out of its queue; null when it was already taken for pairing
+export async function cancelMatch(
+  context: ServerContext,
+  ticket: MatchTicket
+): Promise<MatchTicket | null> {
+  if (ticket.status === 'cancelled') return ticket;
+
+  const cancelled: MatchTicket = { ...ticket, status: 'cancelled' };
+  return (await context.store.cancelMatchTicket(cancelled)) ? cancelled : null;
+}
+
+export async function toMatchStatus(
+  context: ServerContext,
+  ticket: MatchTicket
+): Promise<MatchStatusResponse> {
+  let game: Game | null = null;
+  let player: Player | null = null;
+
+  if (ticket.game_id) {
+    const cached = await context.stateCache.load(context.store, ticket.game_id);
+    if (cached) {
+      game = gameHeader(cached.game);
+      player = cached.game.players.find((p) => p.id === ticket.player_id) ?? null;
+    }
+  }
+
+  return {
+    ticket_id: ticket.id,
+    status: ticket.status,
+    mode: ticket.mode,
+    player_id: ticket.player_id,
+    game,
+    player,
+  };
+}
@@ -0,0 +1,303 @@
+// Memory diagnostics for long-running workers
+// A snapshot records process memory, V8 heap space usage and the size of the in-process
+// caches. With MEMORY_DIAGNOSTICS=1 the V8 sampling heap profiler runs in the background
+// (one sample per MEMORY_SAMPLE_BYTES allocated, 32 KB by default, cheap enough to leave on)
+// and snapshots also list the sampled allocations still alive, by module and by allocation
+// site. The last MEMORY_SNAPSHOTS snapshots are kept so growth can be diffed.
+//
+// Served by /api/debug/memory. With MEMORY_DIAGNOSTICS=1, `kill -USR2 <pid>` logs a snapshot
+// and its diff against the previous one without touching the API.
+
+import { Session } from 'node:inspector';
+import path from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { getHeapSpaceStatistics } from 'node:v8';
+import { getServerContext, type ServerContext } from './context';
+
+export interface MemoryOptions {
+  enabled: boolean; // sampling heap profiler and SIGUSR2 handler
+  sampleBytes: number;
+  keepSnapshots: number;
+}
+
+export function memoryOptionsFromEnv(): MemoryOptions {
+  return {
+    enabled: process.env.MEMORY_DIAGNOSTICS === '1',
+    sampleBytes: Number(process.env.MEMORY_SAMPLE_BYTES || 32_768),
+    keepSnapshots: Number(process.env.MEMORY_SNAPSHOTS || 10),
+  };
+}
+
+export interface AllocationGroup {
+  name: string;
+  bytes: number;
+  samples: number;
+}
+
+export interface AllocationSummary {
+  sampleBytes: number;
+  totalBytes: number;
+  modules: AllocationGroup[]; // largest first
+  sites: AllocationGroup[];
+}
+
+export interface MemorySnapshot {
+  id: number;
+  takenAt: string;
+  process: Record<'rss' | 'heapTotal' | 'heapUsed' | 'external' | 'arrayBuffers', number>;
+  heapSpaces: Record<string, number>; // used bytes per V8 space
+  caches: Record<string, Record<string, number>>;
+  allocations: AllocationSummary | null; // null unless MEMORY_DIAGNOSTICS=1
+}
+
+export interface MemoryDiff {
+  from: number;
+  to: number;
+  seconds: number;
+  process: Record<string, number>;
+  heapSpaces: Record<string, number>;
+  caches: Record<string, Record<string, number>>;
+  modules: AllocationGroup[]; // change in live sampled bytes, largest growth first
+  sites: AllocationGroup[];
+}
+
+interface ProfileNode {
+  callFrame: { functionName: string; url: string; lineNumber: number };
+  selfSize: number;
+  children: ProfileNode[];
+}
+
+// Entries and sizes of the caches kept in this process
+export function cacheSizes(context: ServerContext): Record<string, Record<string, number>> {
+  const { entries, bytes } = context.stateCache.stats();
+  const { games, messages } = context.chatBuffers.stats();
+  const rateLimitKeys = (endpoint: keyof ServerContext['rateLimiters']) =>
+    context.rateLimiters[endpoint].stats().keys ?? 0;
+
+  return {
+    state_cache: { entries, bytes },
+    chat_buffers: { games, messages },
+    rate_limits: {
+      chat_send_keys: rateLimitKeys('chat:send'),
+      game_move_keys: rateLimitKeys('game:move'),
+    },
+    traces: { buffered: context.tracer.stats().buffered },
+  };
+}
+
+// Package name for dependencies, path relative to the app for our own code
+export function moduleOf(url: string): string {
+  if (!url) return '(native)';
+  if (url.startsWith('node:') || !url.includes('/')) return 'node (internal)';
+
+  const file = url.startsWith('file://') ? fileURLToPath(url) : url;
+  const nodeModules = file.lastIndexOf('/node_modules/');
+  if (nodeModules >= 0) {
+    const [scope, name] = file.slice(nodeModules + '/node_modules/'.length).split('/');
+    return scope.startsWith('@') ? `${scope}/${name}` : scope;
+  }
+
+  const relative = path.relative(process.cwd(), file);
+  return relative.startsWith('..') ? file : relative;
+}
+
+function topGroups(groups: Map<string, AllocationGroup>): AllocationGroup[] {
+  return [...groups.values()].sort((a, b) => b.bytes - a.bytes);
+}
+
+export function summarizeProfile(head: ProfileNode, sampleBytes: number): AllocationSummary {
+  const modules = new Map<string, AllocationGroup>();
+  const sites = new Map<string, AllocationGroup>();
+  let totalBytes = 0;
+
+  const add = (groups: Map<string, AllocationGroup>, name: string, bytes: number) => {
+    const group = groups.get(name);
+    if (group) {
+      group.bytes += bytes;
+      group.samples++;
+    } else {
+      groups.set(name, { name, bytes, samples: 1 });
+    }
+  };
+
+  const stack = [head];
+  while (stack.length > 0) {
+    const node = stack.pop()!;
+    stack.push(...node.children);
+    if (node.selfSize === 0) continue;
+
+    const { functionName, url, lineNumber } = node.callFrame;
+    const module = moduleOf(url);
+    totalBytes += node.selfSize;
+    add(modules, module, node.selfSize);
+    add(sites, `${functionName || '(anonymous)'} ${module}:${lineNumber + 1}`, node.selfSize);
+  }
+
+  return { sampleBytes, totalBytes, modules: topGroups(modules), sites: topGroups(sites) };
+}
+
+function numericDelta(
+  before: Record<string, number>,
+  after: Record<string, number>
+): Record<string, number> {
+  const keys = new Set([...Object.keys(before), ...Object.keys(after)]);
+  return Object.fromEntries([...keys].map((key) => [key, (after[key] ?? 0) - (before[key] ?? 0)]));
+}
+
+function groupDelta(before: AllocationGroup[] = [], after: AllocationGroup[] = []) {
+  const groups = new Map<string, AllocationGroup>();
+  for (const { name, bytes, samples } of before) {
+    groups.set(name, { name, bytes: -bytes, samples: -samples });
+  }
+  for (const { name, bytes, samples } of after) {
+    const previous = groups.get(name);
+    groups.set(name, {
+      name,
+      bytes: bytes + (previous?.bytes ?? 0),
+      samples: samples + (previous?.samples ?? 0),
+    });
+  }
+  return topGroups(groups).filter((group) => group.bytes !== 0);
+}
+
+export function diffSnapshots(before: MemorySnapshot, after: MemorySnapshot): MemoryDiff {
+  const caches: Record<string, Record<string, number>> = {};
+  for (const name of Object.keys(after.caches)) {
+    caches[name] = numericDelta(before.caches[name] ?? {}, after.caches[name]);
+  }
+
+  return {
+    from: before.id,
+    to: after.id,
+    seconds: (Date.parse(after.takenAt) - Date.parse(before.takenAt)) / 1000,
+    process: numericDelta(before.process, after.process),
+    heapSpaces: numericDelta(before.heapSpaces, after.heapSpaces),
+    caches,
+    modules: groupDelta(before.allocations?.modules, after.allocations?.modules),
+    sites: groupDelta(before.allocations?.sites, after.allocations?.sites),
+  };
+}
+
+// The profiler session and signal handler are process-wide, shared by every context instance
+const globalForMemory = globalThis as unknown as {
+  __memoryProfiler?: Promise<Session | null>;
+  __memorySignalHandler?: boolean;
+};
+
+function post<T>(session: Session, method: string, params?: object): Promise<T> {
+  return new Promise((resolve, reject) => {
+    session.post(method, params, (error, result) => (error ? reject(error) : resolve(result as T)));
+  });
+}
+
+async function startProfiler(sampleBytes: number): Promise<Session | null> {
+  try {
+    const session = new Session();
+    session.connect();
+    await post(session, 'HeapProfiler.enable');
+    await post(session, 'HeapProfiler.startSampling', { samplingInterval: sampleBytes });
+    console.log(`[Memory] Sampling heap profiler started (every ${sampleBytes} bytes)`);
+    return session;
+  } catch (error) {
+    console.error('[Memory] Failed to start the sampling heap profiler:', error);
+    return null;
+  }
+}
+
+export class MemoryDiagnostics {
+  private snapshots: MemorySnapshot[] = [];
+  private nextId = 1;
+
+  constructor(readonly options: MemoryOptions = memoryOptionsFromEnv()) {}
+
+  // Starts the profiler and signal handler when enabled; safe to call more than once
+  start(): void {
+    if (!this.options.enabled) return;
+
+    if (!globalForMemory.__memoryProfiler) {
+      globalForMemory.__memoryProfiler = startProfiler(this.options.sampleBytes);
+    }
+    if (!globalForMemory.__memorySignalHandler) {
+      globalForMemory.__memorySignalHandler = true;
+      process.on('SIGUSR2', () => {
+        const { memory } = getServerContext();
+        memory.logSnapshot().catch((error) => {
+          console.error('[Memory] Snapshot failed:', error);
+        });
+      });
+    }
+  }
+
+  async snapshot(context: ServerContext = getServerContext()): Promise<MemorySnapshot> {
+    const { rss, heapTotal, heapUsed, external, arrayBuffers } = process.memoryUsage();
+    const heapSpaces = Object.fromEntries(
+      getHeapSpaceStatistics().map((space) => [space.space_name, space.space_used_size])
+    );
+
+    const snapshot: MemorySnapshot = {
+      id: this.nextId++,
+      takenAt: new Date().toISOString(),
+      process: { rss, heapTotal, heapUsed, external, arrayBuffers },
+      heapSpaces,
+      caches: cacheSizes(context),
+      allocations: await this.sampledAllocations(),
+    };
+
+    this.snapshots.push(snapshot);
+    if (this.snapshots.length > this.options.keepSnapshots) {
+      this.snapshots.shift();
+    }
+    return snapshot;
+  }
+
+  get(id: number): MemorySnapshot | null {
+    return this.snapshots.find((snapshot) => snapshot.id === id) ?? null;
+  }
+
+  // Signal handler output: one summary line, the caches and the largest growth since last time
+  async logSnapshot(): Promise<void> {
+    const previous = this.snapshots[this.snapshots.length - 1];
+    const snapshot = await this.snapshot();
+    const mb = (bytes: number) => `${(bytes / 1_048_576).toFixed(1)} MB`;
+
+    console.log(
+      `[Memory] Snapshot ${snapshot.id}: rss ${mb(snapshot.process.rss)}, ` +
+        `heap ${mb(snapshot.process.heapUsed)} / ${mb(snapshot.process.heapTotal)}, ` +
+        `external ${mb(snapshot.process.external)}`
+    );
+    console.log('[Memory] Caches:', JSON.stringify(snapshot.caches));
+    if (snapshot.allocations) {
+      const modules = snapshot.allocations.modules.slice(0, 10);
+      console.log('[Memory] Top modules:', JSON.stringify(modules));
+    }
+    if (previous) {
+      const diff = diffSnapshots(previous, snapshot);
+      console.log(
+        `[Memory] Since snapshot ${previous.id} (${diff.seconds}s): ` +
+          `heap ${mb(diff.process.heapUsed)}, rss ${mb(diff.process.rss)}`
+      );
+      console.log('[Memory] Largest growth:', JSON.stringify(diff.sites.slice(0, 10)));
+    }
+  }
+
+  stats() {
+    const last = this.snapshots[this.snapshots.length - 1];
+    return {
+      enabled: this.options.enabled,
+      sampleBytes: this.options.enabled ? this.options.sampleBytes : null,
+      snapshots: this.snapshots.map((snapshot) => snapshot.id),
+      lastSnapshotAt: last?.takenAt ?? null,
+    };
+  }
+
+  private async sampledAllocations(): Promise<AllocationSummary | null> {
+    const session = await globalForMemory.__memoryProfiler;
+    if (!this.options.enabled || !session) return null;
+
+    const { profile } = await post<{ profile: { head: ProfileNode } }>(
+      session,
+      'HeapProfiler.getSamplingProfile'
+    );
+    return summarizeProfile(profile.head, this.options.sampleBytes);
+  }
+}
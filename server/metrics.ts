@@ -0,0 +1,493 @@
+// Request metrics in Prometheus text format
+// Route handlers are wrapped with withMetrics(), which records per-route latency, time spent in
+// the store vs the handler itself, status codes, in-flight requests and payload sizes. Series
+// live in maps keyed by pre-rendered label strings, so recording a request costs a few map
+// lookups and bucket comparisons. The wrapper also starts the request's trace when it is
+// sampled (see server/tracing.ts).
+//
+// Each worker keeps its own registry. With METRICS_SHARED=1 and KV configured, workers add
+// their deltas to a KV hash every METRICS_FLUSH_MS and /api/metrics reports the totals of
+// all workers.
+
+import type { VercelKV } from '@vercel/kv';
+import { createRequestScope, finishRequestScope, runInRequestScope } from './request-scope';
+import { createKvClient } from './stores/kv-store';
+import { isKvConfigured } from './store';
+import { getServerContext } from './context';
+
+type MetricType = 'counter' | 'gauge' | 'histogram';
+
+export interface MetricFamily {
+  name: string;
+  type: MetricType;
+  help: string;
+}
+
+// One exposition line: family + suffix (_bucket/_sum/_count for histograms) + labels
+export interface MetricSample {
+  family: string;
+  suffix: '' | '_bucket' | '_sum' | '_count';
+  labels: string; // rendered, without braces, e.g. route="/api/game/move",method="POST"
+  le?: string;
+  value: number;
+}
+
+const LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+const SIZE_BUCKETS = [64, 256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576];
+
+interface CounterCell {
+  value: number;
+}
+
+class Counter {
+  private cells = new Map<string, CounterCell>();
+  private flushed = new Map<string, number>();
+
+  constructor(readonly family: MetricFamily) {}
+
+  // Callers on the hot path keep the cell and update it directly
+  cell(labels: string): CounterCell {
+    let cell = this.cells.get(labels);
+    if (!cell) {
+      cell = { value: 0 };
+      this.cells.set(labels, cell);
+    }
+    return cell;
+  }
+
+  inc(labels: string, amount = 1): void {
+    this.cell(labels).value += amount;
+  }
+
+  collect(deltas: boolean): MetricSample[] {
+    const samples: MetricSample[] = [];
+    for (const [labels, { value }] of this.cells) {
+      const previous = deltas ? this.flushed.get(labels) ?? 0 : 0;
+      if (deltas) this.flushed.set(labels, value);
+      samples.push({ family: this.family.name, suffix: '', labels, value: value - previous });
+    }
+    return samples;
+  }
+}
+
+interface HistogramSeries {
+  bounds: number[];
+  counts: Float64Array; // per bucket, non-cumulative; last slot is +Inf
+  sum: number;
+  count: number;
+}
+
+function observeInto(series: HistogramSeries, value: number): void {
+  const { bounds } = series;
+  let bucket = 0;
+  while (bucket < bounds.length && value > bounds[bucket]) bucket++;
+  series.counts[bucket]++;
+  series.sum += value;
+  series.count++;
+}
+
+class Histogram {
+  private series = new Map<string, HistogramSeries>();
+  private flushed = new Map<string, Omit<HistogramSeries, 'bounds'>>();
+
+  constructor(
+    readonly family: MetricFamily,
+    readonly buckets: number[]
+  ) {}
+
+  // Callers on the hot path keep the series and pass it to observeInto()
+  seriesFor(labels: string): HistogramSeries {
+    let series = this.series.get(labels);
+    if (!series) {
+      const counts = new Float64Array(this.buckets.length + 1);
+      series = { bounds: this.buckets, counts, sum: 0, count: 0 };
+      this.series.set(labels, series);
+    }
+    return series;
+  }
+
+  observe(labels: string, value: number): void {
+    observeInto(this.seriesFor(labels), value);
+  }
+
+  collect(deltas: boolean): MetricSample[] {
+    const samples: MetricSample[] = [];
+    const { name } = this.family;
+
+    for (const [labels, series] of this.series) {
+      const previous = deltas ? this.flushed.get(labels) : undefined;
+      let cumulative = 0;
+      for (let i = 0; i <= this.buckets.length; i++) {
+        cumulative += series.counts[i] - (previous?.counts[i] ?? 0);
+        const le = i < this.buckets.length ? String(this.buckets[i]) : '+Inf';
+        samples.push({ family: name, suffix: '_bucket', labels, le, value: cumulative });
+      }
+      const sum = series.sum - (previous?.sum ?? 0);
+      const count = series.count - (previous?.count ?? 0);
+      samples.push({ family: name, suffix: '_sum', labels, value: sum });
+      samples.push({ family: name, suffix: '_count', labels, value: count });
+
+      if (deltas) {
+        const { sum: total, count: observed } = series;
+        this.flushed.set(labels, { counts: series.counts.slice(), sum: total, count: observed });
+      }
+    }
+    return samples;
+  }
+}
+
+// Prometheus label values escape backslash, double quote and newline
+function labelValue(value: string): string {
+  return value.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
+
+function formatValue(value: number): string {
+  if (Number.isFinite(value)) return String(value);
+  return Number.isNaN(value) ? 'NaN' : value > 0 ? '+Inf' : '-Inf';
+}
+
+export function renderPrometheus(families: MetricFamily[], samples: MetricSample[]): string {
+  const byFamily = new Map<string, MetricSample[]>();
+  for (const sample of samples) {
+    const list = byFamily.get(sample.family) ?? [];
+    list.push(sample);
+    byFamily.set(sample.family, list);
+  }
+
+  const suffixOrder = { '': 0, _bucket: 0, _sum: 1, _count: 2 };
+  const lines: string[] = [];
+
+  for (const family of families) {
+    const list = byFamily.get(family.name);
+    if (!list) continue;
+
+    // Series together, buckets in ascending le, then _sum and _count
+    list.sort(
+      (a, b) =>
+        a.labels.localeCompare(b.labels) ||
+        suffixOrder[a.suffix] - suffixOrder[b.suffix] ||
+        (a.le === '+Inf' ? Infinity : Number(a.le)) - (b.le === '+Inf' ? Infinity : Number(b.le))
+    );
+
+    lines.push(`# HELP ${family.name} ${family.help}`, `# TYPE ${family.name} ${family.type}`);
+    for (const sample of list) {
+      const labels =
+        sample.le === undefined ? sample.labels : joinLabels(sample.labels, `le="${sample.le}"`);
+      const name = family.name + sample.suffix;
+      lines.push(`${labels ? `${name}{${labels}}` : name} ${formatValue(sample.value)}`);
+    }
+  }
+
+  return `${lines.join('\n')}\n`;
+}
+
+function joinLabels(...parts: string[]): string {
+  return parts.filter(Boolean).join(',');
+}
+
+export interface MetricsOptions {
+  shared: boolean;
+  flushIntervalMs: number;
+}
+
+export function metricsOptionsFromEnv(): MetricsOptions {
+  return {
+    shared: process.env.METRICS_SHARED === '1' && isKvConfigured(),
+    flushIntervalMs: Number(process.env.METRICS_FLUSH_MS || 10_000),
+  };
+}
+
+const METRICS_KEY = 'metrics:v1';
+
+// Series of one route and method, resolved once and then updated in place
+export interface RouteSeries {
+  labels: string;
+  inFlight: CounterCell;
+  statuses: Map<number, CounterCell>;
+  duration: HistogramSeries;
+  storeTime: HistogramSeries;
+  handlerTime: HistogramSeries;
+  requestSize: HistogramSeries;
+  responseSize: HistogramSeries;
+}
+
+export interface RequestObservation {
+  status: number;
+  durationMs: number;
+  storeMs: number;
+  requestBytes: number | null;
+  responseBytes: number | null;
+}
+
+export class RequestMetrics {
+  readonly requests: Counter;
+  readonly inFlight: Counter; // a gauge; kept as +1/-1 increments so deltas add up across workers
+  readonly duration: Histogram;
+  readonly storeTime: Histogram;
+  readonly handlerTime: Histogram;
+  readonly requestSize: Histogram;
+  readonly responseSize: Histogram;
+  private readonly metrics: (Counter | Histogram)[];
+  private readonly families: MetricFamily[];
+  private client: Promise<VercelKV> | null = null;
+  private lastFlushAt = Date.now();
+  private flushing: Promise<void> | null = null;
+  private counters = { observed: 0, flushes: 0, flushErrors: 0 };
+
+  constructor(
+    readonly options: MetricsOptions = metricsOptionsFromEnv(),
+    private readonly clientFactory: () => Promise<VercelKV> = createKvClient
+  ) {
+    const family = (name: string, type: MetricType, help: string) => ({ name, type, help });
+
+    this.requests = new Counter(
+      family('http_requests_total', 'counter', 'API requests by route, method and status')
+    );
+    this.inFlight = new Counter(
+      family('http_requests_in_flight', 'gauge', 'API requests currently being handled')
+    );
+    this.duration = new Histogram(
+      family('http_request_duration_seconds', 'histogram', 'Time to produce the response'),
+      LATENCY_BUCKETS
+    );
+    this.storeTime = new Histogram(
+      family(
+        'http_request_store_seconds',
+        'histogram',
+        'Time spent waiting on the game store per request (overlapping calls are summed)'
+      ),
+      LATENCY_BUCKETS
+    );
+    this.handlerTime = new Histogram(
+      family(
+        'http_request_handler_seconds',
+        'histogram',
+        'Request time outside the store: parsing, game logic, serialization'
+      ),
+      LATENCY_BUCKETS
+    );
+    this.requestSize = new Histogram(
+      family('http_request_size_bytes', 'histogram', 'Request bodies with a Content-Length'),
+      SIZE_BUCKETS
+    );
+    this.responseSize = new Histogram(
+      family('http_response_size_bytes', 'histogram', 'Response bodies with a Content-Length'),
+      SIZE_BUCKETS
+    );
+
+    this.metrics = [
+      this.requests,
+      this.inFlight,
+      this.duration,
+      this.storeTime,
+      this.handlerTime,
+      this.requestSize,
+      this.responseSize,
+    ];
+    this.families = this.metrics.map((metric) => metric.family);
+  }
+
+  routeSeries(route: string, method: string): RouteSeries {
+    const routeLabel = `route="${labelValue(route)}"`;
+    const labels = `${routeLabel},method="${labelValue(method)}"`;
+
+    return {
+      labels,
+      inFlight: this.inFlight.cell(routeLabel),
+      statuses: new Map(),
+      duration: this.duration.seriesFor(labels),
+      storeTime: this.storeTime.seriesFor(labels),
+      handlerTime: this.handlerTime.seriesFor(labels),
+      requestSize: this.requestSize.seriesFor(labels),
+      responseSize: this.responseSize.seriesFor(labels),
+    };
+  }
+
+  observe(series: RouteSeries, observation: RequestObservation): void {
+    const { status, durationMs, storeMs } = observation;
+    this.counters.observed++;
+
+    let requests = series.statuses.get(status);
+    if (!requests) {
+      requests = this.requests.cell(`${series.labels},status="${status}"`);
+      series.statuses.set(status, requests);
+    }
+    requests.value++;
+
+    observeInto(series.duration, durationMs / 1000);
+    observeInto(series.storeTime, storeMs / 1000);
+    observeInto(series.handlerTime, Math.max(0, durationMs - storeMs) / 1000);
+    if (observation.requestBytes !== null) {
+      observeInto(series.requestSize, observation.requestBytes);
+    }
+    if (observation.responseBytes !== null) {
+      observeInto(series.responseSize, observation.responseBytes);
+    }
+
+    if (this.options.shared && Date.now() - this.lastFlushAt >= this.options.flushIntervalMs) {
+      void this.flush();
+    }
+  }
+
+  // Prometheus exposition of this worker, or of all workers in shared mode
+  async render(): Promise<string> {
+    if (!this.options.shared) {
+      return renderPrometheus(
+        [...this.families, ...PROCESS_FAMILIES],
+        [...this.collect(false), ...processSamples()]
+      );
+    }
+
+    await this.flush();
+    const kv = await this.kv();
+    const fields = (await kv.hgetall<Record<string, number>>(METRICS_KEY)) ?? {};
+    const samples = Object.entries(fields).map(([field, value]) => {
+      const [family, suffix, labels, le] = JSON.parse(field) as [
+        string,
+        MetricSample['suffix'],
+        string,
+        string,
+      ];
+      return { family, suffix, labels, le: le || undefined, value: Number(value) };
+    });
+    return renderPrometheus(this.families, samples);
+  }
+
+  // Add everything recorded since the last flush to the shared hash
+  flush(): Promise<void> {
+    if (!this.flushing) {
+      this.lastFlushAt = Date.now();
+      this.flushing = this.writeDeltas().finally(() => {
+        this.flushing = null;
+      });
+    }
+    return this.flushing;
+  }
+
+  stats() {
+    return { shared: this.options.shared, ...this.counters };
+  }
+
+  private collect(deltas: boolean): MetricSample[] {
+    return this.metrics.flatMap((metric) => metric.collect(deltas));
+  }
+
+  private async writeDeltas(): Promise<void> {
+    const deltas = this.collect(true).filter((sample) => sample.value !== 0);
+    if (deltas.length === 0) return;
+
+    try {
+      const kv = await this.kv();
+      const pipeline = kv.pipeline();
+      for (const sample of deltas) {
+        const field = [sample.family, sample.suffix, sample.labels, sample.le ?? ''];
+        pipeline.hincrbyfloat(METRICS_KEY, JSON.stringify(field), sample.value);
+      }
+      await pipeline.exec();
+      this.counters.flushes++;
+    } catch (error) {
+      // These deltas are lost; counters stay monotonic, which is what rate() needs
+      this.counters.flushErrors++;
+      console.error('[Metrics] Failed to flush to KV:', error);
+    }
+  }
+
+  private kv(): Promise<VercelKV> {
+    if (!this.client) {
+      this.client = this.clientFactory();
+    }
+    return this.client;
+  }
+}
+
+const PROCESS_FAMILIES: MetricFamily[] = [
+  { name: 'process_uptime_seconds', type: 'gauge', help: 'Seconds since the worker started' },
+  { name: 'process_resident_memory_bytes', type: 'gauge', help: 'Resident set size' },
+  { name: 'nodejs_heap_used_bytes', type: 'gauge', help: 'V8 heap in use' },
+];
+
+function processSamples(): MetricSample[] {
+  const memory = process.memoryUsage();
+  const sample = (family: string, value: number): MetricSample => ({
+    family,
+    suffix: '',
+    labels: '',
+    value,
+  });
+
+  return [
+    sample('process_uptime_seconds', process.uptime()),
+    sample('process_resident_memory_bytes', memory.rss),
+    sample('nodejs_heap_used_bytes', memory.heapUsed),
+  ];
+}
+
+function contentLength(headers: Headers): number | null {
+  const value = headers.get('content-length');
+  return value === null ? null : Number(value);
+}
+
+// Response.json sets no Content-Length, but its body is already in memory, so JSON bodies are
+// measured from a copy. Streamed bodies (the NDJSON export) are not buffered just to count them.
+async function responseLength(response: Response): Promise<number | null> {
+  const declared = contentLength(response.headers);
+  if (declared !== null) return declared;
+  if (!response.body) return 0;
+  if (!response.headers.get('content-type')?.startsWith('application/json')) return null;
+  return (await response.clone().arrayBuffer()).byteLength;
+}
+
+type RouteHandler = (request: Request) => Promise<Response>;
+
+// Instruments a route handler; `route` is the path pattern, e.g. '/api/game/move'
+export function withMetrics(route: string, handler: RouteHandler): RouteHandler {
+  // Resolved per method for the current registry (tests and benchmarks replace the context)
+  let registry: RequestMetrics | null = null;
+  const seriesByMethod = new Map<string, RouteSeries>();
+
+  return async (request: Request) => {
+    const { metrics, tracer } = getServerContext();
+    if (metrics !== registry) {
+      registry = metrics;
+      seriesByMethod.clear();
+    }
+    let series = seriesByMethod.get(request.method);
+    if (!series) {
+      series = metrics.routeSeries(route, request.method);
+      seriesByMethod.set(request.method, series);
+    }
+
+    const scope = createRequestScope(route, request.method);
+    const root = tracer.startTrace(`${request.method} ${route}`, {
+      'http.route': route,
+      'http.request.method': request.method,
+    });
+    const start = performance.now();
+    let status = 500;
+    let responseBytes: number | null = null;
+
+    series.inFlight.value++;
+    try {
+      const response = await runInRequestScope(scope, () =>
+        root ? root.run(() => handler(request)) : handler(request)
+      );
+      status = response.status;
+      responseBytes = await responseLength(response);
+      return response;
+    } finally {
+      series.inFlight.value--;
+      finishRequestScope(scope);
+      if (root) {
+        root.setAttributes({ 'http.response.status_code': status });
+        root.end(status >= 500 ? `HTTP ${status}` : undefined);
+      }
+      metrics.observe(series, {
+        status,
+        durationMs: performance.now() - start,
+        storeMs: scope.storeMs,
+        requestBytes: contentLength(request.headers),
+        responseBytes,
+      });
+    }
+  };
+}
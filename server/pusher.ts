@@ -1,48 +1,58 @@
 // Pusher integration for real-time game state updates
-import Pusher from 'pusher';
+// The SDK is imported on first use so it stays off the cold-start path of routes that never publish
+import type Pusher from 'pusher';
+import { getServerContext } from './context';
 
 // Singleton instance
-let pusherInstance: Pusher | null = null;
-
-export function getPusherServer(): Pusher {
-  if (!pusherInstance) {
-    // Check if Pusher credentials are configured
-    const appId = process.env.PUSHER_APP_ID;
-    const key = process.env.PUSHER_KEY;
-    const secret = process.env.PUSHER_SECRET;
-    const cluster = process.env.PUSHER_CLUSTER || 'mt1';
-
-    if (!appId || !key || !secret) {
-      console.warn('[Pusher] Credentials not configured. Real-time updates will be disabled.');
-      console.warn(
-        '[Pusher] Set PUSHER_APP_ID, PUSHER_KEY, and PUSHER_SECRET in environment variables.'
-      );
-
-      // Return a mock Pusher instance that doesn't throw errors
-      return {
-        trigger: async () => {
-          console.log('[Pusher] Mock trigger called (credentials not configured)');
-        },
-      } as any;
-    }
-
-    pusherInstance = new Pusher({
-      appId,
-      key,
-      secret,
-      cluster,
-      useTLS: true,
-    });
-
-    console.log(`[Pusher] Server initialized with cluster: ${cluster}`);
+let pusherPromise: Promise<Pusher> | null = null;
+
+async function createPusherServer(): Promise<Pusher> {
+  // Check if Pusher credentials are configured
+  const appId = process.env.PUSHER_APP_ID;
+  const key = process.env.PUSHER_KEY;
+  const secret = process.env.PUSHER_SECRET;
+  const cluster = process.env.PUSHER_CLUSTER || 'mt1';
+
+  if (!appId || !key || !secret) {
+    console.warn('[Pusher] Credentials not configured. Real-time updates will be disabled.');
+    console.warn(
+      '[Pusher] Set PUSHER_APP_ID, PUSHER_KEY, and PUSHER_SECRET in environment variables.'
+    );
+
+    // Return a mock Pusher instance that doesn't throw errors
+    return {
+      trigger: async () => {
+        console.log('[Pusher] Mock trigger called (credentials not configured)');
+      },
+    } as any;
+  }
+
+  const { default: PusherServer } = await import('pusher');
+  const pusher = new PusherServer({
+    appId,
+    key,
+    secret,
+    cluster,
+    useTLS: true,
+  });
+
+  console.log(`[Pusher] Server initialized with cluster: ${cluster}`);
+
+  return pusher;
+}
+
+export function getPusherServer(): Promise<Pusher> {
+  if (!pusherPromise) {
+    pusherPromise = createPusherServer();
   }
 
-  return pusherInstance;
+  return pusherPromise;
 }
 
+// Broadcasts go through the shared context's client, so tests and benchmarks can replace it
 export async function broadcastGameUpdate(gameId: string, gameState: any) {
   try {
-    const pusher = getPusherServer();
+    const pusher = await getServerContext().getPusher();
 
     await pusher.trigger(`game-${gameId}`, 'game-update', gameState);
 
@@ -55,7 +65,7 @@ export async function broadcastGameUpdate(gameId: string, gameState: any) {
 
 export async function broadcastChatUpdate(gameId: string, messages: any[]) {
   try {
-    const pusher = getPusherServer();
+    const pusher = await getServerContext().getPusher();
 
     await pusher.trigger(`game-${gameId}`, 'chat-update', messages);
 
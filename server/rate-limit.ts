@@ -0,0 +1,207 @@
+// Token-bucket rate limiting for write endpoints (chat/send, game/move)
+// Each endpoint has its own budget; buckets are keyed by player id and by client IP. A
+// request takes a token from every one of its buckets or from none, so a rejected player does
+// not also drain the budget of everyone sharing their IP.
+// In-process buckets suit a single worker; set RATE_LIMIT_SHARED=1 to keep them in KV so
+// every worker enforces the same budget.
+
+import type { VercelKV } from '@vercel/kv';
+import { createKvClient } from './stores/kv-store';
+import { isKvConfigured } from './store';
+
+export type RateLimitedEndpoint = 'chat:send' | 'game:move';
+
+export interface RateBudget {
+  capacity: number; // burst size
+  refillPerSecond: number;
+}
+
+export interface RateLimitDecision {
+  allowed: boolean;
+  retryAfterMs: number;
+}
+
+export interface RateLimiter {
+  // Allowed only when every bucket has a token; tokens are taken only then
+  consume(keys: string[], now?: number): Promise<RateLimitDecision>;
+  stats(): { keys: number | null; allowed: number; rejected: number };
+}
+
+const DEFAULT_BUDGETS: Record<RateLimitedEndpoint, RateBudget> = {
+  'chat:send': { capacity: 10, refillPerSecond: 1 },
+  'game:move': { capacity: 5, refillPerSecond: 2 },
+};
+
+// RATE_LIMIT_CHAT_SEND / RATE_LIMIT_GAME_MOVE as "<capacity>/<refillPerSecond>", e.g. "10/1"
+function budgetFromEnv(endpoint: RateLimitedEndpoint): RateBudget {
+  const name = `RATE_LIMIT_${endpoint.replace(':', '_').toUpperCase()}`;
+  const [capacity, refill] = (process.env[name] || '').split('/').map(Number);
+
+  if (capacity > 0 && refill > 0) {
+    return { capacity, refillPerSecond: refill };
+  }
+  return DEFAULT_BUDGETS[endpoint];
+}
+
+interface Bucket {
+  tokens: number;
+  updatedAt: number;
+}
+
+export class MemoryRateLimiter implements RateLimiter {
+  // Least recently touched first; idle buckets refill to capacity and are dropped
+  private buckets = new Map<string, Bucket>();
+  private counters = { allowed: 0, rejected: 0 };
+  private readonly refillPerMs: number;
+  private readonly idleMs: number;
+
+  constructor(readonly budget: RateBudget) {
+    this.refillPerMs = budget.refillPerSecond / 1000;
+    this.idleMs = Math.ceil(budget.capacity / this.refillPerMs);
+  }
+
+  async consume(keys: string[], now = Date.now()): Promise<RateLimitDecision> {
+    this.sweep(now);
+
+    const levels = keys.map((key) => {
+      const bucket = this.buckets.get(key);
+      if (!bucket) return this.budget.capacity;
+      return Math.min(
+        this.budget.capacity,
+        bucket.tokens + (now - bucket.updatedAt) * this.refillPerMs
+      );
+    });
+    const allowed = levels.every((tokens) => tokens >= 1);
+
+    keys.forEach((key, i) => {
+      this.buckets.delete(key);
+      this.buckets.set(key, { tokens: allowed ? levels[i] - 1 : levels[i], updatedAt: now });
+    });
+
+    if (allowed) {
+      this.counters.allowed++;
+      return { allowed, retryAfterMs: 0 };
+    }
+
+    this.counters.rejected++;
+    const lowest = Math.min(...levels);
+    return { allowed, retryAfterMs: Math.ceil((1 - lowest) / this.refillPerMs) };
+  }
+
+  stats() {
+    return { keys: this.buckets.size, ...this.counters };
+  }
+
+  // Amortized O(1): only looks at the least recently touched buckets
+  private sweep(now: number): void {
+    for (const [key, bucket] of this.buckets) {
+      if (now - bucket.updatedAt < this.idleMs) return;
+      this.buckets.delete(key);
+    }
+  }
+}
+
+// Atomic token buckets in Redis hashes, one per key: every bucket is refilled first, and a
+// token is taken from each only when all of them have one. Keys expire once the bucket would
+// be full again.
+const TOKEN_BUCKET_SCRIPT = `
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local levels = {}
+local retry = 0
+for i, key in ipairs(KEYS) do
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < 1 then
+    retry = math.max(retry, math.ceil((1 - tokens) / rate))
+  end
+end
+local allowed = 0
+if retry == 0 then
+  allowed = 1
+end
+for i, key in ipairs(KEYS) do
+  redis.call('HSET', key, 'tokens', tostring(levels[i] - allowed), 'ts', now)
+  redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+return {allowed, retry}
+`;
+
+export class KvRateLimiter implements RateLimiter {
+  private client: Promise<VercelKV> | null = null;
+  private counters = { allowed: 0, rejected: 0 };
+
+  constructor(
+    readonly endpoint: RateLimitedEndpoint,
+    readonly budget: RateBudget,
+    private readonly clientFactory: () => Promise<VercelKV> = createKvClient
+  ) {}
+
+  async consume(keys: string[], now = Date.now()): Promise<RateLimitDecision> {
+    if (!this.client) {
+      this.client = this.clientFactory();
+    }
+    const kv = await this.client;
+
+    const [allowed, retryAfterMs] = await kv.eval<string[], [number, number]>(
+      TOKEN_BUCKET_SCRIPT,
+      keys.map((key) => `ratelimit:${this.endpoint}:${key}`),
+      [String(this.budget.capacity), String(this.budget.refillPerSecond / 1000), String(now)]
+    );
+
+    if (allowed === 1) {
+      this.counters.allowed++;
+      return { allowed: true, retryAfterMs: 0 };
+    }
+
+    this.counters.rejected++;
+    return { allowed: false, retryAfterMs };
+  }
+
+  stats() {
+    return { keys: null, ...this.counters };
+  }
+}
+
+export function createRateLimiters(): Record<RateLimitedEndpoint, RateLimiter> {
+  const shared = process.env.RATE_LIMIT_SHARED === '1' && isKvConfigured();
+  const endpoints: RateLimitedEndpoint[] = ['chat:send', 'game:move'];
+
+  return Object.fromEntries(
+    endpoints.map((endpoint) => {
+      const budget = budgetFromEnv(endpoint);
+      const limiter = shared
+        ? new KvRateLimiter(endpoint, budget)
+        : new MemoryRateLimiter(budget);
+      return [endpoint, limiter];
+    })
+  ) as Record<RateLimitedEndpoint, RateLimiter>;
+}
+
+export function clientIp(request: Request): string {
+  const forwarded = request.headers.get('x-forwarded-for');
+  if (forwarded) {
+    return forwarded.split(',')[0].trim();
+  }
+  return request.headers.get('x-real-ip') || 'unknown';
+}
+
+// Takes one token from every key's bucket; returns a 429 response, and takes nothing, when
+// any bucket is empty
+export async function enforceRateLimit(
+  limiter: RateLimiter,
+  keys: string[]
+): Promise<Response | null> {
+  const decision = await limiter.consume(keys);
+  if (decision.allowed) return null;
+
+  const retryAfter = Math.max(1, Math.ceil(decision.retryAfterMs / 1000));
+  return Response.json(
+    { error: 'Too many requests', retry_after: retryAfter },
+    { status: 429, headers: { 'Retry-After': String(retryAfter) } }
+  );
+}
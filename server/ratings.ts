@@ -0,0 +1,180 @@
+// Player profiles, Elo ratings and leaderboards
+// A profile is a persistent identity players pass (profile_id) when they create, join or
+// queue for a game, together with the secret profile_token handed out when the profile was
+// created. A game between two different profiles is rated when it finishes: the
+// move that ends it computes both rating changes and saves them with the final game state
+// in one store transaction (GameStore.saveRatedGame). Ratings are kept per mode in a sorted
+// set that is the leaderboard, so top-N and rank lookups never scan games.
+//
+// Changes are deltas added to the stored rating, so two games a player finishes at the same
+// time both count. Profile ids are public handles shown on the leaderboard; only a SHA-256
+// hash of the token is stored, and a profile id without its token is rejected.
+
+import { createHash, randomBytes, timingSafeEqual } from 'node:crypto';
+import type {
+  GameMode,
+  LeaderboardEntry,
+  ModeStanding,
+  PlayerProfile,
+  PlayerProfileResponse,
+} from '@/lib/types';
+import type {
+  GameStore,
+  ProfileStanding,
+  RatingChange,
+  StoredGame,
+  StoredProfile,
+} from './store';
+
+export const RATED_MODES: GameMode[] = ['classic3', 'gomoku'];
+export const INITIAL_RATING = 1500;
+// Ratings of new players move faster until they have settled
+const PROVISIONAL_GAMES = 30;
+const PROVISIONAL_K = 40;
+const K = 20;
+
+function generateId(): string {
+  return `${Date.now()}_${Math.random().toString(36).substring(2, 15)}`;
+}
+
+// Expected score (0-1) of a player against an opponent
+export function expectedScore(rating: number, opponentRating: number): number {
+  return 1 / (1 + 10 ** ((opponentRating - rating) / 400));
+}
+
+// Rating changes of both players; score is player 1's result (1 win, 0.5 draw, 0 loss)
+export function eloDeltas(
+  first: ProfileStanding,
+  second: ProfileStanding,
+  score: number
+): [number, number] {
+  const firstRating = first.rating ?? INITIAL_RATING;
+  const secondRating = second.rating ?? INITIAL_RATING;
+  const k = (standing: ProfileStanding) =>
+    standing.games < PROVISIONAL_GAMES ? PROVISIONAL_K : K;
+  const expected = expectedScore(firstRating, secondRating);
+
+  return [k(first) * (score - expected), k(second) * (expected - score)];
+}
+
+// Changes to save with a finished game, or null when the game is not rated
+export async function ratingChanges(
+  store: GameStore,
+  game: StoredGame
+): Promise<RatingChange[] | null> {
+  const [first, second] = [...game.players].sort((a, b) => a.player_number - b.player_number);
+  if (game.status !== 'completed' || !first?.profile_id || !second?.profile_id) return null;
+  if (first.profile_id === second.profile_id) return null;
+
+  const standings = await store.getStandings(game.mode, [first.profile_id, second.profile_id]);
+  const score = game.winner_id === first.id ? 1 : game.winner_id === second.id ? 0 : 0.5;
+  const [firstDelta, secondDelta] = eloDeltas(standings[0], standings[1], score);
+  const result = (s: number): RatingChange['result'] =>
+    s === 1 ? 'wins' : s === 0 ? 'losses' : 'draws';
+
+  return [
+    { profileId: first.profile_id, delta: firstDelta, result: result(score) },
+    { profileId: second.profile_id, delta: secondDelta, result: result(1 - score) },
+  ];
+}
+
+function hashToken(token: string): string {
+  return createHash('sha256').update(token).digest('hex');
+}
+
+function publicProfile({ id, player_name, created_at }: StoredProfile): PlayerProfile {
+  return { id, player_name, created_at };
+}
+
+// Creates a profile and returns it with its token; the token is not stored and cannot be
+// looked up again
+export async function createProfile(
+  store: GameStore,
+  playerName: string
+): Promise<{ profile: PlayerProfile; token: string }> {
+  const token = randomBytes(24).toString('base64url');
+  const profile: StoredProfile = {
+    id: `profile_${generateId()}`,
+    player_name: playerName,
+    created_at: new Date().toISOString(),
+    token_hash: hashToken(token),
+  };
+  await store.saveProfile(profile);
+  return { profile: publicProfile(profile), token };
+}
+
+// Whether a request may play under a profile: it must exist and the token must match
+export async function checkProfileToken(
+  store: GameStore,
+  profileId: unknown,
+  token: unknown
+): Promise<'ok' | 'not_found' | 'invalid_token'> {
+  if (typeof profileId !== 'string') return 'not_found';
+  const [profile] = await store.getProfiles([profileId]);
+  if (!profile) return 'not_found';
+  if (typeof token !== 'string') return 'invalid_token';
+
+  const expected = Buffer.from(profile.token_hash, 'hex');
+  const actual = Buffer.from(hashToken(token), 'hex');
+  return timingSafeEqual(actual, expected) ? 'ok' : 'invalid_token';
+}
+
+// Profile with its standing and rank in every mode, or null when it does not exist
+export async function getProfileResponse(
+  store: GameStore,
+  profileId: string
+): Promise<PlayerProfileResponse | null> {
+  const [[profile], perMode] = await Promise.all([
+    store.getProfiles([profileId]),
+    Promise.all(
+      RATED_MODES.map((mode) =>
+        Promise.all([
+          store.getStandings(mode, [profileId]),
+          store.getLeaderboardRank(mode, profileId),
+        ])
+      )
+    ),
+  ]);
+  if (!profile) return null;
+
+  const standings = {} as Record<GameMode, ModeStanding>;
+  RATED_MODES.forEach((mode, i) => {
+    const [[standing], rank] = perMode[i];
+    standings[mode] = {
+      ...standing,
+      rating: Math.round(standing.rating ?? INITIAL_RATING),
+      rank: rank === null ? null : rank + 1,
+    };
+  });
+  return { profile: publicProfile(profile), standings };
+}
+
+// One page of the leaderboard with player names
+export async function getLeaderboardPage(
+  store: GameStore,
+  mode: GameMode,
+  offset: number,
+  limit: number
+): Promise<LeaderboardEntry[]> {
+  const rows = await store.getLeaderboard(mode, offset, limit);
+  const profiles = await store.getProfiles(rows.map((row) => row.profileId));
+
+  return rows.map((row, i) => ({
+    rank: offset + i + 1,
+    profile_id: row.profileId,
+    player_name: profiles[i]?.player_name ?? '',
+    rating: Math.round(row.rating),
+  }));
+}
+
+// A profile's own leaderboard entry, or null when it has no rated games in the mode
+export async function getLeaderboardEntry(
+  store: GameStore,
+  mode: GameMode,
+  profileId: string
+): Promise<LeaderboardEntry | null> {
+  const rank = await store.getLeaderboardRank(mode, profileId);
+  if (rank === null) return null;
+  const [entry] = await getLeaderboardPage(store, mode, rank, 1);
+  return entry ?? null;
+}
@@ -0,0 +1,249 @@
+// Per-request state that follows a request through its async calls
+// Route handlers wrapped with withMetrics() run inside a scope; store calls made anywhere
+// below them are counted and timed against it, per store operation. The AsyncLocalStorage
+// instance lives on globalThis for the same reason as the server context: each route bundle
+// has its own copy of this module.
+//
+// STORE_SLOW_OP_MS logs single store calls slower than the threshold with their arguments.
+// STORE_LOG_REQUESTS=1 logs every request's store operations, which makes N+1 patterns
+// (one call per game, message or player) easy to spot.
+
+import { AsyncLocalStorage } from 'node:async_hooks';
+import type { GameStore } from './store';
+import { currentSpan, isPromise } from './tracing';
+
+export interface StoreOpStats {
+  calls: number;
+  // Records returned: array length, 1 for any other non-null value
+  items: number;
+  ms: number;
+}
+
+export interface RequestScope {
+  route: string;
+  method: string;
+  storeMs: number;
+  storeCalls: number;
+  storeOps: Map<string, StoreOpStats>;
+  // Enclosing scope, e.g. a test measuring a whole route call; it is charged too
+  parent?: RequestScope;
+}
+
+export interface StoreOpReport {
+  calls: number;
+  items: number;
+  ms: number;
+  byOperation: Record<string, StoreOpStats>;
+}
+
+export interface StoreAccountingOptions {
+  slowOpMs: number;
+  logRequests: boolean;
+}
+
+export function storeAccountingOptionsFromEnv(): StoreAccountingOptions {
+  return {
+    slowOpMs: Number(process.env.STORE_SLOW_OP_MS || 100),
+    logRequests: process.env.STORE_LOG_REQUESTS === '1',
+  };
+}
+
+const globalForScope = globalThis as unknown as {
+  __requestScope?: AsyncLocalStorage<RequestScope>;
+  __storeAccounting?: StoreAccountingOptions;
+};
+
+function scopeStorage(): AsyncLocalStorage<RequestScope> {
+  if (!globalForScope.__requestScope) {
+    globalForScope.__requestScope = new AsyncLocalStorage<RequestScope>();
+  }
+  return globalForScope.__requestScope;
+}
+
+function accountingOptions(): StoreAccountingOptions {
+  if (!globalForScope.__storeAccounting) {
+    globalForScope.__storeAccounting = storeAccountingOptionsFromEnv();
+  }
+  return globalForScope.__storeAccounting;
+}
+
+export function createRequestScope(route: string, method: string): RequestScope {
+  return {
+    route,
+    method,
+    storeMs: 0,
+    storeCalls: 0,
+    storeOps: new Map(),
+    parent: currentRequestScope(),
+  };
+}
+
+export function runInRequestScope<T>(scope: RequestScope, fn: () => T): T {
+  return scopeStorage().run(scope, fn);
+}
+
+export function currentRequestScope(): RequestScope | undefined {
+  return scopeStorage().getStore();
+}
+
+export function storeOpReport(scope: RequestScope): StoreOpReport {
+  let items = 0;
+  for (const stats of scope.storeOps.values()) items += stats.items;
+
+  return {
+    calls: scope.storeCalls,
+    items,
+    ms: scope.storeMs,
+    byOperation: Object.fromEntries(
+      [...scope.storeOps].map(([operation, stats]) => [operation, { ...stats }])
+    ),
+  };
+}
+
+// Called by the route wrapper once the response is ready
+export function finishRequestScope(scope: RequestScope): void {
+  if (!accountingOptions().logRequests) return;
+
+  const { calls, items, ms, byOperation } = storeOpReport(scope);
+  const operations = Object.entries(byOperation)
+    .map(([operation, stats]) => `${operation}×${stats.calls}`)
+    .join(', ');
+  console.log(
+    `[Store] ${scope.method} ${scope.route}: ${calls} ops, ${items} items, ` +
+      `${ms.toFixed(2)}ms (${operations || 'none'})`
+  );
+}
+
+// Runs fn in its own scope and reports the store operations it made, including those of any
+// route handlers it calls. Used by the store budget tests.
+export async function measureStoreOps<T>(
+  fn: () => Promise<T>
+): Promise<{ result: T; ops: StoreOpReport }> {
+  const scope = createRequestScope('measure', '-');
+  const result = await runInRequestScope(scope, fn);
+  return { result, ops: storeOpReport(scope) };
+}
+
+export interface StoreBudget {
+  calls?: number;
+  items?: number;
+  byOperation?: Record<string, number>; // maximum calls per operation
+}
+
+// Budget violations as readable messages; empty when the report is within budget
+export function checkStoreBudget(report: StoreOpReport, budget: StoreBudget): string[] {
+  const violations: string[] = [];
+
+  if (budget.calls !== undefined && report.calls > budget.calls) {
+    violations.push(`${report.calls} store calls, budget ${budget.calls}`);
+  }
+  if (budget.items !== undefined && report.items > budget.items) {
+    violations.push(`${report.items} items read or written, budget ${budget.items}`);
+  }
+  for (const [operation, limit] of Object.entries(budget.byOperation ?? {})) {
+    const calls = report.byOperation[operation]?.calls ?? 0;
+    if (calls > limit) {
+      violations.push(`${calls} ${operation} calls, budget ${limit}`);
+    }
+  }
+
+  if (violations.length > 0) {
+    const made = Object.entries(report.byOperation)
+      .map(([operation, stats]) => `${operation}×${stats.calls}`)
+      .join(', ');
+    violations.push(`operations made: ${made}`);
+  }
+  return violations;
+}
+
+function countItems(value: unknown): number {
+  if (Array.isArray(value)) return value.length;
+  return value === null || value === undefined ? 0 : 1;
+}
+
+function describeArgs(args: unknown[]): string {
+  return args
+    .map((arg) => {
+      if (typeof arg === 'string') return JSON.stringify(arg);
+      if (Array.isArray(arg)) return `[${arg.length} items]`;
+      if (arg && typeof arg === 'object') {
+        return 'id' in arg ? `{id: ${JSON.stringify(arg.id)}}` : JSON.stringify(arg);
+      }
+      return String(arg);
+    })
+    .join(', ');
+}
+
+function record(scope: RequestScope, operation: string, ms: number, items: number): void {
+  for (let current: RequestScope | undefined = scope; current; current = current.parent) {
+    current.storeCalls++;
+    current.storeMs += ms;
+
+    let stats = current.storeOps.get(operation);
+    if (!stats) {
+      stats = { calls: 0, items: 0, ms: 0 };
+      current.storeOps.set(operation, stats);
+    }
+    stats.calls++;
+    stats.items += items;
+    stats.ms += ms;
+  }
+}
+
+// Wraps every store method so its calls, items and time are charged to the current request
+// scope, with a span when the request is traced. Calls made outside a request (cron jobs,
+// scripts) pass straight through.
+export function instrumentStore(store: GameStore): GameStore {
+  const wrapped = new Map<PropertyKey, unknown>();
+
+  return new Proxy(store, {
+    get(target, property, receiver) {
+      const value = Reflect.get(target, property, receiver);
+      if (typeof value !== 'function' || typeof property !== 'string') {
+        return value;
+      }
+
+      let method = wrapped.get(property);
+      if (!method) {
+        method = function (this: unknown, ...args: unknown[]) {
+          const scope = currentRequestScope();
+          if (!scope) {
+            return value.apply(target, args);
+          }
+
+          const span = currentSpan()?.child(
+            `store.${property}`,
+            { 'db.operation': property },
+            'client'
+          );
+          const start = performance.now();
+          const done = (result: unknown, error?: unknown) => {
+            const ms = performance.now() - start;
+            span?.end(error);
+            record(scope, property, ms, countItems(result));
+            if (ms >= accountingOptions().slowOpMs) {
+              console.warn(
+                `[Store] Slow ${property} (${ms.toFixed(1)}ms) in ${scope.method} ` +
+                  `${scope.route}: ${describeArgs(args)}`
+              );
+            }
+            return result;
+          };
+
+          const result = value.apply(target, args);
+          if (!isPromise(result)) {
+            // Async iterables (listChatGameIds) are counted once, when created
+            done(undefined);
+            return result;
+          }
+          return result.then(done, (error: unknown) => {
+            done(undefined, error);
+            throw error;
+          });
+        };
+        wrapped.set(property, method);
+      }
+      return method;
+    },
+  });
+}
@@ -0,0 +1,262 @@
+// Self-play: engines play each other on the shared rules, with no HTTP or store in the loop
+// Run with scripts/selfplay.ts, which spreads tasks over a pool of worker processes. A game
+// is a loop over a GameBoard: the engine to move picks a cell, lib/game-logic checks for a
+// winner or a full board. Engines of a pairing take turns moving first, and each game has
+// its own seed, so results do not depend on how games are split across workers.
+//
+// Games come back with the think time of every move. PairingStats adds them up into result
+// counts with Wilson confidence intervals and think time histograms; finished games convert
+// to compact game records (server/game-record.ts) for replay.
+
+import { checkWinner, getBoardSize, isBoardFull } from '@/lib/game-logic';
+import type { BoardCell, GameBoard, GameMode } from '@/lib/types';
+import { createEngine, type Engine } from './engines';
+import type { GameRecord } from './game-record';
+
+export interface SelfPlayTask {
+  mode: GameMode;
+  engines: [string, string]; // the pairing; engines[0] moves first in even games
+  from: number; // index of the first game of the task within the pairing
+  count: number;
+  seed: number;
+}
+
+export interface SelfPlayGame {
+  mode: GameMode;
+  index: number;
+  seats: [string, string]; // engine specs, first mover first
+  winner: 0 | 1 | 2; // seat, 0 for a draw
+  cells: number[]; // row * size + column, per move
+  thinkUs: number[]; // engine time per move, microseconds
+}
+
+// Deterministic PRNG (mulberry32), seeded per game
+export function seededRandom(seed: number): () => number {
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function emptyBoard(mode: GameMode): GameBoard {
+  const size = getBoardSize(mode);
+  const cells: BoardCell[][] = Array.from({ length: size }, () =>
+    Array.from({ length: size }, () => ({ symbol: null, player_number: null }))
+  );
+  return { size, cells };
+}
+
+export function playGame(
+  mode: GameMode,
+  seats: [Engine, Engine],
+  random: () => number
+): Omit<SelfPlayGame, 'index'> {
+  const board = emptyBoard(mode);
+  const cells: number[] = [];
+  const thinkUs: number[] = [];
+
+  for (;;) {
+    const player = ((cells.length % 2) + 1) as 1 | 2;
+    const start = performance.now();
+    const [row, column] = seats[player - 1].move(board, player, random);
+    thinkUs.push((performance.now() - start) * 1000);
+
+    const cell = board.cells[row]?.[column];
+    if (!cell || cell.player_number !== null) {
+      throw new Error(`${seats[player - 1].spec} played an illegal move: ${row},${column}`);
+    }
+    cell.symbol = player === 1 ? 'X' : 'O';
+    cell.player_number = player;
+    cells.push(row * board.size + column);
+
+    const winner = checkWinner(mode, board);
+    if (winner || isBoardFull(board)) {
+      return {
+        mode,
+        seats: [seats[0].spec, seats[1].spec],
+        winner: winner === 'X' ? 1 : winner === 'O' ? 2 : 0,
+        cells,
+        thinkUs,
+      };
+    }
+  }
+}
+
+export function runTask(task: SelfPlayTask): SelfPlayGame[] {
+  const [a, b] = task.engines.map((spec) => createEngine(spec, task.mode));
+  const games: SelfPlayGame[] = [];
+
+  for (let index = task.from; index < task.from + task.count; index++) {
+    const seats: [Engine, Engine] = index % 2 === 0 ? [a, b] : [b, a];
+    const random = seededRandom(task.seed * 1_000_003 + index);
+    games.push({ ...playGame(task.mode, seats, random), index });
+  }
+  return games;
+}
+
+// Splits each pairing's games into tasks small enough to balance across workers
+export function planTasks(
+  modes: GameMode[],
+  engines: string[],
+  gamesPerPairing: number,
+  taskSize: number,
+  seed: number
+): SelfPlayTask[] {
+  const pairings: [string, string][] = [];
+  for (let i = 0; i < engines.length; i++) {
+    for (let j = i + 1; j < engines.length; j++) {
+      pairings.push([engines[i], engines[j]]);
+    }
+  }
+  // A single engine plays itself
+  if (engines.length === 1) pairings.push([engines[0], engines[0]]);
+
+  const tasks: SelfPlayTask[] = [];
+  modes.forEach((mode, m) => {
+    pairings.forEach((pairing, p) => {
+      for (let from = 0; from < gamesPerPairing; from += taskSize) {
+        const count = Math.min(taskSize, gamesPerPairing - from);
+        // Pairings get their own seeds so they do not replay each other's games
+        tasks.push({ mode, engines: pairing, from, count, seed: seed + m * 1_000 + p });
+      }
+    });
+  });
+  return tasks;
+}
+
+// 95% Wilson score interval for a proportion; sound for small counts and rates near 0 or 1
+export function wilsonInterval(successes: number, trials: number, z = 1.96): [number, number] {
+  if (trials === 0) return [0, 1];
+  const p = successes / trials;
+  const z2 = z * z;
+  const center = (p + z2 / (2 * trials)) / (1 + z2 / trials);
+  const margin =
+    (z * Math.sqrt((p * (1 - p)) / trials + z2 / (4 * trials * trials))) / (1 + z2 / trials);
+  return [Math.max(0, center - margin), Math.min(1, center + margin)];
+}
+
+// Log-bucketed histogram: 8 buckets per doubling, so percentiles are within about 9%
+export class LatencyHistogram {
+  private readonly counts = new Map<number, number>();
+  count = 0;
+  max = 0;
+
+  observe(us: number): void {
+    const bucket = us <= 1 ? 0 : Math.ceil(Math.log2(us) * 8);
+    this.counts.set(bucket, (this.counts.get(bucket) ?? 0) + 1);
+    this.count++;
+    if (us > this.max) this.max = us;
+  }
+
+  // Upper bound of the bucket holding the p-th percentile
+  percentile(p: number): number {
+    const target = Math.ceil((p / 100) * this.count);
+    let seen = 0;
+    for (const bucket of [...this.counts.keys()].sort((a, b) => a - b)) {
+      seen += this.counts.get(bucket)!;
+      if (seen >= target) return Math.min(2 ** (bucket / 8), this.max);
+    }
+    return this.max;
+  }
+}
+
+export interface PairingReport {
+  mode: GameMode;
+  engines: [string, string];
+  games: number;
+  wins: [number, number]; // per engine of the pairing
+  draws: number;
+  winRate: [number, number];
+  winInterval: [number, number][]; // 95% Wilson interval of each win rate
+  drawRate: number;
+  firstMoverWinRate: number;
+  averageMoves: number;
+}
+
+// Results of one pairing, from the point of view of its engines rather than seats
+export class PairingStats {
+  games = 0;
+  wins: [number, number] = [0, 0];
+  draws = 0;
+  firstMoverWins = 0;
+  moves = 0;
+  // Think time per engine spec
+  readonly think = new Map<string, LatencyHistogram>();
+
+  constructor(
+    readonly mode: GameMode,
+    readonly engines: [string, string]
+  ) {}
+
+  add(game: SelfPlayGame): void {
+    this.games++;
+    this.moves += game.cells.length;
+    if (game.winner === 0) {
+      this.draws++;
+    } else {
+      // Even games seat engines[0] first
+      const firstIsA = game.index % 2 === 0;
+      const winnerIsA = (game.winner === 1) === firstIsA;
+      this.wins[winnerIsA ? 0 : 1]++;
+      if (game.winner === 1) this.firstMoverWins++;
+    }
+
+    game.thinkUs.forEach((us, i) => {
+      const spec = game.seats[i % 2];
+      let histogram = this.think.get(spec);
+      if (!histogram) {
+        histogram = new LatencyHistogram();
+        this.think.set(spec, histogram);
+      }
+      histogram.observe(us);
+    });
+  }
+
+  report(): PairingReport {
+    const rate = (count: number) => (this.games > 0 ? count / this.games : 0);
+    return {
+      mode: this.mode,
+      engines: this.engines,
+      games: this.games,
+      wins: this.wins,
+      draws: this.draws,
+      winRate: [rate(this.wins[0]), rate(this.wins[1])],
+      winInterval: this.wins.map((wins) => wilsonInterval(wins, this.games)),
+      drawRate: rate(this.draws),
+      firstMoverWinRate: rate(this.firstMoverWins),
+      averageMoves: this.games > 0 ? this.moves / this.games : 0,
+    };
+  }
+}
+
+// As a game record; move times are the cumulative think time from startedAt
+export function selfPlayRecord(game: SelfPlayGame, startedAt: number): GameRecord {
+  const moveTimes: number[] = [];
+  let elapsedUs = 0;
+  for (const us of game.thinkUs) {
+    elapsedUs += us;
+    moveTimes.push(startedAt + Math.round(elapsedUs / 1000));
+  }
+
+  return {
+    id: `selfplay_${game.mode}_${game.seats.join('_vs_')}_${game.index}`,
+    inviteCode: '',
+    mode: game.mode,
+    status: 'completed',
+    winner: game.winner,
+    createdAt: startedAt,
+    startedAt,
+    finishedAt: moveTimes[moveTimes.length - 1] ?? startedAt,
+    players: game.seats.map((spec, seat) => ({
+      id: `engine_${seat + 1}:${spec}`, // seat keeps ids apart when an engine plays itself
+      name: spec,
+      isAi: true,
+      joinedAt: startedAt,
+    })),
+    cells: Uint8Array.from(game.cells),
+    moveTimes,
+  };
+}
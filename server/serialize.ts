@@ -0,0 +1,84 @@
+// Fast JSON encoding for game state responses
+// Game records are built by the server, so they are encoded directly into the response
+// shape without an intermediate copy; repeated ids in the move list are quoted only once
+
+import type { Game, GameMode, GameStateResponse, Move } from '@/lib/types';
+import type { StoredGame } from './store';
+
+// Strings made only of these characters never need JSON escaping
+const SAFE_STRING = /^[\w.:+\- ]*$/;
+
+function quote(value: string): string {
+  return SAFE_STRING.test(value) ? `"${value}"` : JSON.stringify(value);
+}
+
+export function serializeMoves(moves: Move[]): string {
+  if (moves.length === 0) return '[]';
+
+  // game_id and player_id repeat on every move; quote each distinct value once
+  const quoted = new Map<string, string>();
+  const quoteCached = (value: string): string => {
+    let result = quoted.get(value);
+    if (result === undefined) {
+      result = quote(value);
+      quoted.set(value, result);
+    }
+    return result;
+  };
+
+  const parts: string[] = new Array(moves.length);
+  for (let i = 0; i < moves.length; i++) {
+    const m = moves[i];
+    parts[i] =
+      `{"id":${m.id},"game_id":${quoteCached(m.game_id)},"player_id":${quoteCached(m.player_id)},` +
+      `"move_number":${m.move_number},"column_index":${m.column_index},` +
+      `"row_index":${m.row_index},"created_at":${quote(m.created_at)}}`;
+  }
+
+  return `[${parts.join(',')}]`;
+}
+
+// Public game fields, in response order
+export function gameHeader(game: StoredGame): Game {
+  return {
+    id: game.id,
+    invite_code: game.invite_code,
+    mode: game.mode as GameMode,
+    status: game.status,
+    created_at: game.created_at,
+    started_at: game.started_at,
+    finished_at: game.finished_at,
+    current_turn: game.current_turn,
+    winner_id: game.winner_id,
+  };
+}
+
+export function toGameStateResponse(game: StoredGame): GameStateResponse {
+  return {
+    game: gameHeader(game),
+    players: game.players,
+    moves: game.moves ?? [],
+    messages: game.messages ?? [],
+  };
+}
+
+// Encode the /api/game/state body for a stored game
+export function serializeGameState(game: StoredGame): string {
+  const header = JSON.stringify(gameHeader(game));
+
+  return (
+    `{"game":${header},"players":${JSON.stringify(game.players)},` +
+    `"moves":${serializeMoves(game.moves ?? [])},` +
+    `"messages":${JSON.stringify(game.messages ?? [])}}`
+  );
+}
+
+export function jsonResponse(body: string, status = 200): Response {
+  return new Response(body, {
+    status,
+    headers: {
+      'Content-Type': 'application/json',
+      'Content-Length': String(Buffer.byteLength(body)),
+    },
+  });
+}
@@ -0,0 +1,150 @@
+// In-process LRU cache of assembled game states
+// Writers update entries through (write-through); readers validate an entry against the
+// game's version in the store, which is a single small read instead of the full record.
+
+import { serializeGameState } from './serialize';
+import type { GameStore, StoredGame } from './store';
+
+export interface StateCacheOptions {
+  maxEntries: number;
+  maxBytes: number;
+  // Entries younger than this are served without the cross-worker version check
+  revalidateMs: number;
+}
+
+export interface StateCacheEntry {
+  version: number;
+  game: StoredGame;
+  body: string; // serialized /api/game/state response
+  bytes: number;
+  validatedAt: number;
+}
+
+export interface StateCacheStats {
+  entries: number;
+  bytes: number;
+  maxEntries: number;
+  maxBytes: number;
+  hits: number;
+  misses: number;
+  stale: number;
+  evictions: number;
+  invalidations: number;
+  hitRate: number;
+}
+
+export function stateCacheOptionsFromEnv(): StateCacheOptions {
+  return {
+    maxEntries: Number(process.env.STATE_CACHE_MAX_ENTRIES || 1000),
+    maxBytes: Number(process.env.STATE_CACHE_MAX_BYTES || 32 * 1024 * 1024),
+    revalidateMs: Number(process.env.STATE_CACHE_REVALIDATE_MS || 0),
+  };
+}
+
+export class GameStateCache {
+  // Map iteration order is insertion order, so the first key is least recently used
+  private entries = new Map<string, StateCacheEntry>();
+  private totalBytes = 0;
+  private counters = { hits: 0, misses: 0, stale: 0, evictions: 0, invalidations: 0 };
+
+  constructor(readonly options: StateCacheOptions = stateCacheOptionsFromEnv()) {}
+
+  // Cached state for a game, revalidated against the store's version
+  async load(store: GameStore, gameId: string): Promise<StateCacheEntry | null> {
+    const entry = this.entries.get(gameId);
+
+    if (entry) {
+      const now = Date.now();
+      if (now - entry.validatedAt < this.options.revalidateMs) {
+        return this.hit(gameId, entry);
+      }
+
+      const version = await store.getGameVersion(gameId);
+      if (version === entry.version) {
+        entry.validatedAt = now;
+        return this.hit(gameId, entry);
+      }
+
+      this.counters.stale++;
+      this.remove(gameId);
+    } else {
+      this.counters.misses++;
+    }
+
+    const game = await store.getGame(gameId);
+    if (!game) {
+      return null;
+    }
+
+    return this.set(game, game.version ?? 0);
+  }
+
+  // Write-through update after a successful save
+  set(game: StoredGame, version: number): StateCacheEntry {
+    const cached = { ...game, version };
+    const body = serializeGameState(cached);
+    // Rough footprint: UTF-16 body plus a parsed record of similar size
+    const bytes = body.length * 4;
+
+    const entry: StateCacheEntry = { version, game: cached, body, bytes, validatedAt: Date.now() };
+
+    this.remove(game.id);
+    if (bytes > this.options.maxBytes) {
+      // Too large to ever fit; serve it without caching
+      return entry;
+    }
+
+    this.entries.set(game.id, entry);
+    this.totalBytes += bytes;
+    this.evict();
+
+    return entry;
+  }
+
+  invalidate(gameId: string): void {
+    if (this.remove(gameId)) {
+      this.counters.invalidations++;
+    }
+  }
+
+  stats(): StateCacheStats {
+    const lookups = this.counters.hits + this.counters.misses + this.counters.stale;
+
+    return {
+      entries: this.entries.size,
+      bytes: this.totalBytes,
+      maxEntries: this.options.maxEntries,
+      maxBytes: this.options.maxBytes,
+      ...this.counters,
+      hitRate: lookups > 0 ? this.counters.hits / lookups : 0,
+    };
+  }
+
+  private hit(gameId: string, entry: StateCacheEntry): StateCacheEntry {
+    this.counters.hits++;
+    // Move to the most recently used position
+    this.entries.delete(gameId);
+    this.entries.set(gameId, entry);
+    return entry;
+  }
+
+  private remove(gameId: string): boolean {
+    const entry = this.entries.get(gameId);
+    if (!entry) return false;
+
+    this.entries.delete(gameId);
+    this.totalBytes -= entry.bytes;
+    return true;
+  }
+
+  private evict(): void {
+    while (
+      this.entries.size > this.options.maxEntries ||
+      (this.totalBytes > this.options.maxBytes && this.entries.size > 0)
+    ) {
+      const oldest = this.entries.keys().next().value as string;
+      this.remove(oldest);
+      this.counters.evictions++;
+    }
+  }
+}
@@ -0,0 +1,172 @@
+// Game storage shared by all API routes
+// Vercel KV is used when configured, otherwise an in-memory store (dev/demo)
+
+import type { Game, Message, Move, Player, PlayerProfile } from '@/lib/types';
+import type { MessageRef } from './chat-search';
+import type { MatchTicket } from './matchmaking';
+import { KvGameStore } from './stores/kv-store';
+import { MemoryGameStore } from './stores/memory-store';
+
+// Game record as persisted: the game row plus its players, moves and messages
+export interface StoredGame extends Omit<Game, 'mode'> {
+  mode: string;
+  invite_code: string;
+  board?: (string | null)[];
+  players: Player[];
+  moves?: Move[];
+  messages?: Message[];
+  // Incremented on every save; lets workers detect that a cached copy is stale
+  version?: number;
+}
+
+// Time-to-live for game and invite keys (24 hours)
+export const GAME_TTL_SECONDS = 86400;
+
+export type NewMessage = Omit<Message, 'id'>;
+
+// Keyset page over a game's messages, ordered by id
+export interface MessagePageQuery {
+  afterId?: number; // messages with id > afterId, oldest first
+  beforeId?: number; // messages with id < beforeId, newest first (returned oldest first)
+  limit: number;
+}
+
+// Time-bounded read of a search term's postings (epoch ms, inclusive)
+export interface PostingRange {
+  from?: number;
+  to?: number;
+  offset?: number; // postings to skip, newest first
+  limit: number;
+}
+
+// A profile as stored: the public profile plus a hash of its secret token
+export interface StoredProfile extends PlayerProfile {
+  token_hash: string; // SHA-256 hex of the profile_token handed out at creation
+}
+
+// A profile's rating and record in one mode; rating is null before its first rated game
+export interface ProfileStanding {
+  rating: number | null;
+  games: number;
+  wins: number;
+  losses: number;
+  draws: number;
+}
+
+// What a finished rated game changes for one of its players (see server/ratings.ts)
+export interface RatingChange {
+  profileId: string;
+  delta: number; // added to the current rating, or to INITIAL_RATING for a first game
+  result: 'wins' | 'losses' | 'draws';
+}
+
+export interface LeaderboardRow {
+  profileId: string;
+  rating: number;
+}
+
+// Where a game's chat history stands: caches compare both fields to stay in sync with it
+export interface ChatHead {
+  latestId: number; // highest message id assigned (0 when the game has no messages)
+  pruneCount: number; // times messages were deleted (chat retention)
+}
+
+export interface GameStore {
+  readonly kind: 'kv' | 'memory';
+  getGame(gameId: string): Promise<StoredGame | null>;
+  getGames(gameIds: string[]): Promise<(StoredGame | null)[]>;
+  // One page of a walk over all game ids. Cursor '0' starts a walk and is returned when it
+  // is finished (SCAN semantics: ids may repeat across pages, callers de-duplicate if needed)
+  scanGameIds(cursor: string, count: number): Promise<{ cursor: string; ids: string[] }>;
+  // Persists the game and returns its new version
+  saveGame(game: StoredGame): Promise<number>;
+  // Saves only if the stored version still equals expectedVersion (0 for a game saved before
+  // versions existed); returns the new version, or null when another write got there first
+  saveGameIfVersion(game: StoredGame, expectedVersion: number): Promise<number | null>;
+  getGameVersion(gameId: string): Promise<number | null>;
+  // Invite lookup and game read in one round trip
+  getGameByInvite(inviteCode: string): Promise<StoredGame | null>;
+  getGameIdByInvite(inviteCode: string): Promise<string | null>;
+  saveInvite(inviteCode: string, gameId: string): Promise<void>;
+  // Atomically advances a named counter by count and returns its new value; the caller owns
+  // the values (new - count, new]. Counters never expire.
+  reserveSequence(name: string, count: number): Promise<number>;
+  // Assigns the next per-game message id and stores the message
+  appendMessage(message: NewMessage): Promise<Message>;
+  // Returns up to limit messages in ascending id order
+  listMessages(gameId: string, query: MessagePageQuery): Promise<Message[]>;
+  // Newest messages of a game (up to limit, ascending) and its chat head, in one round trip
+  listLatestMessages(
+    gameId: string,
+    limit: number
+  ): Promise<{ messages: Message[]; head: ChatHead }>;
+  getChatHead(gameId: string): Promise<ChatHead>;
+  // Removes messages by id (used by chat retention) and returns the ones that existed; bumps
+  // the game's prune count when any did
+  deleteMessages(gameId: string, ids: number[]): Promise<Message[]>;
+
+  // Full-text index over messages, updated by appendMessage (see server/chat-search.ts).
+  // Indexing a message again (a backfill re-run) changes nothing.
+  indexMessage(message: Message): Promise<void>;
+  // Refs of messages containing the term, newest first
+  searchPostings(term: string, range: PostingRange): Promise<MessageRef[]>;
+  countPostings(terms: string[]): Promise<number[]>;
+  // Messages with at least one term: the document count used for ranking
+  countIndexedMessages(): Promise<number>;
+  getMessagesByRef(refs: MessageRef[]): Promise<(Message | null)[]>;
+  // Games that have chat history (used by the index backfill)
+  listChatGameIds(): AsyncIterable<string>;
+  // The same walk one page at a time, with scanGameIds' cursor semantics
+  scanChatGameIds(cursor: string, count: number): Promise<{ cursor: string; ids: string[] }>;
+  // Where a background job stopped (e.g. the chat pruner), so its next run can resume; null
+  // when no position is saved. Saving null clears it.
+  getJobCursor(name: string): Promise<string | null>;
+  saveJobCursor(name: string, cursor: string | null): Promise<void>;
+
+  // Quick match queues, one FIFO per mode (see server/matchmaking.ts)
+  enqueueMatchTicket(ticket: MatchTicket): Promise<void>;
+  getMatchTicket(ticketId: string): Promise<MatchTicket | null>;
+  // Atomically takes the two oldest ticket ids of a mode, or nothing when fewer are queued.
+  // Taken ids are held as pairing until saveMatchedGame or requeueMatchTicket settles them;
+  // ids held longer than MATCH_PAIRING_TIMEOUT_MS (as of now) are first queued again.
+  popMatchPair(mode: string, now?: number): Promise<[string, string] | null>;
+  // Puts a popped ticket back at the front of its queue
+  requeueMatchTicket(ticket: MatchTicket): Promise<void>;
+  // Removes a queued ticket and stores it as given; false when it is no longer queued
+  cancelMatchTicket(ticket: MatchTicket): Promise<boolean>;
+  // Saves a new game together with the tickets it was created from; returns the version
+  saveMatchedGame(game: StoredGame, tickets: MatchTicket[]): Promise<number>;
+
+  // Player profiles and per-mode ratings (see server/ratings.ts); these never expire
+  saveProfile(profile: StoredProfile): Promise<void>;
+  getProfiles(profileIds: string[]): Promise<(StoredProfile | null)[]>;
+  getStandings(mode: string, profileIds: string[]): Promise<ProfileStanding[]>;
+  // Saves a finished game and applies its rating changes in one transaction, only if the
+  // stored version still equals expectedVersion (as saveGameIfVersion); returns the version,
+  // or null on a conflict. Changes are applied once per game, however often it is saved.
+  saveRatedGame(
+    game: StoredGame,
+    changes: RatingChange[],
+    expectedVersion: number
+  ): Promise<number | null>;
+  // Profiles of a mode by rating, highest first: O(log n + limit)
+  getLeaderboard(mode: string, offset: number, limit: number): Promise<LeaderboardRow[]>;
+  // 0-based position on the leaderboard (O(log n)), null when the profile is not on it
+  getLeaderboardRank(mode: string, profileId: string): Promise<number | null>;
+}
+
+export function isKvConfigured(): boolean {
+  return Boolean(
+    (process.env.KV_REST_API_URL && process.env.KV_REST_API_TOKEN) ||
+      (process.env.VERCEL_KV_REST_API_URL && process.env.VERCEL_KV_REST_API_TOKEN)
+  );
+}
+
+export function createStore(): GameStore {
+  if (isKvConfigured()) {
+    return new KvGameStore();
+  }
+
+  console.warn('[Store] KV credentials not configured. Using in-memory game store.');
+  return new MemoryGameStore();
+}
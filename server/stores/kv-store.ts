@@ -0,0 +1,598 @@
+// Vercel KV (Redis) backed game store
+// The KV client is imported and created on first use, not at module load
+
+import type { VercelKV } from '@vercel/kv';
+import type { Message } from '@/lib/types';
+import { messageRef, parseMessageRef, tokenize, type MessageRef } from '../chat-search';
+import {
+  MATCH_PAIRING_TIMEOUT_MS,
+  MATCH_TICKET_TTL_SECONDS,
+  type MatchTicket,
+} from '../matchmaking';
+import { INITIAL_RATING } from '../ratings';
+import {
+  GAME_TTL_SECONDS,
+  type ChatHead,
+  type GameStore,
+  type LeaderboardRow,
+  type MessagePageQuery,
+  type NewMessage,
+  type PostingRange,
+  type ProfileStanding,
+  type RatingChange,
+  type StoredGame,
+  type StoredProfile,
+} from '../store';
+
+type KvTransaction = ReturnType<VercelKV['multi']>;
+
+export async function createKvClient(): Promise<VercelKV> {
+  const { createClient } = await import('@vercel/kv');
+
+  return createClient({
+    url: (process.env.KV_REST_API_URL || process.env.VERCEL_KV_REST_API_URL)!,
+    token: (process.env.KV_REST_API_TOKEN || process.env.VERCEL_KV_REST_API_TOKEN)!,
+  });
+}
+
+// Conditional save: writes the game and its version key only if the version is unchanged
+const SAVE_IF_VERSION_SCRIPT = `
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+if current ~= tonumber(ARGV[1]) then return 0 end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[4])
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+return 1
+`;
+
+// Indexes a message unless it already is (a backfill re-run), so the document count used
+// for ranking counts each message once. KEYS[1] is the document count, the rest its terms;
+// ARGV: message ref, time, trim cutoff, TTL.
+const INDEX_MESSAGE_SCRIPT = `
+if redis.call('ZSCORE', KEYS[2], ARGV[1]) then return 0 end
+for i = 2, #KEYS do
+  redis.call('ZADD', KEYS[i], ARGV[2], ARGV[1])
+  redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', ARGV[3])
+  redis.call('EXPIRE', KEYS[i], ARGV[4])
+end
+redis.call('INCR', KEYS[1])
+return 1
+`;
+
+// Resolves an invite code and reads the game without a second round trip
+// (values are stored JSON-encoded, so the game id is a quoted string)
+const GAME_BY_INVITE_SCRIPT = `
+local gameId = redis.call('GET', KEYS[1])
+if not gameId then return false end
+return redis.call('GET', 'game:' .. string.gsub(gameId, '^"(.*)"$', '%1'))
+`;
+
+// Pops the two oldest tickets only when both are there, so a lone player is never dequeued.
+// Popped ids are held in a sorted set scored by pop time until their pairing is settled;
+// ids held since before ARGV[2] (a worker died mid-pairing) go back to the front first.
+const POP_PAIR_SCRIPT = `
+local orphaned = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', '(' .. ARGV[2])
+if #orphaned > 0 then
+  redis.call('ZREM', KEYS[2], unpack(orphaned))
+  for i = #orphaned, 1, -1 do
+    redis.call('LPUSH', KEYS[1], orphaned[i])
+  end
+  redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+if redis.call('LLEN', KEYS[1]) < 2 then return nil end
+local pair = {redis.call('LPOP', KEYS[1]), redis.call('LPOP', KEYS[1])}
+redis.call('ZADD', KEYS[2], ARGV[1], pair[1], ARGV[1], pair[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return pair
+`;
+
+// A ticket can only be cancelled while it is still queued
+const CANCEL_TICKET_SCRIPT = `
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then return 0 end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+`;
+
+// Saves a finished game if its version is unchanged (as SAVE_IF_VERSION_SCRIPT) and, the first
+// time only, applies its rating changes: the leaderboard score (the rating) and the profile's
+// per-mode counters. ARGV after the fixed six are profile id, rating delta and result field,
+// per KEYS entry from the fifth on.
+const SAVE_RATED_GAME_SCRIPT = `
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+if current ~= tonumber(ARGV[6]) then return 0 end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+if not redis.call('SET', KEYS[3], '1', 'NX', 'EX', ARGV[3]) then return 1 end
+for i = 5, #KEYS do
+  local arg = 7 + (i - 5) * 3
+  local id, delta = ARGV[arg], tonumber(ARGV[arg + 1])
+  if redis.call('ZSCORE', KEYS[4], id) then
+    redis.call('ZINCRBY', KEYS[4], delta, id)
+  else
+    redis.call('ZADD', KEYS[4], tonumber(ARGV[4]) + delta, id)
+  end
+  redis.call('HINCRBY', KEYS[i], ARGV[5] .. ':games', 1)
+  redis.call('HINCRBY', KEYS[i], ARGV[5] .. ':' .. ARGV[arg + 2], 1)
+end
+return 1
+`;
+
+export class KvGameStore implements GameStore {
+  readonly kind = 'kv' as const;
+
+  private client: Promise<VercelKV> | null = null;
+
+  constructor(private readonly clientFactory: () => Promise<VercelKV> = createKvClient) {}
+
+  protected kv(): Promise<VercelKV> {
+    if (!this.client) {
+      this.client = this.clientFactory();
+    }
+
+    return this.client;
+  }
+
+  async getGame(gameId: string): Promise<StoredGame | null> {
+    const kv = await this.kv();
+    return kv.get<StoredGame>(`game:${gameId}`);
+  }
+
+  async getGames(gameIds: string[]): Promise<(StoredGame | null)[]> {
+    if (gameIds.length === 0) return [];
+
+    const kv = await this.kv();
+    return kv.mget<(StoredGame | null)[]>(...gameIds.map((id) => `game:${id}`));
+  }
+
+  async scanGameIds(cursor: string, count: number): Promise<{ cursor: string; ids: string[] }> {
+    const kv = await this.kv();
+    const [next, keys] = await kv.scan(cursor, { match: 'game:*', count });
+
+    // Game records are game:<id>; keys with a further segment (game:<id>:version) are not
+    return {
+      cursor: String(next),
+      ids: keys
+        .map((key) => key.slice('game:'.length))
+        .filter((id) => !id.includes(':')),
+    };
+  }
+
+  async saveGame(game: StoredGame): Promise<number> {
+    const kv = await this.kv();
+    const version = (game.version ?? 0) + 1;
+
+    // Record and version key are written in one round trip
+    const tx = kv.multi();
+    this.addGameWrite(tx, game, version);
+    await tx.exec();
+
+    return version;
+  }
+
+  private addGameWrite(tx: KvTransaction, game: StoredGame, version: number): void {
+    tx.set(`game:${game.id}`, { ...game, version }, { ex: GAME_TTL_SECONDS });
+    tx.set(`game:${game.id}:version`, version, { ex: GAME_TTL_SECONDS });
+  }
+
+  async saveGameIfVersion(game: StoredGame, expectedVersion: number): Promise<number | null> {
+    const kv = await this.kv();
+    const version = expectedVersion + 1;
+
+    const saved = await kv.eval<string[], number>(
+      SAVE_IF_VERSION_SCRIPT,
+      [`game:${game.id}`, `game:${game.id}:version`],
+      [
+        String(expectedVersion),
+        JSON.stringify({ ...game, version }),
+        String(version),
+        String(GAME_TTL_SECONDS),
+      ]
+    );
+    return saved === 1 ? version : null;
+  }
+
+  async getGameVersion(gameId: string): Promise<number | null> {
+    const kv = await this.kv();
+    return kv.get<number>(`game:${gameId}:version`);
+  }
+
+  async getGameIdByInvite(inviteCode: string): Promise<string | null> {
+    const kv = await this.kv();
+    return kv.get<string>(`invite:${inviteCode}`);
+  }
+
+  async getGameByInvite(inviteCode: string): Promise<StoredGame | null> {
+    const kv = await this.kv();
+    const raw = await kv.eval<string[], string | StoredGame | null>(
+      GAME_BY_INVITE_SCRIPT,
+      [`invite:${inviteCode}`],
+      []
+    );
+    // The client decodes JSON replies itself on most versions
+    return typeof raw === 'string' ? (JSON.parse(raw) as StoredGame) : raw;
+  }
+
+  async saveInvite(inviteCode: string, gameId: string): Promise<void> {
+    const kv = await this.kv();
+    await kv.set(`invite:${inviteCode}`, gameId, { ex: GAME_TTL_SECONDS });
+  }
+
+  async reserveSequence(name: string, count: number): Promise<number> {
+    const kv = await this.kv();
+    return kv.incrby(`seq:${name}`, count);
+  }
+
+  // Messages live in a sorted set per game scored by id, so any page is O(log n + limit)
+  async appendMessage(message: NewMessage): Promise<Message> {
+    const kv = await this.kv();
+    const key = `chat:${message.game_id}`;
+    const id = await kv.incr(`${key}:seq`);
+    const stored: Message = { id, ...message };
+
+    // Message and its search postings are written in the same transaction
+    const tx = kv
+      .multi()
+      .zadd(key, { score: id, member: stored })
+      .expire(key, GAME_TTL_SECONDS)
+      .expire(`${key}:seq`, GAME_TTL_SECONDS);
+    this.addToIndex(tx, stored);
+    await tx.exec();
+
+    return stored;
+  }
+
+  async listMessages(gameId: string, query: MessagePageQuery): Promise<Message[]> {
+    const kv = await this.kv();
+    const key = `chat:${gameId}`;
+
+    if (query.afterId !== undefined) {
+      return kv.zrange<Message[]>(key, `(${query.afterId}` as `(${number}`, '+inf', {
+        byScore: true,
+        offset: 0,
+        count: query.limit,
+      });
+    }
+
+    const max = query.beforeId !== undefined ? (`(${query.beforeId}` as `(${number}`) : '+inf';
+    const newestFirst = await kv.zrange<Message[]>(key, max, '-inf', {
+      byScore: true,
+      rev: true,
+      offset: 0,
+      count: query.limit,
+    });
+    return newestFirst.reverse();
+  }
+
+  async listLatestMessages(
+    gameId: string,
+    limit: number
+  ): Promise<{ messages: Message[]; head: ChatHead }> {
+    const kv = await this.kv();
+    const key = `chat:${gameId}`;
+    const [newestFirst, [latestId, pruneCount]] = await kv
+      .pipeline()
+      .zrange(key, '+inf', '-inf', { byScore: true, rev: true, offset: 0, count: limit })
+      .mget(`${key}:seq`, `${key}:pruned`)
+      .exec<[Message[], (number | null)[]]>();
+
+    return {
+      messages: newestFirst.reverse(),
+      head: { latestId: latestId ?? 0, pruneCount: pruneCount ?? 0 },
+    };
+  }
+
+  async getChatHead(gameId: string): Promise<ChatHead> {
+    const kv = await this.kv();
+    const [latestId, pruneCount] = await kv.mget<(number | null)[]>(
+      `chat:${gameId}:seq`,
+      `chat:${gameId}:pruned`
+    );
+    return { latestId: latestId ?? 0, pruneCount: pruneCount ?? 0 };
+  }
+
+  // Each id is read and removed by score in one pipeline: O(log n) per message, no MULTI,
+  // so a batch never blocks other writers for long
+  async deleteMessages(gameId: string, ids: number[]): Promise<Message[]> {
+    if (ids.length === 0) return [];
+
+    const kv = await this.kv();
+    const key = `chat:${gameId}`;
+    const pipeline = kv.pipeline();
+    for (const id of ids) {
+      pipeline.zrange(key, id, id, { byScore: true });
+      pipeline.zremrangebyscore(key, id, id);
+    }
+
+    const results = await pipeline.exec<(Message[] | number)[]>();
+    const deleted: Message[] = [];
+    for (let i = 0; i < results.length; i += 2) {
+      const [message] = results[i] as Message[];
+      if (message && results[i + 1] === 1) {
+        deleted.push(message);
+      }
+    }
+
+    // Postings of deleted messages are skipped at query time and expire with their term keys.
+    // The prune count tells other workers' chat buffers that messages are gone.
+    if (deleted.length > 0) {
+      const indexed = deleted.filter((message) => tokenize(message.content).length > 0);
+      await kv
+        .multi()
+        .decrby('fts:docs', indexed.length)
+        .incr(`${key}:pruned`)
+        .expire(`${key}:pruned`, GAME_TTL_SECONDS)
+        .exec();
+    }
+    return deleted;
+  }
+
+  // Postings: sorted set per term, scored by message time; entries older than the
+  // message TTL are trimmed whenever the term is written. fts:docs counts messages with at
+  // least one term (no other message can match a search).
+  private addToIndex(tx: KvTransaction, message: Message): void {
+    const time = Date.parse(message.created_at);
+    const ref = messageRef(message);
+    const terms = tokenize(message.content);
+
+    for (const term of terms) {
+      const key = `fts:${term}`;
+      tx.zadd(key, { score: time, member: ref });
+      tx.zremrangebyscore(key, '-inf', time - GAME_TTL_SECONDS * 1000);
+      tx.expire(key, GAME_TTL_SECONDS);
+    }
+    if (terms.length > 0) tx.incr('fts:docs');
+  }
+
+  async indexMessage(message: Message): Promise<void> {
+    const terms = tokenize(message.content);
+    if (terms.length === 0) return;
+
+    const kv = await this.kv();
+    const time = Date.parse(message.created_at);
+    await kv.eval<string[], number>(
+      INDEX_MESSAGE_SCRIPT,
+      ['fts:docs', ...terms.map((term) => `fts:${term}`)],
+      [
+        messageRef(message),
+        String(time),
+        String(time - GAME_TTL_SECONDS * 1000),
+        String(GAME_TTL_SECONDS),
+      ]
+    );
+  }
+
+  async searchPostings(term: string, range: PostingRange): Promise<MessageRef[]> {
+    const kv = await this.kv();
+    return kv.zrange<MessageRef[]>(`fts:${term}`, range.to ?? '+inf', range.from ?? '-inf', {
+      byScore: true,
+      rev: true,
+      offset: range.offset ?? 0,
+      count: range.limit,
+    });
+  }
+
+  async countPostings(terms: string[]): Promise<number[]> {
+    if (terms.length === 0) return [];
+
+    const kv = await this.kv();
+    const pipeline = kv.pipeline();
+    for (const term of terms) {
+      pipeline.zcard(`fts:${term}`);
+    }
+    return pipeline.exec<number[]>();
+  }
+
+  async countIndexedMessages(): Promise<number> {
+    const kv = await this.kv();
+    return (await kv.get<number>('fts:docs')) ?? 0;
+  }
+
+  async getMessagesByRef(refs: MessageRef[]): Promise<(Message | null)[]> {
+    if (refs.length === 0) return [];
+
+    const kv = await this.kv();
+    const pipeline = kv.pipeline();
+    for (const ref of refs) {
+      const { gameId, id } = parseMessageRef(ref);
+      pipeline.zrange(`chat:${gameId}`, id, id, { byScore: true });
+    }
+
+    const pages = await pipeline.exec<Message[][]>();
+    return pages.map((page) => page[0] ?? null);
+  }
+
+  async *listChatGameIds(): AsyncIterable<string> {
+    let cursor = '0';
+
+    do {
+      const page = await this.scanChatGameIds(cursor, 500);
+      cursor = page.cursor;
+      yield* page.ids;
+    } while (cursor !== '0');
+  }
+
+  async scanChatGameIds(cursor: string, count: number): Promise<{ cursor: string; ids: string[] }> {
+    const kv = await this.kv();
+    const [next, keys] = await kv.scan(cursor, { match: 'chat:*', count });
+
+    // Histories are chat:<id>; keys with a further segment (chat:<id>:seq) are not
+    return {
+      cursor: String(next),
+      ids: keys
+        .map((key) => key.slice('chat:'.length))
+        .filter((id) => !id.includes(':')),
+    };
+  }
+
+  // Job cursors never expire; a job clears its own when it finishes a walk
+  async getJobCursor(name: string): Promise<string | null> {
+    const kv = await this.kv();
+    return kv.get<string>(`job:${name}:cursor`);
+  }
+
+  async saveJobCursor(name: string, cursor: string | null): Promise<void> {
+    const kv = await this.kv();
+    if (cursor === null) {
+      await kv.del(`job:${name}:cursor`);
+    } else {
+      await kv.set(`job:${name}:cursor`, cursor);
+    }
+  }
+
+  // Quick match: a list of ticket ids per mode plus one key per ticket, and a sorted set per
+  // mode of ids popped for pairing but not yet settled
+  async enqueueMatchTicket(ticket: MatchTicket): Promise<void> {
+    const kv = await this.kv();
+    const queue = `match:queue:${ticket.mode}`;
+
+    await kv
+      .multi()
+      .set(`match:ticket:${ticket.id}`, ticket, { ex: MATCH_TICKET_TTL_SECONDS })
+      .rpush(queue, ticket.id)
+      .expire(queue, MATCH_TICKET_TTL_SECONDS)
+      .exec();
+  }
+
+  async getMatchTicket(ticketId: string): Promise<MatchTicket | null> {
+    const kv = await this.kv();
+    return kv.get<MatchTicket>(`match:ticket:${ticketId}`);
+  }
+
+  async popMatchPair(mode: string, now = Date.now()): Promise<[string, string] | null> {
+    const kv = await this.kv();
+    return kv.eval<string[], [string, string] | null>(
+      POP_PAIR_SCRIPT,
+      [`match:queue:${mode}`, `match:pairing:${mode}`],
+      [String(now), String(now - MATCH_PAIRING_TIMEOUT_MS), String(MATCH_TICKET_TTL_SECONDS)]
+    );
+  }
+
+  async requeueMatchTicket(ticket: MatchTicket): Promise<void> {
+    const kv = await this.kv();
+    await kv
+      .multi()
+      .zrem(`match:pairing:${ticket.mode}`, ticket.id)
+      .lpush(`match:queue:${ticket.mode}`, ticket.id)
+      .exec();
+  }
+
+  async cancelMatchTicket(ticket: MatchTicket): Promise<boolean> {
+    const kv = await this.kv();
+    const removed = await kv.eval<string[], number>(
+      CANCEL_TICKET_SCRIPT,
+      [`match:queue:${ticket.mode}`, `match:ticket:${ticket.id}`],
+      [ticket.id, JSON.stringify(ticket), String(MATCH_TICKET_TTL_SECONDS)]
+    );
+    return removed === 1;
+  }
+
+  async saveMatchedGame(game: StoredGame, tickets: MatchTicket[]): Promise<number> {
+    const kv = await this.kv();
+    const version = (game.version ?? 0) + 1;
+
+    const tx = kv.multi();
+    this.addGameWrite(tx, game, version);
+    for (const ticket of tickets) {
+      tx.set(`match:ticket:${ticket.id}`, ticket, { ex: MATCH_TICKET_TTL_SECONDS });
+      tx.zrem(`match:pairing:${ticket.mode}`, ticket.id);
+    }
+    await tx.exec();
+
+    return version;
+  }
+
+  // Profiles: JSON record per profile, per-mode counters in a hash, ratings in one sorted set
+  // per mode (the leaderboard). None of these expire.
+  async saveProfile(profile: StoredProfile): Promise<void> {
+    const kv = await this.kv();
+    await kv.set(`profile:${profile.id}`, profile);
+  }
+
+  async getProfiles(profileIds: string[]): Promise<(StoredProfile | null)[]> {
+    if (profileIds.length === 0) return [];
+
+    const kv = await this.kv();
+    return kv.mget<(StoredProfile | null)[]>(...profileIds.map((id) => `profile:${id}`));
+  }
+
+  async getStandings(mode: string, profileIds: string[]): Promise<ProfileStanding[]> {
+    if (profileIds.length === 0) return [];
+
+    const kv = await this.kv();
+    const pipeline = kv.pipeline();
+    for (const id of profileIds) {
+      pipeline.zscore(`leaderboard:${mode}`, id);
+      pipeline.hmget(
+        `profile:${id}:record`,
+        `${mode}:games`,
+        `${mode}:wins`,
+        `${mode}:losses`,
+        `${mode}:draws`
+      );
+    }
+
+    const results = await pipeline.exec<(number | null | Record<string, unknown> | null)[]>();
+    return profileIds.map((_, i) => {
+      const rating = results[i * 2] as number | null;
+      const record = (results[i * 2 + 1] ?? {}) as Record<string, unknown>;
+      const count = (field: string) => Number(record[`${mode}:${field}`] ?? 0);
+      return {
+        rating: rating === null ? null : Number(rating),
+        games: count('games'),
+        wins: count('wins'),
+        losses: count('losses'),
+        draws: count('draws'),
+      };
+    });
+  }
+
+  async saveRatedGame(
+    game: StoredGame,
+    changes: RatingChange[],
+    expectedVersion: number
+  ): Promise<number | null> {
+    const kv = await this.kv();
+    const version = expectedVersion + 1;
+
+    const saved = await kv.eval<string[], number>(
+      SAVE_RATED_GAME_SCRIPT,
+      [
+        `game:${game.id}`,
+        `game:${game.id}:version`,
+        `rated:${game.id}`, // outside game:* so game scans never see it
+        `leaderboard:${game.mode}`,
+        ...changes.map((change) => `profile:${change.profileId}:record`),
+      ],
+      [
+        JSON.stringify({ ...game, version }),
+        String(version),
+        String(GAME_TTL_SECONDS),
+        String(INITIAL_RATING),
+        game.mode,
+        String(expectedVersion),
+        ...changes.flatMap((change) => [change.profileId, String(change.delta), change.result]),
+      ]
+    );
+    return saved === 1 ? version : null;
+  }
+
+  async getLeaderboard(mode: string, offset: number, limit: number): Promise<LeaderboardRow[]> {
+    const kv = await this.kv();
+    const flat = await kv.zrange<(string | number)[]>(
+      `leaderboard:${mode}`,
+      offset,
+      offset + limit - 1,
+      { rev: true, withScores: true }
+    );
+
+    const rows: LeaderboardRow[] = [];
+    for (let i = 0; i < flat.length; i += 2) {
+      rows.push({ profileId: String(flat[i]), rating: Number(flat[i + 1]) });
+    }
+    return rows;
+  }
+
+  async getLeaderboardRank(mode: string, profileId: string): Promise<number | null> {
+    const kv = await this.kv();
+    return kv.zrevrank(`leaderboard:${mode}`, profileId);
+  }
+}
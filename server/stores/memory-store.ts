@@ -0,0 +1,444 @@
+// In-memory game store (for local development and benchmarks)
+// Records are cloned on the way in and out so callers never share mutable state
+
+import type { Message } from '@/lib/types';
+import { messageRef, parseMessageRef, tokenize, type MessageRef } from '../chat-search';
+import { MATCH_PAIRING_TIMEOUT_MS, type MatchTicket } from '../matchmaking';
+import { INITIAL_RATING } from '../ratings';
+import type {
+  ChatHead,
+  GameStore,
+  LeaderboardRow,
+  MessagePageQuery,
+  NewMessage,
+  PostingRange,
+  ProfileStanding,
+  RatingChange,
+  StoredGame,
+  StoredProfile,
+} from '../store';
+
+interface Posting {
+  ref: MessageRef;
+  time: number;
+}
+
+// Index of the first posting with time greater than the given time (postings sorted by time)
+function postingUpperBound(postings: Posting[], time: number): number {
+  let low = 0;
+  let high = postings.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (postings[mid].time <= time) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+// Index of the first message with id greater than the given id (messages are sorted by id)
+function upperBound(messages: Message[], id: number): number {
+  let low = 0;
+  let high = messages.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (messages[mid].id <= id) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+// Leaderboard order, as Redis lists a sorted set in reverse: rating, then id, descending
+function ranksBefore(a: LeaderboardRow, b: LeaderboardRow): boolean {
+  return a.rating > b.rating || (a.rating === b.rating && a.profileId > b.profileId);
+}
+
+// Index of the given row in a leaderboard, or where it would be inserted
+function leaderboardIndex(rows: LeaderboardRow[], row: LeaderboardRow): number {
+  let low = 0;
+  let high = rows.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (ranksBefore(rows[mid], row)) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+export class MemoryGameStore implements GameStore {
+  readonly kind = 'memory' as const;
+
+  private games = new Map<string, StoredGame>();
+  private invites = new Map<string, string>();
+  private messages = new Map<string, Message[]>();
+  private messageSeq = new Map<string, number>();
+  private pruneCounts = new Map<string, number>();
+  private postings = new Map<string, Posting[]>();
+  private indexedRefs = new Set<MessageRef>();
+  private sequences = new Map<string, number>();
+  private jobCursors = new Map<string, string>();
+  private matchQueues = new Map<string, string[]>();
+  private matchTickets = new Map<string, MatchTicket>();
+  // Popped ticket id -> pop time, until the pairing is settled
+  private matchPairing = new Map<string, number>();
+  private profiles = new Map<string, StoredProfile>();
+  // Keyed by mode:profileId
+  private ratings = new Map<string, number>();
+  private records = new Map<string, Omit<ProfileStanding, 'rating'>>();
+  private leaderboards = new Map<string, LeaderboardRow[]>(); // sorted, see ranksBefore
+  private ratedGames = new Set<string>();
+
+  async getGame(gameId: string): Promise<StoredGame | null> {
+    const game = this.games.get(gameId);
+    return game ? structuredClone(game) : null;
+  }
+
+  async getGames(gameIds: string[]): Promise<(StoredGame | null)[]> {
+    return Promise.all(gameIds.map((id) => this.getGame(id)));
+  }
+
+  // The cursor is an offset into insertion order; games are never removed from this store
+  async scanGameIds(cursor: string, count: number): Promise<{ cursor: string; ids: string[] }> {
+    const start = Number(cursor) || 0;
+    const ids: string[] = [];
+    let index = 0;
+
+    for (const id of this.games.keys()) {
+      if (index++ < start) continue;
+      ids.push(id);
+      if (ids.length >= count) break;
+    }
+
+    const end = start + ids.length;
+    return { cursor: end < this.games.size ? String(end) : '0', ids };
+  }
+
+  async saveGame(game: StoredGame): Promise<number> {
+    const version = (game.version ?? 0) + 1;
+    this.games.set(game.id, structuredClone({ ...game, version }));
+    return version;
+  }
+
+  async saveGameIfVersion(game: StoredGame, expectedVersion: number): Promise<number | null> {
+    const current = this.games.get(game.id)?.version ?? 0;
+    if (current !== expectedVersion) return null;
+
+    const version = expectedVersion + 1;
+    this.games.set(game.id, structuredClone({ ...game, version }));
+    return version;
+  }
+
+  async getGameVersion(gameId: string): Promise<number | null> {
+    return this.games.get(gameId)?.version ?? null;
+  }
+
+  async getGameIdByInvite(inviteCode: string): Promise<string | null> {
+    return this.invites.get(inviteCode) ?? null;
+  }
+
+  async getGameByInvite(inviteCode: string): Promise<StoredGame | null> {
+    const gameId = this.invites.get(inviteCode);
+    return gameId ? this.getGame(gameId) : null;
+  }
+
+  async saveInvite(inviteCode: string, gameId: string): Promise<void> {
+    this.invites.set(inviteCode, gameId);
+  }
+
+  async reserveSequence(name: string, count: number): Promise<number> {
+    const value = (this.sequences.get(name) ?? 0) + count;
+    this.sequences.set(name, value);
+    return value;
+  }
+
+  async appendMessage(message: NewMessage): Promise<Message> {
+    let messages = this.messages.get(message.game_id);
+    if (!messages) {
+      messages = [];
+      this.messages.set(message.game_id, messages);
+    }
+
+    const id = (this.messageSeq.get(message.game_id) ?? 0) + 1;
+    this.messageSeq.set(message.game_id, id);
+
+    const stored: Message = { id, ...message };
+    messages.push(stored);
+    await this.indexMessage(stored);
+    return { ...stored };
+  }
+
+  async listMessages(gameId: string, query: MessagePageQuery): Promise<Message[]> {
+    const messages = this.messages.get(gameId) ?? [];
+
+    if (query.afterId !== undefined) {
+      const start = upperBound(messages, query.afterId);
+      return messages.slice(start, start + query.limit).map((m) => ({ ...m }));
+    }
+
+    const end =
+      query.beforeId !== undefined ? upperBound(messages, query.beforeId - 1) : messages.length;
+    return messages.slice(Math.max(0, end - query.limit), end).map((m) => ({ ...m }));
+  }
+
+  async listLatestMessages(
+    gameId: string,
+    limit: number
+  ): Promise<{ messages: Message[]; head: ChatHead }> {
+    const messages = await this.listMessages(gameId, { limit });
+    return { messages, head: await this.getChatHead(gameId) };
+  }
+
+  async getChatHead(gameId: string): Promise<ChatHead> {
+    return {
+      latestId: this.messageSeq.get(gameId) ?? 0,
+      pruneCount: this.pruneCounts.get(gameId) ?? 0,
+    };
+  }
+
+  async deleteMessages(gameId: string, ids: number[]): Promise<Message[]> {
+    const messages = this.messages.get(gameId);
+    if (!messages || ids.length === 0) return [];
+
+    const doomed = new Set(ids);
+    const deleted: Message[] = [];
+    const kept: Message[] = [];
+    for (const message of messages) {
+      (doomed.has(message.id) ? deleted : kept).push(message);
+    }
+    this.messages.set(gameId, kept);
+
+    for (const message of deleted) {
+      this.unindexMessage(message);
+    }
+    if (deleted.length > 0) {
+      this.pruneCounts.set(gameId, (this.pruneCounts.get(gameId) ?? 0) + 1);
+    }
+    return deleted;
+  }
+
+  async indexMessage(message: Message): Promise<void> {
+    const ref = messageRef(message);
+    const terms = tokenize(message.content);
+    // Messages without terms can never match, so they are not counted as documents
+    if (terms.length === 0 || this.indexedRefs.has(ref)) return;
+    this.indexedRefs.add(ref);
+
+    const time = Date.parse(message.created_at);
+    for (const term of terms) {
+      let postings = this.postings.get(term);
+      if (!postings) {
+        postings = [];
+        this.postings.set(term, postings);
+      }
+      // Appends are in time order; backfilled messages are inserted in place
+      postings.splice(postingUpperBound(postings, time), 0, { ref, time });
+    }
+  }
+
+  private unindexMessage(message: Message): void {
+    const ref = messageRef(message);
+    if (!this.indexedRefs.delete(ref)) return;
+
+    const time = Date.parse(message.created_at);
+    for (const term of tokenize(message.content)) {
+      const postings = this.postings.get(term);
+      if (!postings) continue;
+
+      // Postings with the same time sit just before the upper bound
+      let i = postingUpperBound(postings, time) - 1;
+      while (i >= 0 && postings[i].time === time && postings[i].ref !== ref) i--;
+      if (i >= 0 && postings[i].ref === ref) {
+        postings.splice(i, 1);
+      }
+      if (postings.length === 0) {
+        this.postings.delete(term);
+      }
+    }
+  }
+
+  async searchPostings(term: string, range: PostingRange): Promise<MessageRef[]> {
+    const postings = this.postings.get(term) ?? [];
+    const refs: MessageRef[] = [];
+    const end = range.to !== undefined ? postingUpperBound(postings, range.to) : postings.length;
+
+    for (let i = end - 1 - (range.offset ?? 0); i >= 0 && refs.length < range.limit; i--) {
+      if (range.from !== undefined && postings[i].time < range.from) break;
+      refs.push(postings[i].ref);
+    }
+    return refs;
+  }
+
+  async countPostings(terms: string[]): Promise<number[]> {
+    return terms.map((term) => this.postings.get(term)?.length ?? 0);
+  }
+
+  async countIndexedMessages(): Promise<number> {
+    return this.indexedRefs.size;
+  }
+
+  async getMessagesByRef(refs: MessageRef[]): Promise<(Message | null)[]> {
+    return refs.map((ref) => {
+      const { gameId, id } = parseMessageRef(ref);
+      const messages = this.messages.get(gameId) ?? [];
+      const message = messages[upperBound(messages, id - 1)];
+      return message && message.id === id ? { ...message } : null;
+    });
+  }
+
+  async *listChatGameIds(): AsyncIterable<string> {
+    yield* this.messages.keys();
+  }
+
+  async scanChatGameIds(cursor: string, count: number): Promise<{ cursor: string; ids: string[] }> {
+    const start = Number(cursor) || 0;
+    const ids = [...this.messages.keys()].slice(start, start + count);
+    const end = start + ids.length;
+    return { cursor: end < this.messages.size ? String(end) : '0', ids };
+  }
+
+  async getJobCursor(name: string): Promise<string | null> {
+    return this.jobCursors.get(name) ?? null;
+  }
+
+  async saveJobCursor(name: string, cursor: string | null): Promise<void> {
+    if (cursor === null) {
+      this.jobCursors.delete(name);
+    } else {
+      this.jobCursors.set(name, cursor);
+    }
+  }
+
+  async enqueueMatchTicket(ticket: MatchTicket): Promise<void> {
+    this.matchTickets.set(ticket.id, { ...ticket });
+    this.matchQueue(ticket.mode).push(ticket.id);
+  }
+
+  async getMatchTicket(ticketId: string): Promise<MatchTicket | null> {
+    const ticket = this.matchTickets.get(ticketId);
+    return ticket ? { ...ticket } : null;
+  }
+
+  async popMatchPair(mode: string, now = Date.now()): Promise<[string, string] | null> {
+    const queue = this.matchQueue(mode);
+
+    const orphaned = [...this.matchPairing].filter(
+      ([id, poppedAt]) =>
+        poppedAt < now - MATCH_PAIRING_TIMEOUT_MS && this.matchTickets.get(id)?.mode === mode
+    );
+    for (const [id] of orphaned) this.matchPairing.delete(id);
+    queue.unshift(...orphaned.map(([id]) => id));
+
+    if (queue.length < 2) return null;
+    const pair: [string, string] = [queue.shift()!, queue.shift()!];
+    for (const id of pair) this.matchPairing.set(id, now);
+    return pair;
+  }
+
+  async requeueMatchTicket(ticket: MatchTicket): Promise<void> {
+    this.matchPairing.delete(ticket.id);
+    this.matchQueue(ticket.mode).unshift(ticket.id);
+  }
+
+  async cancelMatchTicket(ticket: MatchTicket): Promise<boolean> {
+    const queue = this.matchQueue(ticket.mode);
+    const index = queue.indexOf(ticket.id);
+    if (index === -1) return false;
+
+    queue.splice(index, 1);
+    this.matchTickets.set(ticket.id, { ...ticket });
+    return true;
+  }
+
+  async saveMatchedGame(game: StoredGame, tickets: MatchTicket[]): Promise<number> {
+    for (const ticket of tickets) {
+      this.matchPairing.delete(ticket.id);
+      this.matchTickets.set(ticket.id, { ...ticket });
+    }
+    return this.saveGame(game);
+  }
+
+  async saveProfile(profile: StoredProfile): Promise<void> {
+    this.profiles.set(profile.id, { ...profile });
+  }
+
+  async getProfiles(profileIds: string[]): Promise<(StoredProfile | null)[]> {
+    return profileIds.map((id) => {
+      const profile = this.profiles.get(id);
+      return profile ? { ...profile } : null;
+    });
+  }
+
+  async getStandings(mode: string, profileIds: string[]): Promise<ProfileStanding[]> {
+    return profileIds.map((profileId) => {
+      const key = `${mode}:${profileId}`;
+      const rating = this.ratings.get(key) ?? null;
+      return { rating, games: 0, wins: 0, losses: 0, draws: 0, ...this.records.get(key) };
+    });
+  }
+
+  async saveRatedGame(
+    game: StoredGame,
+    changes: RatingChange[],
+    expectedVersion: number
+  ): Promise<number | null> {
+    const version = await this.saveGameIfVersion(game, expectedVersion);
+    if (version === null || this.ratedGames.has(game.id)) return version;
+    this.ratedGames.add(game.id);
+
+    const rows = this.leaderboard(game.mode);
+    for (const { profileId, delta, result } of changes) {
+      const key = `${game.mode}:${profileId}`;
+      const current = this.ratings.get(key);
+      if (current !== undefined) {
+        rows.splice(leaderboardIndex(rows, { profileId, rating: current }), 1);
+      }
+      const row = { profileId, rating: (current ?? INITIAL_RATING) + delta };
+      rows.splice(leaderboardIndex(rows, row), 0, row);
+      this.ratings.set(key, row.rating);
+
+      const record = this.records.get(key) ?? { games: 0, wins: 0, losses: 0, draws: 0 };
+      record.games++;
+      record[result]++;
+      this.records.set(key, record);
+    }
+    return version;
+  }
+
+  async getLeaderboard(mode: string, offset: number, limit: number): Promise<LeaderboardRow[]> {
+    return this.leaderboard(mode)
+      .slice(offset, offset + limit)
+      .map((row) => ({ ...row }));
+  }
+
+  async getLeaderboardRank(mode: string, profileId: string): Promise<number | null> {
+    const rating = this.ratings.get(`${mode}:${profileId}`);
+    if (rating === undefined) return null;
+    return leaderboardIndex(this.leaderboard(mode), { profileId, rating });
+  }
+
+  private leaderboard(mode: string): LeaderboardRow[] {
+    let rows = this.leaderboards.get(mode);
+    if (!rows) {
+      rows = [];
+      this.leaderboards.set(mode, rows);
+    }
+    return rows;
+  }
+
+  private matchQueue(mode: string): string[] {
+    let queue = this.matchQueues.get(mode);
+    if (!queue) {
+      queue = [];
+      this.matchQueues.set(mode, queue);
+    }
+    return queue;
+  }
+}
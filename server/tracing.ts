@@ -0,0 +1,342 @@
+// Request tracing
+// A sampled request records a trace: a root span for the route, a span for each phase a
+// handler wraps with traced() and one span per store call. The active span is kept in
+// AsyncLocalStorage, so spans started in awaited or concurrent work nest under the right
+// parent. Finished traces go to a ring buffer served by /api/debug/traces and, when
+// TRACE_OTLP_FILE is set, to a file in OTLP/JSON (one export request per line) that the
+// OpenTelemetry Collector's otlpjsonfile receiver can forward.
+//
+// TRACE_SAMPLE_RATE (0-1, default 0) is the share of requests traced. Unsampled requests pay
+// one AsyncLocalStorage lookup per traced() phase and store call.
+
+import { AsyncLocalStorage } from 'node:async_hooks';
+import { randomBytes } from 'node:crypto';
+import { appendFile } from 'node:fs/promises';
+
+export type SpanKind = 'server' | 'internal' | 'client';
+export type SpanAttributes = Record<string, string | number | boolean>;
+
+export interface SpanRecord {
+  spanId: string;
+  parentSpanId: string | null;
+  name: string;
+  kind: SpanKind;
+  startTime: number; // epoch ms, sub-ms precision
+  durationMs: number;
+  attributes: SpanAttributes;
+  error: string | null;
+}
+
+export interface TraceRecord {
+  traceId: string;
+  name: string;
+  startTime: number;
+  durationMs: number; // of the root span
+  spans: SpanRecord[]; // in start order, root first
+}
+
+export interface TracingOptions {
+  sampleRate: number;
+  bufferSize: number; // finished traces kept in memory
+  otlpFile: string | null;
+  serviceName: string;
+}
+
+export interface TracingStats {
+  sampleRate: number;
+  sampled: number;
+  skipped: number;
+  finished: number;
+  buffered: number;
+  exported: number;
+  exportErrors: number;
+}
+
+export function tracingOptionsFromEnv(): TracingOptions {
+  const rate = Number(process.env.TRACE_SAMPLE_RATE || 0);
+  return {
+    sampleRate: Number.isFinite(rate) ? Math.min(1, Math.max(0, rate)) : 0,
+    bufferSize: Number(process.env.TRACE_BUFFER_SIZE || 200),
+    otlpFile: process.env.TRACE_OTLP_FILE || null,
+    serviceName: process.env.OTEL_SERVICE_NAME || 'tic-tac-toe-gomoku',
+  };
+}
+
+const globalForTracing = globalThis as unknown as { __spanStorage?: AsyncLocalStorage<Span> };
+
+function spanStorage(): AsyncLocalStorage<Span> {
+  if (!globalForTracing.__spanStorage) {
+    globalForTracing.__spanStorage = new AsyncLocalStorage<Span>();
+  }
+  return globalForTracing.__spanStorage;
+}
+
+export function isPromise(value: unknown): value is Promise<unknown> {
+  return typeof (value as Promise<unknown> | null)?.then === 'function';
+}
+
+// Ids are cut from a pool of random bytes refilled 4 KB at a time; a randomBytes() call per
+// span costs more than the rest of the span
+const ID_POOL_SIZE = 4096;
+let idPool = Buffer.alloc(0);
+let idPoolOffset = 0;
+
+function randomId(bytes: number): string {
+  if (idPoolOffset + bytes > idPool.length) {
+    idPool = randomBytes(ID_POOL_SIZE);
+    idPoolOffset = 0;
+  }
+  const id = idPool.toString('hex', idPoolOffset, idPoolOffset + bytes);
+  idPoolOffset += bytes;
+  return id;
+}
+
+function errorMessage(error: unknown): string {
+  return error instanceof Error ? error.message : String(error);
+}
+
+interface ActiveTrace {
+  record: TraceRecord;
+  open: number; // spans not yet ended; the trace is finished when this drops to zero
+  finished: boolean; // spans started later still show in the buffer but are not exported
+  finish: (record: TraceRecord) => void;
+}
+
+export class Span {
+  readonly record: SpanRecord;
+  private readonly start = performance.now();
+  private ended = false;
+
+  constructor(
+    private readonly trace: ActiveTrace,
+    name: string,
+    parentSpanId: string | null,
+    kind: SpanKind,
+    attributes: SpanAttributes = {}
+  ) {
+    this.record = {
+      spanId: randomId(8),
+      parentSpanId,
+      name,
+      kind,
+      startTime: performance.timeOrigin + this.start,
+      durationMs: 0,
+      attributes: { ...attributes },
+      error: null,
+    };
+    trace.record.spans.push(this.record);
+    trace.open++;
+  }
+
+  setAttributes(attributes: SpanAttributes): void {
+    Object.assign(this.record.attributes, attributes);
+  }
+
+  child(name: string, attributes?: SpanAttributes, kind: SpanKind = 'internal'): Span {
+    return new Span(this.trace, name, this.record.spanId, kind, attributes);
+  }
+
+  // Runs fn with this span as the parent of spans started inside it
+  run<T>(fn: () => T): T {
+    return spanStorage().run(this, fn);
+  }
+
+  end(error?: unknown): void {
+    if (this.ended) return;
+    this.ended = true;
+
+    this.record.durationMs = performance.now() - this.start;
+    if (error !== undefined) {
+      this.record.error = errorMessage(error);
+    }
+
+    const { trace } = this;
+    if (this.record.parentSpanId === null) {
+      trace.record.durationMs = this.record.durationMs;
+    }
+    // Work the handler did not await (e.g. publishing) keeps the trace open until it ends
+    if (--trace.open === 0 && !trace.finished) {
+      trace.finished = true;
+      trace.finish(trace.record);
+    }
+  }
+}
+
+export function currentSpan(): Span | undefined {
+  return spanStorage().getStore();
+}
+
+// Runs fn in a child span of the current span; just runs fn when the request is not traced
+export function traced<T>(name: string, fn: () => T, attributes?: SpanAttributes): T {
+  const parent = currentSpan();
+  if (!parent) return fn();
+
+  const span = parent.child(name, attributes);
+  let result: T;
+  try {
+    result = span.run(fn);
+  } catch (error) {
+    span.end(error);
+    throw error;
+  }
+
+  if (!isPromise(result)) {
+    span.end();
+    return result;
+  }
+  return result.then(
+    (value) => {
+      span.end();
+      return value;
+    },
+    (error: unknown) => {
+      span.end(error);
+      throw error;
+    }
+  ) as T;
+}
+
+export function setSpanAttributes(attributes: SpanAttributes): void {
+  currentSpan()?.setAttributes(attributes);
+}
+
+export interface TraceQuery {
+  limit: number;
+  name?: string; // substring of the root span name, e.g. "/api/game/move"
+  minMs?: number;
+  slowest?: boolean; // order by duration instead of newest first
+}
+
+export class Tracer {
+  private buffer: TraceRecord[] = [];
+  private next = 0; // ring buffer write position once full
+  private exportQueue: Promise<void> = Promise.resolve();
+  private counters = { sampled: 0, skipped: 0, finished: 0, exported: 0, exportErrors: 0 };
+
+  constructor(readonly options: TracingOptions = tracingOptionsFromEnv()) {}
+
+  // Root span for a request, or null when the request is not sampled
+  startTrace(name: string, attributes?: SpanAttributes): Span | null {
+    const { sampleRate } = this.options;
+    if (sampleRate <= 0 || (sampleRate < 1 && Math.random() >= sampleRate)) {
+      this.counters.skipped++;
+      return null;
+    }
+
+    this.counters.sampled++;
+    const trace: ActiveTrace = {
+      record: { traceId: randomId(16), name, startTime: 0, durationMs: 0, spans: [] },
+      open: 0,
+      finished: false,
+      finish: (record) => this.finish(record),
+    };
+    const root = new Span(trace, name, null, 'server', attributes);
+    trace.record.startTime = root.record.startTime;
+    return root;
+  }
+
+  recent(query: TraceQuery): TraceRecord[] {
+    // Oldest to newest
+    const ordered = [...this.buffer.slice(this.next), ...this.buffer.slice(0, this.next)];
+    const matching = ordered.filter(
+      (trace) =>
+        (!query.name || trace.name.includes(query.name)) &&
+        (query.minMs === undefined || trace.durationMs >= query.minMs)
+    );
+
+    if (query.slowest) {
+      matching.sort((a, b) => b.durationMs - a.durationMs);
+    } else {
+      matching.reverse();
+    }
+    return matching.slice(0, query.limit);
+  }
+
+  // Resolves once every finished trace has been written to the OTLP file
+  flush(): Promise<void> {
+    return this.exportQueue;
+  }
+
+  stats(): TracingStats {
+    return {
+      sampleRate: this.options.sampleRate,
+      ...this.counters,
+      buffered: this.buffer.length,
+    };
+  }
+
+  private finish(record: TraceRecord): void {
+    this.counters.finished++;
+
+    const { bufferSize, otlpFile, serviceName } = this.options;
+    if (bufferSize > 0) {
+      if (this.buffer.length < bufferSize) {
+        this.buffer.push(record);
+      } else {
+        this.buffer[this.next] = record;
+        this.next = (this.next + 1) % bufferSize;
+      }
+    }
+
+    if (otlpFile) {
+      const line = JSON.stringify(toOtlpJson(record, serviceName)) + '\n';
+      this.exportQueue = this.exportQueue
+        .then(() => appendFile(otlpFile, line))
+        .then(
+          () => {
+            this.counters.exported++;
+          },
+          (error: unknown) => {
+            this.counters.exportErrors++;
+            console.error('[Tracing] Failed to write OTLP file:', error);
+          }
+        );
+    }
+  }
+}
+
+// OTLP/JSON encoding (ExportTraceServiceRequest)
+
+const OTLP_SPAN_KIND: Record<SpanKind, number> = { internal: 1, server: 2, client: 3 };
+
+function unixNano(epochMs: number): string {
+  const whole = Math.floor(epochMs);
+  const fraction = Math.round((epochMs - whole) * 1e6);
+  return (BigInt(whole) * BigInt(1e6) + BigInt(fraction)).toString();
+}
+
+function otlpValue(value: string | number | boolean) {
+  if (typeof value === 'string') return { stringValue: value };
+  if (typeof value === 'boolean') return { boolValue: value };
+  return Number.isInteger(value) ? { intValue: String(value) } : { doubleValue: value };
+}
+
+function otlpAttributes(attributes: SpanAttributes) {
+  return Object.entries(attributes).map(([key, value]) => ({ key, value: otlpValue(value) }));
+}
+
+export function toOtlpJson(trace: TraceRecord, serviceName: string) {
+  return {
+    resourceSpans: [
+      {
+        resource: { attributes: otlpAttributes({ 'service.name': serviceName }) },
+        scopeSpans: [
+          {
+            scope: { name: 'server/tracing' },
+            spans: trace.spans.map((span) => ({
+              traceId: trace.traceId,
+              spanId: span.spanId,
+              ...(span.parentSpanId ? { parentSpanId: span.parentSpanId } : {}),
+              name: span.name,
+              kind: OTLP_SPAN_KIND[span.kind],
+              startTimeUnixNano: unixNano(span.startTime),
+              endTimeUnixNano: unixNano(span.startTime + span.durationMs),
+              attributes: otlpAttributes(span.attributes),
+              status: span.error ? { code: 2, message: span.error } : { code: 1 },
+            })),
+          },
+        ],
+      },
+    ],
+  };
+}